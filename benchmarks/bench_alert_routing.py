@@ -0,0 +1,138 @@
+"""
+알림 라우팅 결정 벤치마크 (컴파일된 결정 테이블 vs 알림마다 설정 해석)
+좌석 수별로 무작위 좌석·신뢰도·시각의 라우팅 결정을 반복해 초당 결정 수를 비교
+
+- compiled: AlertRouter.route (좌석 → 분 테이블 조회)
+- interpreted: 알림마다 notification_preferences / 좌석 예외 패턴 / HH:MM / alert_to를 다시 해석
+  (컴파일 전 방식, 결과가 compiled와 같은지도 확인)
+
+사용법:
+    python benchmarks/bench_alert_routing.py
+    python benchmarks/bench_alert_routing.py --seats 16,256,1024 --seconds 1 --output routing.json
+"""
+import argparse
+import fnmatch
+import json
+import random
+import sys
+import time
+from datetime import datetime
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT / 'src'))
+
+from alert_routing import SINK_TOGGLES, SINKS, AlertRouter, resolve_targets  # noqa: E402
+
+
+CONFIG = {
+    'telegram': {
+        'chat_ids': {'admin': '1', 'staff1': '2', 'staff2': '3', 'group': '-100'},
+        'alert_to': 'group',
+    },
+    'notification_preferences': {
+        'send_telegram': True,
+        'log_to_sheets': True,
+        'send_webhook': False,
+        'min_confidence_for_alert': 0.75,
+        'quiet_hours': {'enabled': True, 'start': '22:00', 'end': '07:00', 'sinks': ['telegram']},
+        'seats': {
+            '7': {'min_confidence_for_alert': 0.6},
+            'node-2/*': {'alert_to': 'staff2', 'send_webhook': True},
+            '1?': {'quiet_hours': {'enabled': True, 'start': '12:00', 'end': '13:00'}},
+        },
+    },
+}
+
+
+def interpreted_route(config: dict, seat: str, confidence: float, when: datetime):
+    """컴파일 없이 알림마다 설정을 해석하는 라우팅 (비교 기준)"""
+    prefs = config.get('notification_preferences', {})
+    seats = prefs.get('seats', {})
+    override = seats.get(seat)
+    if override is None:
+        override = next((o for key, o in seats.items() if fnmatch.fnmatchcase(seat, key)), {})
+    prefs = {**prefs, **override}
+
+    if confidence < prefs.get('min_confidence_for_alert', 0.0):
+        return (), ()
+    sinks = [sink for sink in SINKS if prefs.get(SINK_TOGGLES[sink], True)]
+
+    quiet = prefs.get('quiet_hours', {})
+    if quiet.get('enabled', False):
+        start_h, start_m = map(int, quiet['start'].split(':'))
+        end_h, end_m = map(int, quiet['end'].split(':'))
+        start, end, minute = start_h * 60 + start_m, end_h * 60 + end_m, when.hour * 60 + when.minute
+        quiet_now = start <= minute < end if start <= end else (minute >= start or minute < end)
+        if quiet_now:
+            muted = quiet.get('sinks', SINKS)
+            sinks = [sink for sink in sinks if sink not in muted]
+
+    telegram = config.get('telegram', {})
+    targets = resolve_targets(telegram, prefs.get('alert_to', telegram.get('alert_to', 'group')))
+    return tuple(sinks), targets if 'telegram' in sinks else ()
+
+
+def make_requests(seat_count: int, count: int = 4096, seed: int = 0):
+    """(좌석, 신뢰도, 시각) 무작위 요청 (절반은 node-2 좌석)"""
+    rng = random.Random(seed)
+    seats = [str(i + 1) if i % 2 else f"node-2/{i + 1}" for i in range(seat_count)]
+    return [(rng.choice(seats), rng.uniform(0.5, 1.0),
+             datetime(2026, 3, 2, rng.randrange(24), rng.randrange(60)))
+            for _ in range(count)]
+
+
+def rate(func, requests, seconds: float) -> float:
+    """seconds초 동안 요청 목록을 반복 처리한 초당 결정 수"""
+    for args in requests:
+        func(*args)
+    decisions = 0
+    start = time.perf_counter()
+    while time.perf_counter() - start < seconds:
+        for args in requests:
+            func(*args)
+        decisions += len(requests)
+    return decisions / (time.perf_counter() - start)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='알림 라우팅 결정 벤치마크')
+    parser.add_argument('--seats', default='16,256,1024', help='좌석 수 (쉼표 구분)')
+    parser.add_argument('--seconds', type=float, default=0.5, help='측정당 반복 시간 (초)')
+    parser.add_argument('--output', type=str, help='결과 JSON 저장 경로')
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    router = AlertRouter(CONFIG)
+    compile_ms = (time.perf_counter() - start) * 1000
+    print(f"🔀 규칙 컴파일: {compile_ms:.2f}ms")
+
+    def compiled(seat, confidence, when):
+        sinks = router.route(seat, confidence, when)
+        return sinks, router.telegram_targets(seat) if 'telegram' in sinks else ()
+
+    def interpreted(seat, confidence, when):
+        return interpreted_route(CONFIG, seat, confidence, when)
+
+    report = {'compile_ms': compile_ms}
+    print(f"{'좌석':>6} {'compiled 결정/초':>18} {'interpreted 결정/초':>20} {'배율':>6}")
+    for seat_count in (int(v) for v in args.seats.split(',')):
+        requests = make_requests(seat_count)
+        # 두 방식의 결정이 같아야 함
+        for request in requests:
+            assert compiled(*request) == interpreted(*request), request
+
+        results = {'compiled': rate(compiled, requests, args.seconds),
+                   'interpreted': rate(interpreted, requests, args.seconds)}
+        report[seat_count] = results
+        print(f"{seat_count:>6} {results['compiled']:>18,.0f} {results['interpreted']:>20,.0f} "
+              f"{results['compiled'] / results['interpreted']:>5.1f}x")
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2)
+        print(f"💾 결과 저장: {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,123 @@
+"""
+캡처 그룹 화면 캡처 벤치마크 (모니터 수에 따른 캡처 시간)
+실제 모니터마다 캡처 그룹 1개를 만들고, 모니터 1대 / 2대 ...일 때 다음을 측정
+
+- grab: 그룹을 하나씩 순서대로 캡처한 시간 합 (캡처 비용, 그룹 픽셀 수에 비례해야 함)
+- cycle: capture_groups() 1회 (그룹별 스레드 병렬, 감지 루프가 기다리는 시간)
+- pil: 예전 경로 (PIL ImageGrab bbox + all_screens) 순차 합, 비교용
+  Windows에서는 그룹마다 가상 데스크톱 전체를 캡처한 뒤 잘라내므로 모니터 수의 제곱으로 늘어남
+
+배율은 모니터 1대 기준이며, grab 배율이 픽셀 배율과 비슷하면 선형.
+실제 화면(모니터 2대 이상)과 mss가 있어야 함 (헤드리스 환경에서는 실행 불가)
+
+사용법:
+    python benchmarks/bench_capture.py
+    python benchmarks/bench_capture.py --monitors 1,2 --rounds 50 --output capture.json
+"""
+import argparse
+import json
+import os
+import platform
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT / 'src'))
+
+import capture  # noqa: E402
+from capture import ViewGuardCapture  # noqa: E402
+
+
+def monitor_groups(monitors, count: int):
+    """실제 모니터 앞에서부터 count대를 캡처 그룹으로"""
+    return {f"m{i + 1}": {'x': m['left'], 'y': m['top'],
+                          'width': m['width'], 'height': m['height']}
+            for i, m in enumerate(monitors[:count])}
+
+
+def make_capture(groups, workdir: str) -> ViewGuardCapture:
+    """캡처 그룹만 있는 좌석 설정으로 캡처 객체 생성"""
+    path = os.path.join(workdir, f"seats_{len(groups)}.json")
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump({'groups': groups, 'seats': {}}, f)
+    return ViewGuardCapture(config_path=path)
+
+
+def bboxes(groups):
+    return [(g['x'], g['y'], g['x'] + g['width'], g['y'] + g['height'])
+            for g in groups.values()]
+
+
+def time_ms(func, rounds: int) -> float:
+    """func 1회 평균 시간 (ms, 첫 호출은 워밍업으로 제외)"""
+    func()
+    start = time.perf_counter()
+    for _ in range(rounds):
+        func()
+    return (time.perf_counter() - start) / rounds * 1000
+
+
+def run(cap: ViewGuardCapture, groups, rounds: int, pil: bool):
+    """모니터 수 설정 하나 측정 (순차 grab, 병렬 cycle, PIL 비교)"""
+    boxes = bboxes(groups)
+    result = {
+        'monitors': len(groups),
+        'pixels': sum(g['width'] * g['height'] for g in groups.values()),
+        'grab_ms': time_ms(lambda: [cap.grab(b) for b in boxes], rounds),
+        'cycle_ms': time_ms(cap.capture_groups, rounds),
+    }
+    if pil:
+        result['pil_ms'] = time_ms(lambda: [capture._grab_pil(b) for b in boxes], rounds)
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description='캡처 그룹 화면 캡처 벤치마크')
+    parser.add_argument('--monitors', default='1,2', help='측정할 모니터 수 (쉼표 구분)')
+    parser.add_argument('--rounds', type=int, default=30, help='설정별 반복 횟수')
+    parser.add_argument('--no-pil', action='store_true', help='PIL ImageGrab 비교 생략')
+    parser.add_argument('--output', help='결과 JSON 저장 경로')
+    args = parser.parse_args()
+
+    try:
+        import mss
+        with mss.mss() as sct:
+            monitors = sct.monitors[1:]
+    except Exception as e:
+        print(f"❌ 화면 캡처 불가 (mss 설치 / 실제 화면 필요): {e}")
+        sys.exit(1)
+
+    counts = [int(c) for c in args.monitors.split(',')]
+    if max(counts) > len(monitors):
+        print(f"⚠️  모니터 {len(monitors)}대만 연결됨: {max(counts)}대 측정 생략")
+        counts = [c for c in counts if c <= len(monitors)]
+    if not counts:
+        sys.exit(1)
+
+    results = []
+    with tempfile.TemporaryDirectory() as workdir:
+        for count in counts:
+            groups = monitor_groups(monitors, count)
+            results.append(run(make_capture(groups, workdir), groups, args.rounds, not args.no_pil))
+
+    base = results[0]
+    print(f"\n{'모니터':>6} {'픽셀':>10} {'grab ms':>9} {'cycle ms':>9} {'pil ms':>9} "
+          f"{'픽셀 배율':>9} {'grab 배율':>9}")
+    for r in results:
+        r['pixel_ratio'] = r['pixels'] / base['pixels']
+        r['grab_ratio'] = r['grab_ms'] / base['grab_ms']
+        pil = f"{r['pil_ms']:9.2f}" if 'pil_ms' in r else f"{'-':>9}"
+        print(f"{r['monitors']:>6} {r['pixels']:>10,} {r['grab_ms']:9.2f} {r['cycle_ms']:9.2f} {pil} "
+              f"{r['pixel_ratio']:8.2f}x {r['grab_ratio']:8.2f}x")
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump({'platform': platform.platform(), 'rounds': args.rounds,
+                       'results': results}, f, indent=2, ensure_ascii=False)
+        print(f"\n💾 결과 저장: {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,132 @@
+"""
+감지 이벤트 전송 형식 벤치마크 (바이너리 레코드 vs JSON)
+노드 1사이클 분량 이벤트 묶음을 반복 인코딩/디코딩하여
+이벤트당 바이트, 인코딩/디코딩 처리량(이벤트/초)을 비교
+
+- json: json.dumps / json.loads (distributed의 JSON 프레임 본문)
+- binary: event_format.encode_events / decode_events (딕셔너리 왕복)
+- binary-records: pack_events 결과 배열 인코딩 / decode_records (딕셔너리 변환 없음)
+
+사용법:
+    python benchmarks/bench_event_format.py
+    python benchmarks/bench_event_format.py --batch-sizes 16,64,256 --seconds 1 --output event_format.json
+"""
+import argparse
+import json
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT / 'src'))
+
+import event_format  # noqa: E402
+from distributed import seat_event  # noqa: E402
+
+
+def make_events(count: int, seed: int = 0):
+    """착석 80% / 졸음 10% 비율의 현실적인 좌석 이벤트"""
+    rng = np.random.default_rng(seed)
+    events = []
+    for i in range(count):
+        if rng.random() < 0.2:
+            events.append(seat_event(str(i + 1), False))
+            continue
+        drowsy = rng.random() < 0.1
+        details = {
+            'status': 'drowsy' if drowsy else 'alert',
+            'ear': float(rng.uniform(0.12, 0.32)),
+            'head_tilt': float(rng.uniform(0.4, 0.7)),
+            'eyes_closed': drowsy,
+            'head_down': drowsy and rng.random() < 0.5,
+        }
+        events.append(seat_event(str(i + 1), True, (drowsy, float(rng.uniform(0.3, 0.95)), details)))
+    return events
+
+
+def rate(func, seconds: float) -> float:
+    """seconds초 동안 반복 실행한 초당 호출 수"""
+    func()
+    calls = 0
+    start = time.perf_counter()
+    while time.perf_counter() - start < seconds:
+        func()
+        calls += 1
+    return calls / (time.perf_counter() - start)
+
+
+def bench(batch_size: int, seconds: float):
+    """묶음 크기 1개에 대한 형식별 결과"""
+    events = make_events(batch_size)
+    ts = time.time()
+    records = event_format.pack_events(events)
+
+    json_body = json.dumps({'node': 'node-1', 'ts': ts, 'events': events},
+                           separators=(',', ':')).encode('utf-8')
+    binary_body = event_format.encode_events('node-1', events, ts)
+
+    cases = {
+        'json': (
+            len(json_body),
+            lambda: json.dumps({'node': 'node-1', 'ts': ts, 'events': events},
+                               separators=(',', ':')).encode('utf-8'),
+            lambda: json.loads(json_body),
+        ),
+        'binary': (
+            len(binary_body),
+            lambda: event_format.encode_events('node-1', events, ts),
+            lambda: event_format.decode_events(binary_body),
+        ),
+        'binary-records': (
+            len(binary_body),
+            lambda: event_format.encode_events('node-1', records, ts),
+            lambda: event_format.decode_records(binary_body),
+        ),
+    }
+
+    results = {}
+    for name, (size, encode, decode) in cases.items():
+        results[name] = {
+            'bytes_per_event': size / batch_size,
+            'encode_events_per_sec': rate(encode, seconds) * batch_size,
+            'decode_events_per_sec': rate(decode, seconds) * batch_size,
+        }
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description='감지 이벤트 전송 형식 벤치마크')
+    parser.add_argument('--batch-sizes', default='16,64,256', help='묶음당 이벤트 수 (쉼표 구분)')
+    parser.add_argument('--seconds', type=float, default=0.5, help='측정당 반복 시간 (초)')
+    parser.add_argument('--output', type=str, help='결과 JSON 저장 경로')
+    args = parser.parse_args()
+
+    # 왕복 정확성 (신뢰도는 그대로, 나머지는 float16 정밀도 안)
+    events = make_events(64)
+    decoded = event_format.decode_events(event_format.encode_events('node-1', events, 0.0))['events']
+    for original, restored in zip(events, decoded):
+        assert original['seat'] == restored['seat'] and original['status'] == restored['status']
+        assert original.get('confidence') == restored.get('confidence')
+        assert abs(original.get('ear', 0) - restored.get('ear', 0)) < 1e-3
+    assert json.loads(event_format.to_json(event_format.from_json(json.dumps(
+        {'node': 'n', 'ts': 1.0, 'events': decoded}))))['events'] == decoded
+
+    report = {}
+    print(f"{'묶음':>5} {'형식':<15} {'바이트/이벤트':>12} {'인코딩 이벤트/초':>16} {'디코딩 이벤트/초':>16}")
+    for batch_size in (int(v) for v in args.batch_sizes.split(',')):
+        results = bench(batch_size, args.seconds)
+        report[batch_size] = results
+        for name, r in results.items():
+            print(f"{batch_size:>5} {name:<15} {r['bytes_per_event']:>12.1f} "
+                  f"{r['encode_events_per_sec']:>16,.0f} {r['decode_events_per_sec']:>16,.0f}")
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2)
+        print(f"💾 결과 저장: {args.output}")
+
+
+if __name__ == "__main__":
+    main()
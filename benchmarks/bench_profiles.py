@@ -0,0 +1,263 @@
+"""
+감지 프로필(fast / standard / precise) · 랜드마크 백엔드 지연-정확도 비교 벤치마크
+같은 좌석 ROI 시퀀스를 (백엔드, 프로필)마다 새 감지기로 처리하여
+ROI당 지연 백분위수, 좌석/초, 코어당 좌석/초, 얼굴 검출률, 졸음 판정 정확도를 비교
+
+프레임마다 좌석 ROI 전체를 detect_drowsiness_batch로 한 번에 넘기므로
+배치 추론 백엔드(opencv_dnn)는 배치 효과가, MediaPipe는 순차 처리 비용이 그대로 측정됨.
+코어당 좌석/초 = 처리 좌석 수 / 프로세스 CPU 시간 (멀티스레드 추론의 CPU 사용량 반영)
+
+정답 라벨:
+- 합성 입력: SyntheticFaceGrid 상태 라벨 (empty 좌석은 얼굴이 없어야 정답)
+- 녹화 입력: 라벨이 없으므로 precise 프로필 판정과의 일치율
+
+사용법:
+    # 합성 입력 (32석, 10프레임)
+    python benchmarks/bench_profiles.py --seats 32 --frames 10
+
+    # 녹화 입력
+    python benchmarks/bench_profiles.py --recording recordings/lab.vgrec \\
+        --seats-config config/seats.json --output profiles.json
+
+    # 백엔드 비교 (MediaPipe vs OpenCV DNN 배치 추론)
+    python benchmarks/bench_profiles.py --backends mediapipe,opencv_dnn --profiles fast,standard
+"""
+import argparse
+import json
+import os
+import platform
+import sys
+import time
+from datetime import datetime
+from pathlib import Path
+
+import numpy as np
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT / 'src'))
+
+from detection_engine import BACKENDS, PROFILES  # noqa: E402
+
+REFERENCE_PROFILE = 'precise'
+REFERENCE_BACKEND = 'mediapipe'
+
+
+def load_synthetic(args):
+    """합성 프레임 → [(좌석 ROI 리스트, 상태 라벨 리스트)]"""
+    from synthetic import SyntheticFaceGrid
+
+    grid = SyntheticFaceGrid(args.seats, (args.width, args.height), args.seed, args.clips)
+    seats = grid.seats()
+
+    samples = []
+    for _ in range(args.frames):
+        frame, labels = grid.next_frame()
+        rois, states = [], []
+        for sid, seat in seats.items():
+            x, y, w, h = seat['x'], seat['y'], seat['width'], seat['height']
+            rois.append(frame[y:y + h, x:x + w].copy())
+            states.append(labels[sid])
+        samples.append((rois, states))
+    return samples
+
+
+def load_recording(args):
+    """녹화 화면 프레임 → [(좌석 ROI 리스트, None)]"""
+    from replay import FrameRecording, SCREEN_CHANNEL
+
+    with open(args.seats_config, 'r', encoding='utf-8') as f:
+        seats = json.load(f).get('seats', {})
+    seats = [s for s in seats.values() if s.get('enabled', True)]
+
+    recording = FrameRecording.load(args.recording)
+    samples = []
+    for _, channel, encoding, payload in recording.records:
+        if channel != SCREEN_CHANNEL:
+            continue
+        frame = FrameRecording.decode(encoding, payload)
+        if frame is None:
+            continue
+        rois = [frame[s['y']:s['y'] + s['height'], s['x']:s['x'] + s['width']].copy()
+                for s in seats]
+        samples.append((rois, None))
+    return samples
+
+
+def run_profile(backend, name, samples, detection_config):
+    """
+    (백엔드, 프로필) 하나로 전체 ROI 처리
+
+    Returns:
+        (ROI당 처리 시간 리스트, CPU 시간, 프레임별 판정 리스트)
+        판정: None(얼굴 없음) / True(졸음) / False(정상)
+    """
+    from advanced_detector import AdvancedDrowsinessDetector
+
+    engine = dict(detection_config.get('engine', {}), backend=backend)
+    detector = AdvancedDrowsinessDetector(dict(detection_config, profile=name, engine=engine))
+
+    # 첫 호출의 모델 로딩 비용 제외
+    detector.detect_drowsiness_batch(samples[0][0])
+
+    timings, verdicts = [], []
+    cpu_start = time.process_time()
+    for rois, _ in samples:
+        start = time.perf_counter()
+        results = detector.detect_drowsiness_batch(rois)
+        per_roi = (time.perf_counter() - start) / len(rois)
+        timings.extend([per_roi] * len(rois))
+        verdicts.append([
+            is_drowsy if details.get('status') != 'no_face_detected' else None
+            for is_drowsy, _, details in results
+        ])
+    cpu = time.process_time() - cpu_start
+
+    del detector
+    return timings, cpu, verdicts
+
+
+def score_labels(verdicts, samples):
+    """합성 라벨 기준 검출률/정확도"""
+    from synthetic import DROWSY_STATES, STATE_EMPTY
+
+    faces = found = empty = false_faces = judged = correct = 0
+    for frame_verdicts, (_, states) in zip(verdicts, samples):
+        for verdict, state in zip(frame_verdicts, states):
+            if state == STATE_EMPTY:
+                empty += 1
+                false_faces += verdict is not None
+                continue
+            faces += 1
+            if verdict is None:
+                continue
+            found += 1
+            judged += 1
+            correct += verdict == (state in DROWSY_STATES)
+
+    return {
+        'face_detection_rate': found / faces if faces else None,
+        'false_face_rate': false_faces / empty if empty else None,
+        'drowsy_accuracy': correct / judged if judged else None
+    }
+
+
+def score_reference(verdicts, reference):
+    """기준(precise) 프로필 판정과의 일치율"""
+    total = agree = 0
+    for frame_verdicts, ref_verdicts in zip(verdicts, reference):
+        for verdict, ref in zip(frame_verdicts, ref_verdicts):
+            total += 1
+            agree += verdict == ref
+    return {'agreement_with_precise': agree / total if total else None}
+
+
+def summarize(timings, cpu):
+    ms = np.array(timings) * 1000
+    total = float(np.sum(timings))
+    return {
+        'rois': len(timings),
+        'p50_ms': float(np.percentile(ms, 50)),
+        'p90_ms': float(np.percentile(ms, 90)),
+        'mean_ms': float(np.mean(ms)),
+        'seats_per_sec': len(timings) / total if total > 0 else 0.0,
+        'cpu_s': cpu,
+        'seats_per_core_sec': len(timings) / cpu if cpu > 0 else 0.0
+    }
+
+
+def fmt(value, pattern):
+    return '-' if value is None else pattern.format(value)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='감지 프로필 지연-정확도 비교')
+    parser.add_argument('--profiles', default=','.join(PROFILES),
+                        help='비교할 프로필 (fast,standard,precise)')
+    parser.add_argument('--backends', default=REFERENCE_BACKEND,
+                        help='비교할 랜드마크 백엔드 (mediapipe,opencv_dnn)')
+    parser.add_argument('--seats', type=int, default=16, help='합성 입력 좌석 수')
+    parser.add_argument('--frames', type=int, default=6, help='합성 입력 프레임 수')
+    parser.add_argument('--width', type=int, default=1920)
+    parser.add_argument('--height', type=int, default=1080)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--clips', type=str, help='합성 얼굴 클립 폴더')
+    parser.add_argument('--recording', type=str, help='전체 화면 녹화 (.vgrec)')
+    parser.add_argument('--seats-config', type=str, default='config/seats.json',
+                        help='녹화 입력용 좌석 설정')
+    parser.add_argument('--config', type=str, default='config/settings.json')
+    parser.add_argument('--output', type=str, help='결과 JSON 저장 경로')
+    args = parser.parse_args()
+
+    os.chdir(ROOT)
+
+    try:
+        with open(args.config, 'r', encoding='utf-8') as f:
+            detection_config = json.load(f).get('detection', {})
+    except Exception as e:
+        print(f"⚠️ 설정 파일 로드 실패: {e}")
+        detection_config = {}
+
+    samples = load_recording(args) if args.recording else load_synthetic(args)
+    if not samples or not samples[0][0]:
+        print("❌ 처리할 좌석 ROI가 없습니다")
+        return
+
+    names = [p.strip() for p in args.profiles.split(',') if p.strip() in PROFILES]
+    backends = [b.strip() for b in args.backends.split(',') if b.strip() in BACKENDS]
+    runs_wanted = [(backend, name) for backend in backends for name in names]
+    # 녹화 입력은 MediaPipe precise 판정을 기준으로 삼으므로 항상 포함
+    reference = (REFERENCE_BACKEND, REFERENCE_PROFILE)
+    if args.recording and reference not in runs_wanted:
+        runs_wanted.append(reference)
+
+    print(f"📊 {len(samples)}프레임 × {len(samples[0][0])}석, "
+          f"백엔드: {', '.join(backends)}, 프로필: {', '.join(names)}")
+
+    runs = {key: run_profile(*key, samples, detection_config) for key in runs_wanted}
+
+    results = {}
+    for (backend, name), (timings, cpu, verdicts) in runs.items():
+        result = summarize(timings, cpu)
+        result.update(backend=backend, profile=name, config=PROFILES[name])
+        if args.recording:
+            result.update(score_reference(verdicts, runs[reference][2]))
+        else:
+            result.update(score_labels(verdicts, samples))
+        results[f"{backend}/{name}"] = result
+
+    print(f"\n{'백엔드/프로필':<22}{'p50 ms':>9}{'p90 ms':>9}{'좌석/초':>9}{'코어당':>9}"
+          + (f"{'precise 일치':>14}" if args.recording else f"{'얼굴 검출':>11}{'오검출':>9}{'판정 정확도':>12}"))
+    for name, r in results.items():
+        line = (f"{name:<22}{r['p50_ms']:>9.2f}{r['p90_ms']:>9.2f}{r['seats_per_sec']:>9.1f}"
+                f"{r['seats_per_core_sec']:>9.1f}")
+        if args.recording:
+            line += f"{fmt(r['agreement_with_precise'], '{:.1%}'):>14}"
+        else:
+            line += (f"{fmt(r['face_detection_rate'], '{:.1%}'):>11}"
+                     f"{fmt(r['false_face_rate'], '{:.1%}'):>9}"
+                     f"{fmt(r['drowsy_accuracy'], '{:.1%}'):>12}")
+        print(line)
+
+    if args.output:
+        report = {
+            'meta': {
+                'timestamp': datetime.now().isoformat(),
+                'python': platform.python_version(),
+                'platform': platform.platform(),
+                'input': {
+                    'recording': args.recording,
+                    'seats': None if args.recording else args.seats,
+                    'frames': len(samples),
+                    'screen': [args.width, args.height],
+                    'seed': args.seed
+                }
+            },
+            'results': results
+        }
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2, ensure_ascii=False)
+        print(f"\n✅ 결과 저장: {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,112 @@
+"""
+알림 스냅샷 벤치마크 (알림 1건당 추가 CPU / 바이트)
+합성 좌석 ROI 크기별로 다음을 측정
+
+- capture: 감지 루프가 쓰는 시간 (ROI 복사 + 스냅샷 스레드에 인코딩 요청, 인코딩은 기다리지 않음)
+- encode: 스냅샷 스레드의 인코딩 CPU 시간 (축소 + JPEG + 예산 초과 시 품질 낮춤)
+- bytes: JPEG 크기 (텔레그램 / 웹훅 / 대시보드가 같은 바이트를 공유)
+- per-sink: 채널마다 원본 ROI를 따로 인코딩했을 때 (채널 3개) 대비 배율
+
+사용법:
+    python benchmarks/bench_snapshot.py
+    python benchmarks/bench_snapshot.py --sizes 240x180,960x720 --quality 70 --output snapshot.json
+"""
+import argparse
+import json
+import sys
+import time
+from pathlib import Path
+
+import cv2
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT / 'src'))
+
+from snapshot import SnapshotStore, encode_jpeg  # noqa: E402
+from synthetic import SyntheticFaceGrid  # noqa: E402
+
+
+SINK_COUNT = 3    # 텔레그램 / 웹훅 / 대시보드
+
+
+def make_rois(width: int, height: int, count: int = 16):
+    """합성 좌석 ROI (얼굴 + 배경, 좌석마다 다른 상태)"""
+    grid = SyntheticFaceGrid(count, screen_size=(width * 4, height * (count // 4)), seed=0)
+    frame, _ = grid.next_frame()
+    return [cv2.resize(frame[y:y + h, x:x + w], (width, height))
+            for x, y, w, h in grid.layout]
+
+
+def rate(func, rois, seconds: float) -> float:
+    """seconds초 동안 ROI 목록을 반복 처리한 ROI 1개당 평균 시간 (ms, 인코딩 방식 비교용)"""
+    for roi in rois:
+        func(roi)
+    count = 0
+    start = time.perf_counter()
+    while time.perf_counter() - start < seconds:
+        for roi in rois:
+            func(roi)
+        count += len(rois)
+    return (time.perf_counter() - start) / count * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description='알림 스냅샷 벤치마크')
+    parser.add_argument('--sizes', default='240x180,480x360,960x720', help='ROI 크기 (쉼표 구분)')
+    parser.add_argument('--max-width', type=int, default=320, help='스냅샷 축소 너비')
+    parser.add_argument('--quality', type=int, default=80, help='JPEG 품질')
+    parser.add_argument('--max-bytes', type=int, default=40000, help='스냅샷 바이트 예산')
+    parser.add_argument('--alerts', type=int, default=200, help='ROI 크기당 스냅샷 수')
+    parser.add_argument('--seconds', type=float, default=0.5, help='인코딩 비교 측정당 반복 시간 (초)')
+    parser.add_argument('--output', type=str, help='결과 JSON 저장 경로')
+    args = parser.parse_args()
+
+    config = {'max_width': args.max_width, 'quality': args.quality, 'max_bytes': args.max_bytes}
+    report = {'config': config}
+    print(f"📷 스냅샷 설정: 너비 {args.max_width}px, 품질 {args.quality}, 예산 {args.max_bytes}B")
+    print(f"{'ROI':>9} {'capture ms':>11} {'encode CPU ms':>14} {'KB/알림':>8} "
+          f"{'채널별 인코딩 ms':>17} {'원본 KB':>8}")
+
+    for size in args.sizes.split(','):
+        width, height = (int(v) for v in size.split('x'))
+        rois = make_rois(width, height)
+
+        # 감지 루프 쪽 비용 (알림은 드물게 오므로 인코딩이 끝난 뒤 다음 알림)
+        store = SnapshotStore({**config, 'keep_per_seat': 1})
+        for i in range(args.alerts):
+            store.capture(str(i % len(rois)), rois[i % len(rois)]).jpeg()
+        store.close()
+        stats = store.stats
+        capture_ms = stats['capture_seconds'] / stats['captured'] * 1000
+        encode_cpu_ms = stats['encode_cpu_seconds'] / stats['encoded'] * 1000
+        kb = stats['bytes'] / stats['encoded'] / 1024
+
+        # 비교: 채널마다 원본 ROI를 그대로 인코딩 (축소 / 공유 없음)
+        full = [len(cv2.imencode('.jpg', roi, [cv2.IMWRITE_JPEG_QUALITY, args.quality])[1])
+                for roi in rois]
+        per_sink_ms = rate(lambda roi: [cv2.imencode('.jpg', roi, [cv2.IMWRITE_JPEG_QUALITY,
+                                                                   args.quality])
+                                        for _ in range(SINK_COUNT)], rois, args.seconds)
+        once_ms = rate(lambda roi: encode_jpeg(roi, args.max_width, args.quality,
+                                               max_bytes=args.max_bytes), rois, args.seconds)
+
+        report[size] = {
+            'capture_ms': capture_ms,
+            'encode_cpu_ms': encode_cpu_ms,
+            'encode_once_ms': once_ms,
+            'encode_per_sink_ms': per_sink_ms,
+            'bytes': kb * 1024,
+            'full_bytes': sum(full) / len(full),
+        }
+        print(f"{size:>9} {capture_ms:>11.3f} {encode_cpu_ms:>14.2f} {kb:>8.1f} "
+              f"{per_sink_ms:>10.2f} ({per_sink_ms / once_ms:>3.1f}x) "
+              f"{sum(full) / len(full) / 1024:>8.1f}")
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2)
+        print(f"💾 결과 저장: {args.output}")
+
+
+if __name__ == "__main__":
+    main()
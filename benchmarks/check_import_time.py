@@ -0,0 +1,130 @@
+"""
+CLI 명령별 import 시간 회귀 검사
+`python -X importtime viewguard.py --import-only <명령>`을 새 프로세스로 실행해
+모듈 로딩 시간 합계와 무거운 패키지 로딩 여부를 확인
+
+검사 규칙:
+- ML 스택이 필요 없는 명령(roi, channels, test-alerts)은 HEAVY_PACKAGES를 불러오면 실패
+- 모든 명령은 시작 시 mediapipe를 불러오면 실패 (감지기 생성 시점에 로딩)
+- --baseline 지정 시 명령별 합계가 기준보다 tolerance 이상 (그리고 noise-ms 이상) 늘면 실패
+
+사용법:
+    python benchmarks/check_import_time.py
+    python benchmarks/check_import_time.py --save import_baseline.json
+    python benchmarks/check_import_time.py --baseline import_baseline.json --tolerance 0.25
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+from viewguard import COMMAND_MODULES, LIGHT_COMMANDS  # noqa: E402
+
+# 가벼운 명령이 불러오면 안 되는 패키지
+HEAVY_PACKAGES = ('mediapipe', 'telegram', 'pyautogui', 'tensorflow', 'matplotlib')
+# 어떤 명령도 시작 시 불러오면 안 되는 패키지
+LAZY_PACKAGES = ('mediapipe',)
+
+
+def measure(command, runs=3):
+    """
+    명령 1개의 import 시간 측정 (여러 번 실행 중 최솟값)
+
+    Returns:
+        {'total_ms': 합계, 'packages': {최상위 패키지: 누적 ms}}
+    """
+    best = None
+    for _ in range(runs):
+        proc = subprocess.run(
+            [sys.executable, '-X', 'importtime', str(ROOT / 'viewguard.py'), '--import-only', command],
+            cwd=ROOT, capture_output=True, text=True
+        )
+        if proc.returncode != 0:
+            raise RuntimeError(f"{command} 로딩 실패:\n{proc.stderr[-2000:]}")
+
+        total_us = 0
+        packages = {}
+        for line in proc.stderr.splitlines():
+            if not line.startswith('import time:') or 'self [us]' in line:
+                continue
+            self_us, cumulative_us, name = [part.strip() for part in line[len('import time:'):].split('|')]
+            total_us += int(self_us)
+            # 패키지 자신의 누적 시간이 하위 모듈보다 항상 크거나 같음
+            top = name.split('.')[0]
+            packages[top] = max(packages.get(top, 0), int(cumulative_us) / 1000)
+
+        result = {'total_ms': total_us / 1000, 'packages': packages}
+        if best is None or result['total_ms'] < best['total_ms']:
+            best = result
+    return best
+
+
+def check(results, baseline, tolerance, noise_ms):
+    """규칙 위반 목록"""
+    failures = []
+    for command, result in results.items():
+        loaded = set(result['packages'])
+        forbidden = HEAVY_PACKAGES if command in LIGHT_COMMANDS else LAZY_PACKAGES
+        for package in forbidden:
+            if package in loaded:
+                failures.append(f"{command}: 시작 시 {package}를 불러옴 "
+                                f"({result['packages'][package]:.0f}ms)")
+
+        if baseline and command in baseline:
+            before = baseline[command]['total_ms']
+            after = result['total_ms']
+            if after > before * (1 + tolerance) and after - before > noise_ms:
+                failures.append(f"{command}: import 시간 {before:.0f}ms → {after:.0f}ms")
+    return failures
+
+
+def main():
+    parser = argparse.ArgumentParser(description='CLI 명령별 import 시간 회귀 검사')
+    parser.add_argument('--commands', default=','.join(COMMAND_MODULES),
+                        help='검사할 명령 (쉼표 구분)')
+    parser.add_argument('--runs', type=int, default=3, help='명령별 반복 실행 횟수 (최솟값 사용)')
+    parser.add_argument('--baseline', type=str, help='비교할 기준 결과 JSON')
+    parser.add_argument('--tolerance', type=float, default=0.25, help='허용 증가율 (기본 25%%)')
+    parser.add_argument('--noise-ms', type=float, default=30.0, help='무시할 증가량 (ms)')
+    parser.add_argument('--save', type=str, help='결과를 기준 JSON으로 저장')
+    args = parser.parse_args()
+
+    commands = [c.strip() for c in args.commands.split(',') if c.strip() in COMMAND_MODULES]
+
+    results = {}
+    print(f"{'명령':<14}{'import ms':>11}  무거운 패키지")
+    for command in commands:
+        result = measure(command, args.runs)
+        results[command] = result
+        heavy = [f"{p}({result['packages'][p]:.0f}ms)"
+                 for p in HEAVY_PACKAGES + ('cv2',) if p in result['packages']]
+        print(f"{command:<14}{result['total_ms']:>11.0f}  {', '.join(heavy) or '-'}")
+
+    baseline = None
+    if args.baseline:
+        with open(args.baseline, 'r', encoding='utf-8') as f:
+            baseline = json.load(f)
+
+    if args.save:
+        with open(args.save, 'w', encoding='utf-8') as f:
+            json.dump(results, f, indent=2, ensure_ascii=False)
+        print(f"\n✅ 기준 저장: {args.save}")
+
+    failures = check(results, baseline, args.tolerance, args.noise_ms)
+    if failures:
+        print("\n❌ import 시간 회귀:")
+        for failure in failures:
+            print(f"   - {failure}")
+        sys.exit(1)
+
+    print("\n✅ import 시간 검사 통과")
+
+
+if __name__ == "__main__":
+    os.chdir(ROOT)
+    main()
@@ -0,0 +1,393 @@
+"""
+ViewGuard 엔드투엔드 벤치마크
+AccurateStudentMonitor / SequentialStudentMonitor / CCTVMonitor를
+녹화 또는 합성 입력으로 최대 속도로 돌려 구간별 지연 백분위수,
+좌석/초 처리량, 메모리 최고치, CPU 사용률을 JSON으로 기록
+
+사용법:
+    # 합성 입력 (32석, 20프레임)
+    python benchmarks/run_benchmarks.py --seats 32 --frames 20 --output bench.json
+
+    # 녹화 입력
+    python benchmarks/run_benchmarks.py --recording recordings/lab.vgrec \\
+        --seats-config config/seats.json --channel-recording recordings/channels.vgrec
+
+    # 두 결과 비교 (커밋 간 회귀 확인)
+    python benchmarks/run_benchmarks.py --compare old.json new.json
+"""
+import argparse
+import contextlib
+import json
+import multiprocessing
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT / 'src'))
+sys.path.insert(0, str(ROOT / 'viewguard-new'))
+
+MONITORS = ('main', 'sequential', 'cctv')
+
+# 출력 순서 (파이프라인 순)
+STAGE_ORDER = [
+    'capture', 'channel_switch', 'roi_extraction', 'occupancy', 'occupancy_seat',
+    'color_conversion', 'face_mesh', 'metrics', 'state_update', 'background_update',
+    'overlay', 'alert_dispatch'
+]
+
+
+def peak_memory_mb():
+    """프로세스 메모리 최고치 (MB). 측정 불가 시 None"""
+    try:
+        import resource
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        # Linux는 KB, macOS는 바이트
+        return peak / 1024 / 1024 if sys.platform == 'darwin' else peak / 1024
+    except ImportError:
+        pass
+
+    try:
+        import psutil
+        info = psutil.Process().memory_info()
+        return getattr(info, 'peak_wset', info.rss) / 1024 / 1024
+    except ImportError:
+        return None
+
+
+def git_commit():
+    """현재 커밋 해시"""
+    try:
+        return subprocess.check_output(
+            ['git', 'rev-parse', '--short', 'HEAD'], cwd=ROOT, text=True,
+            stderr=subprocess.DEVNULL
+        ).strip()
+    except Exception:
+        return None
+
+
+def write_bench_config(workdir, backend=None):
+    """
+    벤치마크 전용 설정 파일 생성
+    (외부 알림은 끄고 콘솔 알림만 사용 - 네트워크 왕복이 측정을 흔들지 않도록)
+
+    Args:
+        workdir: 설정 파일을 저장할 임시 폴더
+        backend: 랜드마크 백엔드 (None이면 settings.json 설정 그대로)
+    """
+    with open(ROOT / 'config' / 'settings.json', 'r', encoding='utf-8') as f:
+        settings = json.load(f)
+
+    if backend:
+        detection = settings.setdefault('detection', {})
+        detection['engine'] = dict(detection.get('engine', {}), backend=backend)
+        settings['cctv'] = dict(settings.get('cctv', {}))
+        settings['cctv']['engine'] = dict(settings['cctv'].get('engine', {}), backend=backend)
+
+    settings['telegram'] = {'bot_token': 'YOUR_BOT_TOKEN_HERE', 'chat_id': 'YOUR_CHAT_ID_HERE'}
+    settings['github'] = dict(settings.get('github', {}), enabled=False, token='')
+
+    # 측정은 _child에서 켜고 엔드포인트는 열지 않음
+    settings['metrics'] = {'enabled': True, 'http_port': None}
+    # 동영상 입력은 원본 FPS 대기 없이 한 번만 재생, 분석 주기 제한 없이 처리량 측정
+    settings['cctv'] = dict(settings.get('cctv', {}), loop_files=False, pace_files=False,
+                            analysis_fps=0)
+
+    background = settings.setdefault('seat_detection', {}).setdefault('background_model', {})
+    background['state_path'] = os.path.join(workdir, 'background_models.npz')
+
+    path = os.path.join(workdir, 'settings.json')
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(settings, f, indent=2, ensure_ascii=False)
+    return path
+
+
+def build_grid(args):
+    from synthetic import SyntheticFaceGrid
+    return SyntheticFaceGrid(args.seats, (args.width, args.height), args.seed, args.clips)
+
+
+def bench_main(args, config_path, workdir):
+    """AccurateStudentMonitor: 전체 화면 → 좌석 ROI 일괄 처리"""
+    from main import AccurateStudentMonitor
+
+    settings = AccurateStudentMonitor.load_config(config_path)
+    background_config = settings.get('seat_detection', {}).get('background_model', {})
+
+    from replay import FrameRecording, ReplayCapture
+
+    if args.recording:
+        capture = ReplayCapture(args.recording, args.seats_config, background_config)
+    else:
+        # 합성 프레임은 미리 생성 (생성 비용이 capture 구간에 섞이지 않도록)
+        grid = build_grid(args)
+        seats_path = os.path.join(workdir, 'seats.json')
+        grid.save_seats(seats_path)
+        frames = [(i * 2.0, 0, grid.next_frame()[0]) for i in range(args.frames)]
+        capture = ReplayCapture(FrameRecording.from_frames(frames), seats_path, background_config)
+
+    monitor = AccurateStudentMonitor(config_path, capture)
+    start = time.perf_counter()
+    cpu_start = time.process_time()
+    monitor.run()
+    wall = time.perf_counter() - start
+    cpu = time.process_time() - cpu_start
+
+    seat_checks = sum(s['total_checks'] for s in monitor.seat_states.values())
+    return {
+        'cycles': monitor.stats['total_checks'],
+        'seats': len(monitor.seat_states),
+        'seat_checks': seat_checks,
+        'run_wall_s': wall,
+        'run_cpu_s': cpu,
+        'seats_per_sec': seat_checks / wall if wall > 0 else 0.0
+    }
+
+
+def bench_sequential(args, config_path, workdir):
+    """SequentialStudentMonitor: 채널 = 좌석, 채널별 고화질 이미지"""
+    from main_sequential import SequentialStudentMonitor
+    from replay import FrameRecording, ReplayChannelController
+
+    if args.channel_recording:
+        recording = FrameRecording.load(args.channel_recording)
+    else:
+        grid = build_grid(args)
+        frames = []
+        for i in range(args.frames):
+            screen, _ = grid.next_frame()
+            for ch_num, image in grid.channel_frames(screen).items():
+                frames.append((i * 2.0, ch_num, image))
+        recording = FrameRecording.from_frames(frames)
+
+    controller = ReplayChannelController(recording)
+    monitor = SequentialStudentMonitor(config_path, controller)
+    start = time.perf_counter()
+    cpu_start = time.process_time()
+    monitor.run()
+    wall = time.perf_counter() - start
+    cpu = time.process_time() - cpu_start
+
+    checks = monitor.stats['total_checks']
+    return {
+        'cycles': monitor.stats['total_cycles'],
+        'seats': len(monitor.channel_states),
+        'seat_checks': checks,
+        'run_wall_s': wall,
+        'run_cpu_s': cpu,
+        'seats_per_sec': checks / wall if wall > 0 else 0.0
+    }
+
+
+def bench_cctv(args, config_path, workdir):
+    """CCTVMonitor: 단일 스트림 (좌석 한 개를 동영상 파일로 재생)"""
+    import cv2
+    from viewguard_main import CCTVMonitor
+
+    video_path = os.path.join(workdir, 'cctv_input.avi')
+    size = (1280, 720)
+    writer = cv2.VideoWriter(video_path, cv2.VideoWriter_fourcc(*'MJPG'), 15, size)
+
+    if args.recording:
+        from replay import FrameRecording
+        recording = FrameRecording.load(args.recording)
+        for _, _, encoding, payload in recording.records:
+            writer.write(cv2.resize(FrameRecording.decode(encoding, payload), size))
+        frame_count = len(recording)
+    else:
+        grid = build_grid(args)
+        frame_count = args.frames * 4
+        for _ in range(frame_count):
+            screen, _ = grid.next_frame()
+            writer.write(grid.channel_frames(screen, size)[1])
+    writer.release()
+
+    monitor = CCTVMonitor(video_path, config_path, show_window=False)
+    start = time.perf_counter()
+    cpu_start = time.process_time()
+    monitor.start()
+    wall = time.perf_counter() - start
+    cpu = time.process_time() - cpu_start
+
+    return {
+        'cycles': monitor.frames_processed,
+        'seats': 1,
+        'seat_checks': monitor.frames_processed,
+        'run_wall_s': wall,
+        'run_cpu_s': cpu,
+        'seats_per_sec': monitor.frames_processed / wall if wall > 0 else 0.0
+    }
+
+
+BENCHES = {'main': bench_main, 'sequential': bench_sequential, 'cctv': bench_cctv}
+
+
+def _child(name, args, queue):
+    """격리된 프로세스에서 벤치마크 1개 실행 (메모리 최고치 분리)"""
+    from instrumentation import instrumentation
+
+    workdir = tempfile.mkdtemp(prefix=f'vg_bench_{name}_')
+    config_path = write_bench_config(workdir, args.backend)
+
+    instrumentation.configure(enabled=True, sample_window=None)
+    cpu_start = time.process_time()
+    wall_start = time.perf_counter()
+
+    try:
+        with open(os.devnull, 'w', encoding='utf-8') as devnull:
+            out = devnull if not args.verbose else sys.stdout
+            with contextlib.redirect_stdout(out):
+                result = BENCHES[name](args, config_path, workdir)
+    except Exception as e:
+        import traceback
+        queue.put({'error': f"{type(e).__name__}: {e}", 'traceback': traceback.format_exc()})
+        return
+
+    wall = time.perf_counter() - wall_start
+    cpu = time.process_time() - cpu_start
+
+    result.update({
+        'total_wall_s': wall,
+        'cpu_s': cpu,
+        'cpu_utilization_pct': cpu / wall * 100 if wall > 0 else 0.0,
+        # 측정 구간 CPU 시간 기준 (설정/입력 생성 제외, 멀티스레드 추론은 코어 수만큼 반영)
+        'seats_per_core_sec': (result['seat_checks'] / result['run_cpu_s']
+                               if result['run_cpu_s'] > 0 else 0.0),
+        'peak_rss_mb': peak_memory_mb(),
+        'stages': instrumentation.summary()
+    })
+    queue.put(result)
+
+
+def run_isolated(name, args):
+    ctx = multiprocessing.get_context('spawn')
+    queue = ctx.Queue()
+    proc = ctx.Process(target=_child, args=(name, args, queue))
+    proc.start()
+    try:
+        result = queue.get(timeout=args.timeout)
+    except Exception:
+        result = {'error': f'timeout ({args.timeout}s)'}
+    proc.join(5)
+    if proc.is_alive():
+        proc.terminate()
+    return result
+
+
+def print_result(name, result):
+    print(f"\n▶ {name}")
+    if 'error' in result:
+        print(f"  ❌ {result['error']}")
+        return
+
+    peak = result.get('peak_rss_mb')
+    print(f"  좌석 {result['seats']}개, 사이클 {result['cycles']}회, 좌석 체크 {result['seat_checks']}회")
+    memory = f"{peak:.0f}MB" if peak else "측정 불가"
+    print(f"  처리량: {result['seats_per_sec']:.1f} seats/s "
+          f"(코어당 {result.get('seats_per_core_sec', 0.0):.1f}) | "
+          f"CPU {result['cpu_utilization_pct']:.0f}% | 메모리 최고 {memory}")
+    print(f"  {'구간':<18}{'횟수':>8}{'p50 ms':>10}{'p90 ms':>10}{'p99 ms':>10}{'합계 s':>10}")
+
+    stages = result['stages']
+    for stage in sorted(stages, key=lambda s: STAGE_ORDER.index(s) if s in STAGE_ORDER else 99):
+        st = stages[stage]
+        print(f"  {stage:<18}{st['count']:>8}{st['p50_ms']:>10.2f}{st['p90_ms']:>10.2f}"
+              f"{st['p99_ms']:>10.2f}{st['total_s']:>10.2f}")
+
+
+def compare(old_path, new_path):
+    """두 벤치마크 JSON 비교"""
+    with open(old_path, 'r', encoding='utf-8') as f:
+        old = json.load(f)
+    with open(new_path, 'r', encoding='utf-8') as f:
+        new = json.load(f)
+
+    print(f"📊 {old['meta'].get('commit')} → {new['meta'].get('commit')}")
+
+    for name in MONITORS:
+        a = old['results'].get(name)
+        b = new['results'].get(name)
+        if not a or not b or 'error' in a or 'error' in b:
+            continue
+
+        def delta(x, y):
+            return (y - x) / x * 100 if x else 0.0
+
+        print(f"\n▶ {name}: {a['seats_per_sec']:.1f} → {b['seats_per_sec']:.1f} seats/s "
+              f"({delta(a['seats_per_sec'], b['seats_per_sec']):+.1f}%)")
+        for stage in STAGE_ORDER:
+            if stage in a['stages'] and stage in b['stages']:
+                pa = a['stages'][stage]['p50_ms']
+                pb = b['stages'][stage]['p50_ms']
+                print(f"  {stage:<18} p50 {pa:8.2f} → {pb:8.2f} ms ({delta(pa, pb):+.1f}%)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='ViewGuard 엔드투엔드 벤치마크')
+    parser.add_argument('--monitors', default=','.join(MONITORS),
+                        help='실행할 모니터 (main,sequential,cctv)')
+    parser.add_argument('--seats', type=int, default=16, help='합성 입력 좌석 수')
+    parser.add_argument('--frames', type=int, default=10, help='합성 입력 프레임 수')
+    parser.add_argument('--width', type=int, default=1920)
+    parser.add_argument('--height', type=int, default=1080)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--clips', type=str, help='합성 얼굴 클립 폴더')
+    parser.add_argument('--recording', type=str, help='전체 화면 녹화 (.vgrec)')
+    parser.add_argument('--seats-config', type=str, default='config/seats.json',
+                        help='녹화 입력용 좌석 설정')
+    parser.add_argument('--channel-recording', type=str, help='채널 녹화 (.vgrec)')
+    parser.add_argument('--backend', type=str,
+                        help='랜드마크 백엔드 (mediapipe / opencv_dnn, 기본: 설정 파일)')
+    parser.add_argument('--output', type=str, help='결과 JSON 저장 경로')
+    parser.add_argument('--timeout', type=float, default=1800, help='모니터별 제한 시간 (초)')
+    parser.add_argument('--verbose', action='store_true', help='모니터 콘솔 출력 표시')
+    parser.add_argument('--compare', nargs=2, metavar=('OLD', 'NEW'), help='두 결과 비교')
+    args = parser.parse_args()
+
+    if args.compare:
+        compare(*args.compare)
+        return
+
+    os.chdir(ROOT)
+
+    report = {
+        'meta': {
+            'commit': git_commit(),
+            'timestamp': datetime.now().isoformat(),
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'cpu_count': os.cpu_count(),
+            'input': {
+                'recording': args.recording,
+                'channel_recording': args.channel_recording,
+                'seats': None if args.recording else args.seats,
+                'frames': None if args.recording else args.frames,
+                'screen': [args.width, args.height],
+                'seed': args.seed
+            },
+            'backend': args.backend
+        },
+        'results': {}
+    }
+
+    for name in [m.strip() for m in args.monitors.split(',') if m.strip()]:
+        if name not in BENCHES:
+            print(f"⚠️  알 수 없는 모니터: {name}")
+            continue
+        result = run_isolated(name, args)
+        report['results'][name] = result
+        print_result(name, result)
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2, ensure_ascii=False)
+        print(f"\n✅ 결과 저장: {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -4,7 +4,6 @@
 """
 import cv2
 import numpy as np
-from PIL import ImageGrab
 import json
 import os
 import sys
@@ -47,6 +46,7 @@ class ChannelSetup:
     
     def capture_screen(self):
         """전체 화면 캡처"""
+        from PIL import ImageGrab
         screen = ImageGrab.grab()
         screen_np = np.array(screen)
         screen_bgr = cv2.cvtColor(screen_np, cv2.COLOR_RGB2BGR)
@@ -0,0 +1,255 @@
+"""
+알림 묶음 전송 (중복 제거 / 합치기)
+여러 좌석이 동시에 졸면 좌석마다 텔레그램 메시지·시트 행·웹훅·GitHub Issue가 따로 나가던 것을
+짧은 창(window) 동안 모아 알림 채널별로 한 번(좌석 목록이 든 요약 1건)만 전송
+
+- 같은 좌석이 창 안에서 다시 들어오면 1건으로 합치고 반복 횟수만 셈 (신뢰도가 높은 감지 결과 유지)
+- 요약을 보낸 좌석은 alert_cooldown 동안 다시 넣지 않음 (호출 측 쿨다운과 같은 값)
+- 분당 요약 전송 수를 max_per_minute로 제한 → 좌석 수와 무관하게 채널별 분당 호출 수 상한
+
+알림 객체가 send_drowsy_digest(alerts)를 제공하면 요약 1건으로, 없으면 좌석별 send_drowsy_alert로 전송
+"""
+import asyncio
+import time
+from collections import deque
+from datetime import datetime
+from typing import Callable, Dict, List, Optional, Tuple
+
+from instrumentation import instrumentation
+
+
+SUPPRESSED = 'suppressed'   # 알림 규칙으로 전송하지 않음 (전송 성공으로 세지 않지만 쿨다운은 유지)
+
+
+def alert_result(result, seat_id: str = None):
+    """
+    알림 객체 반환값 → 좌석별 전송 결과
+    (MultiAlert는 채널별 딕셔너리, GitHubAlert는 Issue URL)
+
+    Args:
+        result: send_drowsy_alert / send_drowsy_digest 반환값
+        seat_id: 요약 결과에서 이 좌석만 규칙으로 건너뛰었는지 확인할 좌석 ID
+
+    Returns:
+        True(전송) / False(실패) / SUPPRESSED(알림 규칙으로 모든 채널을 건너뜀)
+    """
+    if isinstance(result, dict):
+        muted = result.get('suppressed')
+        if muted is True or (seat_id is not None and muted and seat_id in muted):
+            return SUPPRESSED
+        return any(value for key, value in result.items() if key != 'suppressed')
+    return bool(result)
+
+
+class AlertCoalescer:
+    """좌석별 졸음 알림을 창 단위로 모아 요약 1건으로 전송"""
+
+    def __init__(self, alert, config: Dict = None, cooldown: float = 300,
+                 clock: Callable[[], float] = time.monotonic):
+        """
+        초기화
+        Args:
+            alert: 알림 객체 (TelegramAlert / ConsoleAlert / MultiAlert / GitHubAlert)
+            config: alert_coalescing 설정 딕셔너리
+                window: 첫 알림 후 이만큼(초) 모아서 전송 (기본 10)
+                max_per_minute: 분당 최대 요약 전송 수 (기본 6, 넘으면 다음 창까지 계속 모음)
+            cooldown: 요약을 보낸 좌석을 다시 넣지 않는 시간 (초, detection.alert_cooldown)
+            clock: 단조 시계 (테스트용 교체)
+        """
+        config = config or {}
+        self.alert = alert
+        self.window = config.get('window', 10)
+        self.max_per_minute = config.get('max_per_minute', 6)
+        self.cooldown = cooldown
+        self.clock = clock
+
+        # 좌석 ID → {'seat', 'confidence', 'details', 'time', 'repeats', 'snapshot'} (들어온 순서 유지)
+        self.pending: Dict[str, Dict] = {}
+        self._opened_at: Optional[float] = None
+        self._last_sent: Dict[str, float] = {}
+        self._sent_times = deque()
+
+        self.stats = {'queued': 0, 'merged': 0, 'suppressed': 0, 'digests': 0, 'alerts': 0}
+
+    def add(self, seat_id: str, confidence: float, details: dict, now: float = None,
+            snapshot=None) -> bool:
+        """
+        알림 1건 추가
+
+        Args:
+            seat_id: 좌석 ID
+            confidence: 신뢰도
+            details: 상세 정보
+            snapshot: 좌석 스냅샷 (합칠 때는 신뢰도가 가장 높은 감지의 스냅샷 유지)
+
+        Returns:
+            새로 대기열에 넣었거나 기존 건과 합쳤으면 True, 쿨다운 중이라 버렸으면 False
+        """
+        now = self.clock() if now is None else now
+
+        last = self._last_sent.get(seat_id)
+        if last is not None and now - last < self.cooldown:
+            self.stats['suppressed'] += 1
+            instrumentation.inc('alerts_coalesced_total', result='suppressed')
+            return False
+
+        entry = self.pending.get(seat_id)
+        if entry is not None:
+            entry['repeats'] += 1
+            if confidence > entry['confidence']:
+                entry['confidence'] = confidence
+                entry['details'] = details
+                entry['snapshot'] = snapshot or entry['snapshot']
+            self.stats['merged'] += 1
+            instrumentation.inc('alerts_coalesced_total', result='merged')
+            return True
+
+        if not self.pending:
+            self._opened_at = now
+        self.pending[seat_id] = {
+            'seat': seat_id,
+            'confidence': confidence,
+            'details': details,
+            'time': datetime.now(),
+            'repeats': 1,
+            'snapshot': snapshot,
+        }
+        self.stats['queued'] += 1
+        instrumentation.set_gauge('alerts_pending', len(self.pending))
+        return True
+
+    def time_until_due(self, now: float = None) -> Optional[float]:
+        """
+        다음 요약 전송까지 남은 시간
+
+        Returns:
+            초 (0이면 지금 전송 가능), 대기 알림이 없으면 None
+        """
+        if not self.pending:
+            return None
+        now = self.clock() if now is None else now
+
+        wait = self._opened_at + self.window - now
+        # 분당 전송 한도: 가장 오래된 전송이 1분 창을 벗어날 때까지
+        while self._sent_times and now - self._sent_times[0] >= 60:
+            self._sent_times.popleft()
+        if self.max_per_minute > 0 and len(self._sent_times) >= self.max_per_minute:
+            wait = max(wait, self._sent_times[0] + 60 - now)
+        return max(0.0, wait)
+
+    def take(self, force: bool = False, now: float = None) -> List[Dict]:
+        """
+        전송할 차례인 알림 묶음 꺼내기
+
+        Args:
+            force: 창 / 분당 한도와 무관하게 꺼냄 (종료 시)
+
+        Returns:
+            알림 리스트 (전송할 게 없으면 빈 리스트)
+        """
+        now = self.clock() if now is None else now
+        due = self.time_until_due(now)
+        if due is None or (due > 0 and not force):
+            return []
+
+        alerts = list(self.pending.values())
+        self.pending = {}
+        self._opened_at = None
+        self._sent_times.append(now)
+        instrumentation.set_gauge('alerts_pending', 0)
+        return alerts
+
+    def deliver(self, alerts: List[Dict]) -> List[Tuple[str, bool]]:
+        """
+        알림 묶음 전송 (동기)
+
+        Returns:
+            [(좌석 ID, 전송 결과), ...] (True / False / SUPPRESSED)
+        """
+        if not alerts:
+            return []
+        start = time.perf_counter()
+        try:
+            if len(alerts) > 1 and hasattr(self.alert, 'send_drowsy_digest'):
+                result = self.alert.send_drowsy_digest(alerts)
+                results = [(a['seat'], alert_result(result, a['seat'])) for a in alerts]
+            else:
+                results = [(a['seat'], alert_result(self.alert.send_drowsy_alert(
+                    a['seat'], a['confidence'], a['details'], snapshot=a.get('snapshot'))))
+                    for a in alerts]
+        except Exception as e:
+            print(f"❌ 알림 요약 전송 오류: {e}")
+            results = [(a['seat'], False) for a in alerts]
+        instrumentation.record('alert_dispatch', time.perf_counter() - start)
+        return self._record(results)
+
+    async def deliver_async(self, alerts: List[Dict]) -> List[Tuple[str, bool]]:
+        """
+        알림 묶음 전송 (비동기 런타임용, 텔레그램은 같은 루프에서 await, 그 외는 기본 스레드 풀)
+
+        Returns:
+            [(좌석 ID, 전송 결과), ...] (True / False / SUPPRESSED)
+        """
+        if not alerts:
+            return []
+        if len(alerts) > 1:
+            if not hasattr(self.alert, 'send_drowsy_digest_async'):
+                return await asyncio.get_running_loop().run_in_executor(None, self.deliver, alerts)
+            send = self.alert.send_drowsy_digest_async(alerts)
+        elif hasattr(self.alert, 'send_drowsy_alert_async'):
+            alert = alerts[0]
+            send = self.alert.send_drowsy_alert_async(alert['seat'], alert['confidence'],
+                                                      alert['details'], snapshot=alert.get('snapshot'))
+        else:
+            return await asyncio.get_running_loop().run_in_executor(None, self.deliver, alerts)
+
+        start = time.perf_counter()
+        try:
+            result = await send
+        except Exception as e:
+            print(f"❌ 알림 요약 전송 오류: {e}")
+            result = False
+        instrumentation.record('alert_dispatch', time.perf_counter() - start)
+        return self._record([(a['seat'], alert_result(result, a['seat'])) for a in alerts])
+
+    def flush(self, force: bool = False) -> List[Tuple[str, bool]]:
+        """차례가 된 알림 묶음 꺼내서 전송 (동기 루프에서 사이클마다 호출)"""
+        return self.deliver(self.take(force))
+
+    async def flush_async(self, force: bool = False) -> List[Tuple[str, bool]]:
+        """차례가 된 알림 묶음 꺼내서 전송 (비동기)"""
+        return await self.deliver_async(self.take(force))
+
+    def _record(self, results: List[Tuple[str, bool]]) -> List[Tuple[str, bool]]:
+        """전송 결과 통계 / 좌석별 쿨다운 기록 (규칙으로 건너뛴 좌석도 쿨다운 유지)"""
+        now = self.clock()
+        self.stats['digests'] += 1
+        self.stats['alerts'] += len(results)
+        instrumentation.inc('alert_digests_total')
+        for seat_id, success in results:
+            if success:
+                self._last_sent[seat_id] = now
+        return results
+
+    def print_summary(self):
+        """통계 출력에 들어갈 알림 묶음 요약"""
+        s = self.stats
+        print(f"📨 알림 묶음: 요약 {s['digests']}건으로 좌석 알림 {s['alerts']}건 전송 "
+              f"(중복 합침 {s['merged']}건, 쿨다운 제외 {s['suppressed']}건, 대기 {len(self.pending)}건)")
+
+
+async def digest_loop(coalescer: AlertCoalescer, finish: Callable[[str, bool], None],
+                      poll: float = 1.0):
+    """
+    비동기 런타임 / 집계 서버용 요약 전송 태스크
+
+    Args:
+        coalescer: AlertCoalescer
+        finish: 좌석별 전송 결과 반영 함수 (seat_id, 전송 결과)
+        poll: 대기 알림이 없을 때 확인 주기 (초)
+    """
+    while True:
+        due = coalescer.time_until_due()
+        await asyncio.sleep(poll if due is None else min(due, poll))
+        for seat_id, success in await coalescer.flush_async():
+            finish(seat_id, success)
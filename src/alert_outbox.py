@@ -0,0 +1,315 @@
+"""
+알림 아웃박스 (디스크 대기열 + 재시도)
+네트워크가 끊겨도 알림을 잃지 않도록 전송할 알림을 먼저 SQLite 파일에 기록하고,
+백그라운드 재시도 스레드가 알림 채널(sink)별 지수 백오프로 전송
+
+- submit(): 기록만 하고 바로 반환 → 감지 루프가 네트워크 대기로 막히지 않음, 재시작 후에도 남은 알림 전송
+- 채널마다 연속 실패 횟수로 다음 시도 시각 계산 (base_delay × 2^(실패-1), 최대 max_delay)
+  한 채널이 실패하면 그 채널의 나머지 알림도 다음 시도까지 대기 (다른 채널은 계속 전송)
+- 멱등 키: 같은 채널·같은 내용은 한 번만 기록, 전송 함수에도 키를 넘겨
+  GitHub처럼 "보냈는데 응답만 못 받은" 경우 이미 만들어진 Issue를 찾아 중복 생성 방지
+- 전송 함수가 DEFERRED를 돌려주면 (GitHub 요청 한도로 낮은 우선순위 요청 연기) 실패로 세지 않고
+  그 알림만 남겨 둔 채 같은 채널의 다음 알림을 계속 전송 → 앞에 쌓인 일일 리포트가 졸음 알림을 막지 않음
+- max_age보다 오래된 알림은 버림 (한참 지난 졸음 알림은 의미 없음)
+"""
+import hashlib
+import json
+import random
+import sqlite3
+import threading
+import time
+from typing import Callable, Dict, Optional
+
+from instrumentation import instrumentation
+
+
+# 전송 함수: (payload, 멱등 키, 이전 시도 횟수) → 성공 여부 또는 DEFERRED (예외는 실패로 처리)
+Deliver = Callable[[Dict, str, int], bool]
+
+# 전송 함수 반환값: 지금은 보내지 않음 (실패 아님, 채널 백오프 없이 다음 차례에 다시 시도)
+DEFERRED = 'deferred'
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS outbox (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    key TEXT NOT NULL UNIQUE,
+    sink TEXT NOT NULL,
+    payload TEXT NOT NULL,
+    created REAL NOT NULL,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    last_error TEXT
+)
+"""
+
+
+def open_outbox(alert, config: Dict) -> Optional['AlertOutbox']:
+    """
+    alert_outbox 설정이 켜져 있으면 아웃박스를 열어 알림 객체에 연결 (재시도 스레드는 호출 측이 start)
+
+    Args:
+        alert: 알림 객체 (TelegramAlert / MultiAlert / GitHubAlert, attach_outbox 제공)
+        config: alert_outbox 설정 딕셔너리
+
+    Returns:
+        AlertOutbox, 사용하지 않으면 None (아웃박스를 지원하지 않는 알림 채널이면 그 사실을 출력)
+    """
+    if not config.get('enabled', False) or not getattr(alert, 'enabled', False):
+        return None
+    if not hasattr(alert, 'attach_outbox'):
+        print(f"⚠️  알림 아웃박스 비활성: {type(alert).__name__}은 아웃박스를 지원하지 않아 "
+              f"바로 전송합니다 (네트워크 장애 중 알림은 재시도하지 않음)")
+        return None
+    outbox = AlertOutbox(config.get('path', 'config/alert_outbox.db'), config)
+    alert.attach_outbox(outbox)
+    return outbox
+
+
+def idempotency_key(sink: str, payload: Dict) -> str:
+    """채널 + 내용으로 만든 멱등 키 (같은 알림을 두 번 넣어도 한 번만 전송)"""
+    data = json.dumps(payload, sort_keys=True, ensure_ascii=False, default=str)
+    return hashlib.sha1(f"{sink}\n{data}".encode('utf-8')).hexdigest()[:20]
+
+
+class AlertOutbox:
+    """SQLite 기반 알림 대기열 + 채널별 지수 백오프 재시도"""
+
+    def __init__(self, path: str = 'config/alert_outbox.db', config: Dict = None,
+                 clock: Callable[[], float] = time.time):
+        """
+        초기화
+        Args:
+            path: SQLite 파일 경로 (':memory:'면 메모리, 테스트용)
+            config: alert_outbox 설정 딕셔너리
+                base_delay: 첫 재시도 대기 (초, 기본 2)
+                max_delay: 최대 재시도 대기 (초, 기본 300)
+                jitter: 대기 시간 무작위 감소 비율 (기본 0.1, 여러 노드가 동시에 몰리지 않게)
+                max_age: 이보다 오래된 알림은 버림 (초, 기본 3600, 0이면 버리지 않음)
+                poll_interval: 재시도 스레드 확인 주기 (초, 기본 1)
+            clock: 벽시계 (재시작 후에도 이어지는 기록 시각, 테스트용 교체)
+        """
+        config = config or {}
+        self.path = path
+        self.base_delay = config.get('base_delay', 2)
+        self.max_delay = config.get('max_delay', 300)
+        self.jitter = config.get('jitter', 0.1)
+        self.max_age = config.get('max_age', 3600)
+        self.poll_interval = config.get('poll_interval', 1.0)
+        self.clock = clock
+
+        self.sinks: Dict[str, Deliver] = {}
+        # 채널 → {'failures': 연속 실패 횟수, 'next_at': 다음 시도 시각}
+        self.backoff: Dict[str, Dict] = {}
+        self.stats = {'submitted': 0, 'duplicates': 0, 'delivered': 0, 'failed': 0, 'deferred': 0,
+                      'expired': 0}
+
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+        self.db = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self.db.execute('PRAGMA journal_mode=WAL' if path != ':memory:' else 'PRAGMA journal_mode=MEMORY')
+        self.db.execute(SCHEMA)
+
+    def register(self, sink: str, deliver: Deliver):
+        """
+        알림 채널 전송 함수 등록 (등록 전 기록된 알림은 등록 후 전송)
+
+        Args:
+            sink: 채널 이름 ('telegram', 'github' 등)
+            deliver: 전송 함수 (payload, key, attempts) → 성공 여부 또는 DEFERRED
+        """
+        self.sinks[sink] = deliver
+        self._wake.set()
+
+    def submit(self, sink: str, payload: Dict, key: str = None) -> Optional[str]:
+        """
+        알림 기록 (전송은 재시도 스레드가)
+
+        Args:
+            sink: 채널 이름
+            payload: 전송 내용 (JSON 직렬화 가능해야 함)
+            key: 멱등 키 (None이면 채널 + 내용으로 생성)
+
+        Returns:
+            멱등 키, 기록 실패 시 None
+        """
+        key = key or idempotency_key(sink, payload)
+        try:
+            with self._lock:
+                cursor = self.db.execute(
+                    'INSERT OR IGNORE INTO outbox (key, sink, payload, created) VALUES (?, ?, ?, ?)',
+                    (key, sink, json.dumps(payload, ensure_ascii=False, default=str), self.clock())
+                )
+        except Exception as e:
+            print(f"❌ 알림 아웃박스 기록 실패: {e}")
+            return None
+
+        if cursor.rowcount:
+            self.stats['submitted'] += 1
+            instrumentation.inc('outbox_submitted_total', sink=sink)
+        else:
+            self.stats['duplicates'] += 1
+        self._wake.set()
+        return key
+
+    def pending_count(self, sink: str = None) -> int:
+        """전송 대기 중인 알림 수"""
+        with self._lock:
+            if sink is None:
+                return self.db.execute('SELECT COUNT(*) FROM outbox').fetchone()[0]
+            return self.db.execute('SELECT COUNT(*) FROM outbox WHERE sink = ?',
+                                   (sink,)).fetchone()[0]
+
+    def retry_delay(self, failures: int) -> float:
+        """연속 실패 횟수 → 다음 시도까지 대기 (초)"""
+        delay = min(self.max_delay, self.base_delay * 2 ** max(0, failures - 1))
+        return delay * (1 - random.uniform(0, self.jitter)) if self.jitter else delay
+
+    def process(self, now: float = None) -> int:
+        """
+        시도할 차례인 채널의 대기 알림을 오래된 순서로 전송 (재시도 스레드에서 호출)
+
+        Returns:
+            이번에 전송 성공한 알림 수
+        """
+        now = self.clock() if now is None else now
+        self._expire(now)
+
+        with self._lock:
+            rows = self.db.execute(
+                'SELECT id, key, sink, payload, attempts FROM outbox ORDER BY id').fetchall()
+
+        delivered = 0
+        blocked = set()
+        for row_id, key, sink, payload, attempts in rows:
+            deliver = self.sinks.get(sink)
+            if deliver is None or sink in blocked:
+                continue
+            state = self.backoff.get(sink)
+            if state is not None and now < state['next_at']:
+                continue
+
+            try:
+                result = deliver(json.loads(payload), key, attempts)
+            except Exception as e:
+                result, error = False, str(e)
+            else:
+                error = None if result else '전송 실패'
+
+            # 연기: 시도 횟수 / 백오프 그대로, 같은 채널의 다음 알림은 계속
+            if result == DEFERRED:
+                self.stats['deferred'] += 1
+                instrumentation.inc('outbox_deferred_total', sink=sink)
+                continue
+            success = bool(result)
+
+            with self._lock:
+                if success:
+                    self.db.execute('DELETE FROM outbox WHERE id = ?', (row_id,))
+                else:
+                    self.db.execute('UPDATE outbox SET attempts = attempts + 1, last_error = ? '
+                                    'WHERE id = ?', (error, row_id))
+
+            if success:
+                delivered += 1
+                self.stats['delivered'] += 1
+                self.backoff.pop(sink, None)
+                instrumentation.inc('outbox_delivered_total', sink=sink)
+                continue
+
+            # 채널 단위 백오프: 이 채널의 나머지 알림은 다음 시도까지 대기
+            failures = self.backoff.get(sink, {}).get('failures', 0) + 1
+            delay = self.retry_delay(failures)
+            # 전송 대기(타임아웃)로 시간이 흘렀으면 그 시점부터
+            self.backoff[sink] = {'failures': failures, 'next_at': max(now, self.clock()) + delay}
+            self.stats['failed'] += 1
+            blocked.add(sink)
+            instrumentation.inc('outbox_failures_total', sink=sink)
+            print(f"⚠️  [{sink}] 알림 전송 실패 ({attempts + 1}회째), {delay:.1f}초 후 재시도: {error}")
+
+        instrumentation.set_gauge('outbox_pending', self.pending_count())
+        return delivered
+
+    def _expire(self, now: float):
+        """max_age보다 오래된 알림 버림"""
+        if not self.max_age:
+            return
+        with self._lock:
+            cursor = self.db.execute('DELETE FROM outbox WHERE created < ?', (now - self.max_age,))
+        if cursor.rowcount:
+            self.stats['expired'] += cursor.rowcount
+            instrumentation.inc('outbox_expired_total', cursor.rowcount)
+            print(f"⚠️  오래된 알림 {cursor.rowcount}건 버림 ({self.max_age}초 초과)")
+
+    def next_wait(self, now: float = None) -> float:
+        """다음 확인까지 대기 (가장 빠른 백오프 만료 또는 poll_interval)"""
+        now = self.clock() if now is None else now
+        wait = self.poll_interval
+        for state in self.backoff.values():
+            wait = min(wait, max(0.0, state['next_at'] - now))
+        return wait
+
+    def _all_backing_off(self) -> bool:
+        with self._lock:
+            sinks = [row[0] for row in self.db.execute('SELECT DISTINCT sink FROM outbox')]
+        now = self.clock()
+        return all(sink not in self.sinks or
+                   (sink in self.backoff and now < self.backoff[sink]['next_at'])
+                   for sink in sinks)
+
+    def _run(self):
+        while not self._stop.is_set():
+            try:
+                self.process()
+            except Exception as e:
+                print(f"❌ 알림 아웃박스 오류: {e}")
+            self._wake.wait(self.next_wait())
+            self._wake.clear()
+
+    def start(self):
+        """재시도 스레드 시작 (이전 실행에서 남은 알림도 전송)"""
+        if self._thread is not None:
+            return
+        pending = self.pending_count()
+        if pending:
+            print(f"📮 알림 아웃박스: 이전 실행에서 남은 알림 {pending}건 재전송")
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name='alert-outbox', daemon=True)
+        self._thread.start()
+
+    def stop(self, drain_timeout: float = 5.0):
+        """
+        재시도 스레드 종료 (남은 알림은 파일에 유지되어 다음 실행에서 전송)
+
+        Args:
+            drain_timeout: 종료 전 대기 알림 전송을 기다리는 최대 시간 (초)
+        """
+        if self._thread is None:
+            return
+        deadline = time.monotonic() + drain_timeout
+        # 대기 알림이 있는 채널이 모두 백오프 중이면 기다려도 소용없으므로 바로 종료
+        while (self.pending_count() and time.monotonic() < deadline
+               and not self._all_backing_off()):
+            self._wake.set()
+            time.sleep(0.05)
+        self._stop.set()
+        self._wake.set()
+        self._thread.join(timeout=5)
+        self._thread = None
+
+        pending = self.pending_count()
+        if pending:
+            print(f"📮 알림 아웃박스: 미전송 {pending}건은 다음 실행 때 재전송 ({self.path})")
+
+    def close(self):
+        """재시도 스레드 종료 후 파일 닫기"""
+        self.stop()
+        self.db.close()
+
+    def print_summary(self):
+        """통계 출력에 들어갈 아웃박스 요약"""
+        s = self.stats
+        print(f"📮 알림 아웃박스: 전송 {s['delivered']}건, 실패 후 재시도 {s['failed']}회, "
+              f"연기 {s['deferred']}회, 중복 제외 {s['duplicates']}건, 만료 {s['expired']}건, "
+              f"대기 {self.pending_count()}건")
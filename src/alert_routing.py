@@ -0,0 +1,232 @@
+"""
+알림 라우팅 규칙 (조용한 시간 / 채널별 on·off / 최소 신뢰도 / 좌석별 예외 / 텔레그램 대상)
+settings.json의 notification_preferences를 시작할 때 (그리고 설정 리로드 때) 한 번만 해석해
+좌석 × 시각(분) → 보낼 채널 비트마스크 결정 테이블로 만들어 두고,
+알림마다 문자열 파싱 없이 딕셔너리 조회 + 리스트 인덱스만으로 보낼 채널을 결정 (네트워크 요청 전에 적용)
+
+notification_preferences:
+    send_telegram / log_to_sheets / send_webhook: 채널별 on/off
+    min_confidence_for_alert: 이 신뢰도 미만 알림은 보내지 않음
+    quiet_hours: {"enabled", "start": "22:00", "end": "07:00", "sinks": [조용히 할 채널, 기본 전체]}
+        자정을 넘는 구간 지원, start == end면 구간 없음
+    seats: {"좌석 ID 또는 패턴(CH0*, node-2/*)": 위 항목 + alert_to 덮어쓰기}
+        정확히 일치하는 좌석 우선, 그다음 패턴은 적힌 순서대로 첫 번째 일치
+telegram.alert_to: group | all | admin | chat_ids 이름 (좌석별 alert_to로 덮어쓰기 가능)
+"""
+import fnmatch
+import re
+import time
+from datetime import datetime
+from typing import Dict, List, NamedTuple, Optional, Tuple
+
+
+SINKS = ('telegram', 'google_sheets', 'webhook')
+
+# 채널 → notification_preferences on/off 키
+SINK_TOGGLES = {
+    'telegram': 'send_telegram',
+    'google_sheets': 'log_to_sheets',
+    'webhook': 'send_webhook',
+}
+
+MINUTES_PER_DAY = 24 * 60
+
+
+class SeatRoute(NamedTuple):
+    """좌석 1개의 컴파일된 규칙"""
+    mask: int                   # 켜진 채널 비트마스크
+    minutes: List[int]          # 분(0~1439) → 보낼 채널 비트마스크 (조용한 시간 반영)
+    min_confidence: float
+    targets: Tuple[str, ...]    # 텔레그램 chat_id
+
+
+def parse_hhmm(value: str) -> int:
+    """
+    "HH:MM" → 자정부터 분
+
+    Raises:
+        ValueError: 형식 / 범위 오류
+    """
+    match = re.fullmatch(r'(\d{1,2}):(\d{2})', str(value).strip())
+    if not match or int(match.group(1)) > 23 or int(match.group(2)) > 59:
+        raise ValueError(f"시각 형식은 HH:MM이어야 합니다: {value!r}")
+    return int(match.group(1)) * 60 + int(match.group(2))
+
+
+def resolve_targets(telegram_config: Dict, alert_to: str) -> Tuple[str, ...]:
+    """alert_to → 텔레그램 chat_id 목록 (group / all / admin / chat_ids 이름)"""
+    chat_ids = {k: v for k, v in telegram_config.get('chat_ids', {}).items() if k != 'comment'}
+
+    if alert_to == 'all':
+        # 모든 개별 사용자에게 전송
+        return tuple(v for k, v in chat_ids.items() if k != 'group')
+    # group / admin / 특정 대상
+    target_id = chat_ids.get(alert_to)
+    return (target_id,) if target_id else ()
+
+
+class AlertRouter:
+    """컴파일된 알림 라우팅 결정 테이블"""
+
+    def __init__(self, config: Dict, sinks: Tuple[str, ...] = SINKS):
+        """
+        초기화 (규칙 컴파일)
+        Args:
+            config: settings.json 전체 딕셔너리
+            sinks: 라우팅할 채널 이름 (비트 순서)
+
+        Raises:
+            ValueError: 규칙 형식 오류
+        """
+        self.sinks = tuple(sinks)
+        self.bits = {sink: 1 << i for i, sink in enumerate(self.sinks)}
+        # 비트마스크 → 채널 튜플 (결정마다 튜플을 새로 만들지 않도록)
+        self.sink_sets = [tuple(s for s in self.sinks if mask & self.bits[s])
+                          for mask in range(1 << len(self.sinks))]
+        self.stats = {'routed': 0, 'below_confidence': 0, 'muted': 0}
+        self.compile(config)
+
+    def compile(self, config: Dict):
+        """
+        규칙을 결정 테이블로 컴파일 (실패하면 기존 테이블 유지)
+
+        Raises:
+            ValueError: 규칙 형식 오류
+        """
+        prefs = config.get('notification_preferences', {})
+        telegram_config = config.get('telegram', {})
+        if not isinstance(prefs, dict):
+            raise ValueError("notification_preferences는 객체여야 합니다")
+
+        exact, patterns = {}, []
+        for key, override in prefs.get('seats', {}).items():
+            if key == 'comment':
+                continue
+            if not isinstance(override, dict):
+                raise ValueError(f"notification_preferences.seats.{key}는 객체여야 합니다")
+            if any(ch in key for ch in '*?['):
+                patterns.append((re.compile(fnmatch.translate(key)), override))
+            else:
+                exact[key] = override
+
+        # 새 테이블을 다 만든 뒤 한 번에 교체 (중간에 오류가 나면 기존 테이블 유지)
+        # 같은 규칙 조합은 분 테이블을 공유 (좌석 수와 무관하게 메모리 일정)
+        tables: Dict[Tuple, List[int]] = {}
+        default = self._build(prefs, telegram_config, tables)
+        exact = {seat: self._build({**prefs, **override}, telegram_config, tables)
+                 for seat, override in exact.items()}
+        patterns = [(pattern, self._build({**prefs, **override}, telegram_config, tables))
+                    for pattern, override in patterns]
+
+        self._default, self._exact, self._patterns = default, exact, patterns
+        # 좌석 → SeatRoute (패턴 / 기본 좌석은 처음 조회할 때 채움)
+        self._seats: Dict[str, SeatRoute] = dict(exact)
+        self.quiet_hours = self._describe_quiet(prefs.get('quiet_hours', {}))
+
+    def _build(self, prefs: Dict, telegram_config: Dict, tables: Dict) -> SeatRoute:
+        """설정 1벌 → SeatRoute"""
+        mask = 0
+        for sink in self.sinks:
+            if prefs.get(SINK_TOGGLES.get(sink, f'send_{sink}'), True):
+                mask |= self.bits[sink]
+
+        min_confidence = prefs.get('min_confidence_for_alert', 0.0)
+        if not isinstance(min_confidence, (int, float)) or not 0.0 <= min_confidence <= 1.0:
+            raise ValueError(f"min_confidence_for_alert는 0~1이어야 합니다: {min_confidence!r}")
+
+        quiet = prefs.get('quiet_hours', {})
+        if not isinstance(quiet, dict):
+            raise ValueError("quiet_hours는 객체여야 합니다")
+        quiet_mask = 0
+        start = end = 0
+        if quiet.get('enabled', False):
+            start, end = parse_hhmm(quiet.get('start', '22:00')), parse_hhmm(quiet.get('end', '07:00'))
+            for sink in quiet.get('sinks', self.sinks):
+                if sink not in self.bits:
+                    raise ValueError(f"quiet_hours.sinks에 알 수 없는 채널: {sink}")
+                quiet_mask |= self.bits[sink]
+
+        key = (mask, quiet_mask, start, end)
+        minutes = tables.get(key)
+        if minutes is None:
+            minutes = [mask] * MINUTES_PER_DAY
+            muted = mask & ~quiet_mask
+            minute = start
+            while quiet_mask and minute != end:
+                minutes[minute] = muted
+                minute = (minute + 1) % MINUTES_PER_DAY
+            tables[key] = minutes
+
+        alert_to = prefs.get('alert_to', telegram_config.get('alert_to', 'group'))
+        return SeatRoute(mask, minutes, float(min_confidence), resolve_targets(telegram_config, alert_to))
+
+    @staticmethod
+    def _describe_quiet(quiet: Dict) -> Optional[str]:
+        if not quiet.get('enabled', False):
+            return None
+        return f"{quiet.get('start', '22:00')}~{quiet.get('end', '07:00')}"
+
+    def seat_route(self, seat: str) -> SeatRoute:
+        """좌석의 컴파일된 규칙 (정확히 일치 → 패턴 → 기본)"""
+        route = self._seats.get(seat)
+        if route is None:
+            route = self._default
+            for pattern, candidate in self._patterns:
+                if pattern.match(seat):
+                    route = candidate
+                    break
+            self._seats[seat] = route
+        return route
+
+    def route(self, seat: str, confidence: float, when: Optional[datetime] = None) -> Tuple[str, ...]:
+        """
+        알림 1건을 보낼 채널 결정
+
+        Args:
+            seat: 좌석 ID
+            confidence: 졸음 신뢰도
+            when: 알림 시각 (None이면 지금)
+
+        Returns:
+            보낼 채널 튜플 (비어 있으면 보내지 않음)
+        """
+        route = self._seats.get(seat) or self.seat_route(seat)
+        if confidence < route.min_confidence:
+            self.stats['below_confidence'] += 1
+            return ()
+
+        if when is None:
+            now = time.localtime()
+            minute = now.tm_hour * 60 + now.tm_min
+        else:
+            minute = when.hour * 60 + when.minute
+
+        sinks = self.sink_sets[route.minutes[minute]]
+        self.stats['routed' if sinks else 'muted'] += 1
+        return sinks
+
+    def allows(self, seat: str, sink: str, confidence: float,
+               when: Optional[datetime] = None) -> bool:
+        """채널 1개로 보낼지"""
+        return sink in self.route(seat, confidence, when)
+
+    def telegram_targets(self, seat: Optional[str] = None) -> Tuple[str, ...]:
+        """텔레그램 전송 대상 (좌석별 alert_to 반영, seat가 None이면 기본 대상)"""
+        return (self._default if seat is None else self.seat_route(seat)).targets
+
+    def describe(self) -> str:
+        """시작 / 리로드 때 출력할 규칙 요약"""
+        enabled = self.sink_sets[self._default.mask]
+        parts = [f"채널 {'/'.join(enabled) or '없음'}",
+                 f"최소 신뢰도 {self._default.min_confidence:.0%}"]
+        if self.quiet_hours:
+            parts.append(f"조용한 시간 {self.quiet_hours}")
+        if self._exact or self._patterns:
+            parts.append(f"좌석 예외 {len(self._exact) + len(self._patterns)}개")
+        return ', '.join(parts)
+
+    def print_summary(self):
+        """통계 출력에 들어갈 라우팅 요약"""
+        s = self.stats
+        print(f"🔀 알림 규칙: 전송 {s['routed']}건, 신뢰도 미달 {s['below_confidence']}건, "
+              f"조용한 시간 / 채널 꺼짐 {s['muted']}건")
@@ -2,14 +2,46 @@
 텔레그램 알림 시스템
 """
 import asyncio
-from telegram import Bot
-from telegram.error import TelegramError
-from typing import Optional
+import base64
+from typing import Dict, List, Optional
 import json
 import os
 from datetime import datetime
 
 
+# 텔레그램 사진 설명 길이 / 앨범 사진 수 제한
+CAPTION_LIMIT = 1024
+ALBUM_LIMIT = 10
+
+
+async def send_telegram_message(bot, chat_id: str, message: str, parse_mode: str = None,
+                                photos: List[bytes] = None):
+    """
+    텔레그램 메시지 1건 전송 (TelegramAlert / MultiAlert 공용)
+    - 사진 없음: 메시지
+    - 사진 1장: 사진 + 설명, 여러 장: 앨범 1건 (설명은 첫 장, 최대 10장)
+    - 설명 길이 제한(1024자)을 넘으면 메시지 후 사진 / 앨범
+    
+    Raises:
+        TelegramError: 전송 실패
+    """
+    from telegram import InputMediaPhoto
+    
+    photos = (photos or [])[:ALBUM_LIMIT]
+    caption = message if len(message) <= CAPTION_LIMIT else None
+    if not photos or caption is None:
+        await bot.send_message(chat_id=chat_id, text=message, parse_mode=parse_mode)
+    if len(photos) == 1:
+        await bot.send_photo(chat_id=chat_id, photo=photos[0], caption=caption,
+                             parse_mode=parse_mode if caption else None)
+    elif photos:
+        await bot.send_media_group(chat_id=chat_id, media=[
+            InputMediaPhoto(photo, caption=caption if i == 0 else None,
+                            parse_mode=parse_mode if caption and i == 0 else None)
+            for i, photo in enumerate(photos)
+        ])
+
+
 class TelegramAlert:
     """텔레그램 알림 발송"""
     
@@ -26,11 +58,21 @@ class TelegramAlert:
         
         self.bot = None
         self.enabled = False
+        # 동기 전송용 이벤트 루프 (알림마다 새로 만들지 않고 재사용, 봇의 HTTP 연결도 유지)
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        # 알림 아웃박스 (attach_outbox 후에는 send가 기록만 하고 전송은 재시도 스레드가)
+        self.outbox = None
         
         if self.bot_token and self.chat_id:
             if self.bot_token != "YOUR_BOT_TOKEN_HERE" and self.chat_id != "YOUR_CHAT_ID_HERE":
                 try:
-                    self.bot = Bot(token=self.bot_token)
+                    # python-telegram-bot은 알림이 켜져 있을 때만 로드 (시작 시간 단축)
+                    from telegram import Bot
+                    bot_options = {}
+                    if self.config.get('api_base_url'):
+                        # 로컬 Bot API 서버 / 테스트용 스텁 서버
+                        bot_options['base_url'] = self.config['api_base_url']
+                    self.bot = Bot(token=self.bot_token, **bot_options)
                     self.enabled = True
                     print("✅ 텔레그램 알림 활성화")
                 except Exception as e:
@@ -50,49 +92,105 @@ class TelegramAlert:
             print(f"⚠️  설정 파일 로드 실패: {e}")
             return {}
     
-    def send(self, message: str, parse_mode: str = None) -> bool:
+    def attach_outbox(self, outbox):
+        """
+        알림 아웃박스 연결 (이후 전송은 디스크에 기록 후 재시도 스레드가 처리)
+        
+        Args:
+            outbox: AlertOutbox
+        """
+        self.outbox = outbox
+        outbox.register('telegram', lambda payload, key, attempts: self.deliver(
+            payload['text'], payload.get('parse_mode'),
+            [base64.b64decode(photo) for photo in payload.get('photos', [])]))
+    
+    def send(self, message: str, parse_mode: str = None, snapshots: List = None) -> bool:
         """
         메시지 전송 (동기 방식)
         
         Args:
             message: 전송할 메시지
             parse_mode: 'Markdown' 또는 'HTML'
+            snapshots: 함께 보낼 좌석 스냅샷 (Snapshot 리스트, 있으면 사진 + 설명으로 전송)
             
         Returns:
-            성공 여부
+            성공 여부 (아웃박스 사용 시 기록 성공 여부)
         """
         if not self.enabled:
             print(f"📱 [알림] {message}")
             return False
         
+        if self.outbox is not None:
+            return self.outbox.submit('telegram', self._payload(message, parse_mode, snapshots)) is not None
+        
+        return self.deliver(message, parse_mode,
+                            [photo for photo in (s.jpeg() for s in snapshots or []) if photo])
+    
+    @staticmethod
+    def _payload(message: str, parse_mode: str, snapshots: List = None) -> Dict:
+        """아웃박스 기록 내용 (사진은 이미 인코딩된 JPEG의 base64, 재시작 후에도 전송)"""
+        payload = {'text': message, 'parse_mode': parse_mode}
+        photos = [photo for photo in (s.base64() for s in snapshots or []) if photo]
+        if photos:
+            payload['photos'] = photos
+        return payload
+    
+    def deliver(self, message: str, parse_mode: str = None, photos: List[bytes] = None) -> bool:
+        """메시지 바로 전송 (아웃박스 재시도 스레드 / 아웃박스 미사용 시)"""
         try:
-            # 비동기 함수를 동기적으로 실행
-            loop = asyncio.new_event_loop()
-            asyncio.set_event_loop(loop)
-            result = loop.run_until_complete(
-                self._send_async(message, parse_mode)
+            # 비동기 함수를 동기적으로 실행 (비동기 런타임에서는 send_async 사용)
+            if self._loop is None or self._loop.is_closed():
+                self._loop = asyncio.new_event_loop()
+            return self._loop.run_until_complete(
+                self._send_async(message, parse_mode, photos)
             )
-            loop.close()
-            return result
         except Exception as e:
             print(f"❌ 알림 전송 실패: {e}")
             return False
     
-    async def _send_async(self, message: str, parse_mode: str = None) -> bool:
-        """비동기 메시지 전송"""
+    async def send_async(self, message: str, parse_mode: str = None, snapshots: List = None) -> bool:
+        """
+        메시지 전송 (실행 중인 이벤트 루프에서 await)
+        
+        Args:
+            message: 전송할 메시지
+            parse_mode: 'Markdown' 또는 'HTML'
+            snapshots: 함께 보낼 좌석 스냅샷 (Snapshot 리스트)
+            
+        Returns:
+            성공 여부
+        """
+        if not self.enabled:
+            print(f"📱 [알림] {message}")
+            return False
+        
+        # 인코딩은 스냅샷 스레드에서, 루프는 기다리기만
+        photos = [photo for photo in [await s.jpeg_async() for s in snapshots or []] if photo]
+        
+        if self.outbox is not None:
+            return self.outbox.submit('telegram', self._payload(message, parse_mode, snapshots)) is not None
+        
         try:
-            await self.bot.send_message(
-                chat_id=self.chat_id,
-                text=message,
-                parse_mode=parse_mode
-            )
-            print(f"✅ 텔레그램 알림 전송 완료")
+            return await self._send_async(message, parse_mode, photos)
+        except Exception as e:
+            print(f"❌ 알림 전송 실패: {e}")
+            return False
+    
+    async def _send_async(self, message: str, parse_mode: str = None,
+                          photos: List[bytes] = None) -> bool:
+        """비동기 메시지 전송 (사진이 있으면 사진 + 설명)"""
+        from telegram.error import TelegramError
+        
+        try:
+            await send_telegram_message(self.bot, self.chat_id, message, parse_mode, photos)
+            print(f"✅ 텔레그램 알림 전송 완료{f' (사진 {len(photos)}장)' if photos else ''}")
             return True
         except TelegramError as e:
             print(f"❌ 텔레그램 오류: {e}")
             return False
     
-    def send_drowsy_alert(self, seat_id: str, confidence: float, details: dict) -> bool:
+    def send_drowsy_alert(self, seat_id: str, confidence: float, details: dict,
+                          snapshot=None) -> bool:
         """
         졸음 알림 전송
         
@@ -100,10 +198,23 @@ class TelegramAlert:
             seat_id: 좌석 ID
             confidence: 신뢰도
             details: 상세 정보
+            snapshot: 좌석 스냅샷 (Snapshot, 있으면 사진과 함께 전송)
             
         Returns:
             성공 여부
         """
+        return self.send(self.format_drowsy_alert(seat_id, confidence, details),
+                         parse_mode='Markdown', snapshots=[snapshot] if snapshot else None)
+    
+    async def send_drowsy_alert_async(self, seat_id: str, confidence: float, details: dict,
+                                      snapshot=None) -> bool:
+        """졸음 알림 전송 (비동기 런타임용, send_drowsy_alert와 같은 메시지)"""
+        return await self.send_async(self.format_drowsy_alert(seat_id, confidence, details),
+                                     parse_mode='Markdown',
+                                     snapshots=[snapshot] if snapshot else None)
+    
+    def format_drowsy_alert(self, seat_id: str, confidence: float, details: dict) -> str:
+        """졸음 알림 메시지 (Markdown)"""
         now = datetime.now()
         
         message = f"""
@@ -120,7 +231,45 @@ class TelegramAlert:
 • 고개 상태: {'숙임 😴' if details.get('head_down') else '정상 ✅'}
         """
         
-        return self.send(message.strip(), parse_mode='Markdown')
+        return message.strip()
+    
+    def send_drowsy_digest(self, alerts: List[Dict]) -> bool:
+        """
+        졸음 알림 요약 전송 (여러 좌석을 메시지 1건으로, alert_coalescer에서 사용)
+        
+        Args:
+            alerts: [{'seat', 'confidence', 'details', 'time', 'repeats'}, ...]
+        
+        Returns:
+            성공 여부
+        """
+        return self.send(self.format_drowsy_digest(alerts), parse_mode='Markdown',
+                         snapshots=[a['snapshot'] for a in alerts if a.get('snapshot')])
+    
+    async def send_drowsy_digest_async(self, alerts: List[Dict]) -> bool:
+        """졸음 알림 요약 전송 (비동기 런타임용)"""
+        return await self.send_async(self.format_drowsy_digest(alerts), parse_mode='Markdown',
+                                     snapshots=[a['snapshot'] for a in alerts if a.get('snapshot')])
+    
+    def format_drowsy_digest(self, alerts: List[Dict]) -> str:
+        """졸음 알림 요약 메시지 (Markdown, 좌석당 한 줄)"""
+        now = datetime.now()
+        lines = [
+            f"🚨 *졸음 알림 {len(alerts)}석* 🚨",
+            "",
+            f"⏰ 시간: {now.strftime('%Y-%m-%d %H:%M:%S')}",
+            "",
+        ]
+        for alert in alerts:
+            details = alert['details']
+            repeats = f" ×{alert['repeats']}" if alert['repeats'] > 1 else ""
+            lines.append(
+                f"📍 {alert['seat']} ({alert['time'].strftime('%H:%M:%S')}){repeats} "
+                f"— 신뢰도 {alert['confidence']:.0%}, EAR {details.get('ear', 0):.3f}, "
+                f"고개 {details.get('head_tilt', 0):.3f}"
+                f"{' 😴' if details.get('eyes_closed') or details.get('head_down') else ''}"
+            )
+        return "\n".join(lines)
     
     def send_system_message(self, message: str) -> bool:
         """시스템 메시지 전송"""
@@ -147,8 +296,9 @@ class ConsoleAlert:
         print("=" * 60)
         return True
     
-    def send_drowsy_alert(self, seat_id: str, confidence: float, details: dict) -> bool:
-        """졸음 알림 출력"""
+    def send_drowsy_alert(self, seat_id: str, confidence: float, details: dict,
+                          snapshot=None) -> bool:
+        """졸음 알림 출력 (스냅샷은 크기만 표시)"""
         now = datetime.now()
         
         message = f"""
@@ -164,4 +314,32 @@ class ConsoleAlert:
 • Head: {'DOWN' if details.get('head_down') else 'UP'}
         """
         
+        if snapshot is not None:
+            message = f"{message.strip()}\n📷 스냅샷: {snapshot.describe()}"
         return self.send(message.strip())
+    
+    async def send_drowsy_alert_async(self, seat_id: str, confidence: float, details: dict,
+                                      snapshot=None) -> bool:
+        """졸음 알림 출력 (비동기 런타임용, 콘솔 출력은 바로 끝남)"""
+        if snapshot is not None:
+            await snapshot.jpeg_async()
+        return self.send_drowsy_alert(seat_id, confidence, details, snapshot)
+    
+    def send_drowsy_digest(self, alerts: List[Dict]) -> bool:
+        """졸음 알림 요약 출력 (좌석당 한 줄)"""
+        lines = [f"🚨 졸음 알림 {len(alerts)}석 🚨",
+                 f"⏰ 시간: {datetime.now().strftime('%H:%M:%S')}"]
+        for alert in alerts:
+            details = alert['details']
+            repeats = f" x{alert['repeats']}" if alert['repeats'] > 1 else ""
+            lines.append(
+                f"📍 {alert['seat']} ({alert['time'].strftime('%H:%M:%S')}){repeats} | "
+                f"{alert['confidence']:.1%} | EAR {details.get('ear', 0):.3f} | "
+                f"Tilt {details.get('head_tilt', 0):.3f}"
+                f"{' | 📷 ' + alert['snapshot'].describe() if alert.get('snapshot') else ''}"
+            )
+        return self.send("\n".join(lines))
+    
+    async def send_drowsy_digest_async(self, alerts: List[Dict]) -> bool:
+        """졸음 알림 요약 출력 (비동기 런타임용)"""
+        return self.send_drowsy_digest(alerts)
@@ -7,10 +7,16 @@ GitHub 기반 무료 클라우드 알림 시스템
 import requests
 import json
 import os
-from datetime import datetime
+from datetime import datetime, timezone
 from typing import Dict, Optional, List
 import base64
 
+from github_client import GitHubClient, PRIORITY_ALERT, PRIORITY_DASHBOARD, PRIORITY_SUMMARY
+
+
+class RequestDeferred(requests.RequestException):
+    """요청 한도로 GitHub 요청을 연기함 (연결 실패가 아님)"""
+
 
 class GitHubAlert:
     """GitHub Issues 기반 알림 시스템"""
@@ -29,15 +35,26 @@ class GitHubAlert:
         self.repo_owner = self.github_config.get('repo_owner', '')
         self.repo_name = self.github_config.get('repo_name', '')
         
-        # API URL
-        self.api_base = f"https://api.github.com/repos/{self.repo_owner}/{self.repo_name}"
-        
         # 헤더
         self.headers = {
             'Authorization': f'token {self.token}',
             'Accept': 'application/vnd.github.v3+json'
         }
         
+        # 테스트용 스텁 서버 등 (기본 GitHub API)
+        self.api_url = self.github_config.get('api_url', 'https://api.github.com').rstrip('/')
+        
+        # API URL
+        self.api_base = f"{self.api_url}/repos/{self.repo_owner}/{self.repo_name}"
+        
+        # 요청 한도 관리 (토큰 버킷, 알림 Issue > 대시보드 > 일일 리포트)
+        self.client = GitHubClient(self.token, self.github_config.get('rate_limit', {}))
+        # 대시보드 data.json의 마지막 sha (갱신마다 조회 요청을 보내지 않도록)
+        self.dashboard_sha = None
+        
+        # 알림 아웃박스 (attach_outbox 후에는 create_issue가 기록만 하고 생성은 재시도 스레드가)
+        self.outbox = None
+        
         # 활성화 여부
         self.enabled = bool(self.token and self.repo_owner and self.repo_name)
         
@@ -54,7 +71,18 @@ class GitHubAlert:
         except:
             return {}
     
-    def create_issue(self, title: str, body: str, labels: List[str] = None) -> Optional[str]:
+    def attach_outbox(self, outbox):
+        """
+        알림 아웃박스 연결 (이후 Issue 생성은 디스크에 기록 후 재시도 스레드가 처리)
+        
+        Args:
+            outbox: AlertOutbox
+        """
+        self.outbox = outbox
+        outbox.register('github', self.deliver_issue)
+    
+    def create_issue(self, title: str, body: str, labels: List[str] = None,
+                     idempotency_key: str = None, priority: int = PRIORITY_ALERT) -> Optional[str]:
         """
         GitHub Issue 생성
         
@@ -62,17 +90,116 @@ class GitHubAlert:
             title: Issue 제목
             body: Issue 내용
             labels: 라벨 리스트 (예: ['drowsy', 'urgent'])
+            idempotency_key: 멱등 키 (본문에 숨겨 두어 재시도 시 같은 Issue를 찾음)
+            priority: 요청 우선순위 (일일 리포트는 PRIORITY_SUMMARY)
             
         Returns:
-            Issue URL 또는 None
+            Issue URL 또는 None (아웃박스 사용 시 대기열 멱등 키)
         """
         if not self.enabled:
             print(f"📝 [GitHub] {title}")
             print(body)
             return None
         
+        if self.outbox is not None:
+            from alert_outbox import idempotency_key as make_key
+            issue = {'title': title, 'body': body, 'labels': labels or []}
+            key = idempotency_key or make_key('github', issue)
+            # since: 재시도 때 이 시각 이후 Issue만 확인
+            issue['since'] = datetime.now(timezone.utc).strftime('%Y-%m-%dT%H:%M:%SZ')
+            issue['priority'] = priority
+            return self.outbox.submit('github', issue, key)
+        
+        return self.post_issue(title, body, labels, idempotency_key, priority)
+    
+    def deliver_issue(self, issue: dict, key: str, attempts: int):
+        """
+        아웃박스 재시도 스레드의 Issue 생성
+        이전 시도가 있었으면 (응답만 못 받았을 수 있으므로) 멱등 키로 이미 만든 Issue부터 확인
+        
+        Returns:
+            생성했거나 이미 있으면 True, 요청 한도로 연기했으면 DEFERRED
+            (아웃박스가 실패로 세지 않아 뒤의 알림 Issue를 막지 않음)
+        """
+        from alert_outbox import DEFERRED
+        priority = issue.get('priority', PRIORITY_ALERT)
+        try:
+            if attempts:
+                existing = self.find_issue(key, issue.get('since'), priority)
+                if existing:
+                    print(f"✅ GitHub Issue 이미 생성됨 (재시도 생략): {existing}")
+                    return True
+            return self._post_issue(issue['title'], issue['body'], issue.get('labels'),
+                                    key, priority) is not None
+        except RequestDeferred:
+            return DEFERRED
+    
+    def find_issue(self, key: str, since: str = None,
+                   priority: int = PRIORITY_ALERT) -> Optional[str]:
+        """
+        멱등 키가 든 Issue 찾기
+        
+        Args:
+            key: 멱등 키
+            since: 이 시각(ISO 8601) 이후 갱신된 Issue만
+            priority: 요청 우선순위
+            
+        Returns:
+            Issue URL 또는 None
+            
+        Raises:
+            requests.RequestException: API 연결 실패 / 요청 연기(RequestDeferred)
+                (확인 못 하면 새로 만들지 않도록)
+        """
+        params = {'state': 'all', 'per_page': 100}
+        if since:
+            params['since'] = since
+        response = self.client.request('GET', f"{self.api_base}/issues", priority,
+                                       params=params, timeout=10)
+        if response is None:
+            raise RequestDeferred("요청 한도로 Issue 확인 연기")
+        response.raise_for_status()
+        
+        marker = self.key_marker(key)
+        for issue in response.json():
+            if marker in (issue.get('body') or ''):
+                return issue['html_url']
+        return None
+    
+    @staticmethod
+    def key_marker(key: str) -> str:
+        """Issue 본문에 숨기는 멱등 키 (Markdown 주석이라 화면에 안 보임)"""
+        return f"<!-- viewguard-key: {key} -->"
+    
+    def post_issue(self, title: str, body: str, labels: List[str] = None,
+                   idempotency_key: str = None, priority: int = PRIORITY_ALERT) -> Optional[str]:
+        """
+        GitHub Issue 생성 API 호출
+        
+        Returns:
+            Issue URL 또는 None (요청 한도로 연기된 경우 포함)
+        """
+        try:
+            return self._post_issue(title, body, labels, idempotency_key, priority)
+        except RequestDeferred:
+            return None
+    
+    def _post_issue(self, title: str, body: str, labels: List[str] = None,
+                    idempotency_key: str = None, priority: int = PRIORITY_ALERT) -> Optional[str]:
+        """
+        GitHub Issue 생성 API 호출 (연기는 실패와 구분)
+        
+        Returns:
+            Issue URL 또는 None
+            
+        Raises:
+            RequestDeferred: 요청 한도로 연기
+        """
         url = f"{self.api_base}/issues"
         
+        if idempotency_key:
+            body = f"{body}\n\n{self.key_marker(idempotency_key)}"
+        
         data = {
             'title': title,
             'body': body,
@@ -80,8 +207,11 @@ class GitHubAlert:
         }
         
         try:
-            response = requests.post(url, headers=self.headers, json=data, timeout=10)
+            response = self.client.request('POST', url, priority, json=data, timeout=10)
             
+            if response is None:
+                print(f"⏸️  GitHub 요청 한도로 Issue 생성 연기: {title}")
+                raise RequestDeferred(title)
             if response.status_code == 201:
                 issue_data = response.json()
                 issue_url = issue_data['html_url']
@@ -91,11 +221,14 @@ class GitHubAlert:
                 print(f"❌ GitHub Issue 생성 실패: {response.status_code}")
                 print(response.text)
                 return None
+        except RequestDeferred:
+            raise
         except Exception as e:
             print(f"❌ GitHub API 오류: {e}")
             return None
     
-    def send_drowsy_alert(self, channel: str, confidence: float, details: dict) -> Optional[str]:
+    def send_drowsy_alert(self, channel: str, confidence: float, details: dict,
+                          snapshot=None) -> Optional[str]:
         """
         졸음 알림 Issue 생성
         
@@ -103,6 +236,7 @@ class GitHubAlert:
             channel: 채널 번호
             confidence: 신뢰도
             details: 상세 정보
+            snapshot: 좌석 스냅샷 (Issues API는 이미지 첨부를 지원하지 않아 사용하지 않음)
             
         Returns:
             Issue URL
@@ -146,6 +280,53 @@ class GitHubAlert:
         
         return self.create_issue(title.strip(), body.strip(), labels)
     
+    def send_drowsy_digest(self, alerts: List[Dict]) -> Optional[str]:
+        """
+        여러 좌석 졸음 알림을 Issue 1개로 생성 (alert_coalescer에서 사용)
+        
+        Args:
+            alerts: [{'seat', 'confidence', 'details', 'time', 'repeats'}, ...]
+        
+        Returns:
+            Issue URL
+        """
+        now = datetime.now()
+        top = max(alert['confidence'] for alert in alerts)
+        
+        title = f"🚨 졸음 감지: {len(alerts)}석 (최대 {top:.0%}) - {now.strftime('%m/%d %H:%M')}"
+        
+        rows = "\n".join(
+            f"| {alert['seat']} | {alert['time'].strftime('%H:%M:%S')} | {alert['confidence']:.1%} | "
+            f"`{alert['details'].get('ear', 0):.3f}` | `{alert['details'].get('head_tilt', 0):.3f}` | "
+            f"{alert['repeats']} |"
+            for alert in alerts
+        )
+        body = f"""
+## 졸음 알림 ({len(alerts)}석)
+
+- **시간**: {now.strftime('%Y-%m-%d %H:%M:%S')}
+
+| 채널 | 감지 시각 | 신뢰도 | EAR | Head Tilt | 감지 횟수 |
+|------|-----------|--------|-----|-----------|-----------|
+{rows}
+
+### 조치 사항
+- [ ] 담당자 현장 확인
+- [ ] 학생 깨우기
+- [ ] 상담 필요 여부 체크
+
+---
+*자동 생성된 알림 - ViewGuard Monitor*
+        """
+        
+        labels = ['drowsy']
+        if top >= 0.9:
+            labels.append('urgent')
+        elif top >= 0.8:
+            labels.append('high-confidence')
+        
+        return self.create_issue(title, body.strip(), labels)
+    
     def update_dashboard_data(self, data: dict) -> bool:
         """
         대시보드 데이터 업데이트 (JSON 파일로 저장)
@@ -167,15 +348,21 @@ class GitHubAlert:
             # Base64 인코딩
             content_encoded = base64.b64encode(json_content.encode()).decode()
             
-            # 파일 존재 여부 확인
+            # 지난 갱신 응답의 sha가 있으면 조회 요청 생략 (갱신 1번 = 요청 1건)
             file_url = f"{self.api_base}/contents/docs/data.json"
-            response = requests.get(file_url, headers=self.headers, timeout=10)
+            sha = self.dashboard_sha
+            if sha is None:
+                response = self.client.request('GET', file_url, PRIORITY_DASHBOARD, timeout=10)
+                
+                if response is None:
+                    print("⏸️  GitHub 요청 한도로 대시보드 갱신 연기")
+                    return False
+                if response.status_code == 200:
+                    # PUT이 연기돼도 다음 갱신은 조회 없이 바로 PUT
+                    sha = self.dashboard_sha = response.json()['sha']
             
-            if response.status_code == 200:
+            if sha is not None:
                 # 파일이 있으면 업데이트
-                file_data = response.json()
-                sha = file_data['sha']
-                
                 update_data = {
                     'message': f'Update dashboard data - {datetime.now().isoformat()}',
                     'content': content_encoded,
@@ -188,17 +375,24 @@ class GitHubAlert:
                     'content': content_encoded
                 }
             
-            response = requests.put(
+            response = self.client.request(
+                'PUT',
                 file_url,
-                headers=self.headers,
+                PRIORITY_DASHBOARD,
                 json=update_data,
                 timeout=10
             )
             
+            if response is None:
+                print("⏸️  GitHub 요청 한도로 대시보드 갱신 연기")
+                return False
             if response.status_code in [200, 201]:
+                self.dashboard_sha = response.json().get('content', {}).get('sha')
                 print("✅ 대시보드 데이터 업데이트 완료")
                 return True
             else:
+                # sha 불일치(409/422 등)면 다음 갱신 때 다시 조회
+                self.dashboard_sha = None
                 print(f"❌ 대시보드 업데이트 실패: {response.status_code}")
                 return False
         except Exception as e:
@@ -225,14 +419,15 @@ class GitHubAlert:
                 'since': f"{today}T00:00:00Z"
             }
             
-            response = requests.get(
+            response = self.client.request(
+                'GET',
                 url,
-                headers=self.headers,
+                PRIORITY_SUMMARY,
                 params=params,
                 timeout=10
             )
             
-            if response.status_code == 200:
+            if response is not None and response.status_code == 200:
                 issues = response.json()
                 return issues
             else:
@@ -259,23 +454,23 @@ class GitHubAlert:
             # 코멘트 추가
             if comment:
                 comment_url = f"{self.api_base}/issues/{issue_number}/comments"
-                requests.post(
+                self.client.request(
+                    'POST',
                     comment_url,
-                    headers=self.headers,
                     json={'body': comment},
                     timeout=10
                 )
             
             # Issue 닫기
             issue_url = f"{self.api_base}/issues/{issue_number}"
-            response = requests.patch(
+            response = self.client.request(
+                'PATCH',
                 issue_url,
-                headers=self.headers,
                 json={'state': 'closed'},
                 timeout=10
             )
             
-            return response.status_code == 200
+            return response is not None and response.status_code == 200
         except Exception as e:
             print(f"❌ Issue 닫기 오류: {e}")
             return False
@@ -327,7 +522,7 @@ class GitHubAlert:
 *자동 생성된 일일 리포트 - ViewGuard Monitor*
         """
         
-        return self.create_issue(title, body.strip(), ['daily-report'])
+        return self.create_issue(title, body.strip(), ['daily-report'], priority=PRIORITY_SUMMARY)
     
     def test_connection(self) -> bool:
         """
@@ -342,9 +537,9 @@ class GitHubAlert:
         
         try:
             # Repo 정보 확인
-            response = requests.get(
+            response = self.client.request(
+                'GET',
                 self.api_base,
-                headers=self.headers,
                 timeout=10
             )
             
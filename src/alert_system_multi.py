@@ -3,16 +3,21 @@
 - 텔레그램 그룹/개별 알림
 - 구글 스프레드시트 자동 기록
 - 웹훅 지원 (n8n 연동)
+- 알림 규칙 (notification_preferences: 조용한 시간 / 채널별 on·off / 최소 신뢰도, alert_routing)
+- 좌석 스냅샷 (텔레그램 사진 / 웹훅 base64, 한 번 인코딩한 JPEG를 모든 채널이 공유)
+- 알림 아웃박스 (attach_outbox 후에는 채널별로 디스크에 기록, 재시도 스레드가 전송)
 """
 import asyncio
-from telegram import Bot
-from telegram.error import TelegramError
+import base64
 from typing import List, Optional, Dict
 import json
 import os
 from datetime import datetime
 import requests
 
+from alert_routing import AlertRouter
+from alert_system import send_telegram_message
+
 
 class MultiAlert:
     """다중 채널 알림 시스템"""
@@ -25,6 +30,10 @@ class MultiAlert:
         self.telegram_config = self.config.get('telegram', {})
         self.telegram_enabled = False
         self.bots = {}
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        
+        # 알림 아웃박스 (attach_outbox 후에는 채널별 전송이 기록만 하고 전송은 재시도 스레드가)
+        self.outbox = None
         
         # 구글 시트 설정
         self.gsheet_config = self.config.get('google_sheets', {})
@@ -34,14 +43,23 @@ class MultiAlert:
         self.webhook_config = self.config.get('webhook', {})
         self.webhook_enabled = self.webhook_config.get('enabled', False)
         
+        # 알림 규칙: 시작할 때 한 번 컴파일, 알림마다 네트워크 요청 전에 결정 테이블로 채널 선택
+        try:
+            self.router = AlertRouter(self.config)
+        except ValueError as e:
+            print(f"⚠️  알림 규칙 오류, 기본 규칙 사용: {e}")
+            self.router = AlertRouter({'telegram': self.telegram_config})
+        
         # 초기화
         self.init_telegram()
         self.init_google_sheets()
+        self.enabled = self.telegram_enabled or self.gsheet_enabled or self.webhook_enabled
         
         print("📱 다중 알림 시스템 초기화")
         print(f"   - 텔레그램: {'✅' if self.telegram_enabled else '❌'}")
         print(f"   - 구글 시트: {'✅' if self.gsheet_enabled else '❌'}")
         print(f"   - 웹훅: {'✅' if self.webhook_enabled else '❌'}")
+        print(f"   - 알림 규칙: {self.router.describe()}")
     
     def load_config(self, config_path: str) -> dict:
         """설정 로드"""
@@ -59,6 +77,8 @@ class MultiAlert:
             return
         
         try:
+            # python-telegram-bot은 텔레그램 설정이 있을 때만 로드 (시작 시간 단축)
+            from telegram import Bot
             self.bot = Bot(token=bot_token)
             self.telegram_enabled = True
             print("✅ 텔레그램 봇 연결 성공")
@@ -102,62 +122,88 @@ class MultiAlert:
             print(f"⚠️  구글 시트 초기화 실패: {e}")
             self.gsheet_enabled = False
     
-    def get_telegram_targets(self) -> List[str]:
-        """텔레그램 전송 대상 목록"""
-        alert_to = self.telegram_config.get('alert_to', 'group')
-        chat_ids = self.telegram_config.get('chat_ids', {})
-        
-        if alert_to == 'all':
-            # 모든 개별 사용자에게 전송
-            return [v for k, v in chat_ids.items() if k != 'group']
-        elif alert_to == 'group':
-            # 그룹에만 전송
-            group_id = chat_ids.get('group')
-            return [group_id] if group_id else []
-        elif alert_to == 'admin':
-            # 관리자에게만
-            admin_id = chat_ids.get('admin')
-            return [admin_id] if admin_id else []
-        else:
-            # 특정 대상
-            target_id = chat_ids.get(alert_to)
-            return [target_id] if target_id else []
+    def apply_settings(self, config: dict):
+        """
+        바뀐 settings.json의 알림 규칙 다시 컴파일 (봇 토큰 / 시트 / 웹훅 연결은 재시작 후 적용)
+        
+        Args:
+            config: settings.json 전체 딕셔너리
+        """
+        try:
+            self.router.compile(config)
+        except ValueError as e:
+            print(f"❌ 알림 규칙 오류, 기존 규칙 유지: {e}")
+            return
+        self.config = config
+        print(f"🔄 알림 규칙 다시 불러옴: {self.router.describe()}")
+    
+    def attach_outbox(self, outbox):
+        """
+        알림 아웃박스 연결 (이후 텔레그램 / 구글 시트 / 웹훅 전송은 디스크에 기록 후 재시도 스레드가 처리)
+        
+        Args:
+            outbox: AlertOutbox
+        """
+        self.outbox = outbox
+        outbox.register('telegram', lambda payload, key, attempts: self.deliver_telegram(
+            payload['text'], payload['targets'],
+            [base64.b64decode(photo) for photo in payload.get('photos', [])] or None))
+        outbox.register('google_sheets',
+                        lambda payload, key, attempts: self.append_sheet_rows(payload['rows']))
+        outbox.register('webhook',
+                        lambda payload, key, attempts: self.deliver_webhook(payload['data']))
+    
+    def get_telegram_targets(self, seat: Optional[str] = None) -> List[str]:
+        """텔레그램 전송 대상 목록 (alert_to는 규칙 컴파일 때 한 번만 해석)"""
+        return list(self.router.telegram_targets(seat))
     
-    async def send_telegram_async(self, message: str, targets: List[str]) -> int:
-        """텔레그램 비동기 전송"""
+    async def send_telegram_async(self, message: str, targets: List[str],
+                                  photos: Optional[List[bytes]] = None) -> int:
+        """텔레그램 비동기 전송 (사진이 있으면 사진 + 설명)"""
+        from telegram.error import TelegramError
+        
         success_count = 0
         
         for chat_id in targets:
             try:
-                await self.bot.send_message(
-                    chat_id=chat_id,
-                    text=message,
-                    parse_mode='Markdown'
-                )
+                await send_telegram_message(self.bot, chat_id, message, 'Markdown', photos)
                 success_count += 1
             except TelegramError as e:
                 print(f"❌ 텔레그램 전송 실패 ({chat_id}): {e}")
         
         return success_count
     
-    def send_telegram(self, message: str) -> bool:
-        """텔레그램 전송 (동기)"""
+    def send_telegram(self, message: str, targets: Optional[List[str]] = None,
+                      photos: Optional[List[bytes]] = None) -> bool:
+        """텔레그램 전송 (동기, targets가 None이면 기본 대상, photos는 JPEG 바이트 목록)"""
         if not self.telegram_enabled:
             return False
         
-        targets = self.get_telegram_targets()
+        if targets is None:
+            targets = self.get_telegram_targets()
         
         if not targets:
             print("⚠️  텔레그램 전송 대상이 없습니다")
             return False
         
+        if self.outbox is not None:
+            payload = {'text': message, 'targets': list(targets)}
+            if photos:
+                payload['photos'] = [base64.b64encode(photo).decode('ascii') for photo in photos]
+            return self.outbox.submit('telegram', payload) is not None
+        
+        return self.deliver_telegram(message, targets, photos)
+    
+    def deliver_telegram(self, message: str, targets: List[str],
+                         photos: Optional[List[bytes]] = None) -> bool:
+        """텔레그램 바로 전송 (아웃박스 재시도 스레드 / 아웃박스 미사용 시)"""
         try:
-            loop = asyncio.new_event_loop()
-            asyncio.set_event_loop(loop)
-            success_count = loop.run_until_complete(
-                self.send_telegram_async(message, targets)
+            # 이벤트 루프는 알림마다 새로 만들지 않고 재사용 (봇의 HTTP 연결도 유지)
+            if self._loop is None or self._loop.is_closed():
+                self._loop = asyncio.new_event_loop()
+            success_count = self._loop.run_until_complete(
+                self.send_telegram_async(message, targets, photos)
             )
-            loop.close()
             
             print(f"✅ 텔레그램 전송 완료 ({success_count}/{len(targets)})")
             return success_count > 0
@@ -171,21 +217,27 @@ class MultiAlert:
         if not self.gsheet_enabled:
             return False
         
+        now = datetime.now()
+        
+        row = [
+            now.strftime('%Y-%m-%d %H:%M:%S'),  # 시간
+            channel,                              # 채널
+            f"{confidence:.1%}",                  # 신뢰도
+            f"{details.get('ear', 0):.3f}",      # EAR
+            f"{details.get('head_tilt', 0):.3f}", # Head Tilt
+            "조는중",                             # 상태
+            "발송"                                # 알림여부
+        ]
+        
+        if self.outbox is not None:
+            return self.outbox.submit('google_sheets', {'rows': [row]}) is not None
+        return self.append_sheet_rows([row])
+    
+    def append_sheet_rows(self, rows: List[List[str]]) -> bool:
+        """구글 시트에 행 추가 (API 호출 1회, 아웃박스 재시도 스레드 / 아웃박스 미사용 시)"""
         try:
-            now = datetime.now()
-            
-            row = [
-                now.strftime('%Y-%m-%d %H:%M:%S'),  # 시간
-                channel,                              # 채널
-                f"{confidence:.1%}",                  # 신뢰도
-                f"{details.get('ear', 0):.3f}",      # EAR
-                f"{details.get('head_tilt', 0):.3f}", # Head Tilt
-                "조는중",                             # 상태
-                "발송"                                # 알림여부
-            ]
-            
-            self.sheet.append_row(row)
-            print(f"✅ 구글 시트 기록 완료: {channel}")
+            self.sheet.append_rows(rows)
+            print(f"✅ 구글 시트 기록 완료: {len(rows)}행")
             return True
         except Exception as e:
             print(f"❌ 구글 시트 기록 실패: {e}")
@@ -196,6 +248,12 @@ class MultiAlert:
         if not self.webhook_enabled:
             return False
         
+        if self.outbox is not None:
+            return self.outbox.submit('webhook', {'data': data}) is not None
+        return self.deliver_webhook(data)
+    
+    def deliver_webhook(self, data: dict) -> bool:
+        """웹훅 바로 전송 (아웃박스 재시도 스레드 / 아웃박스 미사용 시)"""
         url = self.webhook_config.get('url')
         
         if not url:
@@ -219,16 +277,26 @@ class MultiAlert:
             return False
     
     def send_drowsy_alert(self, channel: str, confidence: float, 
-                         details: dict) -> Dict[str, bool]:
+                         details: dict, snapshot=None) -> Dict[str, bool]:
         """
-        졸음 알림 전송 (모든 채널)
+        졸음 알림 전송 (알림 규칙이 허용한 채널만)
+        
+        Args:
+            snapshot: 좌석 스냅샷 (Snapshot, 텔레그램 사진 / 웹훅 base64로 함께 전송)
         
         Returns:
-            각 채널별 성공 여부
+            각 채널별 성공 여부 (규칙으로 모든 채널을 건너뛰면 {'suppressed': True},
+            쿨다운은 유지되어 다음 사이클에 다시 시도하지 않음)
         """
         results = {}
         now = datetime.now()
         
+        # 네트워크 요청 전에 보낼 채널 결정
+        sinks = self.router.route(channel, confidence, now)
+        if not sinks:
+            print(f"🔕 [좌석 {channel}] 알림 규칙으로 전송 안 함")
+            return {'suppressed': True}
+        
         # 메시지 생성
         message = f"""
 🚨 *졸음 알림* 🚨
@@ -245,25 +313,132 @@ class MultiAlert:
         """
         
         # 1. 텔레그램
-        results['telegram'] = self.send_telegram(message.strip())
+        if 'telegram' in sinks:
+            photo = snapshot.jpeg() if snapshot else None
+            results['telegram'] = self.send_telegram(
+                message.strip(), self.get_telegram_targets(channel),
+                [photo] if photo else None
+            )
+        
+        # 2. 구글 시트
+        if 'google_sheets' in sinks:
+            results['google_sheets'] = self.log_to_google_sheets(
+                channel, confidence, details
+            )
+        
+        # 3. 웹훅 (n8n 등)
+        if 'webhook' in sinks:
+            webhook_data = {
+                'type': 'drowsy_alert',
+                'channel': channel,
+                'confidence': confidence,
+                'timestamp': now.isoformat(),
+                'details': details
+            }
+            if snapshot and snapshot.base64():
+                webhook_data['snapshot_jpeg'] = snapshot.base64()
+            results['webhook'] = self.send_webhook(webhook_data)
+        
+        return results
+    
+    def send_drowsy_digest(self, alerts: List[Dict]) -> Dict[str, bool]:
+        """
+        졸음 알림 요약 전송 (여러 좌석을 채널별 1회 호출로, alert_coalescer에서 사용)
+        - 텔레그램: 좌석 목록 메시지 1건
+        - 구글 시트: append_rows 1회 (좌석당 1행)
+        - 웹훅: alerts 리스트가 든 요청 1건
+        
+        Args:
+            alerts: [{'seat', 'confidence', 'details', 'time', 'repeats', 'snapshot'(선택)}, ...]
+        
+        Returns:
+            각 채널별 성공 여부 (규칙으로 모든 좌석·채널을 건너뛰면 {'suppressed': True},
+            일부 좌석만 건너뛰면 'suppressed'에 그 좌석 ID 리스트)
+        """
+        results = {}
+        now = datetime.now()
+        
+        # 네트워크 요청 전에 채널별로 보낼 좌석 선택 (좌석별 규칙, 알림이 들어온 시각 기준)
+        by_sink = {sink: [] for sink in self.router.sinks}
+        muted = []
+        for alert in alerts:
+            sinks = self.router.route(alert['seat'], alert['confidence'], alert['time'])
+            for sink in sinks:
+                by_sink[sink].append(alert)
+            if not sinks:
+                muted.append(alert['seat'])
+        if not any(by_sink.values()):
+            print(f"🔕 알림 {len(alerts)}건 모두 알림 규칙으로 전송 안 함")
+            return {'suppressed': True}
+        if muted:
+            results['suppressed'] = muted
+        
+        # 1. 텔레그램 (좌석별 alert_to가 다르면 대상마다 해당 좌석만)
+        by_targets = {}
+        for alert in by_sink['telegram']:
+            by_targets.setdefault(self.router.telegram_targets(alert['seat']), []).append(alert)
+        for targets, group in by_targets.items():
+            lines = [f"🚨 *졸음 알림 {len(group)}석* 🚨", "",
+                     f"⏰ 시간: {now.strftime('%Y-%m-%d %H:%M:%S')}", ""]
+            for alert in group:
+                details = alert['details']
+                repeats = f" ×{alert['repeats']}" if alert['repeats'] > 1 else ""
+                lines.append(f"📍 {alert['seat']} ({alert['time'].strftime('%H:%M:%S')}){repeats} "
+                             f"— 신뢰도 {alert['confidence']:.0%}, "
+                             f"EAR {details.get('ear', 0):.3f}, 고개 {details.get('head_tilt', 0):.3f}")
+            photos = [photo for photo in (a['snapshot'].jpeg() for a in group if a.get('snapshot'))
+                      if photo]
+            sent = self.send_telegram("\n".join(lines), list(targets), photos or None)
+            results['telegram'] = results.get('telegram', True) and sent
         
         # 2. 구글 시트
-        results['google_sheets'] = self.log_to_google_sheets(
-            channel, confidence, details
-        )
+        if by_sink['google_sheets']:
+            results['google_sheets'] = self.log_rows_to_google_sheets(by_sink['google_sheets'])
         
         # 3. 웹훅 (n8n 등)
-        webhook_data = {
-            'type': 'drowsy_alert',
-            'channel': channel,
-            'confidence': confidence,
-            'timestamp': now.isoformat(),
-            'details': details
-        }
-        results['webhook'] = self.send_webhook(webhook_data)
+        if by_sink['webhook']:
+            webhook_data = {
+                'type': 'drowsy_digest',
+                'timestamp': now.isoformat(),
+                'alerts': [
+                    {
+                        'channel': alert['seat'],
+                        'confidence': alert['confidence'],
+                        'timestamp': alert['time'].isoformat(),
+                        'repeats': alert['repeats'],
+                        'details': alert['details'],
+                        **({'snapshot_jpeg': alert['snapshot'].base64()}
+                           if alert.get('snapshot') and alert['snapshot'].base64() else {})
+                    }
+                    for alert in by_sink['webhook']
+                ]
+            }
+            results['webhook'] = self.send_webhook(webhook_data)
         
         return results
     
+    def log_rows_to_google_sheets(self, alerts: List[Dict]) -> bool:
+        """구글 시트에 여러 좌석 한 번에 기록 (API 호출 1회)"""
+        if not self.gsheet_enabled:
+            return False
+        
+        rows = [
+            [
+                alert['time'].strftime('%Y-%m-%d %H:%M:%S'),
+                alert['seat'],
+                f"{alert['confidence']:.1%}",
+                f"{alert['details'].get('ear', 0):.3f}",
+                f"{alert['details'].get('head_tilt', 0):.3f}",
+                "조는중",
+                "발송"
+            ]
+            for alert in alerts
+        ]
+        
+        if self.outbox is not None:
+            return self.outbox.submit('google_sheets', {'rows': rows}) is not None
+        return self.append_sheet_rows(rows)
+    
     def send_system_message(self, message: str) -> bool:
         """시스템 메시지 전송 (텔레그램만)"""
         if not self.telegram_enabled:
@@ -0,0 +1,220 @@
+"""
+asyncio 기반 모니터링 런타임
+캡처 + 감지, 알림 전송, 대시보드 갱신, 주기 통계를 한 이벤트 루프의 태스크로 실행
+
+- 캡처/감지는 전용 스레드 1개(executor)에서 실행 (감지기와 배경 모델은 스레드 안전하지 않으므로 1개로 직렬화)
+- 알림은 큐로 넘겨 알림 태스크가 await로 전송 → 네트워크 대기가 다음 감지를 막지 않음,
+  알림마다 이벤트 루프를 새로 만들지 않음 (알림 묶음 사용 시 요약 태스크가 창 단위로 전송)
+- 체크 주기는 모니터의 CycleScheduler로 절대 기한에 맞춰 예약 (작업 후 sleep이 아니라 누적 오차 없음),
+  처리가 주기보다 길어지면 밀린 주기는 건너뛰고 cycles_skipped_total로 기록
+"""
+import asyncio
+import functools
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Optional
+
+from alert_coalescer import alert_result, digest_loop
+from instrumentation import instrumentation
+
+
+class AsyncMonitorRuntime:
+    """AccurateStudentMonitor를 asyncio 태스크로 실행"""
+
+    def __init__(self, monitor, config: Dict = None):
+        """
+        초기화
+        Args:
+            monitor: AccurateStudentMonitor (prepare / capture_frame / process_frame 사용)
+            config: async_runtime 설정 딕셔너리
+                stats_interval: 통계 출력 주기 (초, 기본 300)
+                dashboard_interval: GitHub 대시보드(docs/data.json) 갱신 주기 (초, 0이면 사용 안 함)
+                alert_queue_size: 대기 알림 최대 개수 (기본 100, 넘치면 버림)
+                drain_timeout: 종료 시 남은 알림 전송 대기 (초, 기본 10)
+        """
+        self.monitor = monitor
+        self.config = config or {}
+        self.stats_interval = self.config.get('stats_interval', 300)
+        self.dashboard_interval = self.config.get('dashboard_interval', 0)
+        self.alert_queue_size = self.config.get('alert_queue_size', 100)
+        self.drain_timeout = self.config.get('drain_timeout', 10)
+
+        # 캡처/감지 전용 스레드 (디버그 창 표시도 같은 스레드에서)
+        self.detect_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='detect')
+        self.loop: Optional[asyncio.AbstractEventLoop] = None
+        self.alert_queue: Optional[asyncio.Queue] = None
+        self.dashboard = None
+
+    async def _in_detect_thread(self, func, *args):
+        return await self.loop.run_in_executor(self.detect_executor, func, *args)
+
+    def _enqueue_alert(self, seat_id: str, confidence: float, details: dict, snapshot=None):
+        """감지 스레드에서 호출 → 이벤트 루프의 알림 큐에 추가"""
+        self.loop.call_soon_threadsafe(self._put_alert, (seat_id, confidence, details, snapshot))
+
+    def _put_alert(self, item):
+        try:
+            self.alert_queue.put_nowait(item)
+        except asyncio.QueueFull:
+            print(f"⚠️  알림 큐 가득 참, [좌석 {item[0]}] 알림 버림")
+            instrumentation.inc('alerts_dropped_total', seat=item[0])
+            self.monitor.finish_alert(item[0], False)
+
+    async def monitor_task(self, debug_mode: bool):
+        """캡처 → 감지 주기 실행 (스케줄러 절대 기한 기준)"""
+        monitor = self.monitor
+        scheduler = monitor.scheduler
+        scheduler.start()
+
+        while True:
+            cycle_start = time.perf_counter()
+            scheduler.begin()
+            screen = await self._in_detect_thread(monitor.capture_frame)
+
+            if screen is None:
+                if monitor.capture.exhausted:
+                    print("\n⏹️  입력 프레임 재생 완료")
+                    return
+                print("⚠️  화면 캡처 실패, 재시도...")
+                await asyncio.sleep(5)
+                scheduler.start()
+                continue
+
+            await self._in_detect_thread(monitor.process_frame, screen)
+            instrumentation.record('cycle', time.perf_counter() - cycle_start)
+
+            if debug_mode and not await self._in_detect_thread(monitor.show_debug, screen):
+                return
+
+            # 사이클 기록은 항상, 최대 속도 재생이면 대기 없음
+            delay = scheduler.end()
+            await asyncio.sleep(delay if monitor.capture.realtime else 0)
+
+    async def alert_task(self):
+        """알림 큐 소비 (텔레그램은 같은 루프에서 await, 그 외 알림은 기본 스레드 풀)"""
+        monitor = self.monitor
+        while True:
+            seat_id, confidence, details, snapshot = await self.alert_queue.get()
+            # 알림 묶음: 모아 두기만 하고 전송은 요약 태스크(digest_loop)가
+            if monitor.coalescer is not None:
+                monitor.coalescer.add(seat_id, confidence, details, snapshot=snapshot)
+                self.alert_queue.task_done()
+                continue
+            try:
+                start = time.perf_counter()
+                if hasattr(monitor.alert, 'send_drowsy_alert_async'):
+                    success = await monitor.alert.send_drowsy_alert_async(
+                        seat_id, confidence, details, snapshot=snapshot)
+                else:
+                    success = await self.loop.run_in_executor(
+                        None, functools.partial(monitor.alert.send_drowsy_alert,
+                                                seat_id, confidence, details, snapshot=snapshot))
+                instrumentation.record('alert_dispatch', time.perf_counter() - start)
+            except Exception as e:
+                print(f"❌ [좌석 {seat_id}] 알림 전송 오류: {e}")
+                success = False
+            finally:
+                self.alert_queue.task_done()
+            monitor.finish_alert(seat_id, alert_result(success))
+
+    async def stats_task(self):
+        """주기 통계 출력 + 배경 모델 저장 (감지 스레드에서 실행해 처리와 겹치지 않음)"""
+        while True:
+            await asyncio.sleep(self.stats_interval)
+            await self._in_detect_thread(self.monitor.print_statistics)
+            await self._in_detect_thread(self.monitor.capture.save_background)
+
+    async def dashboard_task(self):
+        """GitHub 대시보드 데이터 주기 갱신 (HTTP 요청은 기본 스레드 풀에서)"""
+        while True:
+            await asyncio.sleep(self.dashboard_interval)
+            data = await self._in_detect_thread(self.monitor.dashboard_data)
+            await self.loop.run_in_executor(None, self.dashboard.update_dashboard_data, data)
+
+    def _setup_dashboard(self):
+        # 재생 / 합성 입력은 운영 대시보드에 올리지 않음
+        if self.dashboard_interval <= 0 or self.monitor.capture.offline:
+            return
+        from alert_system_github import GitHubAlert
+        dashboard = GitHubAlert(self.monitor.config_path)
+        if dashboard.enabled:
+            self.dashboard = dashboard
+            print(f"📊 대시보드 갱신: {self.dashboard_interval}초마다")
+
+    async def run(self, debug_mode: bool = False):
+        """
+        모니터링 실행 (모니터 태스크가 끝나면 나머지 태스크 정리)
+
+        Args:
+            debug_mode: True면 화면 표시
+        """
+        self.loop = asyncio.get_running_loop()
+        self.alert_queue = asyncio.Queue(maxsize=self.alert_queue_size)
+        monitor = self.monitor
+
+        if not await self._in_detect_thread(monitor.prepare, debug_mode):
+            self.detect_executor.shutdown()
+            return
+
+        monitor.alert_sink = self._enqueue_alert
+        self._setup_dashboard()
+
+        background = [
+            asyncio.create_task(self.alert_task(), name='alerts'),
+            asyncio.create_task(self.stats_task(), name='stats'),
+        ]
+        if self.dashboard is not None:
+            background.append(asyncio.create_task(self.dashboard_task(), name='dashboard'))
+        if monitor.coalescer is not None:
+            background.append(asyncio.create_task(
+                digest_loop(monitor.coalescer, monitor.finish_alert), name='digest'))
+
+        try:
+            await self.monitor_task(debug_mode)
+        except asyncio.CancelledError:
+            print("\n\n⏹️  모니터링 종료")
+        except Exception as e:
+            print(f"\n❌ 오류 발생: {e}")
+            import traceback
+            traceback.print_exc()
+        finally:
+            # 감지 스레드의 마지막 사이클이 넣은 알림까지 전송
+            await asyncio.sleep(0)
+            if not self.alert_queue.empty():
+                print(f"📨 남은 알림 {self.alert_queue.qsize()}건 전송 중...")
+                try:
+                    await asyncio.wait_for(self.alert_queue.join(), self.drain_timeout)
+                except asyncio.TimeoutError:
+                    print("⚠️  남은 알림 전송 시간 초과")
+            if monitor.coalescer is not None and monitor.coalescer.pending:
+                print(f"📨 남은 알림 {len(monitor.coalescer.pending)}건 요약 전송 중...")
+                try:
+                    results = await asyncio.wait_for(monitor.coalescer.flush_async(force=True),
+                                                     self.drain_timeout)
+                    for seat_id, success in results:
+                        monitor.finish_alert(seat_id, success)
+                except asyncio.TimeoutError:
+                    print("⚠️  남은 알림 전송 시간 초과")
+
+            for task in background:
+                task.cancel()
+            await asyncio.gather(*background, return_exceptions=True)
+
+            monitor.alert_sink = None
+            await self._in_detect_thread(monitor.shutdown, debug_mode)
+            self.detect_executor.shutdown()
+
+
+def run_async(monitor, debug_mode: bool = False, config: Dict = None):
+    """
+    비동기 런타임으로 모니터 실행 (Ctrl+C 시 정리 후 종료)
+
+    Args:
+        monitor: AccurateStudentMonitor
+        debug_mode: True면 화면 표시
+        config: async_runtime 설정 딕셔너리
+    """
+    try:
+        asyncio.run(AsyncMonitorRuntime(monitor, config).run(debug_mode))
+    except KeyboardInterrupt:
+        pass
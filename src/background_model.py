@@ -0,0 +1,277 @@
+"""
+좌석별 빈 좌석 배경 모델
+좌석 ROI를 작은 흑백 패치로 축소해 러닝 메디안 배경을 학습하고,
+전경 비율로 착석 여부를 판단 (전 좌석 벡터 연산)
+"""
+import cv2
+import numpy as np
+import os
+from typing import Dict, List, Optional
+
+
+class SeatBackgroundModel:
+    """좌석별 러닝 메디안 배경 모델"""
+
+    def __init__(self, config: Dict = None, persist: bool = True):
+        """
+        초기화
+        Args:
+            config: seat_detection.background_model 설정 딕셔너리
+            persist: False면 state_path를 읽거나 쓰지 않음 (재생 / 합성 입력)
+        """
+        self.config = config or {}
+        self.persist = persist
+
+        # 축소 패치 크기 (가로, 세로)
+        self.PATCH_SIZE = tuple(self.config.get('patch_size', [32, 32]))
+        # 저장 경로
+        self.state_path = self.config.get('state_path', 'config/background_models.npz')
+        self.update_thresholds(self.config)
+
+        w, h = self.PATCH_SIZE
+        self.seat_ids: List[str] = []
+        self.index: Dict[str, int] = {}
+        self.geometry = np.zeros((0, 4), dtype=np.int32)     # (x, y, w, h)
+        self.groups: List[str] = []                          # 캡처 그룹 ID ('' = 전체 화면)
+        self.models = np.zeros((0, h, w), dtype=np.float32)
+        self.initialized = np.zeros(0, dtype=bool)
+        self.empty_streak = np.zeros(0, dtype=np.int32)
+
+        # 마지막 sample() 결과 (update()에서 재사용)
+        self.last_samples: Optional[np.ndarray] = None
+        self.last_valid: Optional[np.ndarray] = None
+
+    def update_thresholds(self, config: Dict) -> List[str]:
+        """
+        판정 / 갱신 임계값 설정 (실행 중 교체 가능, 학습된 배경은 유지)
+
+        Args:
+            config: seat_detection.background_model 설정 딕셔너리
+
+        Returns:
+            재시작해야 적용되는 변경 키 목록 (패치 크기 / 저장 경로)
+        """
+        restart_keys = []
+        if tuple(config.get('patch_size', [32, 32])) != self.PATCH_SIZE:
+            restart_keys.append('patch_size')
+        if config.get('state_path', 'config/background_models.npz') != self.state_path:
+            restart_keys.append('state_path')
+
+        # 픽셀이 전경으로 판정되는 배경과의 밝기 차이
+        self.PIXEL_DIFF_THRESHOLD = config.get('pixel_diff_threshold', 25.0)
+        # 전경 비율이 이 값을 넘으면 착석
+        self.FOREGROUND_RATIO_THRESHOLD = config.get('foreground_ratio_threshold', 0.2)
+        # 한 번 갱신 시 배경이 움직이는 밝기 단계 (러닝 메디안 근사)
+        self.ADAPT_STEP = config.get('adapt_step', 2.0)
+        # 연속으로 빈 좌석 판정이 이만큼 나와야 배경 갱신
+        self.EMPTY_CONFIRM_COUNT = config.get('empty_confirm_count', 3)
+        return restart_keys
+
+    def sync_seats(self, seats: Dict):
+        """
+        좌석 구성과 모델 배열 동기화
+        좌표가 바뀌지 않은 좌석은 학습된 배경을 유지
+
+        Args:
+            seats: seats.json의 좌석 딕셔너리
+        """
+        w, h = self.PATCH_SIZE
+        seat_ids = [sid for sid, seat in seats.items() if seat.get('enabled', True)]
+
+        geometry = np.array(
+            [[seats[sid]['x'], seats[sid]['y'], seats[sid]['width'], seats[sid]['height']]
+             for sid in seat_ids],
+            dtype=np.int32
+        ).reshape(-1, 4)
+        groups = [seats[sid].get('group', '') for sid in seat_ids]
+        models = np.zeros((len(seat_ids), h, w), dtype=np.float32)
+        initialized = np.zeros(len(seat_ids), dtype=bool)
+        empty_streak = np.zeros(len(seat_ids), dtype=np.int32)
+
+        for new_idx, sid in enumerate(seat_ids):
+            old_idx = self.index.get(sid)
+            if old_idx is None:
+                continue
+            if (np.array_equal(self.geometry[old_idx], geometry[new_idx])
+                    and self.groups[old_idx] == groups[new_idx]):
+                models[new_idx] = self.models[old_idx]
+                initialized[new_idx] = self.initialized[old_idx]
+                empty_streak[new_idx] = self.empty_streak[old_idx]
+
+        self.seat_ids = seat_ids
+        self.index = {sid: i for i, sid in enumerate(seat_ids)}
+        self.geometry = geometry
+        self.groups = groups
+        self.models = models
+        self.initialized = initialized
+        self.empty_streak = empty_streak
+        self.last_samples = None
+        self.last_valid = None
+
+    def sample(self, screen) -> np.ndarray:
+        """
+        전체 화면에서 모든 좌석 패치 추출
+
+        Args:
+            screen: 전체 화면 이미지 (BGR) 또는 캡처 그룹별 이미지 {그룹 ID: 이미지}
+
+        Returns:
+            (좌석 수, 높이, 너비) 흑백 패치 배열 (밝기 평균 제거)
+        """
+        w, h = self.PATCH_SIZE
+        count = len(self.seat_ids)
+        patches = np.zeros((count, h, w, 3), dtype=np.uint8)
+        valid = np.zeros(count, dtype=bool)
+
+        for i, (x, y, sw, sh) in enumerate(self.geometry):
+            # 그룹 캡처면 좌석 좌표는 소속 그룹 이미지 기준
+            image = screen.get(self.groups[i]) if isinstance(screen, dict) else screen
+            if image is None:
+                continue
+            screen_h, screen_w = image.shape[:2]
+            if sw <= 0 or sh <= 0 or y + sh > screen_h or x + sw > screen_w:
+                continue
+            patches[i] = cv2.resize(image[y:y+sh, x:x+sw], (w, h),
+                                    interpolation=cv2.INTER_AREA)
+            valid[i] = True
+
+        # BGR -> 흑백 (전 좌석 한 번에)
+        gray = patches.astype(np.float32) @ np.array([0.114, 0.587, 0.299], dtype=np.float32)
+
+        # 좌석별 평균 밝기 제거 → 전체 조명 변화에 둔감
+        gray -= gray.mean(axis=(1, 2), keepdims=True)
+
+        self.last_samples = gray
+        self.last_valid = valid
+        return gray
+
+    def foreground_ratio(self, samples: np.ndarray) -> np.ndarray:
+        """
+        좌석별 전경 비율 계산
+
+        Args:
+            samples: sample() 결과
+
+        Returns:
+            (좌석 수,) 전경 비율 배열. 학습 전 좌석은 NaN
+        """
+        diff = np.abs(samples - self.models) > self.PIXEL_DIFF_THRESHOLD
+        ratios = diff.mean(axis=(1, 2))
+
+        unknown = ~self.initialized
+        if self.last_valid is not None:
+            unknown |= ~self.last_valid
+        ratios[unknown] = np.nan
+        return ratios
+
+    def update(self, empty_mask: np.ndarray, samples: np.ndarray = None):
+        """
+        빈 좌석으로 확인된 좌석만 배경 갱신
+
+        Args:
+            empty_mask: (좌석 수,) 이번 사이클 빈 좌석 여부
+            samples: 패치 배열 (None이면 마지막 sample() 결과)
+        """
+        if samples is None:
+            samples = self.last_samples
+        if samples is None or len(self.seat_ids) == 0:
+            return
+
+        empty_mask = np.asarray(empty_mask, dtype=bool)
+        if self.last_valid is not None:
+            empty_mask = empty_mask & self.last_valid
+
+        self.empty_streak = np.where(empty_mask, self.empty_streak + 1, 0)
+        confirmed = self.empty_streak >= self.EMPTY_CONFIRM_COUNT
+
+        # 처음 확인된 좌석은 현재 패치로 초기화
+        seed = confirmed & ~self.initialized
+        self.models[seed] = samples[seed]
+        self.initialized |= seed
+
+        # 기존 좌석은 러닝 메디안 근사: 차이 부호 방향으로 한 단계씩 이동
+        adapt = confirmed & ~seed
+        if adapt.any():
+            step = np.sign(samples[adapt] - self.models[adapt]) * self.ADAPT_STEP
+            self.models[adapt] += step
+
+    def is_occupied(self, ratios: np.ndarray) -> np.ndarray:
+        """전경 비율 → 착석 여부 (학습 전 좌석은 False)"""
+        with np.errstate(invalid='ignore'):
+            return ratios > self.FOREGROUND_RATIO_THRESHOLD
+
+    def save(self, path: str = None) -> bool:
+        """
+        배경 모델 저장
+
+        Args:
+            path: 저장 경로 (None이면 설정값)
+
+        Returns:
+            성공 여부
+        """
+        if path is None and not self.persist:
+            return False
+        path = path or self.state_path
+        try:
+            directory = os.path.dirname(path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            np.savez_compressed(
+                path,
+                seat_ids=np.array(self.seat_ids, dtype=str),
+                geometry=self.geometry,
+                groups=np.array(self.groups, dtype=str),
+                models=self.models,
+                initialized=self.initialized,
+                patch_size=np.array(self.PATCH_SIZE)
+            )
+            return True
+        except Exception as e:
+            print(f"❌ 배경 모델 저장 실패: {e}")
+            return False
+
+    def load(self, path: str = None) -> int:
+        """
+        저장된 배경 모델 불러오기
+        현재 좌석과 ID·좌표가 같은 모델만 복원
+
+        Args:
+            path: 저장 경로 (None이면 설정값)
+
+        Returns:
+            복원된 좌석 수
+        """
+        if path is None and not self.persist:
+            return 0
+        path = path or self.state_path
+        if not os.path.exists(path):
+            return 0
+
+        try:
+            with np.load(path) as data:
+                if tuple(data['patch_size']) != self.PATCH_SIZE:
+                    print("⚠️  배경 모델 패치 크기가 달라 새로 학습합니다")
+                    return 0
+
+                # 그룹 정보가 없는 이전 파일은 전체 화면 좌표로 간주
+                saved_groups = (data['groups'] if 'groups' in data.files
+                                else np.full(len(data['seat_ids']), ''))
+                restored = 0
+                for old_idx, sid in enumerate(data['seat_ids']):
+                    new_idx = self.index.get(str(sid))
+                    if new_idx is None:
+                        continue
+                    if not np.array_equal(data['geometry'][old_idx], self.geometry[new_idx]):
+                        continue
+                    if str(saved_groups[old_idx]) != self.groups[new_idx]:
+                        continue
+                    if not data['initialized'][old_idx]:
+                        continue
+                    self.models[new_idx] = data['models'][old_idx]
+                    self.initialized[new_idx] = True
+                    restored += 1
+                return restored
+        except Exception as e:
+            print(f"⚠️  배경 모델 로드 실패, 새로 학습합니다: {e}")
+            return 0
@@ -1,26 +1,124 @@
 """
 뷰가드웹 화면 캡처 모듈
+
+seats.json에 캡처 그룹(groups)을 정의하면 모니터/뷰어 창 영역별로 따로 캡처하고
+(그룹마다 스레드 1개, 병렬), 좌석 좌표는 소속 그룹 영역 기준 상대 좌표로 저장
+→ 모니터를 추가해도 전체 데스크톱 한 장이 커지는 대신 그룹 캡처가 하나 늘어남
+
+영역 캡처는 mss로 그룹 사각형만 복사 (캡처 시간이 그룹 픽셀 수에 비례).
+mss가 없으면 PIL ImageGrab으로 대체하지만, Windows에서 bbox + all_screens는
+가상 데스크톱 전체를 캡처한 뒤 잘라내므로 그룹마다 전체 데스크톱 비용이 듦
 """
 import cv2
 import numpy as np
-from PIL import ImageGrab
 import json
-from typing import Dict, Tuple, Optional
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Tuple, Optional, Iterable, Union
 import os
+import threading
+
+from background_model import SeatBackgroundModel
+from instrumentation import instrumentation
+
+
+# 캡처 결과: 단일 화면 이미지 또는 그룹별 이미지 {그룹 ID: 이미지}
+Screen = Union[np.ndarray, Dict[str, np.ndarray]]
+
+
+def seat_image(screen: Screen, seat: Dict) -> Optional[np.ndarray]:
+    """
+    좌석이 속한 캡처 이미지 선택
+    
+    Args:
+        screen: 캡처 결과 (단일 이미지 또는 그룹별 이미지)
+        seat: 좌석 정보 (그룹 캡처면 'group' 키 사용)
+        
+    Returns:
+        좌석 좌표 기준 이미지 (그룹 캡처 실패 시 None)
+    """
+    if isinstance(screen, dict):
+        return screen.get(seat.get('group'))
+    return screen
+
+
+# 스레드별 mss 인스턴스 (mss 핸들은 만든 스레드에서만 사용 가능)
+_grabbers = threading.local()
+_pil_fallback_warned = False
+
+
+def _screen_grabber():
+    """
+    현재 스레드의 mss 인스턴스 (없으면 생성)
+    
+    Returns:
+        mss 인스턴스, mss 미설치 시 None
+    """
+    sct = getattr(_grabbers, 'sct', None)
+    if sct is None:
+        try:
+            import mss
+        except ImportError:
+            return None
+        sct = _grabbers.sct = mss.mss()
+    return sct
+
+
+def _grab_pil(bbox: Optional[Tuple[int, int, int, int]]) -> np.ndarray:
+    """PIL ImageGrab 캡처 (mss 미설치 시 대체 경로)"""
+    global _pil_fallback_warned
+    from PIL import ImageGrab
+    
+    if bbox:
+        if not _pil_fallback_warned:
+            _pil_fallback_warned = True
+            print("⚠️  mss가 없어 PIL ImageGrab 사용 (그룹마다 전체 데스크톱 캡처 후 자름): pip install mss")
+        screen = ImageGrab.grab(bbox=bbox, all_screens=True)
+    else:
+        screen = ImageGrab.grab()
+    
+    # PIL to OpenCV (RGB -> BGR)
+    return cv2.cvtColor(np.array(screen), cv2.COLOR_RGB2BGR)
 
 
 class ViewGuardCapture:
     """뷰가드웹 화면 캡처 및 ROI 관리"""
     
-    def __init__(self, config_path: str = 'config/seats.json'):
+    # 실시간 캡처 여부 (재생/합성 입력을 최대 속도로 돌릴 때 False)
+    realtime = True
+    # 좌석을 config_path 파일에서 읽는지 여부 (False면 핫 리로드 대상 아님)
+    seats_from_file = True
+    # 재생 / 합성 입력 여부 (True면 운영 배경 모델 파일과 실제 알림 채널을 쓰지 않음)
+    offline = False
+    
+    def __init__(self, config_path: str = 'config/seats.json',
+                 background_config: Optional[Dict] = None):
         """
         초기화
         Args:
             config_path: 좌석 설정 파일 경로
+            background_config: 배경 모델 설정 (None 또는 enabled=false면 사용 안 함)
         """
         self.config_path = config_path
         self.seats = self.load_seats()
+        # 캡처 그룹 {그룹 ID: {'x', 'y', 'width', 'height'}} (비어 있으면 전체 화면 한 장)
+        self.groups = self.load_groups()
+        self._capture_pool = None
+        self._capture_pool_size = 0
+        
+        # 좌석별 빈 좌석 배경 모델
+        self.background = None
+        if background_config is not None and background_config.get('enabled', True):
+            self.background = SeatBackgroundModel(background_config, persist=not self.offline)
+            self.background.sync_seats(self.seats)
+            restored = self.background.load()
+            if restored:
+                print(f"✅ 배경 모델 {restored}개 좌석 복원")
         
+    @property
+    def exhausted(self) -> bool:
+        """더 캡처할 프레임이 없으면 True (실제 화면은 항상 False)"""
+        return False
+    
     def load_seats(self) -> Dict:
         """
         저장된 좌석 좌표 불러오기
@@ -41,64 +139,151 @@ class ViewGuardCapture:
             print(f"❌ 좌석 설정 로드 실패: {e}")
             return {}
     
-    def save_seats(self, seats: Dict) -> bool:
+    def load_groups(self) -> Dict:
+        """
+        캡처 그룹 불러오기 (seats.json의 groups, 영역은 가상 데스크톱 절대 좌표)
+        
+        Returns:
+            그룹 정보 딕셔너리 (없으면 빈 딕셔너리)
+        """
+        if not self.seats_from_file or not os.path.exists(self.config_path):
+            return {}
+        
+        try:
+            with open(self.config_path, 'r', encoding='utf-8') as f:
+                return json.load(f).get('groups', {})
+        except Exception as e:
+            print(f"❌ 캡처 그룹 로드 실패: {e}")
+            return {}
+    
+    def save_seats(self, seats: Dict, groups: Optional[Dict] = None) -> bool:
         """
         좌석 정보 저장
         
         Args:
             seats: 저장할 좌석 정보
+            groups: 캡처 그룹 (None이면 현재 그룹 유지)
             
         Returns:
             성공 여부
         """
+        groups = self.groups if groups is None else groups
         try:
             data = {
                 "comment": "ROI Manager로 생성된 좌석 설정",
                 "seats": seats
             }
+            if groups:
+                data["groups"] = groups
             
             os.makedirs(os.path.dirname(self.config_path), exist_ok=True)
             
             with open(self.config_path, 'w', encoding='utf-8') as f:
                 json.dump(data, f, indent=2, ensure_ascii=False)
             
-            self.seats = seats
+            self.update_seats(seats, groups)
             return True
         except Exception as e:
             print(f"❌ 좌석 설정 저장 실패: {e}")
             return False
     
-    def capture_screen(self, bbox: Optional[Tuple[int, int, int, int]] = None) -> np.ndarray:
+    def update_seats(self, seats: Dict, groups: Optional[Dict] = None):
         """
-        화면 캡처
+        좌석 구성 교체 (파일 저장 없음, 핫 리로드용)
+        배경 모델은 좌표가 그대로인 좌석의 학습 결과를 유지
+
+        Args:
+            seats: 새 좌석 정보
+            groups: 새 캡처 그룹 (None이면 유지)
+        """
+        self.seats = seats
+        if groups is not None:
+            self.groups = groups
+        if self.background is not None:
+            self.background.sync_seats(seats)
+    
+    def grab(self, bbox: Optional[Tuple[int, int, int, int]] = None) -> np.ndarray:
+        """
+        화면 영역 1회 캡처 (mss로 영역만 복사, 다른 모니터 영역도 가능)
         
         Args:
-            bbox: 캡처할 영역 (x1, y1, x2, y2). None이면 전체 화면
+            bbox: 캡처할 영역 (x1, y1, x2, y2, 가상 데스크톱 좌표). None이면 주 모니터 전체
             
         Returns:
             캡처된 이미지 (BGR)
         """
-        try:
-            if bbox:
-                screen = ImageGrab.grab(bbox=bbox)
-            else:
-                screen = ImageGrab.grab()
-            
-            # PIL to OpenCV (RGB -> BGR)
-            screen_np = np.array(screen)
-            screen_bgr = cv2.cvtColor(screen_np, cv2.COLOR_RGB2BGR)
+        sct = _screen_grabber()
+        if sct is None:
+            return _grab_pil(bbox)
+        
+        if bbox:
+            x1, y1, x2, y2 = bbox
+            region = {'left': x1, 'top': y1, 'width': x2 - x1, 'height': y2 - y1}
+        else:
+            region = sct.monitors[1]
+        
+        # mss는 BGRA
+        return cv2.cvtColor(np.asarray(sct.grab(region)), cv2.COLOR_BGRA2BGR)
+    
+    def capture_screen(self, bbox: Optional[Tuple[int, int, int, int]] = None) -> Optional[Screen]:
+        """
+        화면 캡처
+        
+        Args:
+            bbox: 캡처할 영역 (x1, y1, x2, y2). None이면 전체 화면 (캡처 그룹이 있으면 그룹별)
             
-            return screen_bgr
+        Returns:
+            캡처된 이미지 (BGR), 캡처 그룹이 있으면 {그룹 ID: 이미지}
+        """
+        if bbox is None and self.groups:
+            return self.capture_groups()
+        
+        try:
+            return self.grab(bbox)
         except Exception as e:
             print(f"❌ 화면 캡처 실패: {e}")
             return None
     
-    def get_seat_roi(self, screen: np.ndarray, seat_id: str) -> Optional[np.ndarray]:
+    def capture_groups(self) -> Optional[Dict[str, np.ndarray]]:
+        """
+        캡처 그룹별 병렬 캡처 (그룹마다 스레드 1개)
+        일부 그룹만 실패하면 나머지 그룹으로 진행 (실패 그룹 좌석은 이번 사이클 건너뜀)
+        
+        Returns:
+            {그룹 ID: 이미지}, 모든 그룹 실패 시 None
+        """
+        groups = {gid: g for gid, g in self.groups.items() if g.get('enabled', True)}
+        # 그룹 수가 늘면 (핫 리로드) 스레드 풀 다시 생성
+        if self._capture_pool is None or self._capture_pool_size < len(groups):
+            if self._capture_pool is not None:
+                self._capture_pool.shutdown(wait=False)
+            self._capture_pool_size = max(1, len(groups))
+            self._capture_pool = ThreadPoolExecutor(max_workers=self._capture_pool_size,
+                                                    thread_name_prefix='capture')
+        
+        def grab_group(group):
+            with instrumentation.span('capture_group'):
+                x, y = group['x'], group['y']
+                return self.grab((x, y, x + group['width'], y + group['height']))
+        
+        futures = {gid: self._capture_pool.submit(grab_group, group)
+                   for gid, group in groups.items()}
+        images = {}
+        for gid, future in futures.items():
+            try:
+                images[gid] = future.result()
+            except Exception as e:
+                instrumentation.inc('capture_group_failures_total', group=gid)
+                print(f"❌ 그룹 {gid} 캡처 실패: {e}")
+        
+        return images or None
+    
+    def get_seat_roi(self, screen: Screen, seat_id: str) -> Optional[np.ndarray]:
         """
         특정 좌석 영역만 추출
         
         Args:
-            screen: 전체 화면 이미지
+            screen: 전체 화면 이미지 또는 그룹별 이미지
             seat_id: 좌석 ID
             
         Returns:
@@ -113,6 +298,11 @@ class ViewGuardCapture:
         if not seat.get('enabled', True):
             return None
         
+        # 그룹 캡처면 소속 그룹 이미지 (좌표는 그룹 기준)
+        image = seat_image(screen, seat)
+        if image is None:
+            return None
+        
         try:
             x = seat['x']
             y = seat['y']
@@ -120,22 +310,22 @@ class ViewGuardCapture:
             h = seat['height']
             
             # 범위 체크
-            if y + h > screen.shape[0] or x + w > screen.shape[1]:
+            if y + h > image.shape[0] or x + w > image.shape[1]:
                 print(f"⚠️  좌석 {seat_id} 좌표가 화면을 벗어남")
                 return None
             
-            roi = screen[y:y+h, x:x+w]
+            roi = image[y:y+h, x:x+w]
             return roi
         except Exception as e:
             print(f"❌ 좌석 {seat_id} ROI 추출 실패: {e}")
             return None
     
-    def get_all_seat_rois(self, screen: np.ndarray) -> Dict[str, np.ndarray]:
+    def get_all_seat_rois(self, screen: Screen) -> Dict[str, np.ndarray]:
         """
         모든 좌석의 ROI 추출
         
         Args:
-            screen: 전체 화면 이미지
+            screen: 전체 화면 이미지 또는 그룹별 이미지
             
         Returns:
             {seat_id: roi_image} 딕셔너리
@@ -149,23 +339,87 @@ class ViewGuardCapture:
         
         return rois
     
-    def draw_seat_boxes(self, screen: np.ndarray, 
+    def measure_occupancy(self, screen: Screen) -> Dict[str, Optional[float]]:
+        """
+        배경 모델로 모든 좌석의 전경 비율 계산
+        
+        Args:
+            screen: 전체 화면 이미지 또는 그룹별 이미지
+            
+        Returns:
+            {seat_id: 전경 비율} 딕셔너리 (배경 학습 전 좌석은 None)
+        """
+        if self.background is None:
+            return {}
+        
+        samples = self.background.sample(screen)
+        ratios = self.background.foreground_ratio(samples)
+        
+        return {
+            seat_id: (None if np.isnan(ratio) else float(ratio))
+            for seat_id, ratio in zip(self.background.seat_ids, ratios)
+        }
+    
+    def update_background(self, empty_seat_ids: Iterable[str]):
+        """
+        이번 사이클에 빈 좌석으로 판정된 좌석의 배경 갱신
+        (measure_occupancy()로 추출한 패치 재사용)
+        
+        Args:
+            empty_seat_ids: 빈 좌석 ID 목록
+        """
+        if self.background is None:
+            return
+        
+        empty = set(empty_seat_ids)
+        mask = np.array([sid in empty for sid in self.background.seat_ids], dtype=bool)
+        self.background.update(mask)
+    
+    def save_background(self) -> bool:
+        """배경 모델 디스크에 저장"""
+        if self.background is None:
+            return False
+        return self.background.save()
+    
+    def draw_seat_boxes(self, screen: Screen, 
                        highlight_seats: Dict[str, Tuple[int, int, int]] = None) -> np.ndarray:
         """
         화면에 좌석 박스 그리기 (디버깅용)
         
         Args:
-            screen: 화면 이미지
+            screen: 화면 이미지 (그룹별 이미지면 그룹마다 그린 뒤 가로로 이어 붙임)
             highlight_seats: {seat_id: (B, G, R)} 특정 좌석 하이라이트
             
         Returns:
             박스가 그려진 이미지
         """
+        if isinstance(screen, dict):
+            tiles = []
+            for group_id, image in screen.items():
+                tile = self._draw_boxes(image, highlight_seats, group_id)
+                cv2.putText(tile, f"[{group_id}]", (10, 30),
+                           cv2.FONT_HERSHEY_SIMPLEX, 0.8, (255, 255, 0), 2)
+                tiles.append(tile)
+            height = max(tile.shape[0] for tile in tiles)
+            return np.hstack([
+                cv2.copyMakeBorder(tile, 0, height - tile.shape[0], 0, 2,
+                                   cv2.BORDER_CONSTANT, value=(64, 64, 64))
+                for tile in tiles
+            ])
+        
+        return self._draw_boxes(screen, highlight_seats)
+    
+    def _draw_boxes(self, screen: np.ndarray,
+                    highlight_seats: Optional[Dict[str, Tuple[int, int, int]]],
+                    group_id: Optional[str] = None) -> np.ndarray:
+        """이미지 1장에 좌석 박스 그리기 (group_id가 있으면 그 그룹 좌석만)"""
         screen_copy = screen.copy()
         
         for seat_id, seat in self.seats.items():
             if not seat.get('enabled', True):
                 continue
+            if group_id is not None and seat.get('group') != group_id:
+                continue
             
             x, y, w, h = seat['x'], seat['y'], seat['width'], seat['height']
             
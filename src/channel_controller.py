@@ -2,19 +2,23 @@
 뷰가드웹 채널 자동 전환 컨트롤러
 하단 번호 클릭으로 채널을 순차 전환하여 고화질 캡처
 """
-import pyautogui
 import time
 import json
 import os
 from typing import List, Tuple, Optional, Dict
 import cv2
 import numpy as np
-from PIL import ImageGrab
 
 
 class ChannelController:
     """채널 자동 전환 컨트롤러"""
     
+    # 실시간 캡처 여부 / 입력 소진 여부 (재생 컨트롤러와 인터페이스 통일)
+    realtime = True
+    exhausted = False
+    # 재생 입력 여부 (True면 실제 알림 채널을 쓰지 않음)
+    offline = False
+    
     def __init__(self, config_path: str = 'config/channel_positions.json'):
         """
         초기화
@@ -33,7 +37,9 @@ class ChannelController:
         # 캡처 영역 (전체 화면 또는 특정 영역)
         self.capture_region = None  # None이면 전체 화면
         
-        # PyAutoGUI 설정
+        # PyAutoGUI 설정 (실제 화면 제어 시에만 필요하므로 여기서 import)
+        import pyautogui
+        self.pyautogui = pyautogui
         pyautogui.PAUSE = 0.1
         pyautogui.FAILSAFE = True  # 마우스를 모서리로 이동하면 중단
         
@@ -112,7 +118,7 @@ class ChannelController:
             x, y = self.channel_buttons[channel_key]
             
             # 클릭
-            pyautogui.click(x, y)
+            self.pyautogui.click(x, y)
             
             # 화면 전환 대기
             time.sleep(self.SWITCH_DELAY)
@@ -137,6 +143,7 @@ class ChannelController:
             time.sleep(self.CAPTURE_DELAY)
             
             # 화면 캡처
+            from PIL import ImageGrab
             if self.capture_region:
                 x, y, w, h = self.capture_region
                 screen = ImageGrab.grab(bbox=(x, y, x+w, y+h))
@@ -0,0 +1,280 @@
+"""
+설정 파일 핫 리로드
+seats.json / settings.json의 수정 시각·크기를 주기적으로 확인하여 바뀐 파일만 다시 읽고 검증한 뒤,
+모니터 루프가 사이클 사이에 한 번에 적용 (한 사이클 안에서 옛 좌석/임계값과 새 값이 섞이지 않음)
+
+별도 의존성(watchdog 등) 없이 파일당 stat 1회만 사용하며,
+저장 도중의 반쯤 쓰인 파일은 JSON 파싱/검증에 실패하므로 기존 설정을 유지하고 다음 변경을 기다림
+"""
+import json
+import os
+import time
+from typing import Callable, Dict, List, Optional, Tuple
+
+from alert_routing import AlertRouter
+from detection_engine import PROFILES
+
+
+# settings.json detection 섹션 숫자 값 허용 범위 (None이면 제한 없음)
+DETECTION_RANGES = {
+    'ear_threshold': (0.0, 1.0),
+    'head_tilt_threshold': (0.0, 5.0),
+    'head_pitch_threshold': (-90.0, 90.0),
+    'confidence_threshold': (0.0, 1.0),
+    'drowsy_count_threshold': (1, None),
+    'check_interval': (0.0, None),
+    'alert_cooldown': (0.0, None),
+    'auto_fast_seat_count': (1, None),
+}
+
+# 좌석 좌표 키
+SEAT_GEOMETRY_KEYS = ('x', 'y', 'width', 'height')
+
+
+def _check_range(section: str, key: str, value, bounds: Tuple):
+    """숫자 값 범위 확인 (벗어나면 ValueError)"""
+    if isinstance(value, bool) or not isinstance(value, (int, float)):
+        raise ValueError(f"{section}.{key}는 숫자여야 합니다: {value!r}")
+    low, high = bounds
+    if (low is not None and value < low) or (high is not None and value > high):
+        raise ValueError(f"{section}.{key} 범위 초과: {value} (허용 {low} ~ {high})")
+
+
+def validate_settings(data: Dict) -> Dict:
+    """
+    settings.json 검증
+
+    Args:
+        data: 파싱된 settings.json
+
+    Returns:
+        검증된 설정 (입력 그대로)
+
+    Raises:
+        ValueError: 형식 / 범위 오류
+    """
+    if not isinstance(data, dict):
+        raise ValueError("settings.json 최상위는 객체여야 합니다")
+
+    detection = data.get('detection', {})
+    if not isinstance(detection, dict):
+        raise ValueError("detection 섹션은 객체여야 합니다")
+
+    for key, bounds in DETECTION_RANGES.items():
+        if key in detection:
+            _check_range('detection', key, detection[key], bounds)
+
+    profile = detection.get('profile', 'auto')
+    if profile != 'auto' and profile not in PROFILES:
+        raise ValueError(f"알 수 없는 감지 프로필: {profile}")
+    if detection.get('head_pose_method', 'ratio') not in ('ratio', 'pnp'):
+        raise ValueError(f"알 수 없는 head_pose_method: {detection['head_pose_method']}")
+
+    background = data.get('seat_detection', {}).get('background_model', {})
+    for key in ('pixel_diff_threshold', 'adapt_step'):
+        if key in background:
+            _check_range('seat_detection.background_model', key, background[key], (0.0, 255.0))
+    if 'foreground_ratio_threshold' in background:
+        _check_range('seat_detection.background_model', 'foreground_ratio_threshold',
+                     background['foreground_ratio_threshold'], (0.0, 1.0))
+
+    # 알림 규칙은 컴파일해 봐서 형식 확인 (조용한 시간 HH:MM, 신뢰도 0~1, 채널 이름)
+    if 'notification_preferences' in data:
+        AlertRouter(data)
+
+    return data
+
+
+def validate_groups(data: Dict) -> Dict:
+    """
+    seats.json 캡처 그룹 검증 (영역은 가상 데스크톱 절대 좌표라 주 모니터 왼쪽/위는 음수 가능)
+
+    Args:
+        data: 파싱된 seats.json
+
+    Returns:
+        그룹 딕셔너리 {그룹 ID: {'x', 'y', 'width', 'height', ...}} (없으면 빈 딕셔너리)
+
+    Raises:
+        ValueError: 좌표 누락 / 크기 0 이하
+    """
+    groups = data.get('groups', {})
+    if not isinstance(groups, dict):
+        raise ValueError("groups는 객체여야 합니다")
+
+    for group_id, group in groups.items():
+        if not isinstance(group, dict):
+            raise ValueError(f"그룹 {group_id} 형식 오류")
+        for key in SEAT_GEOMETRY_KEYS:
+            value = group.get(key)
+            if isinstance(value, bool) or not isinstance(value, int):
+                raise ValueError(f"그룹 {group_id}의 {key}는 정수여야 합니다: {value!r}")
+        if group['width'] <= 0 or group['height'] <= 0:
+            raise ValueError(f"그룹 {group_id}의 크기가 0 이하입니다")
+
+    return groups
+
+
+def validate_seats(data: Dict) -> Dict:
+    """
+    seats.json 검증 (캡처 그룹이 있으면 모든 활성 좌석이 그룹에 속해야 함)
+
+    Args:
+        data: 파싱된 seats.json
+
+    Returns:
+        좌석 딕셔너리 {좌석 ID: {'x', 'y', 'width', 'height', ...}}
+
+    Raises:
+        ValueError: 좌표 누락 / 음수 / 크기 0 / 없는 그룹
+    """
+    if not isinstance(data, dict) or not isinstance(data.get('seats'), dict):
+        raise ValueError("seats.json에 seats 객체가 없습니다")
+
+    seats = data['seats']
+    groups = validate_groups(data)
+    for seat_id, seat in seats.items():
+        if not isinstance(seat, dict):
+            raise ValueError(f"좌석 {seat_id} 형식 오류")
+        for key in SEAT_GEOMETRY_KEYS:
+            value = seat.get(key)
+            if isinstance(value, bool) or not isinstance(value, int):
+                raise ValueError(f"좌석 {seat_id}의 {key}는 정수여야 합니다: {value!r}")
+            if value < 0:
+                raise ValueError(f"좌석 {seat_id}의 {key}가 음수입니다: {value}")
+        if seat['width'] == 0 or seat['height'] == 0:
+            raise ValueError(f"좌석 {seat_id}의 크기가 0입니다")
+        if groups and seat.get('enabled', True) and seat.get('group') not in groups:
+            raise ValueError(f"좌석 {seat_id}의 캡처 그룹이 없습니다: {seat.get('group')!r}")
+        if not groups and 'group' in seat:
+            raise ValueError(f"좌석 {seat_id}에 group이 있지만 groups 정의가 없습니다")
+
+    return seats
+
+
+def validate_seat_layout(data: Dict) -> Dict:
+    """
+    seats.json 전체 검증 (핫 리로드용)
+
+    Returns:
+        {'seats': 좌석 딕셔너리, 'groups': 캡처 그룹 딕셔너리}
+    """
+    return {'seats': validate_seats(data), 'groups': validate_groups(data)}
+
+
+def diff_seats(old: Dict, new: Dict) -> Dict[str, List[str]]:
+    """
+    좌석 구성 변경 비교
+
+    Returns:
+        {'added': 새 좌석, 'removed': 삭제/비활성화된 좌석,
+         'moved': 좌표가 바뀐 좌석, 'unchanged': 그대로인 좌석}
+    """
+    def active(seats):
+        return {sid: seat for sid, seat in seats.items() if seat.get('enabled', True)}
+
+    old, new = active(old), active(new)
+    result = {'added': [], 'removed': [], 'moved': [], 'unchanged': []}
+
+    for seat_id, seat in new.items():
+        if seat_id not in old:
+            result['added'].append(seat_id)
+        elif any(old[seat_id].get(k) != seat.get(k) for k in SEAT_GEOMETRY_KEYS + ('group',)):
+            result['moved'].append(seat_id)
+        else:
+            result['unchanged'].append(seat_id)
+    result['removed'] = [seat_id for seat_id in old if seat_id not in new]
+    return result
+
+
+class ConfigFileWatcher:
+    """파일 1개 변경 감시 (수정 시각 + 크기)"""
+
+    def __init__(self, path: str, validator: Callable[[Dict], Dict], settle: float = 0.2):
+        """
+        초기화
+        Args:
+            path: 감시할 JSON 파일
+            validator: 파싱 결과 검증 함수 (오류 시 ValueError)
+            settle: 마지막 수정 후 이 시간(초)이 지나야 읽음 (저장 중인 파일 회피)
+        """
+        self.path = path
+        self.validator = validator
+        self.settle = settle
+        # 시작 시 이미 읽은 상태로 간주 (첫 poll에서 다시 읽지 않음)
+        self._seen = self._signature()
+
+    def _signature(self) -> Optional[Tuple[int, int]]:
+        try:
+            stat = os.stat(self.path)
+        except OSError:
+            return None
+        return stat.st_mtime_ns, stat.st_size
+
+    def poll(self) -> Optional[Dict]:
+        """
+        변경 확인
+
+        Returns:
+            바뀌었고 검증을 통과한 새 설정, 아니면 None
+        """
+        signature = self._signature()
+        if signature is None or signature == self._seen:
+            return None
+
+        if time.time() - signature[0] / 1e9 < self.settle:
+            return None
+        self._seen = signature
+
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                return self.validator(json.load(f))
+        except Exception as e:
+            print(f"⚠️  설정 리로드 실패 ({self.path}): {e} - 기존 설정 유지")
+            return None
+
+
+class ConfigReloader:
+    """settings.json / seats.json 변경 감시 (모니터 루프에서 사이클마다 poll)"""
+
+    def __init__(self, settings_path: str, seats_path: Optional[str] = None,
+                 config: Dict = None):
+        """
+        초기화
+        Args:
+            settings_path: settings.json 경로
+            seats_path: seats.json 경로 (None이면 좌석 감시 안 함)
+            config: config_reload 설정 {"enabled": true, "poll_interval": 1.0}
+        """
+        config = config or {}
+        self.enabled = config.get('enabled', True)
+        self.poll_interval = config.get('poll_interval', 1.0)
+        self._last_poll = time.perf_counter()
+
+        self.watchers: Dict[str, ConfigFileWatcher] = {
+            'settings': ConfigFileWatcher(settings_path, validate_settings)
+        }
+        if seats_path:
+            self.watchers['seats'] = ConfigFileWatcher(seats_path, validate_seat_layout)
+
+    def poll(self) -> Dict[str, Dict]:
+        """
+        변경된 설정 확인 (poll_interval마다 stat)
+
+        Returns:
+            {'settings': 새 settings, 'seats': {'seats': 좌석, 'groups': 캡처 그룹}} 중 바뀐 것만
+        """
+        if not self.enabled:
+            return {}
+
+        now = time.perf_counter()
+        if now - self._last_poll < self.poll_interval:
+            return {}
+        self._last_poll = now
+
+        changes = {}
+        for name, watcher in self.watchers.items():
+            data = watcher.poll()
+            if data is not None:
+                changes[name] = data
+        return changes
@@ -0,0 +1,695 @@
+"""
+공용 졸음 감지 엔진
+랜드마크 백엔드 → 지표(metric) 계산 → 판단(decision) 3단계를 교체 가능하게 분리
+main.py / main_sequential.py / viewguard_main.py가 같은 엔진을 사용하며,
+화면 그리기와 알림은 호출하는 쪽에서 처리
+
+지표와 판단은 (얼굴 수, 포인트 수, 2) 배열을 한 번에 처리하도록 작성되어
+여러 좌석을 묶어 처리할 때도 그대로 사용
+"""
+import cv2
+import numpy as np
+from typing import Dict, List, Optional, Tuple
+
+from head_pose import HeadPoseEstimator
+from instrumentation import instrumentation
+
+
+# MediaPipe 468(+10 홍채) 포인트 기준 인덱스
+LEFT_EYE = [362, 385, 387, 263, 373, 380]
+RIGHT_EYE = [33, 160, 158, 133, 153, 144]
+NOSE_TIP = 1
+CHIN = 152
+FOREHEAD = 10
+
+# 오버레이에 표시하는 주요 포인트 (눈, 코, 턱)
+OVERLAY_POINTS = LEFT_EYE + RIGHT_EYE + [NOSE_TIP, CHIN]
+
+# 감지 프로필 (배포 환경별 모델 구성)
+# - fast: 홍채 정밀화(refine_landmarks) 생략 + 큰 입력 축소 → 좌석 수가 많을 때
+# - standard: 홍채 정밀화 포함 (기존 동작)
+# - precise: 홍채 정밀화 + 매 이미지 얼굴 재검출 (좌석 간 추적 오인식 방지)
+# 사용하는 지표(눈 6점, 코/턱/이마)는 468 기본 포인트에 모두 포함되어 정밀화 없이도 계산 가능
+# crop_refine은 opencv_dnn 백엔드용: 1차 랜드마크 주변을 잘라 한 번 더 추론 (fast는 1회만)
+PROFILES = {
+    'fast': {'refine_landmarks': False, 'static_image_mode': False, 'max_input_size': 640,
+             'crop_refine': False},
+    'standard': {'refine_landmarks': True, 'static_image_mode': False, 'max_input_size': None,
+                 'crop_refine': True},
+    'precise': {'refine_landmarks': True, 'static_image_mode': True, 'max_input_size': None,
+                'crop_refine': True},
+}
+
+
+def resolve_profile(config: Dict, seat_count: Optional[int] = None) -> Tuple[str, Dict]:
+    """
+    설정의 profile 값을 실제 프로필로 결정
+
+    Args:
+        config: detection 설정 딕셔너리
+            profile: 'fast' | 'standard' | 'precise' | 'auto' (기본 auto)
+            auto_fast_seat_count: auto일 때 이 좌석 수 이상이면 fast (기본 16)
+        seat_count: 이 감지기가 처리할 좌석(채널/스트림) 수
+
+    Returns:
+        (프로필 이름, 모델 구성)
+    """
+    name = config.get('profile', 'auto')
+
+    if name == 'auto':
+        threshold = config.get('auto_fast_seat_count', 16)
+        name = 'fast' if seat_count is not None and seat_count >= threshold else 'standard'
+
+    if name not in PROFILES:
+        print(f"⚠️  알 수 없는 감지 프로필 '{name}', standard 사용")
+        name = 'standard'
+
+    return name, PROFILES[name]
+
+
+# ==================== 랜드마크 백엔드 ====================
+
+class MediaPipeLandmarkBackend:
+    """MediaPipe FaceMesh 랜드마크 백엔드 (이미지 1장씩 처리)"""
+
+    name = 'mediapipe'
+
+    def __init__(self, config: Dict = None, profile: Dict = None):
+        """
+        초기화
+        Args:
+            config: detection 설정 딕셔너리
+            profile: PROFILES 중 하나 (None이면 standard)
+        """
+        import mediapipe as mp
+
+        self.config = config or {}
+        self.profile = profile or PROFILES['standard']
+        self.max_input_size = self.profile.get('max_input_size')
+        self.face_mesh = mp.solutions.face_mesh.FaceMesh(
+            static_image_mode=self.profile.get('static_image_mode', False),
+            max_num_faces=1,
+            refine_landmarks=self.profile.get('refine_landmarks', True),
+            min_detection_confidence=0.5,
+            min_tracking_confidence=0.5
+        )
+
+    def detect(self, frame: np.ndarray) -> Optional[np.ndarray]:
+        """
+        얼굴 랜드마크 추출
+
+        Args:
+            frame: 입력 이미지 (BGR)
+
+        Returns:
+            (포인트 수, 2) 정규화 좌표 배열 (0~1), 얼굴이 없으면 None
+        """
+        # RGB 변환 (MediaPipe는 RGB 사용), 큰 입력은 축소 (랜드마크는 정규화 좌표라 영향 없음)
+        with instrumentation.span('color_conversion'):
+            h, w = frame.shape[:2]
+            if self.max_input_size and max(h, w) > self.max_input_size:
+                scale = self.max_input_size / max(h, w)
+                frame = cv2.resize(frame, (int(w * scale), int(h * scale)),
+                                   interpolation=cv2.INTER_AREA)
+            rgb_frame = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
+
+        with instrumentation.span('face_mesh'):
+            results = self.face_mesh.process(rgb_frame)
+
+        if not results.multi_face_landmarks:
+            return None
+
+        landmarks = results.multi_face_landmarks[0].landmark
+        return np.array([(p.x, p.y) for p in landmarks], dtype=np.float32)
+
+    def detect_batch(self, frames: List[np.ndarray]) -> List[Optional[np.ndarray]]:
+        """여러 이미지 처리 (MediaPipe는 배치를 지원하지 않아 순차 처리)"""
+        return [self.detect(frame) for frame in frames]
+
+    def close(self):
+        self.face_mesh.close()
+
+
+def bundled_landmark_model() -> Optional[str]:
+    """mediapipe 패키지에 포함된 FaceMesh 랜드마크 모델 경로 (mediapipe를 import하지 않음)"""
+    import importlib.util
+    import os
+
+    spec = importlib.util.find_spec('mediapipe')
+    if spec is None or not spec.origin:
+        return None
+    path = os.path.join(os.path.dirname(spec.origin), 'modules', 'face_landmark', 'face_landmark.tflite')
+    return path if os.path.exists(path) else None
+
+
+class OpenCVDnnLandmarkBackend:
+    """
+    OpenCV DNN 랜드마크 백엔드 (CPU, 여러 ROI를 한 번에 배치 추론)
+    FaceMesh와 같은 468 포인트 순서를 출력하는 모델(ONNX / TFLite)이면 그대로 사용 가능하며,
+    모델을 지정하지 않으면 mediapipe에 포함된 face_landmark.tflite를 사용
+    """
+
+    name = 'opencv_dnn'
+
+    def __init__(self, config: Dict = None, profile: Dict = None):
+        """
+        초기화
+        Args:
+            config: detection 설정 딕셔너리
+                engine.dnn_model: 모델 경로 (.onnx / .tflite, 기본: mediapipe 포함 모델)
+                engine.dnn_input_size: 모델 입력 크기 (기본 192)
+                engine.dnn_landmark_output: 랜드마크 출력 레이어 (기본 'conv2d_21')
+                engine.dnn_score_output: 얼굴 점수 출력 레이어 (기본 'conv2d_31', None이면 점수 없음)
+                engine.dnn_score_threshold: 얼굴 판정 점수 (기본 0.5)
+                engine.dnn_batch_size: 한 번에 추론할 최대 ROI 수 (기본 32)
+            profile: PROFILES 중 하나 (crop_refine 사용)
+        """
+        self.config = config or {}
+        self.profile = profile or PROFILES['standard']
+        engine_config = self.config.get('engine', {})
+
+        model_path = engine_config.get('dnn_model') or bundled_landmark_model()
+        if not model_path:
+            raise ValueError("opencv_dnn 백엔드 모델이 없습니다 (detection.engine.dnn_model 설정 필요)")
+
+        self.input_size = engine_config.get('dnn_input_size', 192)
+        self.batch_size = max(1, engine_config.get('dnn_batch_size', 32))
+        self.score_threshold = engine_config.get('dnn_score_threshold', 0.5)
+        self.crop_refine = self.profile.get('crop_refine', True)
+
+        landmark_output = engine_config.get('dnn_landmark_output', 'conv2d_21')
+        score_output = engine_config.get('dnn_score_output', 'conv2d_31')
+        self.output_names = [landmark_output] + ([score_output] if score_output else [])
+
+        # 중간 레이어 이름으로 출력을 꺼내려면 OpenCV 5의 새 엔진 대신 classic 엔진 필요
+        if hasattr(cv2.dnn, 'ENGINE_CLASSIC'):
+            self.net = cv2.dnn.readNet(model_path, engine=cv2.dnn.ENGINE_CLASSIC)
+        else:
+            self.net = cv2.dnn.readNet(model_path)
+
+    def _infer(self, images: List[np.ndarray]) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        배치 추론
+
+        Returns:
+            ((이미지 수, 포인트 수, 2) 이미지 기준 정규화 좌표, (이미지 수,) 얼굴 점수 0~1)
+        """
+        size = self.input_size
+        points, scores = [], []
+
+        for start in range(0, len(images), self.batch_size):
+            chunk = images[start:start + self.batch_size]
+
+            with instrumentation.span('color_conversion'):
+                blob = cv2.dnn.blobFromImages(chunk, 1 / 255.0, (size, size), swapRB=True)
+
+            with instrumentation.span('face_mesh'):
+                self.net.setInput(blob)
+                outputs = self.net.forward(self.output_names)
+
+            landmarks = outputs[0].reshape(len(chunk), -1, 3)
+            if landmarks.shape[1] < 468:
+                raise ValueError(f"랜드마크 모델 출력이 {landmarks.shape[1]}포인트입니다 (468 포인트 필요)")
+            points.append(landmarks[:, :, :2] / size)
+
+            if len(outputs) > 1:
+                logits = outputs[1].reshape(len(chunk), -1)[:, 0]
+                scores.append(1.0 / (1.0 + np.exp(-logits)))
+            else:
+                scores.append(np.ones(len(chunk), dtype=np.float32))
+
+        return np.concatenate(points).astype(np.float32), np.concatenate(scores)
+
+    @staticmethod
+    def _face_crop(frame: np.ndarray, points: np.ndarray) -> Tuple[np.ndarray, Tuple[int, int, int]]:
+        """1차 랜드마크 주변 정사각형 영역 (1.5배 여유, 화면 밖은 검은색)"""
+        h, w = frame.shape[:2]
+        pixels = points * (w, h)
+        cx, cy = pixels.mean(axis=0)
+        side = max(8, int(1.5 * max(np.ptp(pixels[:, 0]), np.ptp(pixels[:, 1]))))
+        x0, y0 = int(cx - side / 2), int(cy - side / 2)
+
+        crop = np.zeros((side, side, 3), dtype=frame.dtype)
+        sx0, sy0 = max(0, x0), max(0, y0)
+        sx1, sy1 = min(w, x0 + side), min(h, y0 + side)
+        if sx1 > sx0 and sy1 > sy0:
+            crop[sy0 - y0:sy1 - y0, sx0 - x0:sx1 - x0] = frame[sy0:sy1, sx0:sx1]
+        return crop, (x0, y0, side)
+
+    def detect(self, frame: np.ndarray) -> Optional[np.ndarray]:
+        """얼굴 랜드마크 추출 (detect_batch와 같은 형식)"""
+        return self.detect_batch([frame])[0]
+
+    def detect_batch(self, frames: List[np.ndarray]) -> List[Optional[np.ndarray]]:
+        """
+        여러 이미지 일괄 처리
+
+        Args:
+            frames: BGR 이미지 리스트
+
+        Returns:
+            이미지별 (포인트 수, 2) 정규화 좌표 배열, 얼굴이 없으면 None
+        """
+        if not frames:
+            return []
+
+        points, scores = self._infer(frames)
+        found = [i for i in range(len(frames)) if scores[i] >= self.score_threshold]
+        results: List[Optional[np.ndarray]] = [None] * len(frames)
+
+        if not self.crop_refine or not found:
+            for i in found:
+                results[i] = points[i]
+            return results
+
+        # 2차: 얼굴 주변만 잘라 다시 추론 (좌석 ROI 안에서 얼굴이 작거나 치우친 경우 보정)
+        crops, boxes = zip(*(self._face_crop(frames[i], points[i]) for i in found))
+        refined, _ = self._infer(list(crops))
+
+        for j, i in enumerate(found):
+            h, w = frames[i].shape[:2]
+            x0, y0, side = boxes[j]
+            results[i] = ((refined[j] * side + (x0, y0)) / (w, h)).astype(np.float32)
+        return results
+
+    def close(self):
+        self.net = None
+
+
+BACKENDS = {
+    'mediapipe': MediaPipeLandmarkBackend,
+    'opencv_dnn': OpenCVDnnLandmarkBackend,
+}
+
+
+# ==================== 지표 ====================
+
+class EyeAspectRatioMetric:
+    """
+    Eye Aspect Ratio (양쪽 눈 평균)
+    눈이 감기면 값이 작아짐 (정상: 0.25~0.3, 감김: <0.2)
+    """
+
+    keys = ('ear', 'left_ear', 'right_ear')
+
+    def __init__(self):
+        self.index = np.array([LEFT_EYE, RIGHT_EYE])     # (2, 6)
+
+    def compute(self, points: np.ndarray, sizes: Optional[np.ndarray] = None) -> Dict[str, np.ndarray]:
+        """
+        Args:
+            points: (얼굴 수, 포인트 수, 2) 픽셀 좌표
+            sizes: (얼굴 수, 2) 이미지 너비, 높이 (크기가 필요한 지표만 사용)
+
+        Returns:
+            {'ear', 'left_ear', 'right_ear'}: 각 (얼굴 수,) 배열
+        """
+        eyes = points[:, self.index]                      # (F, 2, 6, 2)
+        vertical_a = np.linalg.norm(eyes[:, :, 1] - eyes[:, :, 5], axis=-1)
+        vertical_b = np.linalg.norm(eyes[:, :, 2] - eyes[:, :, 4], axis=-1)
+        horizontal = np.linalg.norm(eyes[:, :, 0] - eyes[:, :, 3], axis=-1)
+
+        with np.errstate(divide='ignore', invalid='ignore'):
+            ear = (vertical_a + vertical_b) / (2.0 * horizontal)
+        ear = np.nan_to_num(ear, nan=0.0, posinf=0.0)
+
+        return {
+            'ear': ear.mean(axis=1),
+            'left_ear': ear[:, 0],
+            'right_ear': ear[:, 1]
+        }
+
+
+class HeadTiltRatioMetric:
+    """
+    머리 기울기 비율 (코가 이마~턱 사이에서 차지하는 세로 위치)
+    정상: ~0.5, 고개 숙임: >0.58
+    """
+
+    keys = ('head_tilt',)
+
+    def compute(self, points: np.ndarray, sizes: Optional[np.ndarray] = None) -> Dict[str, np.ndarray]:
+        nose_y = points[:, NOSE_TIP, 1]
+        chin_y = points[:, CHIN, 1]
+        forehead_y = points[:, FOREHEAD, 1]
+
+        height = chin_y - forehead_y
+        safe = np.where(height == 0, 1.0, height)
+        ratio = np.where(height == 0, 0.5, (nose_y - forehead_y) / safe)
+        return {'head_tilt': ratio}
+
+
+class HeadTiltAngleMetric:
+    """
+    머리 기울기 각도 (코→턱 선과 수직선 사이 각도, 라디안)
+    viewguard-new CCTV 모니터 방식
+    """
+
+    keys = ('head_tilt',)
+
+    def compute(self, points: np.ndarray, sizes: Optional[np.ndarray] = None) -> Dict[str, np.ndarray]:
+        delta = points[:, CHIN] - points[:, NOSE_TIP]
+        return {'head_tilt': np.abs(np.arctan2(delta[:, 0], delta[:, 1]))}
+
+
+class HeadPitchMetric:
+    """
+    solvePnP 머리 자세 (도 단위, head_pose.py)
+    pitch는 고개를 숙일수록 커짐 (정면: 5~12, 숙임: >15)
+    """
+
+    keys = ('head_pitch', 'head_yaw', 'head_roll')
+
+    def __init__(self):
+        self.estimator = HeadPoseEstimator()
+
+    def compute(self, points: np.ndarray, sizes: Optional[np.ndarray] = None) -> Dict[str, np.ndarray]:
+        if sizes is None:
+            # 크기를 모르면 랜드마크가 들어가는 최소 크기로 근사
+            sizes = np.ceil(points.max(axis=1))
+        return self.estimator.estimate(points, sizes)
+
+
+METRICS = {
+    'ear': EyeAspectRatioMetric,
+    'head_tilt_ratio': HeadTiltRatioMetric,
+    'head_tilt_angle': HeadTiltAngleMetric,
+    'head_pitch': HeadPitchMetric,
+}
+
+
+# ==================== 판단 ====================
+
+def head_down_mask(values: Dict[str, np.ndarray], tilt_threshold: float,
+                   pitch_threshold: float) -> np.ndarray:
+    """고개 숙임 여부 (head_pitch 지표가 있으면 각도 기준, 없으면 head_tilt 기준)"""
+    if 'head_pitch' in values:
+        return values['head_pitch'] > pitch_threshold
+    return values['head_tilt'] > tilt_threshold
+
+
+class WeightedDecision:
+    """
+    다중 지표 복합 판단
+    - 눈 감김 + 고개 숙임: 0.95
+    - 고개만 숙임: 0.80
+    - 눈만 감음: 0.60 (깜빡임일 수 있음)
+    """
+
+    def __init__(self, config: Dict):
+        self.EAR_THRESHOLD = config.get('ear_threshold', 0.2)
+        self.HEAD_TILT_THRESHOLD = config.get('head_tilt_threshold', 0.58)
+        self.HEAD_PITCH_THRESHOLD = config.get('head_pitch_threshold', 15.0)
+
+    def decide(self, values: Dict[str, np.ndarray]) -> Dict[str, np.ndarray]:
+        """
+        Args:
+            values: 지표 이름 → (얼굴 수,) 배열
+
+        Returns:
+            {'is_drowsy', 'confidence', 'eyes_closed', 'head_down'}: 각 (얼굴 수,) 배열
+        """
+        eyes_closed = values['ear'] < self.EAR_THRESHOLD
+        head_down = head_down_mask(values, self.HEAD_TILT_THRESHOLD, self.HEAD_PITCH_THRESHOLD)
+
+        confidence = np.select(
+            [eyes_closed & head_down, head_down, eyes_closed],
+            [0.95, 0.80, 0.60],
+            default=0.0
+        )
+
+        return {
+            'is_drowsy': eyes_closed | head_down,
+            'confidence': confidence,
+            'eyes_closed': eyes_closed,
+            'head_down': head_down
+        }
+
+
+class AnyThresholdDecision:
+    """둘 중 하나라도 임계값을 넘으면 졸음 (신뢰도 1.0) - viewguard-new CCTV 모니터 방식"""
+
+    def __init__(self, config: Dict):
+        self.EAR_THRESHOLD = config.get('ear_threshold', 0.2)
+        self.HEAD_TILT_THRESHOLD = config.get('head_tilt_threshold', 0.58)
+        self.HEAD_PITCH_THRESHOLD = config.get('head_pitch_threshold', 15.0)
+
+    def decide(self, values: Dict[str, np.ndarray]) -> Dict[str, np.ndarray]:
+        eyes_closed = values['ear'] < self.EAR_THRESHOLD
+        head_down = head_down_mask(values, self.HEAD_TILT_THRESHOLD, self.HEAD_PITCH_THRESHOLD)
+        is_drowsy = eyes_closed | head_down
+
+        return {
+            'is_drowsy': is_drowsy,
+            'confidence': is_drowsy.astype(np.float64),
+            'eyes_closed': eyes_closed,
+            'head_down': head_down
+        }
+
+
+DECISIONS = {
+    'weighted': WeightedDecision,
+    'any': AnyThresholdDecision,
+}
+
+
+# ==================== 엔진 ====================
+
+def _lookup(registry: Dict, name: str, kind: str):
+    if name not in registry:
+        raise ValueError(f"알 수 없는 {kind}: {name} (가능: {', '.join(registry)})")
+    return registry[name]
+
+
+class DetectionEngine:
+    """랜드마크 백엔드 + 지표 + 판단을 묶은 졸음 감지 엔진"""
+
+    def __init__(self, config: Dict = None, backend=None, seat_count: Optional[int] = None):
+        """
+        초기화
+        Args:
+            config: detection 설정 딕셔너리
+                profile: 감지 프로필 ('fast' | 'standard' | 'precise' | 'auto')
+                head_pose_method: 고개 숙임 판단 ('ratio' | 'pnp', pnp면 head_pitch 지표 추가)
+                engine.backend: 랜드마크 백엔드 ('mediapipe' | 'opencv_dnn')
+                engine.metrics: 지표 목록 (기본 ['ear', 'head_tilt_ratio'])
+                engine.decision: 판단 방식 ('weighted' | 'any')
+            backend: 랜드마크 백엔드 객체 (None이면 설정값으로 생성)
+            seat_count: 처리할 좌석 수 (profile=auto 판단용)
+        """
+        self.config = config or {}
+        self.profile_name, profile = resolve_profile(self.config, seat_count)
+
+        backend_name = self.config.get('engine', {}).get('backend', 'mediapipe')
+        self.backend = backend or _lookup(BACKENDS, backend_name, '랜드마크 백엔드')(self.config, profile)
+        self._build_pipeline()
+
+        # 마지막으로 처리한 얼굴의 픽셀 좌표 랜드마크 (오버레이용, 얼굴 없으면 None)
+        self.last_landmarks: Optional[np.ndarray] = None
+
+    def _build_pipeline(self):
+        """설정으로 지표 / 판단 객체 생성 (모델 로딩 없음)"""
+        engine_config = self.config.get('engine', {})
+        metric_names = engine_config.get('metrics', ['ear', 'head_tilt_ratio'])
+        decision_name = engine_config.get('decision', 'weighted')
+
+        # pnp: solvePnP pitch로 고개 숙임 판단 (head_tilt는 표시/알림용으로 계속 계산)
+        head_pose_method = self.config.get('head_pose_method', 'ratio')
+        if head_pose_method == 'pnp' and 'head_pitch' not in metric_names:
+            metric_names = list(metric_names) + ['head_pitch']
+        elif head_pose_method not in ('ratio', 'pnp'):
+            print(f"⚠️  알 수 없는 head_pose_method '{head_pose_method}', ratio 사용")
+
+        self.metrics = [_lookup(METRICS, name, '지표')() for name in metric_names]
+        self.decision = _lookup(DECISIONS, decision_name, '판단 방식')(self.config)
+
+    def reconfigure(self, config: Dict) -> List[str]:
+        """
+        실행 중 설정 교체 (임계값 / 지표 / 판단 방식만, 랜드마크 모델은 유지)
+        새 지표·판단 객체를 모두 만든 뒤 한 번에 바꾸므로 실패하면 기존 설정 유지
+
+        Args:
+            config: 새 detection 설정 딕셔너리
+
+        Returns:
+            모델을 다시 불러와야 적용되는 변경 키 목록 (재시작 필요, 이번에는 무시)
+        """
+        old_engine = self.config.get('engine', {})
+        new_engine = config.get('engine', {})
+        restart_keys = [key for key in ('profile', 'auto_fast_seat_count')
+                        if config.get(key) != self.config.get(key)]
+        restart_keys += [f'engine.{key}' for key in set(old_engine) | set(new_engine)
+                         if key not in ('metrics', 'decision')
+                         and old_engine.get(key) != new_engine.get(key)]
+
+        previous = (self.config, self.metrics, self.decision)
+        try:
+            self.config = config
+            self._build_pipeline()
+        except Exception:
+            self.config, self.metrics, self.decision = previous
+            raise
+        return sorted(restart_keys)
+
+    def evaluate(self, points: np.ndarray,
+                 sizes: Optional[np.ndarray] = None) -> List[Tuple[bool, float, Dict]]:
+        """
+        픽셀 좌표 랜드마크 → 지표 계산 및 판단 (여러 얼굴 일괄)
+
+        Args:
+            points: (얼굴 수, 포인트 수, 2) 픽셀 좌표
+            sizes: (얼굴 수, 2) 이미지 너비, 높이 (head_pitch 카메라 근사용)
+
+        Returns:
+            얼굴별 (is_drowsy, confidence, details)
+        """
+        values = {}
+        for metric in self.metrics:
+            values.update(metric.compute(points, sizes))
+        verdict = self.decision.decide(values)
+
+        results = []
+        for i in range(points.shape[0]):
+            is_drowsy = bool(verdict['is_drowsy'][i])
+            details = {key: float(value[i]) for key, value in values.items()}
+            details.update({
+                'eyes_closed': bool(verdict['eyes_closed'][i]),
+                'head_down': bool(verdict['head_down'][i]),
+                'status': 'drowsy' if is_drowsy else 'alert'
+            })
+            results.append((is_drowsy, float(verdict['confidence'][i]), details))
+        return results
+
+    def detect_batch(self, frames: List[np.ndarray]) -> List[Tuple[bool, float, Dict]]:
+        """
+        여러 이미지(좌석 ROI) 졸음 감지
+
+        Args:
+            frames: BGR 이미지 리스트
+
+        Returns:
+            이미지별 (is_drowsy, confidence, details) - detect_drowsiness와 같은 형식
+        """
+        landmarks = self.backend.detect_batch(frames)
+
+        with instrumentation.span('metrics'):
+            found = [i for i, lm in enumerate(landmarks) if lm is not None]
+            results = [(False, 0.0, {"status": "no_face_detected"}) for _ in frames]
+            self.last_landmarks = None
+
+            if found:
+                # 정규화 좌표 → 이미지별 픽셀 좌표
+                scale = np.array([[frames[i].shape[1], frames[i].shape[0]] for i in found],
+                                 dtype=np.float32)
+                points = np.stack([landmarks[i] for i in found]) * scale[:, None, :]
+
+                for i, result in zip(found, self.evaluate(points, scale)):
+                    results[i] = result
+                if found[-1] == len(frames) - 1:
+                    self.last_landmarks = points[-1]
+
+        return results
+
+    def detect_drowsiness(self, frame: np.ndarray) -> Tuple[bool, float, Dict]:
+        """
+        졸음 감지 - 다중 지표 복합 판단
+
+        Args:
+            frame: 입력 이미지 (BGR)
+
+        Returns:
+            (is_drowsy, confidence, details)
+            - is_drowsy: 졸음 여부
+            - confidence: 신뢰도 (0.0 ~ 1.0)
+            - details: 지표 값, eyes_closed, head_down, status
+              (얼굴 미감지 시 {"status": "no_face_detected"})
+        """
+        return self.detect_batch([frame])[0]
+
+    def warmup(self, sizes: List[Tuple[int, int]], rounds: int = 3) -> Dict[str, float]:
+        """
+        합성 얼굴로 모델 예열 (그래프 초기화 / 메모리 할당 / 카메라 행렬 캐시를 실제 사이클 전에 처리)
+        예열 구간은 파이프라인 측정값에 섞이지 않도록 측정을 잠시 끔
+
+        Args:
+            sizes: 실제로 처리할 이미지(좌석 ROI) 크기 리스트 [(너비, 높이), ...]
+                   한 번의 detect_batch로 넘기므로 배치 크기도 실제 사이클과 같음
+            rounds: 첫 호출 이후 반복 횟수 (안정 지연 측정용)
+
+        Returns:
+            {'cold_seconds': 첫 호출 시간, 'warm_seconds': 이후 호출 중앙값,
+             'frames': 호출당 이미지 수, 'faces_found': 마지막 호출의 얼굴 검출 수}
+        """
+        import time
+        from synthetic import STATE_ALERT, STATE_EMPTY, render_face
+
+        rng = np.random.default_rng(0)
+        faces = [render_face(STATE_ALERT, size, rng) for size in sizes]
+
+        measuring = instrumentation.enabled
+        instrumentation.configure(enabled=False)
+        try:
+            timings = []
+            for _ in range(max(1, rounds) + 1):
+                start = time.perf_counter()
+                results = self.detect_batch(faces)
+                timings.append(time.perf_counter() - start)
+
+            # 빈 프레임으로 마무리: 합성 얼굴 추적 상태가 첫 실제 프레임에 남지 않도록
+            self.detect_batch([render_face(STATE_EMPTY, size, rng) for size in sizes])
+            self.last_landmarks = None
+        finally:
+            instrumentation.configure(enabled=measuring)
+
+        return {
+            'cold_seconds': timings[0],
+            'warm_seconds': float(np.median(timings[1:])),
+            'frames': len(faces),
+            'faces_found': sum(details.get('status') != 'no_face_detected'
+                               for _, _, details in results)
+        }
+
+    def close(self):
+        """백엔드 리소스 정리"""
+        if hasattr(self.backend, 'close'):
+            self.backend.close()
+
+
+def warmup_worker(detector, sizes: List[Tuple[int, int]], worker: str = 'detector',
+                  config: Dict = None) -> Optional[Dict[str, float]]:
+    """
+    감지기 1개 예열 + 준비 상태 / 첫 호출·안정 지연 기록
+    예열이 끝나기 전까지 /ready는 503을 반환
+
+    Args:
+        detector: warmup(sizes, rounds)을 가진 감지기 (DetectionEngine / AdvancedDrowsinessDetector)
+        sizes: 실제 사이클에서 한 번에 처리할 이미지 크기 리스트 [(너비, 높이), ...]
+        worker: 준비 상태 / 메트릭 라벨용 작업자 이름
+        config: detection.warmup 설정 {"enabled": true, "rounds": 3}
+
+    Returns:
+        예열 결과 (비활성화 / 실패 시 None)
+    """
+    config = config or {}
+    instrumentation.set_ready(worker, False)
+
+    if not config.get('enabled', True) or not sizes:
+        instrumentation.set_ready(worker, True)
+        return None
+
+    print(f"🔥 [{worker}] 감지기 예열 중... (이미지 {len(sizes)}장)")
+    try:
+        result = detector.warmup(sizes, config.get('rounds', 3))
+    except Exception as e:
+        # 예열 실패는 첫 사이클이 느려질 뿐이므로 모니터링은 계속
+        print(f"⚠️  [{worker}] 예열 실패: {e}")
+        instrumentation.set_ready(worker, True)
+        return None
+
+    instrumentation.set_gauge('warmup_cold_seconds', result['cold_seconds'], worker=worker)
+    instrumentation.set_gauge('warmup_warm_seconds', result['warm_seconds'], worker=worker)
+    instrumentation.set_ready(worker, True)
+    print(f"✅ [{worker}] 예열 완료: 첫 호출 {result['cold_seconds'] * 1000:.0f}ms → "
+          f"안정 {result['warm_seconds'] * 1000:.0f}ms "
+          f"(얼굴 {result['faces_found']}/{result['frames']})")
+    return result
@@ -0,0 +1,632 @@
+"""
+분산 모니터링 (캡처 노드 여러 대 + 집계 서버 1대)
+
+- 노드: 기존 모니터(main.py --node)가 캡처 → 빈 좌석 체크 → 졸음 감지까지만 하고,
+  사이클마다 좌석별 감지 이벤트(이미지 아님)를 묶어 집계 서버로 TCP 전송
+- 집계 서버: 좌석 상태(연속 감지 카운터), 알림 쿨다운, 알림 전송, 대시보드를 전담
+  좌석 ID는 "노드/좌석"으로 구분하므로 노드마다 seats.json 좌석 번호가 겹쳐도 됨
+
+전송 형식: [형식 1바이트][길이 4바이트, big-endian][본문] 프레임 반복
+  본문(JSON, 'J') = {"node": 노드 ID, "ts": 캡처 시각(epoch 초), "events": [좌석 이벤트, ...]}
+  본문(바이너리, 'B') = event_format 고정 길이 레코드 묶음 (기본값, 좌석당 18바이트)
+"""
+import argparse
+import asyncio
+import json
+import socket
+import struct
+import time
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
+
+import event_format
+from alert_coalescer import SUPPRESSED, AlertCoalescer, alert_result, digest_loop
+from instrumentation import instrumentation, setup_metrics
+
+
+# 프레임 헤더: 본문 형식, 본문 길이
+FRAME_HEADER = struct.Struct('!BI')
+FORMAT_JSON = ord('J')
+FORMAT_BINARY = ord('B')
+WIRE_FORMATS = {'json': FORMAT_JSON, 'binary': FORMAT_BINARY}
+# 비정상 길이 프레임 차단 (노드 1대 한 사이클 이벤트는 수 KB)
+MAX_FRAME_BYTES = 16 * 1024 * 1024
+
+DEFAULT_PORT = 9200
+
+
+def seat_event(seat_id: str, occupied: bool,
+               detection: Optional[Tuple[bool, float, Dict]] = None) -> Dict:
+    """
+    좌석 감지 이벤트 1건 (집계 서버로 보내는 최소 필드만)
+
+    Args:
+        seat_id: 노드 안의 좌석 ID
+        occupied: 착석 여부
+        detection: detect_drowsiness 결과 (is_drowsy, confidence, details), 빈 좌석이면 None
+
+    Returns:
+        {'seat', 'occupied', 'status', 'drowsy', 'confidence', 'ear', 'head_tilt', ...}
+    """
+    event = {'seat': seat_id, 'occupied': occupied}
+    if detection is None:
+        event['status'] = 'empty'
+        return event
+
+    is_drowsy, confidence, details = detection
+    event.update(status=details.get('status', 'unknown'),
+                 drowsy=bool(is_drowsy),
+                 confidence=round(float(confidence), 4))
+    for key in ('ear', 'head_tilt', 'head_pitch'):
+        if key in details:
+            event[key] = round(float(details[key]), 4)
+    for key in ('eyes_closed', 'head_down'):
+        if key in details:
+            event[key] = bool(details[key])
+    return event
+
+
+def encode_batch(node_id: str, events: List[Dict], ts: float = None,
+                 wire_format: str = 'json') -> bytes:
+    """
+    이벤트 묶음 → 전송 프레임
+
+    Args:
+        node_id: 노드 ID
+        events: seat_event() 리스트
+        ts: 캡처 시각 (None이면 현재)
+        wire_format: 'json' 또는 'binary'
+
+    Returns:
+        헤더 포함 프레임 바이트
+    """
+    ts = time.time() if ts is None else ts
+    kind = WIRE_FORMATS[wire_format]
+    if kind == FORMAT_BINARY:
+        body = event_format.encode_events(node_id, events, ts)
+    else:
+        body = json.dumps({'node': node_id, 'ts': ts, 'events': events},
+                          separators=(',', ':')).encode('utf-8')
+    return FRAME_HEADER.pack(kind, len(body)) + body
+
+
+def decode_body(kind: int, body: bytes) -> Dict:
+    """
+    프레임 본문 → 이벤트 묶음
+
+    Raises:
+        ValueError: 알 수 없는 형식
+    """
+    if kind == FORMAT_JSON:
+        return json.loads(body)
+    if kind == FORMAT_BINARY:
+        return event_format.decode_events(body)
+    raise ValueError(f"알 수 없는 프레임 형식: {kind}")
+
+
+class NodePublisher:
+    """캡처 노드 → 집계 서버 이벤트 전송 (블로킹 소켓, 연결 끊기면 주기적으로 재연결)"""
+
+    def __init__(self, host: str, port: int, node_id: str, config: Dict = None):
+        """
+        초기화
+        Args:
+            host: 집계 서버 주소
+            port: 집계 서버 포트
+            node_id: 이 노드 ID (집계 서버의 좌석 ID 앞부분)
+            config: distributed 설정 딕셔너리
+                send_timeout: 전송 제한 시간 (초, 기본 2)
+                reconnect_interval: 재연결 시도 간격 (초, 기본 5)
+                wire_format: 'binary'(기본) 또는 'json'
+        """
+        config = config or {}
+        self.address = (host, port)
+        self.node_id = node_id
+        self.send_timeout = config.get('send_timeout', 2.0)
+        self.reconnect_interval = config.get('reconnect_interval', 5.0)
+        self.wire_format = config.get('wire_format', 'binary')
+
+        self.sock: Optional[socket.socket] = None
+        self._next_connect = 0.0
+        self.stats = {'batches': 0, 'events': 0, 'dropped': 0, 'bytes': 0}
+
+    def _connect(self) -> bool:
+        now = time.monotonic()
+        if now < self._next_connect:
+            return False
+        self._next_connect = now + self.reconnect_interval
+
+        try:
+            self.sock = socket.create_connection(self.address, timeout=self.send_timeout)
+            self.sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+            print(f"🔗 집계 서버 연결: {self.address[0]}:{self.address[1]} (노드 {self.node_id})")
+            return True
+        except OSError as e:
+            print(f"⚠️  집계 서버 연결 실패 ({self.address[0]}:{self.address[1]}): {e}")
+            self.sock = None
+            return False
+
+    def publish(self, events: List[Dict], ts: float = None) -> bool:
+        """
+        한 사이클 이벤트 전송 (연결이 없으면 버림 - 다음 사이클 결과가 더 최신)
+
+        Args:
+            events: seat_event() 리스트
+            ts: 캡처 시각
+
+        Returns:
+            전송 성공 여부
+        """
+        if not events:
+            return True
+        if self.sock is None and not self._connect():
+            self._drop(events)
+            return False
+
+        try:
+            frame = encode_batch(self.node_id, events, ts, self.wire_format)
+        except ValueError as e:
+            # 바이너리 레코드에 안 맞는 좌석 ID(8바이트 초과) / 노드 ID(255바이트 초과) → JSON으로 전환
+            print(f"⚠️  바이너리 형식 사용 불가, JSON으로 전송: {e}")
+            self.wire_format = 'json'
+            frame = encode_batch(self.node_id, events, ts, self.wire_format)
+        try:
+            self.sock.sendall(frame)
+        except OSError as e:
+            print(f"⚠️  이벤트 전송 실패, 재연결 대기: {e}")
+            self.close()
+            self._drop(events)
+            return False
+
+        self.stats['batches'] += 1
+        self.stats['events'] += len(events)
+        self.stats['bytes'] += len(frame)
+        instrumentation.inc('node_events_sent_total', len(events))
+        return True
+
+    def _drop(self, events: List[Dict]):
+        self.stats['dropped'] += len(events)
+        instrumentation.inc('node_events_dropped_total', len(events))
+
+    def close(self):
+        """연결 종료"""
+        if self.sock is not None:
+            try:
+                self.sock.close()
+            except OSError:
+                pass
+            self.sock = None
+
+
+class EventAggregator:
+    """노드 이벤트로 좌석 상태 / 알림 쿨다운 관리 (main.py의 좌석 상태 규칙과 동일)"""
+
+    def __init__(self, config: Dict = None, alert_sink=None):
+        """
+        초기화
+        Args:
+            config: settings.json 전체 딕셔너리 (detection 임계값 사용)
+            alert_sink: 알림 전달 함수 (seat_id, confidence, details), None이면 알림 없음
+        """
+        config = config or {}
+        detection_config = config.get('detection', {})
+        self.CONFIDENCE_THRESHOLD = detection_config.get('confidence_threshold', 0.75)
+        self.DROWSY_THRESHOLD = detection_config.get('drowsy_count_threshold', 5)
+        self.ALERT_COOLDOWN = detection_config.get('alert_cooldown', 300)
+        self.alert_sink = alert_sink
+
+        # 좌석별 상태 {"노드/좌석": {...}}
+        self.seat_states: Dict[str, Dict] = {}
+        # 노드별 상태 {노드 ID: {'last_seen', 'batches', 'events', 'lag'}}
+        self.nodes: Dict[str, Dict] = {}
+
+        self.stats = {
+            'batches': 0,
+            'events': 0,
+            'drowsy_detections': 0,
+            'alerts_sent': 0,
+            'alerts_suppressed': 0,
+            'start_time': datetime.now()
+        }
+
+    def initialize_seat_state(self) -> Dict:
+        """좌석 상태 초기화"""
+        return {
+            'drowsy_count': 0,
+            'last_alert_time': None,
+            'is_occupied': False,
+            'last_confidence': 0.0,
+            'total_checks': 0,
+            'total_drowsy': 0
+        }
+
+    def apply_batch(self, batch: Dict) -> int:
+        """
+        노드 1사이클 이벤트 묶음 반영
+
+        Args:
+            batch: {'node', 'ts', 'events'}
+
+        Returns:
+            반영한 이벤트 수
+        """
+        node_id = str(batch['node'])
+        events = batch.get('events', [])
+
+        node = self.nodes.get(node_id)
+        if node is None:
+            node = self.nodes[node_id] = {'batches': 0, 'events': 0, 'lag': 0.0}
+            print(f"🖥️  노드 합류: {node_id}")
+        node['last_seen'] = time.time()
+        node['batches'] += 1
+        node['events'] += len(events)
+        if 'ts' in batch:
+            node['lag'] = max(0.0, node['last_seen'] - batch['ts'])
+
+        for event in events:
+            self.apply_event(f"{node_id}/{event['seat']}", event)
+
+        self.stats['batches'] += 1
+        self.stats['events'] += len(events)
+        return len(events)
+
+    def apply_event(self, seat_key: str, event: Dict):
+        """
+        좌석 이벤트 1건 반영 (연속 감지 카운터, 알림 판단)
+
+        Args:
+            seat_key: "노드/좌석"
+            event: seat_event() 결과
+        """
+        state = self.seat_states.get(seat_key)
+        if state is None:
+            state = self.seat_states[seat_key] = self.initialize_seat_state()
+        state['total_checks'] += 1
+
+        if not event.get('occupied'):
+            state['is_occupied'] = False
+            state['drowsy_count'] = 0
+            return
+
+        state['is_occupied'] = True
+        if event.get('status') == 'no_face_detected':
+            return
+
+        confidence = event.get('confidence', 0.0)
+        state['last_confidence'] = confidence
+
+        if event.get('drowsy') and confidence >= self.CONFIDENCE_THRESHOLD:
+            state['drowsy_count'] += 1
+            state['total_drowsy'] += 1
+            self.stats['drowsy_detections'] += 1
+
+            # 연속 감지 임계값 도달 시 알림
+            if state['drowsy_count'] >= self.DROWSY_THRESHOLD:
+                state['drowsy_count'] = 0
+                self.send_alert(seat_key, confidence, event)
+        elif state['drowsy_count'] > 0:
+            state['drowsy_count'] -= 1
+
+    def should_send_alert(self, seat_key: str) -> bool:
+        """알림 쿨다운 확인"""
+        last_alert = self.seat_states[seat_key]['last_alert_time']
+        if last_alert is None:
+            return True
+        return (datetime.now() - last_alert).total_seconds() >= self.ALERT_COOLDOWN
+
+    def send_alert(self, seat_key: str, confidence: float, details: Dict):
+        """쿨다운을 먼저 잡고 알림 전달 (전송 실패 시 finish_alert에서 해제)"""
+        if self.alert_sink is None or not self.should_send_alert(seat_key):
+            return
+        self.seat_states[seat_key]['last_alert_time'] = datetime.now()
+        self.alert_sink(seat_key, confidence, details)
+
+    def finish_alert(self, seat_key: str, success):
+        """
+        알림 전송 결과 반영
+
+        Args:
+            seat_key: "노드/좌석"
+            success: 전송 결과 (SUPPRESSED면 발송으로 세지 않고 쿨다운은 유지)
+        """
+        if success == SUPPRESSED:
+            instrumentation.inc('alerts_total', seat=seat_key, result='suppressed')
+            self.stats['alerts_suppressed'] += 1
+            return
+        instrumentation.inc('alerts_total', seat=seat_key,
+                            result='success' if success else 'failure')
+        if success:
+            self.stats['alerts_sent'] += 1
+            print(f"✅ [좌석 {seat_key}] 알림 발송 완료")
+        elif seat_key in self.seat_states:
+            self.seat_states[seat_key]['last_alert_time'] = None
+
+    def dashboard_data(self) -> Dict:
+        """
+        대시보드(docs/data.json) 형식의 전체 노드 좌석 상태
+
+        Returns:
+            {'total_checks', 'drowsy_count', 'alerts_sent', 'last_update', 'channels'}
+        """
+        now = datetime.now()
+        channels = {}
+        for seat_key, state in self.seat_states.items():
+            if not state['is_occupied']:
+                status = 'empty'
+            elif state['drowsy_count'] >= self.DROWSY_THRESHOLD:
+                status = 'drowsy'
+            else:
+                status = 'alert'
+
+            channel = {
+                'status': status,
+                'last_check': now.strftime('%H:%M:%S'),
+                'has_person': state['is_occupied']
+            }
+            if status == 'drowsy':
+                channel['confidence'] = state['last_confidence']
+            channels[seat_key] = channel
+
+        return {
+            'total_checks': self.stats['events'],
+            'drowsy_count': self.stats['drowsy_detections'],
+            'alerts_sent': self.stats['alerts_sent'],
+            'last_update': now.strftime('%Y-%m-%d %H:%M:%S'),
+            'channels': channels
+        }
+
+    def print_statistics(self, stale_after: float = 30.0):
+        """통계 출력 (stale_after초 넘게 소식 없는 노드 표시)"""
+        elapsed = (datetime.now() - self.stats['start_time']).total_seconds()
+        rate = self.stats['events'] / elapsed if elapsed > 0 else 0.0
+        now = time.time()
+
+        print("\n" + "=" * 70)
+        print("📊 집계 서버 통계")
+        print("=" * 70)
+        print(f"📨 이벤트: {self.stats['events']}건 ({rate:.0f}건/초), 묶음 {self.stats['batches']}개")
+        print(f"💤 졸음 감지: {self.stats['drowsy_detections']}회")
+        print(f"🚨 알림 발송: {self.stats['alerts_sent']}회 (알림 규칙으로 건너뜀 {self.stats['alerts_suppressed']}회)")
+        occupied = sum(1 for state in self.seat_states.values() if state['is_occupied'])
+        print(f"📍 좌석: {len(self.seat_states)}석 (착석 {occupied}석)")
+        for node_id, node in sorted(self.nodes.items()):
+            age = now - node['last_seen']
+            mark = "⚠️ " if age > stale_after else "✅"
+            print(f"  {mark} 노드 {node_id}: 이벤트 {node['events']}건 | "
+                  f"마지막 수신 {age:.0f}초 전 | 지연 {node['lag'] * 1000:.0f}ms")
+        print("=" * 70 + "\n")
+
+
+class AggregatorServer:
+    """노드 연결 수신 + 알림 / 대시보드 / 통계 태스크 (asyncio)"""
+
+    def __init__(self, aggregator: EventAggregator, alert=None, config: Dict = None,
+                 dashboard=None, coalescer: Optional[AlertCoalescer] = None):
+        """
+        초기화
+        Args:
+            aggregator: EventAggregator
+            alert: 알림 객체 (TelegramAlert / ConsoleAlert, None이면 알림 없음)
+            config: distributed 설정 딕셔너리
+                listen_host / listen_port: 수신 주소 (기본 127.0.0.1:9200, 인증이 없으므로
+                    다른 PC의 노드를 받으려면 LAN 주소를 직접 지정)
+                stats_interval: 통계 출력 주기 (초, 기본 60)
+                stale_after: 이 시간(초) 넘게 소식 없는 노드 경고 (기본 30)
+                dashboard_interval: 대시보드 갱신 주기 (초, 0이면 사용 안 함)
+                alert_queue_size: 대기 알림 최대 개수 (기본 100)
+            dashboard: GitHubAlert (update_dashboard_data 사용)
+            coalescer: 알림 묶음 (None이면 좌석별로 바로 전송)
+        """
+        self.aggregator = aggregator
+        self.alert = alert
+        self.config = config or {}
+        self.host = self.config.get('listen_host', '127.0.0.1')
+        self.port = self.config.get('listen_port', DEFAULT_PORT)
+        self.stats_interval = self.config.get('stats_interval', 60)
+        self.stale_after = self.config.get('stale_after', 30)
+        self.dashboard_interval = self.config.get('dashboard_interval', 0)
+        self.alert_queue_size = self.config.get('alert_queue_size', 100)
+        self.dashboard = dashboard
+        self.coalescer = coalescer
+
+        self.loop: Optional[asyncio.AbstractEventLoop] = None
+        self.alert_queue: Optional[asyncio.Queue] = None
+        self.server: Optional[asyncio.AbstractServer] = None
+
+    def _enqueue_alert(self, seat_key: str, confidence: float, details: Dict):
+        try:
+            self.alert_queue.put_nowait((seat_key, confidence, details))
+        except asyncio.QueueFull:
+            print(f"⚠️  알림 큐 가득 참, [좌석 {seat_key}] 알림 버림")
+            instrumentation.inc('alerts_dropped_total', seat=seat_key)
+            self.aggregator.finish_alert(seat_key, False)
+
+    async def handle_node(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        """노드 연결 1개 처리 (연결이 끊길 때까지 프레임 수신)"""
+        peer = writer.get_extra_info('peername')
+        try:
+            while True:
+                header = await reader.readexactly(FRAME_HEADER.size)
+                kind, length = FRAME_HEADER.unpack(header)
+                if length > MAX_FRAME_BYTES:
+                    raise ValueError(f"프레임이 너무 큼: {length}바이트")
+                body = await reader.readexactly(length)
+
+                with instrumentation.span('aggregate_batch'):
+                    count = self.aggregator.apply_batch(decode_body(kind, body))
+                instrumentation.inc('aggregator_events_total', count)
+        except asyncio.IncompleteReadError:
+            pass
+        except Exception as e:
+            print(f"❌ 노드 연결 오류 ({peer}): {e}")
+        finally:
+            writer.close()
+
+    async def alert_task(self):
+        """알림 큐 소비 (텔레그램은 같은 루프에서 await, 그 외 알림은 기본 스레드 풀)"""
+        while True:
+            seat_key, confidence, details = await self.alert_queue.get()
+            if self.coalescer is not None:
+                self.coalescer.add(seat_key, confidence, details)
+                self.alert_queue.task_done()
+                continue
+            try:
+                if hasattr(self.alert, 'send_drowsy_alert_async'):
+                    success = await self.alert.send_drowsy_alert_async(seat_key, confidence, details)
+                else:
+                    success = await self.loop.run_in_executor(
+                        None, self.alert.send_drowsy_alert, seat_key, confidence, details)
+            except Exception as e:
+                print(f"❌ [좌석 {seat_key}] 알림 전송 오류: {e}")
+                success = False
+            finally:
+                self.alert_queue.task_done()
+            self.aggregator.finish_alert(seat_key, alert_result(success))
+
+    async def stats_task(self):
+        """주기 통계 출력"""
+        while True:
+            await asyncio.sleep(self.stats_interval)
+            self.aggregator.print_statistics(self.stale_after)
+            if self.coalescer is not None:
+                self.coalescer.print_summary()
+
+    async def dashboard_task(self):
+        """GitHub 대시보드 데이터 주기 갱신 (HTTP 요청은 기본 스레드 풀에서)"""
+        while True:
+            await asyncio.sleep(self.dashboard_interval)
+            data = self.aggregator.dashboard_data()
+            await self.loop.run_in_executor(None, self.dashboard.update_dashboard_data, data)
+
+    async def start(self):
+        """수신 시작 + 백그라운드 태스크 생성"""
+        self.loop = asyncio.get_running_loop()
+        self.alert_queue = asyncio.Queue(maxsize=self.alert_queue_size)
+        if self.alert is not None:
+            self.aggregator.alert_sink = self._enqueue_alert
+
+        self.server = await asyncio.start_server(self.handle_node, self.host, self.port)
+        # port=0이면 OS가 고른 포트
+        self.port = self.server.sockets[0].getsockname()[1]
+        print(f"📡 집계 서버 수신 중: {self.host}:{self.port}")
+        if self.host not in ('127.0.0.1', 'localhost', '::1'):
+            print("⚠️  노드 인증이 없습니다: 이 주소에 접속할 수 있는 누구나 좌석 상태를 바꾸고 알림을 "
+                  "보낼 수 있으니 신뢰할 수 있는 네트워크에서만 여세요")
+
+        self.tasks = [asyncio.create_task(self.stats_task(), name='stats')]
+        if self.alert is not None:
+            self.tasks.append(asyncio.create_task(self.alert_task(), name='alerts'))
+        if self.alert is not None and self.coalescer is not None:
+            self.tasks.append(asyncio.create_task(
+                digest_loop(self.coalescer, self.aggregator.finish_alert), name='digest'))
+        if self.dashboard is not None and self.dashboard_interval > 0:
+            self.tasks.append(asyncio.create_task(self.dashboard_task(), name='dashboard'))
+
+    async def stop(self):
+        """수신 중지, 남은 알림 전송 후 태스크 정리"""
+        self.server.close()
+        await self.server.wait_closed()
+        if self.alert is not None and not self.alert_queue.empty():
+            try:
+                await asyncio.wait_for(self.alert_queue.join(), 10)
+            except asyncio.TimeoutError:
+                print("⚠️  남은 알림 전송 시간 초과")
+        if self.coalescer is not None and self.coalescer.pending:
+            try:
+                results = await asyncio.wait_for(self.coalescer.flush_async(force=True), 10)
+                for seat_key, success in results:
+                    self.aggregator.finish_alert(seat_key, success)
+            except asyncio.TimeoutError:
+                print("⚠️  남은 알림 전송 시간 초과")
+        for task in self.tasks:
+            task.cancel()
+        await asyncio.gather(*self.tasks, return_exceptions=True)
+
+    async def serve_forever(self):
+        """Ctrl+C까지 실행"""
+        await self.start()
+        try:
+            await asyncio.Event().wait()
+        finally:
+            await self.stop()
+            self.aggregator.print_statistics(self.stale_after)
+            if self.coalescer is not None:
+                self.coalescer.print_summary()
+
+
+def parse_address(value: str, default_port: int = DEFAULT_PORT) -> Tuple[str, int]:
+    """ "host:port" 또는 "host" → (host, port)"""
+    host, _, port = value.rpartition(':')
+    if not host:
+        return value, default_port
+    return host, int(port)
+
+
+def main(argv=None):
+    """집계 서버 실행"""
+    parser = argparse.ArgumentParser(description='ViewGuard 분산 모니터링 집계 서버')
+    parser.add_argument('--config', type=str, default='config/settings.json',
+                        help='설정 파일 경로')
+    parser.add_argument('--listen', type=str,
+                        help='수신 주소 "host:port" (기본: distributed.listen_host / listen_port)')
+    args = parser.parse_args(argv)
+
+    try:
+        with open(args.config, 'r', encoding='utf-8') as f:
+            config = json.load(f)
+    except Exception as e:
+        print(f"⚠️  설정 파일 로드 실패, 기본값 사용: {e}")
+        config = {}
+
+    dist_config = dict(config.get('distributed', {}))
+    if args.listen:
+        dist_config['listen_host'], dist_config['listen_port'] = parse_address(args.listen)
+
+    from alert_system import TelegramAlert, ConsoleAlert
+    if 'notification_preferences' in config:
+        from alert_system_multi import MultiAlert
+        alert = MultiAlert(args.config)
+    else:
+        alert = TelegramAlert(args.config)
+    if not alert.enabled:
+        alert = ConsoleAlert()
+        print("📱 콘솔 알림 모드로 실행")
+
+    from alert_outbox import open_outbox
+    outbox_config = config.get('alert_outbox', {})
+    outbox = open_outbox(alert, outbox_config)
+    if outbox is not None:
+        outbox.start()
+
+    dashboard = None
+    if dist_config.get('dashboard_interval', 0) > 0:
+        from alert_system_github import GitHubAlert
+        dashboard = GitHubAlert(args.config)
+        if not dashboard.enabled:
+            dashboard = None
+
+    coalescer = None
+    coalescing_config = config.get('alert_coalescing', {})
+    if coalescing_config.get('enabled', False):
+        coalescer = AlertCoalescer(
+            alert, coalescing_config,
+            cooldown=config.get('detection', {}).get('alert_cooldown', 300)
+        )
+
+    metrics_server = setup_metrics(config.get('metrics', {}))
+    server = AggregatorServer(EventAggregator(config), alert, dist_config, dashboard, coalescer)
+    try:
+        asyncio.run(server.serve_forever())
+    except KeyboardInterrupt:
+        print("\n\n⏹️  집계 서버 종료")
+    finally:
+        if outbox is not None:
+            outbox.stop(outbox_config.get('drain_timeout', 5))
+            outbox.print_summary()
+            outbox.close()
+        if metrics_server:
+            metrics_server.stop()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,223 @@
+"""
+감지 이벤트 바이너리 형식
+좌석 이벤트 1건을 고정 길이 레코드(NumPy structured dtype, 18바이트)로 담아
+묶음 단위로 한 번에 인코딩/디코딩 (JSON 대비 크기 1/5 이하, 파싱 없음)
+
+묶음 = 헤더 + 노드 ID(UTF-8) + 레코드 × 개수
+  헤더: 매직 b'VGEV', 스키마 버전, 레코드 수, 캡처 시각(epoch 초), 노드 ID 길이 (little-endian)
+
+레코드 필드 (없는 값은 NaN):
+  seat        좌석 ID (UTF-8, 최대 8바이트)
+  status      상태 코드 (STATUS_CODES)
+  flags       비트 플래그 (착석 / 졸음 / 눈 감음 / 고개 숙임)
+  confidence  고정소수점 uint16 (× CONFIDENCE_SCALE, 없으면 CONFIDENCE_MISSING)
+              seat_event()가 소수 4자리로 반올림하므로 손실 없음 → 임계값 비교가 JSON과 같음
+  ear, head_tilt, head_pitch   float16 (알림 상세 표시용)
+
+스키마가 바뀌면 SCHEMA_VERSION을 올리고 decode에서 이전 버전 dtype도 읽도록 EVENT_DTYPES에 추가
+"""
+import json
+import struct
+from typing import Dict, List
+
+import numpy as np
+
+
+MAGIC = b'VGEV'
+SCHEMA_VERSION = 2
+
+# 묶음 헤더: 매직, 버전, 레코드 수, 캡처 시각, 노드 ID 길이
+BATCH_HEADER = struct.Struct('<4sBIdB')
+# 노드 ID 최대 길이 (헤더의 길이 필드가 1바이트)
+MAX_NODE_ID_BYTES = 255
+
+# 신뢰도 고정소수점 (0.8 → 8000), 0xFFFF는 값 없음
+CONFIDENCE_SCALE = 10000
+CONFIDENCE_MISSING = 0xFFFF
+
+# 스키마 버전 → 레코드 dtype (1: 신뢰도 float16, 0.8이 0.7998로 바뀌어 임계값 판단이 JSON과 달라짐)
+EVENT_DTYPES = {
+    1: np.dtype([
+        ('seat', 'S8'),
+        ('status', 'u1'),
+        ('flags', 'u1'),
+        ('confidence', '<f2'),
+        ('ear', '<f2'),
+        ('head_tilt', '<f2'),
+        ('head_pitch', '<f2'),
+    ]),
+    2: np.dtype([
+        ('seat', 'S8'),
+        ('status', 'u1'),
+        ('flags', 'u1'),
+        ('confidence', '<u2'),
+        ('ear', '<f2'),
+        ('head_tilt', '<f2'),
+        ('head_pitch', '<f2'),
+    ]),
+}
+EVENT_DTYPE = EVENT_DTYPES[SCHEMA_VERSION]
+
+# 상태 문자열 ↔ 코드 (모르는 상태는 unknown)
+STATUS_CODES = {'empty': 0, 'alert': 1, 'drowsy': 2, 'no_face_detected': 3, 'unknown': 255}
+STATUS_NAMES = {code: name for name, code in STATUS_CODES.items()}
+
+# 플래그 비트 → 이벤트 키
+FLAG_BITS = {'occupied': 1, 'drowsy': 2, 'eyes_closed': 4, 'head_down': 8}
+MEASURE_KEYS = ('confidence', 'ear', 'head_tilt', 'head_pitch')
+
+
+def pack_events(events: List[Dict]) -> np.ndarray:
+    """
+    이벤트 딕셔너리 리스트 → 레코드 배열
+
+    Args:
+        events: distributed.seat_event() 형식 딕셔너리 리스트
+
+    Returns:
+        EVENT_DTYPE 배열
+
+    Raises:
+        ValueError: 좌석 ID가 8바이트를 넘음
+    """
+    records = np.zeros(len(events), dtype=EVENT_DTYPE)
+    seats = []
+    statuses = np.empty(len(events), dtype=np.uint8)
+    flags = np.zeros(len(events), dtype=np.uint8)
+    measures = np.full((len(events), len(MEASURE_KEYS)), np.nan, dtype=np.float64)
+
+    for i, event in enumerate(events):
+        seat = str(event['seat']).encode('utf-8')
+        if len(seat) > 8:
+            raise ValueError(f"좌석 ID가 너무 깁니다 (최대 8바이트): {event['seat']}")
+        seats.append(seat)
+        statuses[i] = STATUS_CODES.get(event.get('status', 'unknown'), STATUS_CODES['unknown'])
+        for key, bit in FLAG_BITS.items():
+            if event.get(key):
+                flags[i] |= bit
+        for j, key in enumerate(MEASURE_KEYS):
+            if key in event:
+                measures[i, j] = event[key]
+
+    records['seat'] = seats
+    records['status'] = statuses
+    records['flags'] = flags
+    confidence = measures[:, 0]
+    fixed = np.rint(np.clip(confidence, 0.0, (CONFIDENCE_MISSING - 1) / CONFIDENCE_SCALE)
+                    * CONFIDENCE_SCALE)
+    records['confidence'] = np.where(np.isnan(confidence), CONFIDENCE_MISSING, fixed)
+    for j, key in enumerate(MEASURE_KEYS[1:], start=1):
+        records[key] = measures[:, j]
+    return records
+
+
+def _measure_column(records: np.ndarray, key: str) -> List[float]:
+    """레코드 측정값 열 → 소수 4자리 float 리스트 (값 없음은 NaN, 고정소수점 신뢰도는 배율 복원)"""
+    column = records[key]
+    if column.dtype.kind == 'u':
+        values = column.astype(np.float64) / CONFIDENCE_SCALE
+        values[column == CONFIDENCE_MISSING] = np.nan
+    else:
+        values = column.astype(np.float32)
+    return values.round(4).tolist()
+
+
+def unpack_events(records: np.ndarray) -> List[Dict]:
+    """
+    레코드 배열 → 이벤트 딕셔너리 리스트 (seat_event() 형식, 신뢰도 외 측정값은 float16 정밀도)
+
+    Args:
+        records: EVENT_DTYPE 배열
+
+    Returns:
+        이벤트 딕셔너리 리스트
+    """
+    seats = [seat.decode('utf-8') for seat in records['seat'].tolist()]
+    columns = [_measure_column(records, key) for key in MEASURE_KEYS]
+    occupied_bit, drowsy_bit = FLAG_BITS['occupied'], FLAG_BITS['drowsy']
+    eyes_bit, head_bit = FLAG_BITS['eyes_closed'], FLAG_BITS['head_down']
+    empty = STATUS_CODES['empty']
+
+    events = []
+    for seat, status, flags, *measures in zip(seats, records['status'].tolist(),
+                                              records['flags'].tolist(), *columns):
+        event = {'seat': seat, 'occupied': bool(flags & occupied_bit),
+                 'status': STATUS_NAMES.get(status, 'unknown')}
+        if status != empty:
+            event['drowsy'] = bool(flags & drowsy_bit)
+        for key, value in zip(MEASURE_KEYS, measures):
+            if value == value:  # NaN 제외
+                event[key] = value
+        # eyes_closed / head_down은 감지 결과(EAR)가 있는 이벤트에만 (seat_event()와 같은 모양)
+        if 'ear' in event:
+            event['eyes_closed'] = bool(flags & eyes_bit)
+            event['head_down'] = bool(flags & head_bit)
+        events.append(event)
+    return events
+
+
+def encode_events(node_id: str, events, ts: float) -> bytes:
+    """
+    이벤트 묶음 → 바이너리
+
+    Args:
+        node_id: 노드 ID
+        events: 이벤트 딕셔너리 리스트 또는 pack_events() 배열
+        ts: 캡처 시각 (epoch 초)
+
+    Returns:
+        헤더 + 노드 ID + 레코드 바이트
+
+    Raises:
+        ValueError: 노드 ID가 255바이트를 넘거나 좌석 ID가 8바이트를 넘음
+    """
+    node = node_id.encode('utf-8')
+    if len(node) > MAX_NODE_ID_BYTES:
+        raise ValueError(f"노드 ID가 너무 깁니다 (최대 {MAX_NODE_ID_BYTES}바이트): {len(node)}바이트")
+    records = events if isinstance(events, np.ndarray) else pack_events(events)
+    return (BATCH_HEADER.pack(MAGIC, SCHEMA_VERSION, len(records), ts, len(node))
+            + node + records.tobytes())
+
+
+def decode_records(data: bytes) -> Dict:
+    """
+    바이너리 묶음 → {'node', 'ts', 'records'} (레코드는 복사 없이 읽기 전용 배열)
+
+    Raises:
+        ValueError: 매직 / 버전 / 길이 오류
+    """
+    if len(data) < BATCH_HEADER.size:
+        raise ValueError("이벤트 묶음이 헤더보다 짧습니다")
+    magic, version, count, ts, node_len = BATCH_HEADER.unpack_from(data)
+    if magic != MAGIC:
+        raise ValueError(f"이벤트 묶음 매직 불일치: {magic!r}")
+    dtype = EVENT_DTYPES.get(version)
+    if dtype is None:
+        raise ValueError(f"지원하지 않는 이벤트 스키마 버전: {version}")
+
+    offset = BATCH_HEADER.size + node_len
+    if len(data) != offset + count * dtype.itemsize:
+        raise ValueError(f"이벤트 묶음 길이 불일치: {len(data)}바이트, 레코드 {count}개")
+
+    node = data[BATCH_HEADER.size:offset].decode('utf-8')
+    records = np.frombuffer(data, dtype=dtype, count=count, offset=offset)
+    return {'node': node, 'ts': ts, 'records': records}
+
+
+def decode_events(data: bytes) -> Dict:
+    """
+    바이너리 묶음 → {'node', 'ts', 'events'} (distributed JSON 본문과 같은 모양)
+    """
+    batch = decode_records(data)
+    return {'node': batch['node'], 'ts': batch['ts'], 'events': unpack_events(batch['records'])}
+
+
+def to_json(data: bytes) -> str:
+    """바이너리 묶음 → JSON 문자열 (기존 JSON 소비자 / 디버깅용)"""
+    return json.dumps(decode_events(data), ensure_ascii=False, separators=(',', ':'))
+
+
+def from_json(text: str) -> bytes:
+    """JSON 문자열 ({'node', 'ts', 'events'}) → 바이너리 묶음"""
+    batch = json.loads(text)
+    return encode_events(str(batch['node']), batch.get('events', []), batch.get('ts', 0.0))
@@ -0,0 +1,223 @@
+"""
+요청 한도를 지키는 GitHub API 클라이언트
+좌석 알림이 몰리거나 대시보드를 자주 갱신해도 GitHub 요청 한도에 걸리지 않도록
+모든 요청을 토큰 버킷으로 내보내고 응답의 한도 헤더를 추적
+
+- 1차 한도: X-RateLimit-Remaining / X-RateLimit-Reset 추적, 0이 되면 reset까지 요청 중지
+- 2차 한도: 403/429 + Retry-After (없으면 60초) 동안 요청 중지
+- 토큰 버킷: 초당 requests_per_second개, 최대 burst개까지 몰아서 (GitHub 권장: 요청을 몰아 보내지 않기)
+- 우선순위: 알림 Issue > 대시보드 갱신 > 일일 리포트
+  알림은 토큰이 생길 때까지 기다리고 (최대 max_wait초), 낮은 우선순위는 기다리지 않고 연기
+  남은 한도가 low_priority_reserve 이하이거나 알림이 대기 중이면 낮은 우선순위는 연기 (None 반환)
+"""
+import threading
+import time
+from typing import Callable, Dict, Optional
+
+import requests
+
+from instrumentation import instrumentation
+
+
+PRIORITY_ALERT = 0
+PRIORITY_DASHBOARD = 1
+PRIORITY_SUMMARY = 2
+
+PRIORITY_NAMES = {
+    PRIORITY_ALERT: 'alert',
+    PRIORITY_DASHBOARD: 'dashboard',
+    PRIORITY_SUMMARY: 'summary',
+}
+
+# 2차 한도 응답에 Retry-After가 없을 때 대기 (GitHub 문서: 최소 1분)
+SECONDARY_LIMIT_WAIT = 60
+
+
+class GitHubClient:
+    """토큰 버킷 + 한도 헤더 추적 + 우선순위 연기"""
+
+    def __init__(self, token: str, config: Dict = None,
+                 clock: Callable[[], float] = time.monotonic):
+        """
+        초기화
+        Args:
+            token: GitHub 토큰
+            config: github.rate_limit 설정 딕셔너리
+                requests_per_second: 토큰 충전 속도 (기본 1.0)
+                burst: 버킷 크기 (기본 5)
+                low_priority_reserve: 남은 한도가 이 이하면 대시보드 / 리포트 연기 (기본 200,
+                    리포트는 두 배까지 남겨 둠)
+                alert_token_reserve: 낮은 우선순위가 쓰지 않고 남겨 두는 버킷 토큰 수 (기본 1)
+                max_wait: 알림 요청이 토큰 / 한도 해제를 기다리는 최대 시간 (초, 기본 30)
+            clock: 단조 시계 (테스트용 교체)
+        """
+        config = config or {}
+        self.rate = config.get('requests_per_second', 1.0)
+        self.burst = config.get('burst', 5)
+        self.low_priority_reserve = config.get('low_priority_reserve', 200)
+        self.alert_token_reserve = config.get('alert_token_reserve', 1)
+        self.max_wait = config.get('max_wait', 30)
+        self.clock = clock
+
+        self.session = requests.Session()
+        self.session.headers.update({
+            'Authorization': f'token {token}',
+            'Accept': 'application/vnd.github.v3+json'
+        })
+
+        self.tokens = float(self.burst)
+        self._refilled_at = clock()
+        self._cond = threading.Condition()
+        self._waiting = {priority: 0 for priority in PRIORITY_NAMES}
+
+        # 응답 헤더에서 읽은 1차 한도 (모르면 None)
+        self.limit: Optional[int] = None
+        self.remaining: Optional[int] = None
+        self.reset_at: Optional[float] = None  # epoch 초
+        # 1차 한도 소진 / 2차 한도로 요청을 멈출 시각 (단조 시계)
+        self.blocked_until = 0.0
+
+        self.stats = {
+            'requests': {name: 0 for name in PRIORITY_NAMES.values()},
+            'deferred': {name: 0 for name in PRIORITY_NAMES.values()},
+            'throttled': 0,
+            'waited': 0.0,
+        }
+
+    def _refill(self, now: float):
+        self.tokens = min(self.burst, self.tokens + (now - self._refilled_at) * self.rate)
+        self._refilled_at = now
+
+    def _reserve_for(self, priority: int) -> int:
+        """우선순위별로 남겨 둘 1차 한도 (알림은 0)"""
+        return self.low_priority_reserve * priority
+
+    def defer_reason(self, priority: int, now: float = None) -> Optional[str]:
+        """
+        낮은 우선순위 요청을 지금 연기해야 하는 이유
+
+        Returns:
+            이유 문자열, 보내도 되면 None
+        """
+        if priority == PRIORITY_ALERT:
+            return None
+        now = self.clock() if now is None else now
+
+        if now < self.blocked_until:
+            return f"요청 한도 대기 중 ({self.blocked_until - now:.0f}초)"
+        if self.reset_at is not None and time.time() >= self.reset_at:
+            # reset 시각이 지났으면 예전 헤더 값은 의미 없음
+            self.remaining = self.reset_at = None
+        if self.remaining is not None and self.remaining <= self._reserve_for(priority):
+            return f"남은 요청 한도 부족 ({self.remaining}/{self.limit})"
+        if any(self._waiting[p] for p in PRIORITY_NAMES if p < priority):
+            return "우선 요청 대기 중"
+        self._refill(now)
+        if self.tokens < 1 + self.alert_token_reserve:
+            return "요청 속도 제한"
+        return None
+
+    def acquire(self, priority: int = PRIORITY_ALERT) -> bool:
+        """
+        요청 1건 토큰 받기
+
+        Args:
+            priority: PRIORITY_ALERT / PRIORITY_DASHBOARD / PRIORITY_SUMMARY
+
+        Returns:
+            보내도 되면 True, 연기해야 하면 False
+        """
+        with self._cond:
+            if priority != PRIORITY_ALERT:
+                if self.defer_reason(priority) is not None:
+                    return False
+                self.tokens -= 1
+                return True
+
+            start = self.clock()
+            self._waiting[priority] += 1
+            try:
+                while True:
+                    now = self.clock()
+                    self._refill(now)
+                    wait = max(self.blocked_until - now, 0.0)
+                    if wait == 0 and self.tokens >= 1:
+                        self.tokens -= 1
+                        self.stats['waited'] += now - start
+                        return True
+                    if wait == 0:
+                        wait = (1 - self.tokens) / self.rate
+                    if now - start + wait > self.max_wait:
+                        return False
+                    self._cond.wait(wait)
+            finally:
+                self._waiting[priority] -= 1
+
+    def update_limits(self, response: requests.Response):
+        """응답 헤더로 한도 상태 갱신 (1차 한도 소진 / 2차 한도면 요청 중지 시각 설정)"""
+        headers = response.headers
+        now = self.clock()
+        with self._cond:
+            if 'X-RateLimit-Remaining' in headers:
+                self.remaining = int(headers['X-RateLimit-Remaining'])
+                self.limit = int(headers.get('X-RateLimit-Limit', self.limit or 0)) or None
+                if 'X-RateLimit-Reset' in headers:
+                    self.reset_at = float(headers['X-RateLimit-Reset'])
+                instrumentation.set_gauge('github_ratelimit_remaining', self.remaining)
+
+            block = 0.0
+            if response.status_code in (403, 429):
+                retry_after = headers.get('Retry-After')
+                if retry_after is not None:
+                    block = float(retry_after)
+                elif self.remaining == 0 and self.reset_at is not None:
+                    block = self.reset_at - time.time()
+                elif 'rate limit' in response.text.lower():
+                    block = SECONDARY_LIMIT_WAIT
+                if block > 0:
+                    self.stats['throttled'] += 1
+                    instrumentation.inc('github_throttled_total')
+                    print(f"⚠️  GitHub 요청 한도 초과 ({response.status_code}), {block:.0f}초 대기")
+            elif self.remaining == 0 and self.reset_at is not None:
+                block = self.reset_at - time.time()
+
+            if block > 0:
+                self.blocked_until = max(self.blocked_until, now + block)
+            self._cond.notify_all()
+
+    def request(self, method: str, url: str, priority: int = PRIORITY_ALERT,
+                **kwargs) -> Optional[requests.Response]:
+        """
+        한도 안에서 API 요청
+
+        Args:
+            method: HTTP 메서드
+            url: 전체 URL
+            priority: 요청 우선순위
+            **kwargs: requests 인자 (json, params, timeout 등)
+
+        Returns:
+            응답, 연기했으면 None (연결 오류는 requests 예외 그대로)
+        """
+        name = PRIORITY_NAMES[priority]
+        if not self.acquire(priority):
+            self.stats['deferred'][name] += 1
+            instrumentation.inc('github_requests_deferred_total', priority=name)
+            return None
+
+        kwargs.setdefault('timeout', 10)
+        response = self.session.request(method, url, **kwargs)
+        self.update_limits(response)
+        self.stats['requests'][name] += 1
+        instrumentation.inc('github_requests_total', priority=name,
+                            status=str(response.status_code))
+        return response
+
+    def print_summary(self):
+        """한도 / 요청 통계 출력"""
+        s = self.stats
+        sent = ', '.join(f"{name} {count}" for name, count in s['requests'].items())
+        deferred = ', '.join(f"{name} {count}" for name, count in s['deferred'].items() if count)
+        remaining = f"{self.remaining}/{self.limit}" if self.remaining is not None else "알 수 없음"
+        print(f"🐙 GitHub 요청: {sent} | 연기: {deferred or '없음'} | "
+              f"한도 초과 {s['throttled']}회 | 남은 한도 {remaining}")
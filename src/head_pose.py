@@ -0,0 +1,112 @@
+"""
+solvePnP 기반 머리 자세 추정
+고정된 3D 얼굴 모델(코, 턱, 눈꼬리, 입꼬리)과 2D 랜드마크를 맞춰 pitch/yaw/roll을 계산
+코/이마/턱 세로 비율과 달리 ROI 크기나 카메라 각도에 따라 기준값이 흔들리지 않음
+
+카메라 내부 파라미터는 모르므로 ROI 크기로 근사 (초점거리 = ROI 너비, 주점 = ROI 중심)하고
+좌석마다 ROI 크기가 고정이므로 크기별로 한 번만 만들어 재사용
+"""
+import cv2
+import numpy as np
+from typing import Dict, Tuple
+
+# 3D 얼굴 모델 (mm 근사, 이미지 축과 같은 방향: x 오른쪽, y 아래, z 카메라에서 멀어지는 방향)
+# MediaPipe 468 포인트 인덱스 → 모델 좌표
+MODEL_LANDMARKS = [1, 152, 33, 263, 61, 291]   # 코끝, 턱, 오른눈 바깥, 왼눈 바깥, 오른입꼬리, 왼입꼬리
+MODEL_POINTS = np.array([
+    [0.0, 0.0, 0.0],
+    [0.0, 330.0, 65.0],
+    [-225.0, -170.0, 135.0],
+    [225.0, -170.0, 135.0],
+    [-150.0, 150.0, 125.0],
+    [150.0, 150.0, 125.0],
+], dtype=np.float64)
+
+# SQPnP는 초기값 없이 전역해를 찾고 반복법보다 빠름 (OpenCV 4.5.3+)
+PNP_FLAGS = getattr(cv2, 'SOLVEPNP_SQPNP', cv2.SOLVEPNP_ITERATIVE)
+
+
+def rotation_to_euler(rvecs: np.ndarray) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    회전 벡터 → 오일러 각 (여러 얼굴 일괄, Rodrigues 공식 벡터 연산)
+
+    Args:
+        rvecs: (얼굴 수, 3) 회전 벡터
+
+    Returns:
+        (pitch, yaw, roll) 각 (얼굴 수,) 도 단위
+        pitch는 고개를 숙일수록 커짐
+    """
+    theta = np.linalg.norm(rvecs, axis=1)
+    axis = rvecs / np.where(theta == 0, 1.0, theta)[:, None]
+
+    k = np.zeros((len(rvecs), 3, 3))
+    k[:, 0, 1], k[:, 0, 2] = -axis[:, 2], axis[:, 1]
+    k[:, 1, 0], k[:, 1, 2] = axis[:, 2], -axis[:, 0]
+    k[:, 2, 0], k[:, 2, 1] = -axis[:, 1], axis[:, 0]
+
+    sin = np.sin(theta)[:, None, None]
+    cos = np.cos(theta)[:, None, None]
+    rotation = np.eye(3) + sin * k + (1 - cos) * (k @ k)
+
+    pitch = np.arctan2(rotation[:, 2, 1], rotation[:, 2, 2])
+    yaw = np.arctan2(-rotation[:, 2, 0], np.hypot(rotation[:, 2, 1], rotation[:, 2, 2]))
+    roll = np.arctan2(rotation[:, 1, 0], rotation[:, 0, 0])
+    return np.degrees(pitch), np.degrees(yaw), np.degrees(roll)
+
+
+class HeadPoseEstimator:
+    """3D 얼굴 모델 + solvePnP 머리 자세 추정기"""
+
+    def __init__(self):
+        self.index = np.array(MODEL_LANDMARKS)
+        # (너비, 높이) → 카메라 행렬
+        self._camera_cache: Dict[Tuple[int, int], np.ndarray] = {}
+
+    def camera_matrix(self, width: int, height: int) -> np.ndarray:
+        """
+        ROI 크기로 근사한 카메라 내부 파라미터 (크기별 캐시)
+
+        Args:
+            width, height: ROI 크기 (픽셀)
+
+        Returns:
+            3x3 카메라 행렬
+        """
+        key = (int(width), int(height))
+        matrix = self._camera_cache.get(key)
+        if matrix is None:
+            focal = float(width)
+            matrix = np.array([
+                [focal, 0.0, width / 2.0],
+                [0.0, focal, height / 2.0],
+                [0.0, 0.0, 1.0]
+            ])
+            self._camera_cache[key] = matrix
+        return matrix
+
+    def estimate(self, points: np.ndarray, sizes: np.ndarray) -> Dict[str, np.ndarray]:
+        """
+        머리 자세 추정 (한 사이클의 얼굴 일괄)
+
+        Args:
+            points: (얼굴 수, 포인트 수, 2) 픽셀 좌표
+            sizes: (얼굴 수, 2) 이미지(ROI) 너비, 높이
+
+        Returns:
+            {'head_pitch', 'head_yaw', 'head_roll'}: 각 (얼굴 수,) 도 단위
+            (solvePnP 실패한 얼굴은 0)
+        """
+        # solvePnP는 연속 메모리 배열만 받음 (팬시 인덱싱 결과는 stride가 바뀔 수 있음)
+        image_points = np.ascontiguousarray(points[:, self.index], dtype=np.float64)   # (F, 6, 2)
+        rvecs = np.zeros((len(points), 3))
+
+        for i, (width, height) in enumerate(sizes):
+            ok, rvec, _ = cv2.solvePnP(MODEL_POINTS, image_points[i],
+                                       self.camera_matrix(width, height), None,
+                                       flags=PNP_FLAGS)
+            if ok:
+                rvecs[i] = rvec.ravel()
+
+        pitch, yaw, roll = rotation_to_euler(rvecs)
+        return {'head_pitch': pitch, 'head_yaw': yaw, 'head_roll': roll}
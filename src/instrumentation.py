@@ -0,0 +1,464 @@
+"""
+파이프라인 구간별 시간 측정 및 메트릭 노출
+캡처 → ROI 추출 → 빈 좌석 체크 → 색 변환 → FaceMesh → 지표 계산 → 상태 갱신 → 알림
+각 구간을 span으로 감싸 단조 시계(perf_counter)로 측정하고,
+고정 버킷 히스토그램 / 좌석별 카운터를 로컬 /metrics 엔드포인트(Prometheus 텍스트 형식)로 제공
+"""
+import time
+import threading
+from bisect import bisect_left
+from collections import defaultdict, deque
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List, Optional, Tuple
+
+
+# 히스토그램 버킷 상한 (초) - 0.5ms ~ 10s
+DEFAULT_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05,
+                   0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+METRIC_PREFIX = 'viewguard'
+
+
+class _NullSpan:
+    """측정 비활성화 시 사용하는 빈 span"""
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        return False
+
+
+_NULL_SPAN = _NullSpan()
+
+
+class _Span:
+    """구간 시간 측정"""
+
+    __slots__ = ('owner', 'name', 'start')
+
+    def __init__(self, owner: 'Instrumentation', name: str):
+        self.owner = owner
+        self.name = name
+        self.start = 0.0
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.owner.record(self.name, time.perf_counter() - self.start)
+        return False
+
+
+class _Histogram:
+    """고정 버킷 히스토그램 (누적 카운트는 출력 시 계산)"""
+
+    __slots__ = ('buckets', 'counts', 'sum', 'count')
+
+    def __init__(self, buckets: Tuple[float, ...]):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)   # 마지막 칸 = +Inf
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float):
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+    def quantile(self, q: float) -> float:
+        """버킷 상한 기준 근사 분위수 (초)"""
+        if self.count == 0:
+            return 0.0
+        target = q * self.count
+        running = 0
+        for i, c in enumerate(self.counts):
+            running += c
+            if running >= target:
+                return self.buckets[i] if i < len(self.buckets) else float('inf')
+        return float('inf')
+
+
+def _label_key(labels: Dict) -> Tuple:
+    return tuple(sorted((k, str(v)) for k, v in labels.items()))
+
+
+def _format_labels(key: Tuple, extra: Tuple = ()) -> str:
+    items = key + extra
+    if not items:
+        return ''
+    body = ','.join(
+        '{}="{}"'.format(k, v.replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n'))
+        for k, v in items
+    )
+    return '{' + body + '}'
+
+
+class Instrumentation:
+    """구간별 소요 시간 / 카운터 / 게이지 수집기"""
+
+    def __init__(self, enabled: bool = False, sample_window: Optional[int] = 4096,
+                 buckets: Tuple[float, ...] = DEFAULT_BUCKETS):
+        """
+        초기화
+        Args:
+            enabled: 측정 활성화 여부 (비활성화 시 span 비용은 속성 조회 한 번)
+            sample_window: 구간별 원시 측정값 보관 개수 (None이면 전부 보관, 벤치마크용)
+            buckets: 히스토그램 버킷 상한 (초)
+        """
+        self.enabled = enabled
+        self.sample_window = sample_window
+        self.buckets = tuple(sorted(buckets))
+        self._lock = threading.Lock()
+        
+        # 시작 → 첫 캡처 시간 (reset과 무관한 프로세스 단위 값)
+        # 기본 기준은 이 모듈 로딩 시각, CLI는 mark_boot로 더 이른 시각을 넘김
+        self.boot_at = time.perf_counter()
+        self.startup_seconds: Optional[float] = None
+        # 작업자(감지기)별 준비 상태 - 예열 전 False, 예열 후 True (/ready 응답 기준)
+        self.readiness: Dict[str, bool] = {}
+        self.reset()
+
+    def configure(self, enabled: bool = None, sample_window: Optional[int] = -1):
+        """
+        실행 중 설정 변경 (측정값은 유지, 보관 개수 변경 시 원시값만 초기화)
+
+        Args:
+            enabled: 측정 활성화 여부 (None이면 유지)
+            sample_window: 원시 측정값 보관 개수 (-1이면 유지)
+        """
+        if enabled is not None:
+            self.enabled = bool(enabled)
+        if sample_window != -1 and sample_window != self.sample_window:
+            with self._lock:
+                self.sample_window = sample_window
+                self.samples = defaultdict(self._new_window)
+
+    def _new_window(self):
+        return deque(maxlen=self.sample_window)
+
+    def span(self, name: str):
+        """
+        구간 측정 컨텍스트
+
+        사용 예:
+            with instrumentation.span('face_mesh'):
+                results = face_mesh.process(rgb)
+        """
+        if not self.enabled:
+            return _NULL_SPAN
+        return _Span(self, name)
+
+    def record(self, name: str, seconds: float):
+        """측정값 직접 기록"""
+        if not self.enabled:
+            return
+        with self._lock:
+            self.samples[name].append(seconds)
+            histogram = self.histograms.get(name)
+            if histogram is None:
+                histogram = self.histograms[name] = _Histogram(self.buckets)
+            histogram.observe(seconds)
+
+    def inc(self, name: str, value: float = 1, **labels):
+        """
+        카운터 증가
+
+        사용 예:
+            instrumentation.inc('seat_checks_total', seat='A1')
+        """
+        if not self.enabled:
+            return
+        key = (name, _label_key(labels))
+        with self._lock:
+            self.counters[key] = self.counters.get(key, 0) + value
+
+    def set_gauge(self, name: str, value: float, **labels):
+        """게이지 값 설정"""
+        if not self.enabled:
+            return
+        with self._lock:
+            self.gauges[(name, _label_key(labels))] = value
+
+    def mark_boot(self, started_at: float):
+        """
+        프로세스 시작 시각 지정 (무거운 import 전에 기록한 perf_counter 값)
+
+        Args:
+            started_at: time.perf_counter() 값
+        """
+        self.boot_at = started_at
+
+    def mark_first_capture(self) -> Optional[float]:
+        """
+        첫 캡처 완료 기록 (처음 한 번만 출력, 이후 호출은 무시)
+
+        Returns:
+            시작 → 첫 캡처 시간 (초), 이미 기록했으면 None
+        """
+        if self.startup_seconds is not None:
+            return None
+        self.startup_seconds = time.perf_counter() - self.boot_at
+        self.set_gauge('startup_seconds', self.startup_seconds)
+        print(f"⏱️  시작 → 첫 캡처: {self.startup_seconds:.2f}초")
+        return self.startup_seconds
+
+    def set_ready(self, worker: str, ready: bool):
+        """
+        작업자 준비 상태 기록 (측정 활성화 여부와 무관)
+
+        Args:
+            worker: 작업자 이름 (감지기 / 스트림 이름)
+            ready: 예열 완료 여부
+        """
+        with self._lock:
+            self.readiness[worker] = bool(ready)
+
+    @property
+    def ready(self) -> bool:
+        """모든 작업자 예열 완료 여부 (등록된 작업자가 없으면 False)"""
+        with self._lock:
+            return bool(self.readiness) and all(self.readiness.values())
+
+    def pending_workers(self) -> List[str]:
+        """아직 준비되지 않은 작업자 이름"""
+        with self._lock:
+            return [name for name, ready in self.readiness.items() if not ready]
+
+    def reset(self):
+        """측정값 초기화"""
+        with self._lock:
+            self.samples: Dict[str, deque] = defaultdict(self._new_window)
+            self.histograms: Dict[str, _Histogram] = {}
+            self.counters: Dict[Tuple, float] = {}
+            self.gauges: Dict[Tuple, float] = {}
+            self.started_at = time.time()
+
+    def summary(self) -> Dict[str, Dict[str, float]]:
+        """
+        구간별 통계 (보관 중인 원시 측정값 기준)
+
+        Returns:
+            {구간: {count, total_s, mean_ms, p50_ms, p90_ms, p99_ms, max_ms}}
+        """
+        with self._lock:
+            snapshot = {name: list(values) for name, values in self.samples.items()}
+
+        result = {}
+
+        for name, values in snapshot.items():
+            if not values:
+                continue
+            ordered = sorted(values)
+            count = len(ordered)
+
+            def pct(p):
+                return ordered[min(count - 1, int(round(p / 100 * (count - 1))))] * 1000
+
+            result[name] = {
+                'count': count,
+                'total_s': sum(ordered),
+                'mean_ms': sum(ordered) / count * 1000,
+                'p50_ms': pct(50),
+                'p90_ms': pct(90),
+                'p99_ms': pct(99),
+                'max_ms': ordered[-1] * 1000
+            }
+
+        return result
+
+    def print_summary(self):
+        """구간별 지연 요약 출력 (print_statistics에서 호출)"""
+        if not self.histograms:
+            return
+
+        with self._lock:
+            stages = sorted(self.histograms.items(),
+                            key=lambda item: item[1].sum, reverse=True)
+            rows = [(name, h.count, h.sum / h.count * 1000,
+                     h.quantile(0.5) * 1000, h.quantile(0.9) * 1000)
+                    for name, h in stages if h.count]
+
+        print("구간별 처리 시간 (p50/p90은 버킷 상한 기준):")
+        for name, count, mean_ms, p50_ms, p90_ms in rows:
+            print(f"  {name:<20} {count:>8}회 | 평균 {mean_ms:7.2f}ms | "
+                  f"p50 ≤{p50_ms:g}ms | p90 ≤{p90_ms:g}ms")
+        print()
+
+    def render_prometheus(self) -> str:
+        """Prometheus 텍스트 형식으로 전체 메트릭 출력"""
+        lines: List[str] = []
+
+        with self._lock:
+            histograms = [(name, list(h.counts), h.sum, h.count)
+                          for name, h in self.histograms.items()]
+            counters = sorted(self.counters.items())
+            gauges = sorted(self.gauges.items())
+            uptime = time.time() - self.started_at
+            readiness = sorted(self.readiness.items())
+
+        lines.append(f'# HELP {METRIC_PREFIX}_instrumentation_enabled 측정 활성화 여부')
+        lines.append(f'# TYPE {METRIC_PREFIX}_instrumentation_enabled gauge')
+        lines.append(f'{METRIC_PREFIX}_instrumentation_enabled {int(self.enabled)}')
+        lines.append(f'# TYPE {METRIC_PREFIX}_uptime_seconds gauge')
+        lines.append(f'{METRIC_PREFIX}_uptime_seconds {uptime:.3f}')
+        lines.append(f'# HELP {METRIC_PREFIX}_ready 모든 감지기 예열 완료 여부')
+        lines.append(f'# TYPE {METRIC_PREFIX}_ready gauge')
+        lines.append(f'{METRIC_PREFIX}_ready {int(bool(readiness) and all(r for _, r in readiness))}')
+        if readiness:
+            lines.append(f'# TYPE {METRIC_PREFIX}_worker_ready gauge')
+            for worker, ready in readiness:
+                lines.append(f'{METRIC_PREFIX}_worker_ready{_format_labels((("worker", worker),))} {int(ready)}')
+
+        if histograms:
+            metric = f'{METRIC_PREFIX}_stage_seconds'
+            lines.append(f'# HELP {metric} 파이프라인 구간별 소요 시간')
+            lines.append(f'# TYPE {metric} histogram')
+            for name, counts, total, count in sorted(histograms):
+                stage = (('stage', name),)
+                running = 0
+                for bound, c in zip(self.buckets, counts):
+                    running += c
+                    lines.append(f'{metric}_bucket{_format_labels(stage, (("le", f"{bound:g}"),))} {running}')
+                lines.append(f'{metric}_bucket{_format_labels(stage, (("le", "+Inf"),))} {count}')
+                lines.append(f'{metric}_sum{_format_labels(stage)} {total:.6f}')
+                lines.append(f'{metric}_count{_format_labels(stage)} {count}')
+
+        declared = set()
+        for (name, key), value in counters:
+            metric = f'{METRIC_PREFIX}_{name}'
+            if metric not in declared:
+                lines.append(f'# TYPE {metric} counter')
+                declared.add(metric)
+            lines.append(f'{metric}{_format_labels(key)} {value:g}')
+
+        for (name, key), value in gauges:
+            metric = f'{METRIC_PREFIX}_{name}'
+            if metric not in declared:
+                lines.append(f'# TYPE {metric} gauge')
+                declared.add(metric)
+            lines.append(f'{metric}{_format_labels(key)} {value:g}')
+
+        return '\n'.join(lines) + '\n'
+
+
+# 프로세스 전역 수집기 (캡처/감지기/모니터가 공유)
+instrumentation = Instrumentation()
+
+
+class _MetricsHandler(BaseHTTPRequestHandler):
+    """
+    GET  /metrics  → Prometheus 텍스트
+    GET  /ready    → 모든 감지기 예열 완료 시 200, 아니면 503
+    POST /enable   → 측정 켜기
+    POST /disable  → 측정 끄기
+    POST /reset    → 측정값 초기화
+    """
+
+    def _reply(self, status: int, body: str,
+               content_type: str = 'text/plain; version=0.0.4; charset=utf-8'):
+        data = body.encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', content_type)
+        self.send_header('Content-Length', str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def do_GET(self):
+        if self.path.split('?')[0] == '/metrics':
+            self._reply(200, self.server.instrumentation.render_prometheus())
+        elif self.path.split('?')[0] == '/ready':
+            target = self.server.instrumentation
+            if target.ready:
+                self._reply(200, 'ready\n')
+            else:
+                pending = target.pending_workers()
+                self._reply(503, f"warming up: {', '.join(pending) or 'starting'}\n")
+        else:
+            self._reply(404, 'not found\n')
+
+    def do_POST(self):
+        target = self.server.instrumentation
+        path = self.path.split('?')[0]
+
+        if path == '/enable':
+            target.configure(enabled=True)
+        elif path == '/disable':
+            target.configure(enabled=False)
+        elif path == '/reset':
+            target.reset()
+        else:
+            self._reply(404, 'not found\n')
+            return
+        self._reply(200, f'enabled={int(target.enabled)}\n')
+
+    def log_message(self, format, *args):
+        # 스크레이프마다 콘솔 출력 방지
+        pass
+
+
+class MetricsServer:
+    """로컬 메트릭 HTTP 서버 (데몬 스레드)"""
+
+    def __init__(self, host: str = '127.0.0.1', port: int = 9108,
+                 collector: Instrumentation = None):
+        """
+        초기화
+        Args:
+            host: 바인드 주소 (기본 로컬 전용)
+            port: 포트 (0이면 임의 포트)
+            collector: 노출할 수집기 (None이면 전역 수집기)
+        """
+        self.host = host
+        self.port = port
+        self.collector = collector or instrumentation
+        self.httpd: Optional[ThreadingHTTPServer] = None
+        self.thread: Optional[threading.Thread] = None
+
+    def start(self) -> bool:
+        """서버 시작"""
+        try:
+            self.httpd = ThreadingHTTPServer((self.host, self.port), _MetricsHandler)
+        except OSError as e:
+            print(f"⚠️  메트릭 서버 시작 실패 ({self.host}:{self.port}): {e}")
+            return False
+
+        self.httpd.daemon_threads = True
+        self.httpd.instrumentation = self.collector
+        self.port = self.httpd.server_address[1]
+        self.thread = threading.Thread(target=self.httpd.serve_forever,
+                                       name='metrics-server', daemon=True)
+        self.thread.start()
+        print(f"📈 메트릭 엔드포인트: http://{self.host}:{self.port}/metrics")
+        return True
+
+    def stop(self):
+        """서버 종료"""
+        if self.httpd is not None:
+            self.httpd.shutdown()
+            self.httpd.server_close()
+            self.httpd = None
+
+
+def setup_metrics(config: Dict) -> Optional[MetricsServer]:
+    """
+    settings.json의 metrics 섹션으로 측정 활성화 및 엔드포인트 시작
+
+    Args:
+        config: metrics 설정 딕셔너리
+            {"enabled": true, "http_host": "127.0.0.1", "http_port": 9108}
+
+    Returns:
+        실행 중인 MetricsServer (http_port 미설정 시 None)
+        측정이 꺼져 있어도 엔드포인트는 열어 두어 POST /enable로 켤 수 있음
+    """
+    config = config or {}
+    instrumentation.configure(enabled=config.get('enabled', False))
+
+    port = config.get('http_port')
+    if port is None:
+        return None
+
+    server = MetricsServer(config.get('http_host', '127.0.0.1'), port)
+    return server if server.start() else None
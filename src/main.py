@@ -7,74 +7,145 @@ import numpy as np
 import time
 import json
 import os
+import socket
 from datetime import datetime, timedelta
-from typing import Dict, Optional
+from typing import Dict, List, Optional, Tuple
 
 from advanced_detector import AdvancedDrowsinessDetector
 from capture import ViewGuardCapture
+from config_reloader import ConfigReloader, diff_seats
+from detection_engine import warmup_worker
+from distributed import NodePublisher, parse_address, seat_event
+from alert_coalescer import SUPPRESSED, AlertCoalescer, alert_result
+from alert_outbox import open_outbox
 from alert_system import TelegramAlert, ConsoleAlert
+from instrumentation import instrumentation, setup_metrics
+from scheduler import CycleScheduler
 
 
 class AccurateStudentMonitor:
     """고정확도 학생 모니터링 시스템"""
     
-    def __init__(self, config_path: str = 'config/settings.json'):
+    def __init__(self, config_path: str = 'config/settings.json',
+                 capture: Optional[ViewGuardCapture] = None):
         """
         초기화
         Args:
             config_path: 설정 파일 경로
+            capture: 캡처 객체 (None이면 실제 화면 캡처, 재생/합성 입력 주입용)
         """
         print("=" * 70)
         print("🎯 ViewGuard Student Monitor - 고정확도 졸음 감지 시스템")
         print("=" * 70)
         
         # 설정 로드
+        self.config_path = config_path
         self.config = self.load_config(config_path)
         detection_config = self.config.get('detection', {})
         
+        # 빈 좌석 감지 설정
+        seat_config = self.config.get('seat_detection', {})
+        
         # 컴포넌트 초기화
         print("📦 컴포넌트 초기화 중...")
-        self.capture = ViewGuardCapture()
-        self.detector = AdvancedDrowsinessDetector(detection_config)
-        
-        # 알림 시스템
-        self.alert = TelegramAlert(config_path)
-        if not self.alert.enabled:
+        self.capture = capture or ViewGuardCapture(
+            background_config=seat_config.get('background_model', {})
+        )
+        # 좌석 수가 많으면 profile=auto가 fast 프로필 선택
+        self.detector = AdvancedDrowsinessDetector(
+            detection_config, seat_count=self.capture.get_seat_count()
+        )
+        
+        # 알림 시스템 (notification_preferences가 있으면 다중 채널 + 알림 규칙)
+        if self.capture.offline:
+            # 재생 / 합성 입력은 실제 알림 채널 / 아웃박스를 쓰지 않음
             self.alert = ConsoleAlert()
-            print("📱 콘솔 알림 모드로 실행")
+            print("📱 재생 / 합성 입력: 콘솔 알림 모드로 실행")
+        else:
+            if 'notification_preferences' in self.config:
+                from alert_system_multi import MultiAlert
+                self.alert = MultiAlert(config_path)
+            else:
+                self.alert = TelegramAlert(config_path)
+            if not self.alert.enabled:
+                self.alert = ConsoleAlert()
+                print("📱 콘솔 알림 모드로 실행")
+        
+        # 알림 아웃박스: 전송할 알림을 디스크에 먼저 기록, 재시도 스레드가 백오프로 전송 (네트워크 단절 대비)
+        self.outbox = None
+        if not self.capture.offline:
+            self.outbox = open_outbox(self.alert, self.config.get('alert_outbox', {}))
+        
+        # 알림 스냅샷: 알림 시점 좌석 ROI를 스냅샷 스레드에서 JPEG로 한 번 인코딩해 모든 채널이 공유
+        self.snapshots = None
+        snapshot_config = self.config.get('alert_snapshot', {})
+        if snapshot_config.get('enabled', False):
+            from snapshot import SnapshotStore
+            self.snapshots = SnapshotStore(snapshot_config)
         
         # 좌석별 상태 추적
         self.seat_states: Dict[str, Dict] = {}
         
+        # 알림 전달 함수 (None이면 send_alert에서 바로 전송, 비동기 런타임이 큐 연결)
+        self.alert_sink = None
+        
+        # 알림 묶음 전송: 여러 좌석 알림을 창 단위로 모아 채널별 요약 1건으로 (alert_coalescing)
+        self.coalescer = None
+        coalescing_config = self.config.get('alert_coalescing', {})
+        if coalescing_config.get('enabled', False):
+            self.coalescer = AlertCoalescer(
+                self.alert, coalescing_config,
+                cooldown=detection_config.get('alert_cooldown', 300)
+            )
+        
+        # 분산 모드 노드: 좌석 감지 이벤트를 집계 서버로 전송 (상태/알림은 집계 서버 담당)
+        self.publisher = None
+        self.pending_events = []
+        
         # 설정값
-        self.CONFIDENCE_THRESHOLD = detection_config.get('confidence_threshold', 0.75)
-        self.DROWSY_THRESHOLD = detection_config.get('drowsy_count_threshold', 5)
-        self.CHECK_INTERVAL = detection_config.get('check_interval', 2)
-        self.ALERT_COOLDOWN = detection_config.get('alert_cooldown', 300)
+        self.load_thresholds(self.config)
         
-        # 빈 좌석 감지 설정
-        seat_config = self.config.get('seat_detection', {})
-        self.BRIGHTNESS_THRESHOLD = seat_config.get('brightness_threshold', 180)
-        self.EDGE_DENSITY_THRESHOLD = seat_config.get('edge_density_threshold', 0.05)
+        # 절대 기한 주기 스케줄러 (주기 초과 시 성능 저하 단계 전환)
+        self.scheduler = CycleScheduler(self.CHECK_INTERVAL, self.config.get('scheduler', {}))
+        
+        # 설정 파일 핫 리로드 (사이클 사이에 적용, 합성 입력은 좌석 감시 안 함)
+        self.reloader = ConfigReloader(
+            config_path,
+            self.capture.config_path if self.capture.seats_from_file else None,
+            self.config.get('config_reload', {})
+        )
         
         # 통계
         self.stats = {
             'total_checks': 0,
             'drowsy_detections': 0,
             'alerts_sent': 0,
+            'alerts_suppressed': 0,
             'start_time': datetime.now()
         }
         
+        # 구간별 측정 / 메트릭 엔드포인트
+        self.metrics_server = setup_metrics(self.config.get('metrics', {}))
+        
         print(f"✅ 초기화 완료!")
         print(f"📊 설정:")
         print(f"   - 신뢰도 임계값: {self.CONFIDENCE_THRESHOLD*100}%")
         print(f"   - 연속 감지 횟수: {self.DROWSY_THRESHOLD}회")
         print(f"   - 체크 주기: {self.CHECK_INTERVAL}초")
         print(f"   - 알림 쿨다운: {self.ALERT_COOLDOWN}초")
+        if self.coalescer is not None:
+            print(f"   - 알림 묶음: {self.coalescer.window}초 창, "
+                  f"분당 최대 {self.coalescer.max_per_minute}건")
+        if self.snapshots is not None:
+            print(f"   - 알림 스냅샷: 너비 {self.snapshots.max_width}px, "
+                  f"품질 {self.snapshots.quality}, 최대 {self.snapshots.max_bytes // 1024}KB")
         print(f"📍 활성 좌석: {self.capture.get_seat_count()}개")
+        if self.capture.groups:
+            print(f"🖥️  캡처 그룹: {', '.join(self.capture.groups)} (그룹별 병렬 캡처)")
         print("=" * 70)
     
-    def load_config(self, config_path: str) -> dict:
+    @staticmethod
+    def load_config(config_path: str) -> dict:
         """설정 파일 로드"""
         try:
             with open(config_path, 'r', encoding='utf-8') as f:
@@ -83,6 +154,87 @@ class AccurateStudentMonitor:
             print(f"⚠️  설정 파일 로드 실패, 기본값 사용: {e}")
             return {}
     
+    def load_thresholds(self, config: dict):
+        """
+        settings.json의 임계값 / 주기 설정 적용 (시작 시, 핫 리로드 시)
+        
+        Args:
+            config: settings.json 전체 딕셔너리
+        """
+        detection_config = config.get('detection', {})
+        seat_config = config.get('seat_detection', {})
+        
+        self.BRIGHTNESS_THRESHOLD = seat_config.get('brightness_threshold', 180)
+        self.EDGE_DENSITY_THRESHOLD = seat_config.get('edge_density_threshold', 0.05)
+        self.CONFIDENCE_THRESHOLD = detection_config.get('confidence_threshold', 0.75)
+        self.DROWSY_THRESHOLD = detection_config.get('drowsy_count_threshold', 5)
+        self.CHECK_INTERVAL = detection_config.get('check_interval', 2)
+        self.ALERT_COOLDOWN = detection_config.get('alert_cooldown', 300)
+        # 감지기 예열 설정 {"enabled": true, "rounds": 3}
+        self.warmup_config = detection_config.get('warmup', {})
+        if hasattr(self, 'scheduler'):
+            self.scheduler.interval = self.CHECK_INTERVAL
+    
+    def apply_settings(self, config: dict):
+        """
+        바뀐 settings.json 적용 (감지 모델은 유지, 모델 관련 변경은 재시작 후 적용)
+        
+        Args:
+            config: 검증된 settings.json 전체 딕셔너리
+        """
+        try:
+            restart_keys = self.detector.reconfigure(config.get('detection', {}))
+            if self.capture.background is not None:
+                restart_keys += self.capture.background.update_thresholds(
+                    config.get('seat_detection', {}).get('background_model', {}))
+        except Exception as e:
+            print(f"❌ 설정 적용 실패, 기존 설정 유지: {e}")
+            return
+        
+        self.load_thresholds(config)
+        if self.coalescer is not None:
+            self.coalescer.cooldown = self.ALERT_COOLDOWN
+        if hasattr(self.alert, 'apply_settings'):
+            self.alert.apply_settings(config)
+        if 'metrics' in config:
+            instrumentation.configure(enabled=config['metrics'].get('enabled', False))
+        self.config = config
+        
+        print(f"🔄 설정 다시 불러옴: EAR {self.detector.EAR_THRESHOLD}, "
+              f"신뢰도 {self.CONFIDENCE_THRESHOLD}, 연속 {self.DROWSY_THRESHOLD}회, "
+              f"주기 {self.CHECK_INTERVAL}초")
+        if restart_keys:
+            print(f"   ⚠️  재시작 후 적용: {', '.join(restart_keys)}")
+    
+    def apply_seats(self, seats: Dict, groups: Optional[Dict] = None):
+        """
+        바뀐 seats.json 적용
+        좌표가 그대로인 좌석은 졸음 카운터/기록과 배경 모델을 유지하고,
+        옮겨진 좌석은 상태를 초기화, 삭제된 좌석은 상태 제거
+        (캡처 그룹 영역만 옮겨진 경우 좌석 좌표는 그룹 기준이라 상태 유지)
+        
+        Args:
+            seats: 검증된 좌석 딕셔너리
+            groups: 검증된 캡처 그룹 딕셔너리 (None이면 유지)
+        """
+        changes = diff_seats(self.capture.seats, seats)
+        self.capture.update_seats(seats, groups)
+        
+        for seat_id in changes['removed'] + changes['moved']:
+            self.seat_states.pop(seat_id, None)
+        
+        print(f"🔄 좌석 다시 불러옴: 추가 {len(changes['added'])}, 이동 {len(changes['moved'])}, "
+              f"삭제 {len(changes['removed'])}, 유지 {len(changes['unchanged'])} "
+              f"(활성 {self.capture.get_seat_count()}석)")
+    
+    def apply_config_changes(self):
+        """설정 파일 변경 확인 후 적용 (사이클 시작 전에만 호출)"""
+        changes = self.reloader.poll()
+        if 'settings' in changes:
+            self.apply_settings(changes['settings'])
+        if 'seats' in changes:
+            self.apply_seats(changes['seats']['seats'], changes['seats']['groups'])
+    
     def initialize_seat_state(self, seat_id: str) -> Dict:
         """좌석 상태 초기화"""
         return {
@@ -94,9 +246,27 @@ class AccurateStudentMonitor:
             'total_drowsy': 0
         }
     
-    def is_seat_occupied(self, roi: np.ndarray) -> bool:
+    def is_seat_occupied(self, roi: np.ndarray,
+                         foreground_ratio: Optional[float] = None) -> bool:
         """
         빈 좌석 감지
+        배경 모델이 학습된 좌석은 전경 비율로, 아니면 밝기/에지 휴리스틱으로 판단
+        
+        Args:
+            roi: 좌석 영역 이미지
+            foreground_ratio: 배경 모델 전경 비율 (None이면 휴리스틱 사용)
+            
+        Returns:
+            사람이 있으면 True
+        """
+        if foreground_ratio is not None:
+            return foreground_ratio > self.capture.background.FOREGROUND_RATIO_THRESHOLD
+        
+        return self.is_seat_occupied_heuristic(roi)
+    
+    def is_seat_occupied_heuristic(self, roi: np.ndarray) -> bool:
+        """
+        밝기/에지 밀도 기반 빈 좌석 감지 (배경 학습 전 사용)
         
         Args:
             roi: 좌석 영역 이미지
@@ -145,64 +315,218 @@ class AccurateStudentMonitor:
         elapsed = (datetime.now() - last_alert).seconds
         return elapsed >= self.ALERT_COOLDOWN
     
-    def send_alert(self, seat_id: str, confidence: float, details: dict):
-        """알림 발송"""
+    def send_alert(self, seat_id: str, confidence: float, details: dict,
+                   roi: Optional[np.ndarray] = None):
+        """
+        알림 발송
+        
+        Args:
+            seat_id: 좌석 ID
+            confidence: 신뢰도
+            details: 상세 정보
+            roi: 좌석 영역 이미지 (알림 스냅샷이 켜져 있으면 복사만 해 두고 인코딩은 스냅샷 스레드가)
+        """
         if not self.should_send_alert(seat_id):
             return
         
+        snapshot = None
+        if self.snapshots is not None and roi is not None:
+            snapshot = self.snapshots.capture(seat_id, roi)
+        
+        # 비동기 런타임: 쿨다운을 먼저 잡아 두고 전송은 알림 태스크가 처리 (감지를 막지 않음)
+        if self.alert_sink is not None:
+            self.seat_states[seat_id]['last_alert_time'] = datetime.now()
+            self.alert_sink(seat_id, confidence, details, snapshot)
+            return
+        
+        # 알림 묶음: 쿨다운을 먼저 잡아 두고 사이클 끝(flush_alerts)에 요약으로 전송
+        if self.coalescer is not None:
+            self.seat_states[seat_id]['last_alert_time'] = datetime.now()
+            self.coalescer.add(seat_id, confidence, details, snapshot=snapshot)
+            return
+        
         # 알림 전송
-        success = self.alert.send_drowsy_alert(seat_id, confidence, details)
+        with instrumentation.span('alert_dispatch'):
+            success = alert_result(self.alert.send_drowsy_alert(seat_id, confidence, details,
+                                                                snapshot=snapshot))
         
+        # 알림 규칙으로 건너뛴 경우(SUPPRESSED)도 쿨다운은 유지
         if success:
             self.seat_states[seat_id]['last_alert_time'] = datetime.now()
+        self.finish_alert(seat_id, success)
+    
+    def finish_alert(self, seat_id: str, success):
+        """
+        알림 전송 결과 반영
+        
+        Args:
+            seat_id: 좌석 ID
+            success: 전송 결과 (비동기 런타임 / 알림 묶음에서 실패하면 미리 잡은 쿨다운 해제,
+                     SUPPRESSED면 발송으로 세지 않고 쿨다운은 유지)
+        """
+        if success == SUPPRESSED:
+            instrumentation.inc('alerts_total', seat=seat_id, result='suppressed')
+            self.stats['alerts_suppressed'] += 1
+            return
+        
+        instrumentation.inc('alerts_total', seat=seat_id,
+                            result='success' if success else 'failure')
+        
+        if success:
             self.stats['alerts_sent'] += 1
             print(f"✅ [좌석 {seat_id}] 알림 발송 완료")
+        elif ((self.alert_sink is not None or self.coalescer is not None)
+              and seat_id in self.seat_states):
+            self.seat_states[seat_id]['last_alert_time'] = None
     
-    def process_seat(self, seat_id: str, roi: np.ndarray):
+    def flush_alerts(self, force: bool = False):
         """
-        개별 좌석 처리
+        알림 묶음 중 차례가 된 요약 전송 (동기 루프에서 사이클마다, 종료 시 force)
+        
+        Args:
+            force: 창 / 분당 한도와 무관하게 남은 알림 모두 전송
+        """
+        if self.coalescer is None:
+            return
+        with instrumentation.span('alert_flush'):
+            results = self.coalescer.flush(force)
+        for seat_id, success in results:
+            self.finish_alert(seat_id, success)
+    
+    def dashboard_data(self) -> Dict:
+        """
+        대시보드(docs/data.json) 형식의 현재 상태
+        
+        Returns:
+            {'total_checks', 'drowsy_count', 'alerts_sent', 'last_update', 'channels'}
+            (알림 스냅샷이 켜져 있으면 channels[좌석]['snapshot']에 최근 알림 사진)
+        """
+        now = datetime.now()
+        channels = {}
+        snapshots = {}
+        if self.snapshots is not None and self.snapshots.dashboard:
+            snapshots = self.snapshots.dashboard_entries()
+        for seat_id, state in self.seat_states.items():
+            if not state['is_occupied']:
+                status = 'empty'
+            elif state['drowsy_count'] >= self.DROWSY_THRESHOLD:
+                status = 'drowsy'
+            else:
+                status = 'alert'
+            
+            channel = {
+                'status': status,
+                'last_check': now.strftime('%H:%M:%S'),
+                'has_person': state['is_occupied']
+            }
+            if status == 'drowsy' and state['history']:
+                channel['confidence'] = state['history'][-1]['confidence']
+            if seat_id in snapshots:
+                channel['snapshot'] = snapshots[seat_id]
+            channels[seat_id] = channel
+        
+        return {
+            'total_checks': self.stats['total_checks'],
+            'drowsy_count': self.stats['drowsy_detections'],
+            'alerts_sent': self.stats['alerts_sent'],
+            'last_update': now.strftime('%Y-%m-%d %H:%M:%S'),
+            'channels': channels
+        }
+    
+    def check_occupancy(self, seat_id: str, roi: np.ndarray,
+                        foreground_ratio: Optional[float] = None) -> bool:
+        """
+        좌석 체크 1회 기록 + 빈 좌석 판정
         
         Args:
             seat_id: 좌석 ID
             roi: 좌석 영역 이미지
+            foreground_ratio: 배경 모델 전경 비율 (None이면 휴리스틱 사용)
+            
+        Returns:
+            착석 여부 (True면 졸음 감지 대상)
         """
         state = self.seat_states[seat_id]
         state['total_checks'] += 1
+        instrumentation.inc('seat_checks_total', seat=seat_id)
         
         # 빈 좌석 체크
-        if not self.is_seat_occupied(roi):
+        with instrumentation.span('occupancy_seat'):
+            occupied = self.is_seat_occupied(roi, foreground_ratio)
+        
+        if not occupied:
+            instrumentation.inc('seat_results_total', seat=seat_id, result='empty')
             state['is_occupied'] = False
             state['drowsy_count'] = 0
-            return
+            if self.publisher is not None:
+                self.pending_events.append(seat_event(seat_id, False))
+            return False
         
         state['is_occupied'] = True
+        return True
+    
+    def apply_detection(self, seat_id: str, roi: np.ndarray,
+                        foreground_ratio: Optional[float],
+                        detection: Tuple[bool, float, Dict]) -> bool:
+        """
+        착석 좌석의 졸음 감지 결과 반영 (히스토리, 연속 감지 카운터, 알림)
         
-        # 졸음 감지
-        is_drowsy, confidence, details = self.detector.detect_drowsiness(roi)
-        
-        # 히스토리 업데이트
-        self.update_seat_history(seat_id, is_drowsy, confidence, details)
-        
-        # 신뢰도가 충분히 높은 경우만 처리
-        if is_drowsy and confidence >= self.CONFIDENCE_THRESHOLD:
-            state['drowsy_count'] += 1
-            state['total_drowsy'] += 1
-            self.stats['drowsy_detections'] += 1
+        Args:
+            seat_id: 좌석 ID
+            roi: 좌석 영역 이미지
+            foreground_ratio: 배경 모델 전경 비율
+            detection: detect_drowsiness 결과 (is_drowsy, confidence, details)
             
-            print(f"💤 [좌석 {seat_id}] 졸음 감지! "
-                  f"(카운트: {state['drowsy_count']}/{self.DROWSY_THRESHOLD}, "
-                  f"신뢰도: {confidence:.1%}, "
-                  f"EAR: {details['ear']:.3f}, "
-                  f"Tilt: {details['head_tilt']:.3f})")
+        Returns:
+            얼굴이 없고 조명 변화로 판단되면 True (배경 모델 갱신 대상)
+        """
+        state = self.seat_states[seat_id]
+        is_drowsy, confidence, details = detection
+        instrumentation.inc('seat_results_total', seat=seat_id,
+                            result=details.get('status', 'unknown'))
+        
+        # 분산 모드: 연속 감지 카운터 / 알림은 집계 서버에서
+        if self.publisher is not None:
+            self.pending_events.append(seat_event(seat_id, True, detection))
+        
+        # 배경과 달라도 얼굴이 없고 휴리스틱상 빈 좌석이면 조명 변화로 보고 배경 재학습
+        # (엎드려 자는 학생은 에지가 많아 휴리스틱에서 걸러짐)
+        if details.get('status') == 'no_face_detected':
+            return foreground_ratio is not None and not self.is_seat_occupied_heuristic(roi)
+        
+        if self.publisher is not None:
+            return False
+        
+        alert_due = False
+        with instrumentation.span('state_update'):
+            # 히스토리 업데이트
+            self.update_seat_history(seat_id, is_drowsy, confidence, details)
             
-            # 연속 감지 임계값 도달 시 알림
-            if state['drowsy_count'] >= self.DROWSY_THRESHOLD:
-                self.send_alert(seat_id, confidence, details)
-                state['drowsy_count'] = 0  # 카운터 리셋
-        else:
-            # 정상 상태면 카운터 점진적 감소
-            if state['drowsy_count'] > 0:
-                state['drowsy_count'] -= 1
+            # 신뢰도가 충분히 높은 경우만 처리
+            if is_drowsy and confidence >= self.CONFIDENCE_THRESHOLD:
+                state['drowsy_count'] += 1
+                state['total_drowsy'] += 1
+                self.stats['drowsy_detections'] += 1
+                
+                print(f"💤 [좌석 {seat_id}] 졸음 감지! "
+                      f"(카운트: {state['drowsy_count']}/{self.DROWSY_THRESHOLD}, "
+                      f"신뢰도: {confidence:.1%}, "
+                      f"EAR: {details['ear']:.3f}, "
+                      f"Tilt: {details['head_tilt']:.3f})")
+                
+                # 연속 감지 임계값 도달 시 알림
+                if state['drowsy_count'] >= self.DROWSY_THRESHOLD:
+                    alert_due = True
+                    state['drowsy_count'] = 0  # 카운터 리셋
+            else:
+                # 정상 상태면 카운터 점진적 감소
+                if state['drowsy_count'] > 0:
+                    state['drowsy_count'] -= 1
+        
+        if alert_due:
+            self.send_alert(seat_id, confidence, details, roi)
+        
+        return False
     
     def print_statistics(self):
         """통계 출력"""
@@ -216,9 +540,21 @@ class AccurateStudentMonitor:
         print(f"⏱️  실행 시간: {hours}시간 {minutes}분")
         print(f"🔍 총 체크: {self.stats['total_checks']}회")
         print(f"💤 졸음 감지: {self.stats['drowsy_detections']}회")
-        print(f"🚨 알림 발송: {self.stats['alerts_sent']}회")
+        print(f"🚨 알림 발송: {self.stats['alerts_sent']}회 (알림 규칙으로 건너뜀 {self.stats['alerts_suppressed']}회)")
+        self.scheduler.print_summary()
+        if self.coalescer is not None:
+            self.coalescer.print_summary()
+        if self.outbox is not None:
+            self.outbox.print_summary()
+        if hasattr(self.alert, 'router'):
+            self.alert.router.print_summary()
+        if self.snapshots is not None:
+            self.snapshots.print_summary()
         print()
         
+        # 구간별 처리 시간 (측정 활성화 시)
+        instrumentation.print_summary()
+        
         # 좌석별 통계
         print("좌석별 상태:")
         for seat_id, state in self.seat_states.items():
@@ -233,12 +569,12 @@ class AccurateStudentMonitor:
         
         print("=" * 70 + "\n")
     
-    def run(self, debug_mode: bool = False):
+    def prepare(self, debug_mode: bool = False) -> bool:
         """
-        메인 모니터링 루프
+        모니터링 시작 준비 (좌석 확인, 감지기 예열, 디버그 윈도우)
         
-        Args:
-            debug_mode: True면 화면 표시
+        Returns:
+            좌석이 없으면 False
         """
         print("🚀 모니터링 시작!")
         print("   Ctrl+C로 종료")
@@ -248,81 +584,251 @@ class AccurateStudentMonitor:
         if not self.capture.seats:
             print("❌ 좌석이 설정되지 않았습니다!")
             print("   먼저 roi_manager.py를 실행하여 좌석을 설정하세요.")
-            return
+            return False
+        
+        # 감지기 예열 (좌석 ROI 크기 · 배치 그대로, 끝나야 /ready가 200)
+        warmup_worker(self.detector, [
+            (seat['width'], seat['height'])
+            for seat in self.capture.seats.values() if seat.get('enabled', True)
+        ], config=self.warmup_config)
+        
+        # 알림 재시도 스레드 (이전 실행에서 남은 알림도 전송)
+        if self.outbox is not None:
+            self.outbox.start()
         
         # 디버그 윈도우
         if debug_mode:
             cv2.namedWindow('Monitor Debug', cv2.WINDOW_NORMAL)
+        return True
+    
+    def capture_frame(self) -> Optional[np.ndarray]:
+        """
+        전체 화면 캡처 1회 (설정 파일 변경은 캡처 전에 적용)
+        
+        Returns:
+            화면 이미지, 실패 시 None
+        """
+        # 설정 파일 변경 적용 (사이클 사이에만 교체)
+        self.apply_config_changes()
+        
+        with instrumentation.span('capture'):
+            screen = self.capture.capture_screen()
+        
+        if screen is None:
+            if not self.capture.exhausted:
+                instrumentation.inc('capture_failures_total')
+            return None
+        
+        self.stats['total_checks'] += 1
+        instrumentation.mark_first_capture()
+        return screen
+    
+    def process_frame(self, screen: np.ndarray):
+        """
+        화면 1장 처리 (빈 좌석 체크 → 착석 좌석 일괄 졸음 감지 → 배경 갱신)
+        
+        Args:
+            screen: 전체 화면 이미지
+        """
+        # 배경 모델 전경 비율 (전 좌석 일괄 계산)
+        with instrumentation.span('occupancy'):
+            occupancy = self.capture.measure_occupancy(screen)
+        empty_seats = []
+        occupied_seats = []
+        
+        # 각 좌석 빈 좌석 체크
+        for seat_id in self.capture.seats.keys():
+            # 좌석 상태 초기화
+            if seat_id not in self.seat_states:
+                self.seat_states[seat_id] = self.initialize_seat_state(seat_id)
+            
+            # ROI 추출
+            with instrumentation.span('roi_extraction'):
+                roi = self.capture.get_seat_roi(screen, seat_id)
+            
+            if roi is None:
+                continue
+            
+            foreground_ratio = occupancy.get(seat_id)
+            if self.check_occupancy(seat_id, roi, foreground_ratio):
+                occupied_seats.append((seat_id, roi, foreground_ratio))
+            else:
+                empty_seats.append(seat_id)
+        
+        # 처리 지연 시 저우선 좌석은 두 사이클에 한 번만 분석
+        if self.scheduler.skip_low_priority:
+            occupied_seats = self.select_priority_seats(occupied_seats)
+        
+        # 착석 좌석 일괄 졸음 감지 (배치 추론 백엔드는 한 번에 처리)
+        detections = self.detector.detect_drowsiness_batch(
+            self.scale_rois([roi for _, roi, _ in occupied_seats])) if occupied_seats else []
+        for (seat_id, roi, foreground_ratio), detection in zip(occupied_seats, detections):
+            if self.apply_detection(seat_id, roi, foreground_ratio, detection):
+                empty_seats.append(seat_id)
+        
+        # 빈 좌석으로 확인된 좌석만 배경 갱신
+        with instrumentation.span('background_update'):
+            self.capture.update_background(empty_seats)
+        
+        # 분산 모드: 이번 사이클 좌석 이벤트 일괄 전송
+        if self.publisher is not None:
+            with instrumentation.span('publish'):
+                self.publisher.publish(self.pending_events)
+            self.pending_events = []
+        
+        instrumentation.set_gauge('seats_occupied', sum(
+            1 for state in self.seat_states.values() if state['is_occupied']))
+    
+    def is_low_priority(self, seat_id: str) -> bool:
+        """
+        저우선 좌석 여부 (처리 지연 시 분석 주기를 늘려도 되는 좌석)
+        seats.json에서 priority가 "low"이거나, 졸음 징후(연속 감지 카운트)가 없는 좌석
+        """
+        seat = self.capture.seats.get(seat_id, {})
+        if seat.get('priority') == 'high':
+            return False
+        return seat.get('priority') == 'low' or self.seat_states[seat_id]['drowsy_count'] == 0
+    
+    def select_priority_seats(self, occupied_seats: List[Tuple]) -> List[Tuple]:
+        """
+        성능 저하 1단계: 저우선 좌석을 짝/홀 사이클에 번갈아 분석
+        
+        Args:
+            occupied_seats: [(seat_id, roi, foreground_ratio), ...]
+            
+        Returns:
+            이번 사이클에 분석할 좌석
+        """
+        selected = []
+        for index, item in enumerate(occupied_seats):
+            if self.is_low_priority(item[0]) and (index + self.stats['total_checks']) % 2:
+                instrumentation.inc('seats_deferred_total', seat=item[0])
+                continue
+            selected.append(item)
+        return selected
+    
+    def scale_rois(self, rois: List[np.ndarray]) -> List[np.ndarray]:
+        """성능 저하 2단계: 분석 해상도 축소 (랜드마크는 정규화 좌표라 지표 계산에 영향 없음)"""
+        scale = self.scheduler.analysis_scale
+        if scale >= 1.0:
+            return rois
+        return [cv2.resize(roi, None, fx=scale, fy=scale, interpolation=cv2.INTER_AREA)
+                for roi in rois]
+    
+    def show_debug(self, screen: np.ndarray) -> bool:
+        """
+        디버그 화면 표시
+        
+        Returns:
+            ESC로 종료 요청 시 False
+        """
+        # 졸음 감지된 좌석 하이라이트
+        highlight = {}
+        for seat_id, state in self.seat_states.items():
+            if state['is_occupied'] and state['drowsy_count'] > 0:
+                # 졸음 카운트에 따라 색상 변경
+                if state['drowsy_count'] >= self.DROWSY_THRESHOLD:
+                    highlight[seat_id] = (0, 0, 255)  # 빨강
+                else:
+                    highlight[seat_id] = (0, 165, 255)  # 주황
+        
+        debug_screen = self.capture.draw_seat_boxes(screen, highlight)
+        
+        # 화면 크기 조정
+        h, w = debug_screen.shape[:2]
+        if w > 1920:
+            scale = 1920 / w
+            new_w = 1920
+            new_h = int(h * scale)
+            debug_screen = cv2.resize(debug_screen, (new_w, new_h))
+        
+        cv2.imshow('Monitor Debug', debug_screen)
+        
+        key = cv2.waitKey(1) & 0xFF
+        if key == 27:  # ESC
+            print("\n사용자 종료")
+            return False
+        return True
+    
+    def shutdown(self, debug_mode: bool = False):
+        """최종 통계 출력 및 정리"""
+        if self.coalescer is not None and self.coalescer.pending:
+            print(f"📨 남은 알림 {len(self.coalescer.pending)}건 요약 전송 중...")
+            self.flush_alerts(force=True)
+        if self.outbox is not None:
+            self.outbox.stop(self.config.get('alert_outbox', {}).get('drain_timeout', 5))
+        self.print_statistics()
+        self.capture.save_background()
+        
+        if self.outbox is not None:
+            self.outbox.close()
+        
+        if self.snapshots is not None:
+            self.snapshots.close()
+        
+        if self.publisher is not None:
+            print(f"🛰️  집계 서버 전송: 이벤트 {self.publisher.stats['events']}건, "
+                  f"버림 {self.publisher.stats['dropped']}건")
+            self.publisher.close()
+        
+        if self.metrics_server:
+            self.metrics_server.stop()
+        
+        if debug_mode:
+            cv2.destroyAllWindows()
+        
+        print("✅ 시스템 종료")
+    
+    def run(self, debug_mode: bool = False):
+        """
+        메인 모니터링 루프 (동기, 비동기 런타임은 async_runtime.AsyncMonitorRuntime)
+        
+        Args:
+            debug_mode: True면 화면 표시
+        """
+        if not self.prepare(debug_mode):
+            return
         
         last_stats_time = datetime.now()
         
         try:
+            self.scheduler.start()
             while True:
-                loop_start = time.time()
+                loop_start = time.perf_counter()
+                self.scheduler.begin()
                 
                 # 1. 전체 화면 캡처
-                screen = self.capture.capture_screen()
+                screen = self.capture_frame()
                 
                 if screen is None:
+                    if self.capture.exhausted:
+                        print("\n⏹️  입력 프레임 재생 완료")
+                        break
                     print("⚠️  화면 캡처 실패, 재시도...")
                     time.sleep(5)
+                    self.scheduler.start()
                     continue
                 
-                self.stats['total_checks'] += 1
-                
-                # 2. 각 좌석 처리
-                for seat_id in self.capture.seats.keys():
-                    # 좌석 상태 초기화
-                    if seat_id not in self.seat_states:
-                        self.seat_states[seat_id] = self.initialize_seat_state(seat_id)
-                    
-                    # ROI 추출
-                    roi = self.capture.get_seat_roi(screen, seat_id)
-                    
-                    if roi is None:
-                        continue
-                    
-                    # 좌석 처리
-                    self.process_seat(seat_id, roi)
+                # 2. 좌석 체크 및 졸음 감지
+                self.process_frame(screen)
+                self.flush_alerts()
+                instrumentation.record('cycle', time.perf_counter() - loop_start)
                 
                 # 3. 디버그 화면 표시
-                if debug_mode:
-                    # 졸음 감지된 좌석 하이라이트
-                    highlight = {}
-                    for seat_id, state in self.seat_states.items():
-                        if state['is_occupied'] and state['drowsy_count'] > 0:
-                            # 졸음 카운트에 따라 색상 변경
-                            if state['drowsy_count'] >= self.DROWSY_THRESHOLD:
-                                highlight[seat_id] = (0, 0, 255)  # 빨강
-                            else:
-                                highlight[seat_id] = (0, 165, 255)  # 주황
-                    
-                    debug_screen = self.capture.draw_seat_boxes(screen, highlight)
-                    
-                    # 화면 크기 조정
-                    h, w = debug_screen.shape[:2]
-                    if w > 1920:
-                        scale = 1920 / w
-                        new_w = 1920
-                        new_h = int(h * scale)
-                        debug_screen = cv2.resize(debug_screen, (new_w, new_h))
-                    
-                    cv2.imshow('Monitor Debug', debug_screen)
-                    
-                    key = cv2.waitKey(1) & 0xFF
-                    if key == 27:  # ESC
-                        print("\n사용자 종료")
-                        break
+                if debug_mode and not self.show_debug(screen):
+                    break
                 
                 # 4. 주기적 통계 출력 (5분마다)
                 if (datetime.now() - last_stats_time).seconds >= 300:
                     self.print_statistics()
+                    self.capture.save_background()
                     last_stats_time = datetime.now()
                 
-                # 5. 대기
-                elapsed = time.time() - loop_start
-                sleep_time = max(0, self.CHECK_INTERVAL - elapsed)
-                time.sleep(sleep_time)
+                # 5. 다음 기한까지 대기 (최대 속도 재생이면 사이클 기록만 하고 대기 생략)
+                if self.capture.realtime:
+                    self.scheduler.wait()
+                else:
+                    self.scheduler.end()
                 
         except KeyboardInterrupt:
             print("\n\n⏹️  모니터링 종료")
@@ -331,17 +837,16 @@ class AccurateStudentMonitor:
             import traceback
             traceback.print_exc()
         finally:
-            # 최종 통계
-            self.print_statistics()
-            
-            if debug_mode:
-                cv2.destroyAllWindows()
-            
-            print("✅ 시스템 종료")
+            self.shutdown(debug_mode)
 
 
-def main():
-    """메인 함수"""
+def main(argv=None):
+    """
+    메인 함수
+    
+    Args:
+        argv: 명령줄 인자 (None이면 sys.argv, viewguard.py CLI에서 전달)
+    """
     import argparse
     
     parser = argparse.ArgumentParser(description='ViewGuard Student Monitor')
@@ -350,12 +855,43 @@ def main():
     parser.add_argument('--config', type=str, 
                        default='config/settings.json',
                        help='설정 파일 경로')
+    parser.add_argument('--replay', type=str,
+                       help='녹화 파일(.vgrec)을 화면 대신 입력으로 사용')
+    parser.add_argument('--max-speed', action='store_true',
+                       help='재생 시 녹화 간격을 무시하고 최대 속도로 실행')
+    parser.add_argument('--async', dest='async_runtime', action='store_true',
+                       help='asyncio 런타임으로 실행 (알림 전송이 감지와 겹쳐 진행)')
+    parser.add_argument('--node', type=str, nargs='?', const='',
+                       help='분산 모드 노드로 실행, 감지 이벤트를 집계 서버 "host:port"로 전송 '
+                            '(값 생략 시 distributed.aggregator)')
     
-    args = parser.parse_args()
+    args = parser.parse_args(argv)
+    
+    capture = None
+    if args.replay:
+        from replay import ReplayCapture
+        settings = AccurateStudentMonitor.load_config(args.config)
+        capture = ReplayCapture(
+            args.replay,
+            background_config=settings.get('seat_detection', {}).get('background_model', {}),
+            realtime=not args.max_speed
+        )
     
     # 모니터 실행
-    monitor = AccurateStudentMonitor(args.config)
-    monitor.run(debug_mode=args.debug)
+    monitor = AccurateStudentMonitor(args.config, capture)
+    if args.node is not None:
+        dist_config = monitor.config.get('distributed', {})
+        host, port = parse_address(args.node or dist_config.get('aggregator', '127.0.0.1'))
+        node_id = dist_config.get('node_id') or socket.gethostname()
+        monitor.publisher = NodePublisher(host, port, node_id, dist_config)
+        print(f"🛰️  분산 노드 모드: {node_id} → {host}:{port} (알림은 집계 서버에서)")
+    
+    runtime_config = monitor.config.get('async_runtime', {})
+    if args.async_runtime or runtime_config.get('enabled', False):
+        from async_runtime import run_async
+        run_async(monitor, debug_mode=args.debug, config=runtime_config)
+    else:
+        monitor.run(debug_mode=args.debug)
 
 
 if __name__ == "__main__":
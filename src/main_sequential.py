@@ -14,18 +14,24 @@ from datetime import datetime, timedelta
 from typing import Dict, Optional
 
 from advanced_detector import AdvancedDrowsinessDetector
-from channel_controller import ChannelController
+from alert_outbox import open_outbox
 from alert_system import TelegramAlert, ConsoleAlert
+from config_reloader import ConfigReloader
+from detection_engine import warmup_worker
+from instrumentation import instrumentation, setup_metrics
+from scheduler import CycleScheduler
 
 
 class SequentialStudentMonitor:
     """순차 채널 전환 방식 모니터링 시스템"""
     
-    def __init__(self, config_path: str = 'config/settings.json'):
+    def __init__(self, config_path: str = 'config/settings.json',
+                 controller=None):
         """
         초기화
         Args:
             config_path: 설정 파일 경로
+            controller: 채널 컨트롤러 (None이면 ChannelController, 재생 입력 주입용)
         """
         print("=" * 70)
         print("🎯 ViewGuard Monitor - 순차 채널 전환 방식 (고화질)")
@@ -39,29 +45,48 @@ class SequentialStudentMonitor:
         print("\n📦 컴포넌트 초기화 중...")
         
         # 채널 컨트롤러
-        self.controller = ChannelController()
+        # (pyautogui는 실제 화면 제어 시에만 필요하므로 여기서 import)
+        if controller is None:
+            from channel_controller import ChannelController
+            controller = ChannelController()
+        self.controller = controller
         
         # 졸음 감지기
-        self.detector = AdvancedDrowsinessDetector(detection_config)
+        # 채널 수가 많으면 profile=auto가 fast 프로필 선택
+        self.detector = AdvancedDrowsinessDetector(
+            detection_config, seat_count=self.controller.total_channels
+        )
         
-        # 알림 시스템
-        self.alert = TelegramAlert(config_path)
-        if not self.alert.enabled:
+        # 알림 시스템 (재생 입력은 실제 알림을 보내지 않음)
+        if self.controller.offline:
             self.alert = ConsoleAlert()
-            print("📱 콘솔 알림 모드")
+            print("📱 재생 입력: 콘솔 알림 모드")
+        else:
+            self.alert = TelegramAlert(config_path)
+            if not self.alert.enabled:
+                self.alert = ConsoleAlert()
+                print("📱 콘솔 알림 모드")
+        
+        # 알림 아웃박스: 전송할 알림을 디스크에 먼저 기록, 재시도 스레드가 백오프로 전송 (재생 입력은 사용 안 함)
+        self.outbox = None
+        if not self.controller.offline:
+            self.outbox = open_outbox(self.alert, self.config.get('alert_outbox', {}))
         
         # 좌석별 상태 (채널 = 좌석)
         self.channel_states: Dict[int, Dict] = {}
         
         # 설정값
-        self.CONFIDENCE_THRESHOLD = detection_config.get('confidence_threshold', 0.75)
-        self.DROWSY_THRESHOLD = detection_config.get('drowsy_count_threshold', 5)
-        self.CHECK_INTERVAL = detection_config.get('check_interval', 2)
-        self.ALERT_COOLDOWN = detection_config.get('alert_cooldown', 300)
+        self.load_thresholds(self.config)
+        
+        # settings.json 핫 리로드 (사이클 사이에 적용)
+        self.reloader = ConfigReloader(config_path, config=self.config.get('config_reload', {}))
         
         # 순차 캡처 설정
         self.FULL_CYCLE_INTERVAL = 60  # 전체 사이클 주기 (초) - 16개 채널 순회
         
+        # 사이클 시작을 절대 기한(60초 간격)에 맞춤 (주기 초과 시 성능 저하 단계 전환)
+        self.scheduler = CycleScheduler(self.FULL_CYCLE_INTERVAL, self.config.get('scheduler', {}))
+        
         # 통계
         self.stats = {
             'total_cycles': 0,
@@ -71,6 +96,9 @@ class SequentialStudentMonitor:
             'start_time': datetime.now()
         }
         
+        # 구간별 측정 / 메트릭 엔드포인트
+        self.metrics_server = setup_metrics(self.config.get('metrics', {}))
+        
         print(f"✅ 초기화 완료!")
         print(f"\n📊 설정:")
         print(f"   - 신뢰도 임계값: {self.CONFIDENCE_THRESHOLD*100}%")
@@ -89,6 +117,43 @@ class SequentialStudentMonitor:
             print(f"⚠️  설정 파일 로드 실패, 기본값 사용: {e}")
             return {}
     
+    def load_thresholds(self, config: dict):
+        """
+        settings.json의 임계값 설정 적용 (시작 시, 핫 리로드 시)
+        
+        Args:
+            config: settings.json 전체 딕셔너리
+        """
+        detection_config = config.get('detection', {})
+        self.CONFIDENCE_THRESHOLD = detection_config.get('confidence_threshold', 0.75)
+        self.DROWSY_THRESHOLD = detection_config.get('drowsy_count_threshold', 5)
+        self.CHECK_INTERVAL = detection_config.get('check_interval', 2)
+        self.ALERT_COOLDOWN = detection_config.get('alert_cooldown', 300)
+        # 감지기 예열 설정 {"enabled": true, "rounds": 3}
+        self.warmup_config = detection_config.get('warmup', {})
+    
+    def apply_config_changes(self):
+        """settings.json 변경 확인 후 적용 (사이클 사이에만 호출, 채널별 상태는 유지)"""
+        config = self.reloader.poll().get('settings')
+        if config is None:
+            return
+        
+        try:
+            restart_keys = self.detector.reconfigure(config.get('detection', {}))
+        except Exception as e:
+            print(f"❌ 설정 적용 실패, 기존 설정 유지: {e}")
+            return
+        
+        self.load_thresholds(config)
+        if 'metrics' in config:
+            instrumentation.configure(enabled=config['metrics'].get('enabled', False))
+        self.config = config
+        
+        print(f"🔄 설정 다시 불러옴: EAR {self.detector.EAR_THRESHOLD}, "
+              f"신뢰도 {self.CONFIDENCE_THRESHOLD}, 연속 {self.DROWSY_THRESHOLD}회")
+        if restart_keys:
+            print(f"   ⚠️  재시작 후 적용: {', '.join(restart_keys)}")
+    
     def initialize_channel_state(self, channel_num: int) -> Dict:
         """채널 상태 초기화"""
         return {
@@ -101,6 +166,23 @@ class SequentialStudentMonitor:
             'last_check_time': None
         }
     
+    def should_skip_channel(self, channel_num: int) -> bool:
+        """
+        성능 저하 1단계: 직전에 사람이 없던 채널은 두 사이클에 한 번만 전환/분석
+        
+        Args:
+            channel_num: 채널 번호
+            
+        Returns:
+            이번 사이클에 건너뛸 채널이면 True
+        """
+        if not self.scheduler.skip_low_priority:
+            return False
+        state = self.channel_states.get(channel_num)
+        if state is None or state['has_person']:
+            return False
+        return (channel_num + self.stats['total_cycles']) % 2 == 1
+    
     def detect_person(self, image: np.ndarray) -> bool:
         """
         이미지에 사람이 있는지 감지
@@ -120,13 +202,16 @@ class SequentialStudentMonitor:
         
         return False
     
-    def process_channel(self, channel_num: int, image: np.ndarray):
+    def process_channel(self, channel_num: int, image: np.ndarray) -> Dict:
         """
         개별 채널 처리
         
         Args:
             channel_num: 채널 번호
             image: 캡처된 이미지
+            
+        Returns:
+            감지 상세 정보 (디버그 화면 표시에 재사용)
         """
         # 상태 초기화
         if channel_num not in self.channel_states:
@@ -135,50 +220,62 @@ class SequentialStudentMonitor:
         state = self.channel_states[channel_num]
         state['total_checks'] += 1
         state['last_check_time'] = datetime.now()
+        instrumentation.inc('seat_checks_total', seat=f"CH{channel_num:02d}")
         
-        # 졸음 감지
+        # 졸음 감지 (성능 저하 2단계면 축소한 화면으로 분석)
+        scale = self.scheduler.analysis_scale
+        if scale < 1.0:
+            image = cv2.resize(image, None, fx=scale, fy=scale, interpolation=cv2.INTER_AREA)
         is_drowsy, confidence, details = self.detector.detect_drowsiness(image)
+        instrumentation.inc('seat_results_total', seat=f"CH{channel_num:02d}",
+                            result=details.get('status', 'unknown'))
         
         # 사람 없음
         if 'status' in details and details['status'] == 'no_face_detected':
             state['has_person'] = False
             state['drowsy_count'] = 0
-            return
+            return details
         
         state['has_person'] = True
         
-        # 히스토리 업데이트
-        state['history'].append({
-            'timestamp': datetime.now(),
-            'drowsy': is_drowsy,
-            'confidence': confidence,
-            'details': details
-        })
-        
-        if len(state['history']) > 10:
-            state['history'].pop(0)
-        
-        # 신뢰도 높은 경우만 처리
-        if is_drowsy and confidence >= self.CONFIDENCE_THRESHOLD:
-            state['drowsy_count'] += 1
-            state['total_drowsy'] += 1
-            self.stats['drowsy_detections'] += 1
+        alert_due = False
+        with instrumentation.span('state_update'):
+            # 히스토리 업데이트
+            state['history'].append({
+                'timestamp': datetime.now(),
+                'drowsy': is_drowsy,
+                'confidence': confidence,
+                'details': details
+            })
             
-            print(f"💤 [CH{channel_num:02d}] 졸음 감지! "
-                  f"(카운트: {state['drowsy_count']}/{self.DROWSY_THRESHOLD}, "
-                  f"신뢰도: {confidence:.1%}, "
-                  f"EAR: {details['ear']:.3f}, "
-                  f"Tilt: {details['head_tilt']:.3f})")
+            if len(state['history']) > 10:
+                state['history'].pop(0)
             
-            # 연속 감지 임계값 도달 시 알림
-            if state['drowsy_count'] >= self.DROWSY_THRESHOLD:
-                if self.should_send_alert(channel_num):
-                    self.send_alert(channel_num, confidence, details)
-                    state['drowsy_count'] = 0
-        else:
-            # 정상 상태면 카운터 점진적 감소
-            if state['drowsy_count'] > 0:
-                state['drowsy_count'] -= 1
+            # 신뢰도 높은 경우만 처리
+            if is_drowsy and confidence >= self.CONFIDENCE_THRESHOLD:
+                state['drowsy_count'] += 1
+                state['total_drowsy'] += 1
+                self.stats['drowsy_detections'] += 1
+                
+                print(f"💤 [CH{channel_num:02d}] 졸음 감지! "
+                      f"(카운트: {state['drowsy_count']}/{self.DROWSY_THRESHOLD}, "
+                      f"신뢰도: {confidence:.1%}, "
+                      f"EAR: {details['ear']:.3f}, "
+                      f"Tilt: {details['head_tilt']:.3f})")
+                
+                # 연속 감지 임계값 도달 시 알림
+                if state['drowsy_count'] >= self.DROWSY_THRESHOLD:
+                    alert_due = self.should_send_alert(channel_num)
+            else:
+                # 정상 상태면 카운터 점진적 감소
+                if state['drowsy_count'] > 0:
+                    state['drowsy_count'] -= 1
+        
+        if alert_due:
+            self.send_alert(channel_num, confidence, details)
+            state['drowsy_count'] = 0
+        
+        return details
     
     def should_send_alert(self, channel_num: int) -> bool:
         """알림을 보내야 하는지 확인"""
@@ -193,7 +290,11 @@ class SequentialStudentMonitor:
     
     def send_alert(self, channel_num: int, confidence: float, details: dict):
         """알림 발송"""
-        success = self.alert.send_drowsy_alert(f"CH{channel_num:02d}", confidence, details)
+        with instrumentation.span('alert_dispatch'):
+            success = self.alert.send_drowsy_alert(f"CH{channel_num:02d}", confidence, details)
+        
+        instrumentation.inc('alerts_total', seat=f"CH{channel_num:02d}",
+                            result='success' if success else 'failure')
         
         if success:
             self.channel_states[channel_num]['last_alert_time'] = datetime.now()
@@ -215,35 +316,47 @@ class SequentialStudentMonitor:
         print(f"⏰ {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
         print("=" * 70)
         
-        cycle_start_time = time.time()
+        cycle_start_time = time.perf_counter()
         
         for ch_num in range(1, self.controller.total_channels + 1):
+            if self.should_skip_channel(ch_num):
+                instrumentation.inc('seats_deferred_total', seat=f"CH{ch_num:02d}")
+                continue
+            
             try:
                 # 채널 전환
                 print(f"\n[{ch_num}/16] CH{ch_num:02d} 처리 중...")
                 
-                if not self.controller.switch_to_channel(ch_num):
+                with instrumentation.span('channel_switch'):
+                    switched = self.controller.switch_to_channel(ch_num)
+                
+                if not switched:
                     print(f"⚠️  CH{ch_num:02d} 전환 실패")
                     continue
                 
                 # 화면 캡처
-                image = self.controller.capture_current_channel()
+                with instrumentation.span('capture'):
+                    image = self.controller.capture_current_channel()
                 
                 if image is None:
+                    if self.controller.exhausted:
+                        print("\n⏹️  입력 프레임 재생 완료")
+                        return False
+                    instrumentation.inc('capture_failures_total')
                     print(f"⚠️  CH{ch_num:02d} 캡처 실패")
                     continue
                 
+                instrumentation.mark_first_capture()
                 h, w = image.shape[:2]
                 print(f"📸 캡처 완료 ({w}x{h})")
                 
                 # 졸음 분석
-                self.process_channel(ch_num, image)
+                details = self.process_channel(ch_num, image)
                 self.stats['total_checks'] += 1
                 
                 # 디버그 모드: 화면 표시
                 if debug_mode:
-                    # 감지 결과 그리기
-                    is_drowsy, confidence, details = self.detector.detect_drowsiness(image)
+                    # 감지 결과 그리기 (분석 결과 재사용)
                     debug_img = self.detector.draw_debug_info(image, details)
                     
                     # 채널 정보 추가
@@ -269,8 +382,11 @@ class SequentialStudentMonitor:
                 continue
         
         # 사이클 완료
-        cycle_time = time.time() - cycle_start_time
+        cycle_time = time.perf_counter() - cycle_start_time
         self.stats['total_cycles'] += 1
+        instrumentation.record('cycle', cycle_time)
+        instrumentation.set_gauge('seats_occupied', sum(
+            1 for state in self.channel_states.values() if state['has_person']))
         
         print("\n" + "=" * 70)
         print(f"✅ 사이클 #{self.stats['total_cycles']} 완료")
@@ -295,8 +411,14 @@ class SequentialStudentMonitor:
         print(f"🔍 총 체크: {self.stats['total_checks']}회")
         print(f"💤 졸음 감지: {self.stats['drowsy_detections']}회")
         print(f"🚨 알림 발송: {self.stats['alerts_sent']}회")
+        self.scheduler.print_summary()
+        if self.outbox is not None:
+            self.outbox.print_summary()
         print()
         
+        # 구간별 처리 시간 (측정 활성화 시)
+        instrumentation.print_summary()
+        
         # 채널별 통계
         print("채널별 상태:")
         for ch_num in range(1, self.controller.total_channels + 1):
@@ -333,10 +455,24 @@ class SequentialStudentMonitor:
             print("   먼저 channel_setup.py를 실행하여 채널 버튼을 설정하세요.")
             return
         
+        # 감지기 예열 (채널 화면 1장씩 처리, 캡처 영역 미설정 시 전체 화면 크기로 가정)
+        region = getattr(self.controller, 'capture_region', None)
+        warmup_worker(self.detector, [tuple(region[2:4]) if region else (1920, 1080)],
+                      config=self.warmup_config)
+        
         last_stats_time = datetime.now()
         
+        if self.outbox is not None:
+            self.outbox.start()
+        
         try:
+            self.scheduler.start()
             while True:
+                self.scheduler.begin()
+                
+                # 설정 파일 변경 적용 (사이클 사이에만 교체)
+                self.apply_config_changes()
+                
                 # 한 사이클 실행
                 if not self.run_single_cycle(debug_mode):
                     break
@@ -346,10 +482,15 @@ class SequentialStudentMonitor:
                     self.print_statistics()
                     last_stats_time = datetime.now()
                 
-                # 다음 사이클까지 대기
-                # (사이클 소요 시간을 고려하여 조정)
-                print(f"\n⏸️  다음 사이클까지 대기 중...\n")
-                time.sleep(max(5, self.FULL_CYCLE_INTERVAL / 16))  # 최소 5초
+                # 다음 사이클 기한까지 대기 (사이클 소요 시간만큼 빼고 대기, 밀린 사이클은 건너뜀)
+                delay = self.scheduler.end()
+                
+                # 최대 속도 재생이면 대기 없이 다음 사이클
+                if not self.controller.realtime:
+                    continue
+                
+                print(f"\n⏸️  다음 사이클까지 {delay:.1f}초 대기 중...\n")
+                time.sleep(delay)
         
         except KeyboardInterrupt:
             print("\n\n⏹️  모니터링 종료")
@@ -358,17 +499,32 @@ class SequentialStudentMonitor:
             import traceback
             traceback.print_exc()
         finally:
+            # 남은 알림 전송 (못 보낸 알림은 파일에 남아 다음 실행에서 전송)
+            if self.outbox is not None:
+                self.outbox.stop(self.config.get('alert_outbox', {}).get('drain_timeout', 5))
+            
             # 최종 통계
             self.print_statistics()
             
+            if self.outbox is not None:
+                self.outbox.close()
+            
+            if self.metrics_server:
+                self.metrics_server.stop()
+            
             if debug_mode:
                 cv2.destroyAllWindows()
             
             print("✅ 시스템 종료")
 
 
-def main():
-    """메인 함수"""
+def main(argv=None):
+    """
+    메인 함수
+    
+    Args:
+        argv: 명령줄 인자 (None이면 sys.argv, viewguard.py CLI에서 전달)
+    """
     import argparse
     
     parser = argparse.ArgumentParser(
@@ -379,11 +535,20 @@ def main():
     parser.add_argument('--config', type=str,
                        default='config/settings.json',
                        help='설정 파일 경로')
+    parser.add_argument('--replay', type=str,
+                       help='채널 녹화 파일(.vgrec)을 화면 대신 입력으로 사용')
+    parser.add_argument('--max-speed', action='store_true',
+                       help='재생 시 녹화 간격을 무시하고 최대 속도로 실행')
+    
+    args = parser.parse_args(argv)
     
-    args = parser.parse_args()
+    controller = None
+    if args.replay:
+        from replay import ReplayChannelController
+        controller = ReplayChannelController(args.replay, realtime=not args.max_speed)
     
     # 모니터 실행
-    monitor = SequentialStudentMonitor(args.config)
+    monitor = SequentialStudentMonitor(args.config, controller)
     monitor.run(debug_mode=args.debug)
 
 
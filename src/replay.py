@@ -0,0 +1,452 @@
+"""
+캡처 녹화 및 재생
+실제 화면/뷰어 없이 모니터링 파이프라인을 재현 가능하게 벤치마크·테스트하기 위한 도구
+
+녹화 파일 형식 (.vgrec):
+    헤더: b'VGREC1\\n'
+    레코드: <타임스탬프 f8><채널 i4><인코딩 u1><길이 u4><이미지 바이트>
+    (채널 0 = 전체 화면, 1~ = 순차 모드 채널 번호)
+"""
+import cv2
+import numpy as np
+import struct
+import time
+import os
+from typing import Dict, List, Optional, Tuple, Union
+
+from capture import ViewGuardCapture
+
+
+MAGIC = b'VGREC1\n'
+RECORD_HEADER = struct.Struct('<diBI')
+
+ENCODING_PNG = 0
+ENCODING_JPEG = 1
+ENCODING_RAW = 2  # 메모리 내 녹화 전용 (디코딩 생략)
+
+SCREEN_CHANNEL = 0
+
+
+class FrameRecorder:
+    """캡처 프레임을 .vgrec 파일로 녹화"""
+
+    def __init__(self, path: str, encoding: str = 'png', jpeg_quality: int = 90):
+        """
+        초기화
+        Args:
+            path: 저장 경로
+            encoding: 'png'(무손실, 재현성 우선) 또는 'jpg'(용량 우선)
+            jpeg_quality: JPEG 품질 (1-100)
+        """
+        self.path = path
+        self.encoding = ENCODING_JPEG if encoding in ('jpg', 'jpeg') else ENCODING_PNG
+        self.jpeg_quality = jpeg_quality
+        self.frame_count = 0
+        self.bytes_written = 0
+
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        self.file = open(path, 'wb')
+        self.file.write(MAGIC)
+
+    def write(self, image: np.ndarray, channel: int = SCREEN_CHANNEL,
+              timestamp: Optional[float] = None) -> bool:
+        """
+        프레임 한 장 기록
+
+        Args:
+            image: BGR 이미지
+            channel: 채널 번호 (전체 화면은 0)
+            timestamp: 캡처 시각 (None이면 현재 시각)
+
+        Returns:
+            성공 여부
+        """
+        if self.encoding == ENCODING_JPEG:
+            ok, buf = cv2.imencode('.jpg', image, [cv2.IMWRITE_JPEG_QUALITY, self.jpeg_quality])
+        else:
+            ok, buf = cv2.imencode('.png', image, [cv2.IMWRITE_PNG_COMPRESSION, 3])
+
+        if not ok:
+            print(f"❌ 프레임 인코딩 실패 (채널 {channel})")
+            return False
+
+        data = buf.tobytes()
+        ts = time.time() if timestamp is None else timestamp
+
+        self.file.write(RECORD_HEADER.pack(ts, channel, self.encoding, len(data)))
+        self.file.write(data)
+
+        self.frame_count += 1
+        self.bytes_written += RECORD_HEADER.size + len(data)
+        return True
+
+    def close(self):
+        """파일 닫기"""
+        if not self.file.closed:
+            self.file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+
+class FrameRecording:
+    """녹화된 프레임 목록 (인코딩된 상태로 보관, 재생 시 디코딩)"""
+
+    def __init__(self, records: List[Tuple[float, int, int, object]] = None):
+        """
+        초기화
+        Args:
+            records: [(timestamp, channel, encoding, payload), ...]
+        """
+        self.records = records or []
+
+    @classmethod
+    def load(cls, path: str) -> 'FrameRecording':
+        """
+        .vgrec 파일 읽기
+
+        Args:
+            path: 녹화 파일 경로
+
+        Returns:
+            FrameRecording
+        """
+        records = []
+
+        with open(path, 'rb') as f:
+            if f.read(len(MAGIC)) != MAGIC:
+                raise ValueError(f"녹화 파일 형식이 아닙니다: {path}")
+
+            while True:
+                header = f.read(RECORD_HEADER.size)
+                if len(header) < RECORD_HEADER.size:
+                    break
+
+                ts, channel, encoding, length = RECORD_HEADER.unpack(header)
+                data = f.read(length)
+                if len(data) < length:
+                    print("⚠️  녹화 파일 끝이 잘려 있습니다 (마지막 프레임 무시)")
+                    break
+
+                records.append((ts, channel, encoding, data))
+
+        return cls(records)
+
+    @classmethod
+    def from_frames(cls, frames: List[Tuple[float, int, np.ndarray]]) -> 'FrameRecording':
+        """
+        메모리의 프레임 목록으로 생성 (합성 입력 등)
+
+        Args:
+            frames: [(timestamp, channel, image), ...]
+        """
+        return cls([(ts, ch, ENCODING_RAW, img) for ts, ch, img in frames])
+
+    @staticmethod
+    def decode(encoding: int, payload) -> Optional[np.ndarray]:
+        """레코드 페이로드 → BGR 이미지"""
+        if encoding == ENCODING_RAW:
+            return payload.copy()
+
+        buf = np.frombuffer(payload, dtype=np.uint8)
+        return cv2.imdecode(buf, cv2.IMREAD_COLOR)
+
+    def channels(self) -> List[int]:
+        """녹화에 포함된 채널 번호 목록"""
+        return sorted({ch for _, ch, _, _ in self.records})
+
+    def __len__(self):
+        return len(self.records)
+
+
+class _ReplayClock:
+    """녹화 시각에 맞춰 재생 속도를 맞추는 시계"""
+
+    def __init__(self, realtime: bool):
+        self.realtime = realtime
+        self.first_ts = None
+        self.start_wall = None
+
+    def wait_until(self, ts: float):
+        """녹화 시각 ts의 프레임이 나올 때까지 대기 (최대 속도 모드면 즉시)"""
+        if not self.realtime:
+            return
+
+        if self.first_ts is None:
+            self.first_ts = ts
+            self.start_wall = time.monotonic()
+            return
+
+        due = self.start_wall + (ts - self.first_ts)
+        delay = due - time.monotonic()
+        if delay > 0:
+            time.sleep(delay)
+
+
+def _open_recording(recording: Union[str, FrameRecording]) -> FrameRecording:
+    if isinstance(recording, FrameRecording):
+        return recording
+    return FrameRecording.load(recording)
+
+
+class ReplayCapture(ViewGuardCapture):
+    """녹화된 전체 화면을 ViewGuardCapture처럼 재생"""
+
+    # 재생 입력: 배경 모델은 메모리에서만, 알림은 콘솔로
+    offline = True
+
+    def __init__(self, recording: Union[str, FrameRecording],
+                 config_path: str = 'config/seats.json',
+                 background_config: Optional[Dict] = None,
+                 realtime: bool = False, loop: bool = False):
+        """
+        초기화
+        Args:
+            recording: 녹화 파일 경로 또는 FrameRecording
+            config_path: 좌석 설정 파일 경로
+            background_config: 배경 모델 설정
+            realtime: True면 녹화 간격대로, False면 최대 속도로 재생
+            loop: True면 끝에서 처음으로 반복
+        """
+        super().__init__(config_path, background_config)
+
+        self.recording = _open_recording(recording)
+        self.frames = [r for r in self.recording.records if r[1] == SCREEN_CHANNEL]
+        self.position = 0
+        self.loop = loop
+        self.realtime = realtime
+        self.clock = _ReplayClock(realtime)
+        self.last_timestamp = None
+
+        print(f"▶️  재생 준비: {len(self.frames)}프레임 "
+              f"({'녹화 속도' if realtime else '최대 속도'})")
+
+    @property
+    def exhausted(self) -> bool:
+        """더 재생할 프레임이 없으면 True"""
+        return not self.loop and self.position >= len(self.frames)
+
+    def capture_screen(self, bbox: Optional[Tuple[int, int, int, int]] = None) -> Optional[np.ndarray]:
+        """
+        다음 녹화 프레임 반환
+
+        Args:
+            bbox: 잘라낼 영역 (x1, y1, x2, y2). None이면 전체
+
+        Returns:
+            BGR 이미지 또는 None (재생 완료)
+        """
+        if not self.frames:
+            return None
+
+        if self.position >= len(self.frames):
+            if not self.loop:
+                return None
+            self.position = 0
+            self.clock = _ReplayClock(self.realtime)
+
+        ts, _, encoding, payload = self.frames[self.position]
+        self.position += 1
+
+        self.clock.wait_until(ts)
+        self.last_timestamp = ts
+
+        screen = FrameRecording.decode(encoding, payload)
+        if screen is not None and bbox:
+            x1, y1, x2, y2 = bbox
+            screen = screen[y1:y2, x1:x2]
+
+        return screen
+
+
+class ReplayChannelController:
+    """녹화된 채널 이미지를 ChannelController처럼 재생 (pyautogui 불필요)"""
+
+    # 재생 입력: 알림은 콘솔로
+    offline = True
+
+    def __init__(self, recording: Union[str, FrameRecording], realtime: bool = False):
+        """
+        초기화
+        Args:
+            recording: 녹화 파일 경로 또는 FrameRecording
+            realtime: True면 녹화 간격대로, False면 최대 속도로 재생
+        """
+        self.recording = _open_recording(recording)
+        self.realtime = realtime
+        self.clock = _ReplayClock(realtime)
+
+        # 채널별 프레임 큐
+        self.queues: Dict[int, List] = {}
+        for record in self.recording.records:
+            if record[1] != SCREEN_CHANNEL:
+                self.queues.setdefault(record[1], []).append(record)
+        self.positions = {ch: 0 for ch in self.queues}
+
+        self.total_channels = max(self.queues) if self.queues else 0
+        self.channel_buttons = {str(ch): (0, 0) for ch in self.queues}
+        self.current_channel = 1
+        self.capture_region = None
+        self.last_timestamp = None
+
+        print(f"▶️  채널 재생 준비: {len(self.queues)}개 채널, "
+              f"{sum(len(q) for q in self.queues.values())}프레임")
+
+    @property
+    def exhausted(self) -> bool:
+        """모든 채널의 프레임을 다 재생했으면 True"""
+        return all(self.positions[ch] >= len(q) for ch, q in self.queues.items())
+
+    def switch_to_channel(self, channel_num: int) -> bool:
+        """채널 전환 (대기 없음)"""
+        if channel_num not in self.queues:
+            return False
+        self.current_channel = channel_num
+        return True
+
+    def capture_current_channel(self) -> Optional[np.ndarray]:
+        """현재 채널의 다음 녹화 프레임 반환 (없으면 None)"""
+        queue = self.queues.get(self.current_channel, [])
+        pos = self.positions.get(self.current_channel, 0)
+
+        if pos >= len(queue):
+            return None
+
+        ts, _, encoding, payload = queue[pos]
+        self.positions[self.current_channel] = pos + 1
+
+        self.clock.wait_until(ts)
+        self.last_timestamp = ts
+        return FrameRecording.decode(encoding, payload)
+
+    def capture_all_channels(self, progress_callback=None) -> Dict[int, np.ndarray]:
+        """모든 채널의 다음 프레임 한 장씩 반환"""
+        captured_images = {}
+
+        for ch_num in range(1, self.total_channels + 1):
+            if progress_callback:
+                progress_callback(ch_num, self.total_channels)
+
+            if not self.switch_to_channel(ch_num):
+                continue
+
+            image = self.capture_current_channel()
+            if image is not None:
+                captured_images[ch_num] = image
+
+        return captured_images
+
+
+def record_screen(capture: ViewGuardCapture, output: str, frames: int,
+                  interval: float, encoding: str = 'png') -> int:
+    """
+    전체 화면을 일정 간격으로 녹화
+
+    Args:
+        capture: 캡처 객체
+        output: 저장 경로
+        frames: 녹화할 프레임 수
+        interval: 캡처 간격 (초)
+        encoding: 'png' 또는 'jpg'
+
+    Returns:
+        녹화된 프레임 수
+    """
+    if getattr(capture, 'groups', None):
+        print("❌ 캡처 그룹(seats.json groups) 설정에서는 전체 화면 녹화를 지원하지 않습니다")
+        return 0
+
+    with FrameRecorder(output, encoding) as recorder:
+        for i in range(frames):
+            start = time.time()
+            screen = capture.capture_screen()
+
+            if screen is not None:
+                recorder.write(screen, SCREEN_CHANNEL, start)
+                print(f"🎬 [{i+1}/{frames}] 프레임 기록 ({screen.shape[1]}x{screen.shape[0]})")
+
+            time.sleep(max(0, interval - (time.time() - start)))
+
+        print(f"✅ 녹화 완료: {recorder.frame_count}프레임, "
+              f"{recorder.bytes_written / 1024 / 1024:.1f}MB → {output}")
+        return recorder.frame_count
+
+
+def record_channels(controller, output: str, cycles: int, encoding: str = 'png') -> int:
+    """
+    capture_all_channels()로 채널별 이미지를 사이클 단위로 녹화
+
+    Args:
+        controller: ChannelController
+        output: 저장 경로
+        cycles: 녹화할 사이클 수
+        encoding: 'png' 또는 'jpg'
+
+    Returns:
+        녹화된 프레임 수
+    """
+    with FrameRecorder(output, encoding) as recorder:
+        for cycle in range(cycles):
+            print(f"\n🎬 사이클 {cycle+1}/{cycles} 녹화")
+
+            def on_progress(ch_num, total):
+                on_progress.timestamps[ch_num] = time.time()
+            on_progress.timestamps = {}
+
+            images = controller.capture_all_channels(on_progress)
+            for ch_num, image in sorted(images.items()):
+                recorder.write(image, ch_num, on_progress.timestamps.get(ch_num))
+
+        print(f"✅ 녹화 완료: {recorder.frame_count}프레임, "
+              f"{recorder.bytes_written / 1024 / 1024:.1f}MB → {output}")
+        return recorder.frame_count
+
+
+def main():
+    """메인 함수"""
+    import argparse
+
+    parser = argparse.ArgumentParser(description='ViewGuard 캡처 녹화/재생')
+    sub = parser.add_subparsers(dest='command', required=True)
+
+    rec = sub.add_parser('record', help='전체 화면 녹화 (main.py 입력)')
+    rec.add_argument('--output', required=True, help='저장 경로 (.vgrec)')
+    rec.add_argument('--frames', type=int, default=30, help='녹화 프레임 수')
+    rec.add_argument('--interval', type=float, default=2.0, help='캡처 간격 (초)')
+    rec.add_argument('--encoding', choices=['png', 'jpg'], default='png')
+
+    rec_ch = sub.add_parser('record-channels', help='채널별 순차 녹화 (main_sequential.py 입력)')
+    rec_ch.add_argument('--output', required=True, help='저장 경로 (.vgrec)')
+    rec_ch.add_argument('--cycles', type=int, default=1, help='녹화 사이클 수')
+    rec_ch.add_argument('--encoding', choices=['png', 'jpg'], default='png')
+
+    info = sub.add_parser('info', help='녹화 파일 정보')
+    info.add_argument('input', help='녹화 파일 경로')
+
+    args = parser.parse_args()
+
+    if args.command == 'record':
+        record_screen(ViewGuardCapture(), args.output, args.frames,
+                      args.interval, args.encoding)
+    elif args.command == 'record-channels':
+        from channel_controller import ChannelController
+        record_channels(ChannelController(), args.output, args.cycles, args.encoding)
+    elif args.command == 'info':
+        recording = FrameRecording.load(args.input)
+        timestamps = [r[0] for r in recording.records]
+        print(f"📼 {args.input}")
+        print(f"   프레임: {len(recording)}개")
+        print(f"   채널: {recording.channels()}")
+        if timestamps:
+            print(f"   길이: {max(timestamps) - min(timestamps):.1f}초")
+        print(f"   크기: {os.path.getsize(args.input) / 1024 / 1024:.1f}MB")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,24 +1,30 @@
 """
 ROI Manager - 좌석 위치 설정 GUI
 마우스로 클릭하여 각 좌석의 위치를 지정
+캡처 그룹(--group)을 지정하면 그 그룹 영역만 캡처하고 좌표를 그룹 기준으로 저장
 """
+import argparse
 import cv2
 import numpy as np
 from capture import ViewGuardCapture
-from typing import List, Tuple, Optional
+from typing import Dict, List, Tuple, Optional
 
 
 class ROIManager:
     """좌석 위치 설정 GUI"""
     
-    def __init__(self, capture: ViewGuardCapture):
+    def __init__(self, capture: ViewGuardCapture, group_id: Optional[str] = None):
         """
         초기화
         Args:
             capture: ViewGuardCapture 인스턴스
+            group_id: 편집할 캡처 그룹 (None이면 전체 화면)
         """
         self.capture = capture
+        self.group_id = group_id
         self.seats = {}
+        # 다른 그룹 좌석 (저장 시 그대로 합침)
+        self.other_seats: Dict[str, Dict] = {}
         self.current_seat_id = 1
         
         # 마우스 드래그 관련
@@ -33,6 +39,10 @@ class ROIManager:
         
         print("=" * 60)
         print("🎯 ROI Manager - 좌석 위치 설정")
+        if group_id is not None:
+            group = capture.groups[group_id]
+            print(f"🖥️  캡처 그룹 {group_id}: ({group['x']}, {group['y']}) "
+                  f"{group['width']}x{group['height']} - 좌표는 그룹 기준으로 저장")
         print("=" * 60)
         print("사용법:")
         print("  1. 마우스로 드래그하여 좌석 영역 지정")
@@ -144,6 +154,8 @@ class ROIManager:
             'channel': f"CH{self.current_seat_id:02d}",
             'enabled': True
         }
+        if self.group_id is not None:
+            seat_info['group'] = self.group_id
         
         self.seats[str(self.current_seat_id)] = seat_info
         print(f"✅ 좌석 {self.current_seat_id} 추가: ({x}, {y}, {w}, {h})")
@@ -166,8 +178,9 @@ class ROIManager:
         print(f"🗑️  좌석 {max_id} 삭제됨")
         
         # current_seat_id 조정
-        if self.seats:
-            self.current_seat_id = max(int(k) for k in self.seats.keys()) + 1
+        used = list(self.seats) + list(self.other_seats)
+        if used:
+            self.current_seat_id = max(int(k) for k in used) + 1
         else:
             self.current_seat_id = 1
     
@@ -177,7 +190,7 @@ class ROIManager:
             print("⚠️  저장할 좌석이 없습니다")
             return False
         
-        success = self.capture.save_seats(self.seats)
+        success = self.capture.save_seats({**self.other_seats, **self.seats})
         
         if success:
             print(f"✅ {len(self.seats)}개 좌석 저장 완료!")
@@ -190,7 +203,17 @@ class ROIManager:
     def refresh_screen(self):
         """화면 다시 캡처"""
         print("🔄 화면 새로고침...")
-        self.screen = self.capture.capture_screen()
+        if self.group_id is None:
+            self.screen = self.capture.capture_screen()
+        else:
+            group = self.capture.groups[self.group_id]
+            try:
+                self.screen = self.capture.grab((group['x'], group['y'],
+                                                 group['x'] + group['width'],
+                                                 group['y'] + group['height']))
+            except Exception as e:
+                print(f"❌ 그룹 {self.group_id} 캡처 실패: {e}")
+                self.screen = None
         if self.screen is None:
             print("❌ 화면 캡처 실패")
             return False
@@ -202,13 +225,19 @@ class ROIManager:
         if not self.refresh_screen():
             return
         
-        # 기존 좌석 정보 로드
-        if self.capture.seats:
-            print(f"📋 기존 좌석 {len(self.capture.seats)}개 로드됨")
+        # 기존 좌석 정보 로드 (이 그룹 좌석만 편집, 좌석 번호는 전체 그룹에서 이어서)
+        existing = {sid: seat for sid, seat in self.capture.seats.items()
+                    if seat.get('group') == self.group_id}
+        self.other_seats = {sid: seat for sid, seat in self.capture.seats.items()
+                            if sid not in existing}
+        if self.other_seats:
+            self.current_seat_id = max(int(k) for k in self.other_seats.keys()) + 1
+        if existing:
+            print(f"📋 기존 좌석 {len(existing)}개 로드됨")
             response = input("기존 설정을 사용하시겠습니까? (y/n): ")
             if response.lower() == 'y':
-                self.seats = self.capture.seats.copy()
-                self.current_seat_id = max(int(k) for k in self.seats.keys()) + 1
+                self.seats = existing.copy()
+                self.current_seat_id = max(int(k) for k in self.capture.seats.keys()) + 1
         
         # OpenCV 윈도우 생성
         window_name = 'ROI Manager - 좌석 설정'
@@ -250,13 +279,47 @@ class ROIManager:
         cv2.destroyAllWindows()
 
 
-def main():
+def main(argv=None):
     """메인 함수"""
+    parser = argparse.ArgumentParser(description='ViewGuard 좌석 위치 설정')
+    parser.add_argument('--group', type=str,
+                        help='편집할 캡처 그룹 ID (모니터 / 뷰어 창별 그룹)')
+    parser.add_argument('--region', type=str,
+                        help='그룹 영역 지정/변경 "x,y,너비,높이" (가상 데스크톱 좌표)')
+    args = parser.parse_args(argv)
+    
     # ViewGuardCapture 초기화
     capture = ViewGuardCapture()
     
+    if args.region:
+        if not args.group:
+            print("❌ --region은 --group과 함께 지정하세요")
+            return
+        try:
+            x, y, w, h = (int(v) for v in args.region.split(','))
+        except ValueError:
+            print(f"❌ 영역 형식 오류: {args.region} (예: 1920,0,1920,1080)")
+            return
+        capture.groups = {**capture.groups, args.group: {'x': x, 'y': y, 'width': w, 'height': h}}
+    
+    if args.group is None and capture.groups:
+        print(f"❌ 캡처 그룹이 설정되어 있습니다. --group으로 편집할 그룹을 지정하세요: "
+              f"{', '.join(capture.groups)}")
+        return
+    if args.group is not None and args.group not in capture.groups:
+        print(f"❌ 캡처 그룹 {args.group}이 없습니다. --region으로 영역을 지정하세요")
+        return
+    
+    # 그룹 없는 기존 좌석은 캡처 그룹과 함께 쓸 수 없음 (좌표 기준이 다름)
+    legacy = [sid for sid, seat in capture.seats.items() if 'group' not in seat]
+    if args.group is not None and legacy:
+        print(f"⚠️  그룹 없는 기존 좌석 {len(legacy)}개는 캡처 그룹 설정 시 삭제됩니다")
+        if input("계속하시겠습니까? (y/n): ").lower() != 'y':
+            return
+        capture.seats = {sid: seat for sid, seat in capture.seats.items() if 'group' in seat}
+    
     # ROI Manager 실행
-    manager = ROIManager(capture)
+    manager = ROIManager(capture, args.group)
     manager.run()
 
 
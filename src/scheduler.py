@@ -0,0 +1,191 @@
+"""
+사이클 스케줄러
+"작업 후 interval만큼 sleep" 대신 절대 기한(시작 시각 + k × interval)을 목표로 대기하여
+주기가 작업 시간만큼 밀리지 않게 하고, 주기 초과(overrun) / 시작 지연(lateness)을 기록
+
+처리가 계속 주기를 넘기면 단계적으로 성능 저하 모드로 전환:
+- 1단계: 저우선 좌석(채널)은 두 사이클에 한 번만 분석
+- 2단계: + 분석 해상도 축소 (degrade_scale)
+여유가 생기면 한 단계씩 복귀
+"""
+import time
+from collections import deque
+from typing import Callable, Dict, Optional
+
+import numpy as np
+
+from instrumentation import instrumentation
+
+
+# 성능 저하 단계
+DEGRADE_NONE = 0
+DEGRADE_SKIP_LOW_PRIORITY = 1
+DEGRADE_LOWER_RESOLUTION = 2
+
+DEGRADE_LABELS = {
+    DEGRADE_NONE: '정상',
+    DEGRADE_SKIP_LOW_PRIORITY: '저우선 좌석 격주기 분석',
+    DEGRADE_LOWER_RESOLUTION: '저우선 좌석 격주기 + 해상도 축소',
+}
+
+
+class CycleScheduler:
+    """절대 기한 기반 주기 스케줄러 (주기 초과 / 지연 / 성능 저하 단계 관리)"""
+
+    def __init__(self, interval: float, config: Dict = None, name: str = 'cycle',
+                 clock: Callable[[], float] = time.perf_counter):
+        """
+        초기화
+        Args:
+            interval: 목표 주기 (초)
+            config: scheduler 설정 딕셔너리
+                degrade: 성능 저하 모드 사용 (기본 true)
+                overrun_window: 주기 초과 판단에 보는 최근 사이클 수 (기본 10)
+                degrade_after: 창 안에서 이만큼 주기를 넘기면 한 단계 저하 (기본 3)
+                recover_ratio: 작업 시간 / 주기가 이 값보다 작은 사이클이 (기본 0.6)
+                recover_cycles: 이만큼 이어지면 한 단계 복귀 (기본 10)
+                max_level: 최대 저하 단계 (기본 2)
+                degrade_scale: 2단계 분석 해상도 배율 (기본 0.5)
+            name: 메트릭 / 출력용 이름
+            clock: 단조 시계 (테스트용 교체)
+        """
+        config = config or {}
+        self.interval = interval
+        self.name = name
+        self.clock = clock
+
+        self.degrade_enabled = config.get('degrade', True)
+        self.degrade_after = config.get('degrade_after', 3)
+        self.recover_ratio = config.get('recover_ratio', 0.6)
+        self.recover_cycles = config.get('recover_cycles', 10)
+        self.max_level = config.get('max_level', DEGRADE_LOWER_RESOLUTION)
+        self.degrade_scale = config.get('degrade_scale', 0.5)
+
+        self.level = DEGRADE_NONE
+        self._recent_overruns = deque(maxlen=config.get('overrun_window', 10))
+        self._calm_streak = 0
+
+        self.deadline: Optional[float] = None
+        self._cycle_start: Optional[float] = None
+
+        # 통계
+        self.stats = {'cycles': 0, 'overruns': 0, 'skipped': 0,
+                      'max_work': 0.0, 'max_lateness': 0.0}
+        self._lateness = deque(maxlen=1024)
+
+    def start(self, now: float = None):
+        """첫 기한을 지금으로 설정 (캡처 실패 등으로 오래 멈춘 뒤 다시 시작할 때도 호출)"""
+        self.deadline = self.clock() if now is None else now
+
+    def begin(self, now: float = None) -> float:
+        """
+        사이클 시작 기록
+
+        Returns:
+            기한 대비 시작 지연 (초, 0 이상)
+        """
+        now = self.clock() if now is None else now
+        if self.deadline is None:
+            self.deadline = now
+
+        lateness = max(0.0, now - self.deadline)
+        self._cycle_start = now
+        self._lateness.append(lateness)
+        self.stats['max_lateness'] = max(self.stats['max_lateness'], lateness)
+        instrumentation.record(f'{self.name}_lateness', lateness)
+        return lateness
+
+    def end(self, now: float = None) -> float:
+        """
+        사이클 종료 기록 후 다음 기한 계산
+
+        Returns:
+            다음 기한까지 대기할 시간 (초, 0 이상)
+        """
+        now = self.clock() if now is None else now
+        start = self._cycle_start if self._cycle_start is not None else now
+        work = now - start
+        interval = self.interval
+
+        self.stats['cycles'] += 1
+        self.stats['max_work'] = max(self.stats['max_work'], work)
+
+        overrun = interval > 0 and work > interval
+        if overrun:
+            self.stats['overruns'] += 1
+            instrumentation.inc(f'{self.name}_overruns_total')
+        self._update_level(overrun, work / interval if interval > 0 else 0.0)
+
+        # 다음 기한: 이미 지난 기한은 건너뜀 (밀린 사이클을 몰아서 실행하지 않음)
+        self.deadline = (self.deadline if self.deadline is not None else start) + interval
+        if interval > 0 and self.deadline < now:
+            skipped = int((now - self.deadline) // interval) + 1
+            self.deadline += skipped * interval
+            self.stats['skipped'] += skipped
+            instrumentation.inc(f'{self.name}s_skipped_total', skipped)
+        elif interval <= 0:
+            self.deadline = now
+
+        return max(0.0, self.deadline - now)
+
+    def wait(self):
+        """사이클 종료 기록 후 다음 기한까지 대기 (동기 루프용)"""
+        delay = self.end()
+        if delay > 0:
+            time.sleep(delay)
+
+    def _update_level(self, overrun: bool, load: float):
+        """최근 주기 초과 횟수 / 여유 사이클 수로 성능 저하 단계 조정"""
+        if not self.degrade_enabled:
+            return
+
+        self._recent_overruns.append(overrun)
+        self._calm_streak = self._calm_streak + 1 if load < self.recover_ratio else 0
+
+        previous = self.level
+        if sum(self._recent_overruns) >= self.degrade_after and self.level < self.max_level:
+            self.level += 1
+            self._recent_overruns.clear()
+            self._calm_streak = 0
+        elif self._calm_streak >= self.recover_cycles and self.level > DEGRADE_NONE:
+            self.level -= 1
+            self._calm_streak = 0
+
+        if self.level != previous:
+            arrow = '⚠️  처리 지연' if self.level > previous else '✅ 처리 여유'
+            print(f"{arrow}: 성능 저하 {self.level}단계 ({DEGRADE_LABELS[self.level]})")
+        instrumentation.set_gauge(f'{self.name}_degrade_level', self.level)
+
+    @property
+    def skip_low_priority(self) -> bool:
+        """저우선 좌석을 건너뛰는 단계인지"""
+        return self.level >= DEGRADE_SKIP_LOW_PRIORITY
+
+    @property
+    def analysis_scale(self) -> float:
+        """분석 해상도 배율 (2단계면 degrade_scale, 아니면 1.0)"""
+        return self.degrade_scale if self.level >= DEGRADE_LOWER_RESOLUTION else 1.0
+
+    def summary(self) -> Dict[str, float]:
+        """
+        스케줄 통계
+
+        Returns:
+            {'cycles', 'overruns', 'skipped', 'max_work', 'max_lateness',
+             'lateness_p50', 'lateness_p90', 'level'}
+        """
+        lateness = np.array(self._lateness) if self._lateness else np.zeros(1)
+        return dict(self.stats,
+                    lateness_p50=float(np.percentile(lateness, 50)),
+                    lateness_p90=float(np.percentile(lateness, 90)),
+                    level=self.level)
+
+    def print_summary(self):
+        """통계 출력에 들어갈 스케줄 요약"""
+        s = self.summary()
+        print(f"⏲️  주기 {self.interval:g}초: {s['cycles']}사이클, "
+              f"초과 {s['overruns']}회, 건너뜀 {s['skipped']}회, "
+              f"최대 작업 {s['max_work']:.2f}초")
+        print(f"   시작 지연 p50 {s['lateness_p50'] * 1000:.0f}ms / "
+              f"p90 {s['lateness_p90'] * 1000:.0f}ms / 최대 {s['max_lateness'] * 1000:.0f}ms, "
+              f"성능 저하 {s['level']}단계 ({DEGRADE_LABELS[s['level']]})")
@@ -0,0 +1,249 @@
+"""
+알림 스냅샷 (좌석 ROI JPEG)
+졸음 알림에 좌석 사진을 붙일 수 있도록 알림 시점의 ROI를 JPEG로 만들어 모든 알림 채널이 같이 사용
+
+- 감지 루프에서는 ROI 복사만 하고 (수십 µs), 인코딩은 스냅샷 전용 스레드 1개가 처리
+- 한 번 인코딩한 JPEG를 텔레그램 / 웹훅 / 대시보드가 공유 (채널마다 다시 인코딩하지 않음)
+- 크기 예산: max_width로 ROI 축소 후 quality로 인코딩, max_bytes를 넘으면 품질을 10씩 낮추고
+  min_quality에서도 넘으면 3/4씩 축소
+- 좌석별 최근 스냅샷 LRU (좌석당 keep_per_seat장, 최대 max_seats석) → 대시보드 data.json
+"""
+import asyncio
+import base64
+import threading
+import time
+from collections import OrderedDict, deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
+
+import cv2
+import numpy as np
+
+from instrumentation import instrumentation
+
+
+def encode_jpeg(roi: np.ndarray, max_width: int = 320, quality: int = 80,
+                min_quality: int = 40, max_bytes: int = 0) -> Tuple[bytes, int, Tuple[int, int]]:
+    """
+    ROI → 크기 예산 안의 JPEG
+
+    Args:
+        roi: 좌석 영역 이미지 (BGR 또는 그레이)
+        max_width: 이보다 넓으면 비율 유지하며 축소 (0이면 원본 크기)
+        quality: 시작 JPEG 품질
+        min_quality: 예산을 맞추려고 낮출 수 있는 최저 품질
+        max_bytes: 바이트 예산 (0이면 제한 없음)
+
+    Returns:
+        (JPEG 바이트, 최종 품질, (너비, 높이))
+    """
+    height, width = roi.shape[:2]
+    if max_width and width > max_width:
+        roi = cv2.resize(roi, (max_width, max(1, round(height * max_width / width))),
+                         interpolation=cv2.INTER_AREA)
+
+    while True:
+        ok, buffer = cv2.imencode('.jpg', roi, [cv2.IMWRITE_JPEG_QUALITY, int(quality)])
+        if not ok:
+            raise ValueError("JPEG 인코딩 실패")
+        if not max_bytes or buffer.size <= max_bytes:
+            break
+        if quality - 10 >= min_quality:
+            quality -= 10
+            continue
+        # 품질을 더 낮출 수 없으면 크기를 줄임
+        if roi.shape[1] <= 64:
+            break
+        roi = cv2.resize(roi, (roi.shape[1] * 3 // 4, max(1, roi.shape[0] * 3 // 4)),
+                         interpolation=cv2.INTER_AREA)
+
+    return buffer.tobytes(), quality, (roi.shape[1], roi.shape[0])
+
+
+class Snapshot:
+    """알림 1건의 좌석 스냅샷 (인코딩은 스냅샷 스레드에서 한 번만, 결과는 모든 채널이 공유)"""
+
+    def __init__(self, seat: str, future: Future):
+        self.seat = seat
+        self.time = datetime.now()
+        self._future = future
+        self._base64: Optional[str] = None
+        # 인코딩 후 채워짐
+        self.quality = 0
+        self.size = (0, 0)
+        self.encode_seconds = 0.0
+
+    @property
+    def ready(self) -> bool:
+        """인코딩 완료 여부"""
+        return self._future.done()
+
+    def jpeg(self, timeout: float = 5.0) -> Optional[bytes]:
+        """
+        JPEG 바이트 (인코딩이 안 끝났으면 기다림)
+
+        Returns:
+            JPEG 바이트, 실패 시 None (알림은 사진 없이 전송)
+        """
+        try:
+            return self._future.result(timeout)
+        except Exception as e:
+            print(f"⚠️  [좌석 {self.seat}] 스냅샷 인코딩 실패: {e}")
+            return None
+
+    async def jpeg_async(self, timeout: float = 5.0) -> Optional[bytes]:
+        """JPEG 바이트 (비동기 런타임용, 이벤트 루프를 막지 않고 기다림)"""
+        try:
+            return await asyncio.wait_for(asyncio.wrap_future(self._future), timeout)
+        except Exception as e:
+            print(f"⚠️  [좌석 {self.seat}] 스냅샷 인코딩 실패: {e}")
+            return None
+
+    def base64(self) -> Optional[str]:
+        """base64 문자열 (웹훅 / 아웃박스 / 대시보드용, 한 번만 변환)"""
+        if self._base64 is None:
+            data = self.jpeg()
+            if data is None:
+                return None
+            self._base64 = base64.b64encode(data).decode('ascii')
+        return self._base64
+
+    def describe(self) -> str:
+        """콘솔 출력용 요약"""
+        data = self.jpeg()
+        if data is None:
+            return "없음"
+        return f"{self.size[0]}x{self.size[1]}, {len(data) / 1024:.1f}KB (품질 {self.quality})"
+
+
+class SnapshotStore:
+    """스냅샷 생성 (전용 스레드 인코딩) + 좌석별 최근 스냅샷 LRU"""
+
+    def __init__(self, config: Dict = None):
+        """
+        초기화
+        Args:
+            config: alert_snapshot 설정 딕셔너리
+                max_width: ROI 축소 너비 (기본 320)
+                quality: JPEG 품질 (기본 80)
+                min_quality: 예산 초과 시 낮출 수 있는 최저 품질 (기본 40)
+                max_bytes: 스냅샷 1장 바이트 예산 (기본 40000, 0이면 제한 없음)
+                keep_per_seat: 좌석당 보관할 최근 스냅샷 수 (기본 3)
+                max_seats: 스냅샷을 보관할 최대 좌석 수 (기본 64, 오래된 좌석부터 제거)
+                dashboard: 대시보드 data.json에 좌석별 최신 스냅샷 포함 (기본 false, 켜면 공개 저장소에 얼굴 사진이 올라감)
+        """
+        config = config or {}
+        self.max_width = config.get('max_width', 320)
+        self.quality = config.get('quality', 80)
+        self.min_quality = config.get('min_quality', 40)
+        self.max_bytes = config.get('max_bytes', 40000)
+        self.keep_per_seat = config.get('keep_per_seat', 3)
+        self.max_seats = config.get('max_seats', 64)
+        self.dashboard = config.get('dashboard', False)
+
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='snapshot')
+        self._lock = threading.Lock()
+        # 좌석 ID → 최근 스냅샷 deque (최근에 쓴 좌석이 뒤)
+        self._recent: 'OrderedDict[str, deque]' = OrderedDict()
+
+        self.stats = {'captured': 0, 'encoded': 0, 'failed': 0, 'bytes': 0,
+                      'capture_seconds': 0.0, 'encode_seconds': 0.0, 'encode_cpu_seconds': 0.0}
+
+    def capture(self, seat: str, roi: np.ndarray) -> Snapshot:
+        """
+        알림 시점 ROI로 스냅샷 생성 (감지 루프에서 호출, ROI 복사만 하고 바로 반환)
+
+        Args:
+            seat: 좌석 ID
+            roi: 좌석 영역 이미지 (프레임 버퍼가 재사용되므로 복사해 둠)
+
+        Returns:
+            Snapshot (jpeg()는 인코딩이 끝날 때까지 기다림)
+        """
+        start = time.perf_counter()
+        image = roi.copy()
+        future: Future = Future()
+        snapshot = Snapshot(seat, future)
+        self._executor.submit(self._encode, snapshot, image, future)
+
+        with self._lock:
+            recent = self._recent.pop(seat, None) or deque(maxlen=self.keep_per_seat)
+            recent.append(snapshot)
+            self._recent[seat] = recent
+            while len(self._recent) > self.max_seats:
+                self._recent.popitem(last=False)
+
+        elapsed = time.perf_counter() - start
+        self.stats['captured'] += 1
+        self.stats['capture_seconds'] += elapsed
+        instrumentation.record('snapshot_capture', elapsed)
+        return snapshot
+
+    def _encode(self, snapshot: Snapshot, image: np.ndarray, future: Future):
+        """스냅샷 스레드: JPEG 인코딩 후 결과 전달"""
+        start, cpu_start = time.perf_counter(), time.thread_time()
+        try:
+            data, snapshot.quality, snapshot.size = encode_jpeg(
+                image, self.max_width, self.quality, self.min_quality, self.max_bytes)
+        except Exception as e:
+            self.stats['failed'] += 1
+            future.set_exception(e)
+            return
+
+        snapshot.encode_seconds = time.perf_counter() - start
+        self.stats['encoded'] += 1
+        self.stats['bytes'] += len(data)
+        self.stats['encode_seconds'] += snapshot.encode_seconds
+        self.stats['encode_cpu_seconds'] += time.thread_time() - cpu_start
+        instrumentation.record('snapshot_encode', snapshot.encode_seconds)
+        instrumentation.inc('snapshot_bytes_total', len(data))
+        future.set_result(data)
+
+    def recent(self, seat: str) -> List[Snapshot]:
+        """좌석의 최근 스냅샷 (오래된 순)"""
+        with self._lock:
+            return list(self._recent.get(seat, ()))
+
+    def latest(self, seat: str) -> Optional[Snapshot]:
+        """좌석의 가장 최근 스냅샷"""
+        recent = self.recent(seat)
+        return recent[-1] if recent else None
+
+    def dashboard_entries(self) -> Dict[str, Dict]:
+        """
+        대시보드 data.json용 좌석별 최신 스냅샷 (인코딩이 끝난 것만, 기다리지 않음)
+
+        Returns:
+            {좌석 ID: {'time', 'width', 'height', 'bytes', 'jpeg'(base64)}}
+        """
+        with self._lock:
+            latest = [recent[-1] for recent in self._recent.values() if recent]
+
+        entries = {}
+        for snapshot in latest:
+            if not snapshot.ready or snapshot.base64() is None:
+                continue
+            entries[snapshot.seat] = {
+                'time': snapshot.time.strftime('%H:%M:%S'),
+                'width': snapshot.size[0],
+                'height': snapshot.size[1],
+                'bytes': len(snapshot.jpeg()),
+                'jpeg': snapshot.base64(),
+            }
+        return entries
+
+    def close(self):
+        """남은 인코딩을 끝내고 스냅샷 스레드 종료"""
+        self._executor.shutdown(wait=True)
+
+    def print_summary(self):
+        """통계 출력에 들어갈 스냅샷 요약 (알림당 추가 CPU / 바이트)"""
+        s = self.stats
+        if not s['captured']:
+            return
+        encoded = max(s['encoded'], 1)
+        print(f"📷 알림 스냅샷: {s['captured']}장, 감지 루프 "
+              f"{s['capture_seconds'] / s['captured'] * 1000:.2f}ms/장, 인코딩 "
+              f"{s['encode_cpu_seconds'] / encoded * 1000:.1f}ms CPU/장 (스냅샷 스레드), "
+              f"평균 {s['bytes'] / encoded / 1024:.1f}KB, 실패 {s['failed']}장")
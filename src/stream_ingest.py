@@ -0,0 +1,366 @@
+"""
+다중 카메라/스트림 수집
+카메라(장치 번호), 동영상 파일, RTSP URL을 각각 별도 스레드에서 읽고
+스트림마다 가장 최근 프레임 한 장만 보관 → 감지가 느려도 프레임이 쌓이지 않음
+
+읽기 스레드는 장치를 쉬지 않고 비우므로 감지 지연은 버퍼 깊이가 아니라 추론 시간으로 제한되며,
+프레임마다 캡처 시각을 붙여 감지 시점까지의 프레임 나이(frame_age)를 측정
+
+로컬 테스트용 RTSP 대체: 동영상 파일을 원본 FPS 속도로 반복 재생하면
+실시간 스트림과 같은 방식으로 동작
+"""
+import cv2
+import numpy as np
+import os
+import threading
+import time
+from collections import deque
+from typing import List, Optional, Tuple, Union
+
+from instrumentation import instrumentation
+
+
+def parse_source(source: Union[int, str]) -> Union[int, str]:
+    """
+    입력 문자열을 VideoCapture 소스로 변환
+
+    Args:
+        source: '0' 같은 장치 번호, 파일 경로, 'rtsp://...' URL
+
+    Returns:
+        장치 번호(int) 또는 문자열 그대로
+    """
+    if isinstance(source, str) and source.strip().isdigit():
+        return int(source.strip())
+    return source
+
+
+def is_file_source(source: Union[int, str]) -> bool:
+    """로컬 동영상 파일 여부"""
+    return isinstance(source, str) and '://' not in source and os.path.exists(source)
+
+
+class StreamReader:
+    """스트림 1개를 읽는 백그라운드 스레드 (최신 프레임만 보관)"""
+
+    def __init__(self, source: Union[int, str], name: str = None,
+                 width: int = 1280, height: int = 720,
+                 reconnect_delay: float = 2.0, loop: bool = True,
+                 pace: bool = True, notify: threading.Event = None,
+                 open_retries: int = 5):
+        """
+        초기화
+        Args:
+            source: 장치 번호, 파일 경로 또는 RTSP URL
+            name: 표시/메트릭용 이름 (None이면 소스 문자열)
+            width, height: 요청 해상도 (카메라만 적용)
+            reconnect_delay: 연결 실패/끊김 시 재연결 대기 (초)
+            loop: 파일 끝에서 처음부터 다시 재생
+            pace: 파일을 원본 FPS 속도로 읽기 (False면 최대 속도)
+            notify: 새 프레임 도착 시 set할 이벤트 (StreamHub 공유)
+            open_retries: 처음 연결이 안 될 때 재시도 횟수 (RTSP만, 장치 번호 / 파일은 바로 포기)
+        """
+        self.source = parse_source(source)
+        self.name = name or str(source)
+        self.width = width
+        self.height = height
+        self.reconnect_delay = reconnect_delay
+        self.is_file = is_file_source(self.source)
+        self.loop = loop
+        self.pace = pace
+        self.notify = notify
+        self.open_retries = open_retries
+
+        self._lock = threading.Lock()
+        self._frame: Optional[np.ndarray] = None
+        self._timestamp = 0.0     # 마지막 프레임 캡처 시각 (perf_counter)
+        self._seq = 0             # 마지막으로 받은 프레임 번호
+        self._consumed_seq = 0    # 마지막으로 가져간 프레임 번호
+        self._arrived = threading.Event()
+
+        self._thread: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+        self.finished = False     # 파일 끝 도달 (loop=False) 또는 처음 연결 실패
+        self.open_failed = False  # 한 번도 연결하지 못하고 포기
+
+        # 통계
+        self.stats = {
+            'frames_read': 0,
+            'frames_dropped': 0,   # 가져가기 전에 새 프레임으로 덮어쓴 수
+            'reconnects': 0
+        }
+
+    def start(self) -> 'StreamReader':
+        """읽기 스레드 시작"""
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name=f'stream-{self.name}',
+                                        daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self, timeout: float = 2.0):
+        """읽기 스레드 종료"""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
+
+    @property
+    def exhausted(self) -> bool:
+        """파일 재생이 끝났고 남은 프레임도 모두 가져감"""
+        with self._lock:
+            return self.finished and self._consumed_seq == self._seq
+
+    def read(self) -> Tuple[Optional[np.ndarray], int, float]:
+        """
+        아직 가져가지 않은 최신 프레임
+
+        Returns:
+            (프레임, 프레임 번호, 캡처 시각). 새 프레임이 없으면 (None, 마지막 번호, 0.0)
+            캡처 시각은 time.perf_counter() 기준
+        """
+        with self._lock:
+            if self._seq == self._consumed_seq:
+                return None, self._seq, 0.0
+            self._consumed_seq = self._seq
+            return self._frame, self._seq, self._timestamp
+
+    def wait(self, timeout: float) -> bool:
+        """
+        새 프레임 대기 (단일 스트림용)
+
+        Args:
+            timeout: 최대 대기 시간 (초)
+
+        Returns:
+            새 프레임이 있으면 True
+        """
+        deadline = time.perf_counter() + timeout
+        while True:
+            with self._lock:
+                if self._seq != self._consumed_seq:
+                    return True
+                if self.finished:
+                    return False
+                self._arrived.clear()
+            remaining = deadline - time.perf_counter()
+            if remaining <= 0:
+                return False
+            self._arrived.wait(remaining)
+
+    def _open(self) -> Optional[cv2.VideoCapture]:
+        cap = cv2.VideoCapture(self.source)
+        if not cap.isOpened():
+            cap.release()
+            return None
+        if not self.is_file:
+            cap.set(cv2.CAP_PROP_FRAME_WIDTH, self.width)
+            cap.set(cv2.CAP_PROP_FRAME_HEIGHT, self.height)
+            # 드라이버 내부 버퍼 최소화 (지원하지 않는 백엔드는 무시됨)
+            cap.set(cv2.CAP_PROP_BUFFERSIZE, 1)
+        return cap
+
+    def _publish(self, frame: np.ndarray, timestamp: float):
+        with self._lock:
+            if self._seq != self._consumed_seq:
+                self.stats['frames_dropped'] += 1
+            self._frame = frame
+            self._timestamp = timestamp
+            self._seq += 1
+        self.stats['frames_read'] += 1
+        self._arrived.set()
+        if self.notify is not None:
+            self.notify.set()
+
+    def _run(self):
+        cap = None
+        frame_interval = 0.0
+        next_frame_time = 0.0
+        connected = False
+        open_attempts = 0
+
+        try:
+            while not self._stop.is_set():
+                if cap is None:
+                    cap = self._open()
+                    if cap is None:
+                        # 끊긴 스트림은 계속 재연결, 처음부터 안 열리는 장치 번호 / 파일은 바로,
+                        # RTSP는 open_retries회 재시도 후 포기
+                        open_attempts += 1
+                        if not connected and (isinstance(self.source, int) or self.is_file
+                                              or open_attempts > self.open_retries):
+                            print(f"❌ [{self.name}] 스트림을 열 수 없습니다: {self.source}")
+                            self.open_failed = True
+                            break
+                        print(f"⚠️  [{self.name}] 스트림 연결 실패, {self.reconnect_delay}초 후 재시도")
+                        self._stop.wait(self.reconnect_delay)
+                        continue
+                    connected = True
+                    open_attempts = 0
+                    fps = cap.get(cv2.CAP_PROP_FPS) if self.is_file else 0
+                    frame_interval = 1.0 / fps if self.pace and fps and fps > 0 else 0.0
+                    next_frame_time = time.perf_counter()
+
+                ret, frame = cap.read()
+                captured_at = time.perf_counter()
+
+                if not ret:
+                    if self.is_file and self.loop and self.stats['frames_read'] > 0:
+                        cap.set(cv2.CAP_PROP_POS_FRAMES, 0)
+                        continue
+                    if self.is_file:
+                        break
+                    # 카메라/RTSP 끊김 → 재연결
+                    print(f"⚠️  [{self.name}] 프레임 수신 끊김, 재연결 중...")
+                    cap.release()
+                    cap = None
+                    self.stats['reconnects'] += 1
+                    instrumentation.inc('stream_reconnects_total', stream=self.name)
+                    self._stop.wait(self.reconnect_delay)
+                    continue
+
+                # 파일은 원본 FPS 속도로 (실시간 스트림 대체)
+                if frame_interval:
+                    next_frame_time += frame_interval
+                    delay = next_frame_time - time.perf_counter()
+                    if delay > 0:
+                        self._stop.wait(delay)
+                    else:
+                        next_frame_time = time.perf_counter()
+                    captured_at = time.perf_counter()
+
+                self._publish(frame, captured_at)
+        except Exception as e:
+            print(f"❌ [{self.name}] 스트림 읽기 오류: {e}")
+        finally:
+            if cap is not None:
+                cap.release()
+            with self._lock:
+                self.finished = True
+            self._arrived.set()
+            if self.notify is not None:
+                self.notify.set()
+
+
+class StreamHub:
+    """여러 StreamReader를 묶어 감지 단계에 라운드 로빈으로 프레임 공급"""
+
+    def __init__(self, sources: List[Union[int, str]], **reader_options):
+        """
+        초기화
+        Args:
+            sources: 소스 목록 (장치 번호, 파일 경로, RTSP URL)
+            reader_options: StreamReader 옵션 (width, height, reconnect_delay, loop, pace, open_retries)
+        """
+        self.new_frame = threading.Event()
+        self.readers = [
+            StreamReader(source, name=f"CAM{i + 1:02d}", notify=self.new_frame,
+                         **reader_options)
+            for i, source in enumerate(sources)
+        ]
+        self._cursor = 0
+
+    def start(self) -> 'StreamHub':
+        """전체 스트림 읽기 시작"""
+        for reader in self.readers:
+            reader.start()
+        return self
+
+    def stop(self):
+        """전체 스트림 종료"""
+        for reader in self.readers:
+            reader.stop()
+
+    @property
+    def exhausted(self) -> bool:
+        """모든 스트림이 종료됨 (파일 입력)"""
+        return all(reader.exhausted for reader in self.readers)
+
+    def next_frame(self, timeout: float = 1.0) -> Optional[Tuple[int, np.ndarray, float]]:
+        """
+        다음 차례 스트림의 새 프레임 (새 프레임이 있는 스트림만 순회)
+
+        Args:
+            timeout: 모든 스트림에 새 프레임이 없을 때 최대 대기 (초)
+
+        Returns:
+            (스트림 인덱스, 프레임, 캡처 시각) 또는 None (대기 시간 초과)
+        """
+        deadline = time.perf_counter() + timeout
+        count = len(self.readers)
+
+        while True:
+            # 이벤트를 먼저 지워야 순회 중 도착한 프레임 알림을 놓치지 않음
+            self.new_frame.clear()
+
+            for offset in range(count):
+                index = (self._cursor + offset) % count
+                frame, _, captured_at = self.readers[index].read()
+                if frame is not None:
+                    self._cursor = (index + 1) % count
+                    return index, frame, captured_at
+
+            remaining = deadline - time.perf_counter()
+            if remaining <= 0 or self.exhausted:
+                return None
+            self.new_frame.wait(remaining)
+
+
+class AnalysisCadence:
+    """
+    스트림별 분석 주기 관리
+    표시(프레임 수신) 속도와 분리하여 초당 N회만 추론하고 실제 달성한 분석 FPS 계산
+    """
+
+    def __init__(self, analysis_fps: float = 5.0, window: float = 5.0):
+        """
+        초기화
+        Args:
+            analysis_fps: 목표 분석 횟수/초 (0 이하이면 매 프레임 분석)
+            window: 달성 FPS 계산 구간 (초)
+        """
+        self.interval = 1.0 / analysis_fps if analysis_fps and analysis_fps > 0 else 0.0
+        self.window = window
+        self.next_due = 0.0
+        self.history = deque()
+
+    def due(self, now: float = None) -> bool:
+        """이번 프레임을 분석할 차례인지"""
+        now = time.perf_counter() if now is None else now
+        return now >= self.next_due
+
+    def mark(self, now: float = None):
+        """분석 1회 완료 기록"""
+        now = time.perf_counter() if now is None else now
+        self.next_due += self.interval
+        # 한 주기 이상 밀렸으면 몰아서 분석하지 않고 현재 시각 기준으로 재설정
+        if self.next_due <= now:
+            self.next_due = now + self.interval
+        self.history.append(now)
+        while self.history and now - self.history[0] > self.window:
+            self.history.popleft()
+
+    @property
+    def achieved_fps(self) -> float:
+        """최근 window초 동안 실제 분석 FPS"""
+        if len(self.history) < 2:
+            return 0.0
+        span = self.history[-1] - self.history[0]
+        return (len(self.history) - 1) / span if span > 0 else 0.0
+
+
+def record_frame_age(stream: str, captured_at: float) -> float:
+    """
+    캡처 시각부터 지금(감지 시작)까지의 프레임 나이 기록
+
+    Args:
+        stream: 스트림 이름
+        captured_at: StreamReader.read()가 돌려준 캡처 시각
+
+    Returns:
+        프레임 나이 (초)
+    """
+    age = time.perf_counter() - captured_at
+    instrumentation.record('frame_age', age)
+    instrumentation.set_gauge('frame_age_seconds', age, stream=stream)
+    return age
@@ -0,0 +1,417 @@
+"""
+합성 얼굴 그리드 생성기
+실제 교실 없이 32/64/100석 규모를 시험하기 위해
+좌석별 얼굴 클립(눈 뜸/감음, 고개 숙임, 빈 좌석)을 화면 크기 프레임으로 합성
+"""
+import cv2
+import numpy as np
+import json
+import math
+import os
+import glob
+from typing import Dict, List, Optional, Tuple
+
+from capture import ViewGuardCapture
+
+
+# 좌석 상태 라벨
+STATE_ALERT = 'alert'
+STATE_EYES_CLOSED = 'eyes_closed'
+STATE_HEAD_DOWN = 'head_down'
+STATE_EMPTY = 'empty'
+SEAT_STATES = (STATE_ALERT, STATE_EYES_CLOSED, STATE_HEAD_DOWN, STATE_EMPTY)
+
+# 상태 라벨 → 기대 판정
+DROWSY_STATES = (STATE_EYES_CLOSED, STATE_HEAD_DOWN)
+
+
+def render_face(state: str, size: Tuple[int, int], rng: np.random.Generator,
+                background: np.ndarray = None) -> np.ndarray:
+    """
+    절차적 얼굴 이미지 생성 (클립 폴더가 없을 때 사용)
+
+    Args:
+        state: 좌석 상태 라벨
+        size: (너비, 높이)
+        rng: 난수 생성기
+        background: 좌석 배경 이미지 (None이면 단색)
+
+    Returns:
+        BGR 이미지
+    """
+    w, h = size
+    if background is not None:
+        img = background.copy()
+    else:
+        img = np.full((h, w, 3), (70, 80, 95), dtype=np.uint8)
+
+    if state == STATE_EMPTY:
+        return img
+
+    cx = w // 2 + int(rng.integers(-w // 20, w // 20 + 1))
+    cy = int(h * 0.45)
+    face_w = int(min(w, h) * 0.28)
+    face_h = int(face_w * 1.3)
+
+    # 고개 숙임: 얼굴이 아래로 내려가고 세로로 눌림, 정수리(머리카락)가 더 보임
+    if state == STATE_HEAD_DOWN:
+        cy = int(h * 0.62)
+        face_h = int(face_h * 0.7)
+
+    skin = (150, 180, 225)
+    hair = (30, 30, 40)
+
+    # 몸통 (줄무늬 옷 - 실제 사람처럼 에지가 많도록)
+    cv2.ellipse(img, (cx, h), (int(face_w * 1.8), int(h * 0.3)), 0, 180, 360, (90, 60, 50), -1)
+    stripe = max(3, h // 40)
+    for sy in range(int(h * 0.72), h, stripe * 2):
+        cv2.line(img, (cx - int(face_w * 1.6), sy), (cx + int(face_w * 1.6), sy), (150, 120, 100), 1)
+    # 머리카락 + 얼굴
+    cv2.ellipse(img, (cx, cy - face_h // 5), (face_w + 4, face_h), 0, 0, 360, hair, -1)
+    for _ in range(12):
+        hx = cx + int(rng.integers(-face_w, face_w + 1))
+        cv2.line(img, (hx, cy - face_h - face_h // 5), (cx, cy), (70, 70, 90), 1)
+    cv2.ellipse(img, (cx, cy), (face_w, face_h), 0, 0, 360, skin, -1)
+
+    if state == STATE_HEAD_DOWN:
+        # 앞머리가 얼굴 위쪽을 덮음
+        cv2.ellipse(img, (cx, cy - face_h // 2), (face_w, face_h // 2), 0, 180, 360, hair, -1)
+
+    eye_y = cy - face_h // 5
+    eye_dx = face_w // 2
+    eye_w = max(3, face_w // 4)
+    eye_h = max(2, face_h // 9)
+
+    for ex in (cx - eye_dx, cx + eye_dx):
+        # 눈썹
+        cv2.line(img, (ex - eye_w, eye_y - eye_h * 2), (ex + eye_w, eye_y - eye_h * 2),
+                 (40, 40, 50), max(1, eye_h // 2))
+        if state == STATE_EYES_CLOSED:
+            cv2.line(img, (ex - eye_w, eye_y), (ex + eye_w, eye_y), (40, 40, 60), max(1, eye_h // 3))
+        else:
+            cv2.ellipse(img, (ex, eye_y), (eye_w, eye_h), 0, 0, 360, (240, 240, 240), -1)
+            cv2.circle(img, (ex, eye_y), max(1, eye_h - 1), (40, 30, 20), -1)
+
+    # 코 / 입
+    nose_y = cy + face_h // 8
+    cv2.line(img, (cx, eye_y + eye_h), (cx - face_w // 10, nose_y), (110, 140, 190), max(1, eye_h // 3))
+    mouth_y = cy + face_h // 2
+    cv2.ellipse(img, (cx, mouth_y), (face_w // 3, max(2, face_h // 14)), 0, 0, 180, (60, 60, 170), -1)
+
+    # 센서 노이즈
+    noise = rng.normal(0, 3, img.shape)
+    return np.clip(img + noise, 0, 255).astype(np.uint8)
+
+
+class FaceClipLibrary:
+    """상태별 얼굴 클립 이미지 모음 (폴더 구조: <clips_dir>/<state>/*.png|jpg)"""
+
+    def __init__(self, clips_dir: Optional[str] = None):
+        """
+        초기화
+        Args:
+            clips_dir: 클립 폴더 (None이거나 없으면 절차적 얼굴 사용)
+        """
+        self.clips: Dict[str, List[np.ndarray]] = {}
+
+        if clips_dir and os.path.isdir(clips_dir):
+            for state in SEAT_STATES:
+                paths = []
+                for ext in ('*.png', '*.jpg', '*.jpeg'):
+                    paths.extend(glob.glob(os.path.join(clips_dir, state, ext)))
+                images = [cv2.imread(p) for p in sorted(paths)]
+                images = [img for img in images if img is not None]
+                if images:
+                    self.clips[state] = images
+
+            loaded = ", ".join(f"{s} {len(c)}개" for s, c in self.clips.items())
+            print(f"🎞️  얼굴 클립 로드: {loaded}")
+
+    def render(self, state: str, size: Tuple[int, int], rng: np.random.Generator,
+               background: np.ndarray = None) -> np.ndarray:
+        """상태에 맞는 좌석 이미지 (클립이 있으면 클립, 없으면 절차적 생성)"""
+        clips = self.clips.get(state)
+        if clips:
+            clip = clips[int(rng.integers(len(clips)))]
+            return cv2.resize(clip, size, interpolation=cv2.INTER_AREA)
+        return render_face(state, size, rng, background)
+
+
+class SyntheticFaceGrid:
+    """좌석 그리드 합성 프레임 + 좌석 설정 + 정답 라벨 생성기"""
+
+    def __init__(self, seat_count: int = 16, screen_size: Tuple[int, int] = (1920, 1080),
+                 seed: int = 0, clips_dir: Optional[str] = None,
+                 transition_prob: float = 0.1, state_weights: Dict[str, float] = None):
+        """
+        초기화
+        Args:
+            seat_count: 좌석 수
+            screen_size: 화면 크기 (너비, 높이)
+            seed: 난수 시드 (같은 시드면 같은 프레임 시퀀스)
+            clips_dir: 얼굴 클립 폴더
+            transition_prob: 프레임마다 좌석 상태가 바뀔 확률
+            state_weights: 상태 선택 가중치
+        """
+        self.seat_count = seat_count
+        self.screen_size = screen_size
+        self.rng = np.random.default_rng(seed)
+        self.library = FaceClipLibrary(clips_dir)
+        self.transition_prob = transition_prob
+
+        weights = state_weights or {
+            STATE_ALERT: 0.55, STATE_EYES_CLOSED: 0.15,
+            STATE_HEAD_DOWN: 0.15, STATE_EMPTY: 0.15
+        }
+        total = sum(weights.get(s, 0) for s in SEAT_STATES)
+        self.state_probs = np.array([weights.get(s, 0) / total for s in SEAT_STATES])
+
+        self.layout = self._build_layout()
+        self.seat_ids = [str(i + 1) for i in range(seat_count)]
+
+        # 좌석별 고정 배경 (의자/책상) - 빈 좌석 배경 모델 학습용
+        self.backgrounds = {
+            sid: self._render_background(w, h)
+            for sid, (_, _, w, h) in zip(self.seat_ids, self.layout)
+        }
+        self.states = {
+            sid: SEAT_STATES[self.rng.choice(len(SEAT_STATES), p=self.state_probs)]
+            for sid in self.seat_ids
+        }
+        self.frame_index = 0
+
+    def _build_layout(self) -> List[Tuple[int, int, int, int]]:
+        """화면 비율에 맞춘 좌석 격자 (x, y, w, h) 목록"""
+        screen_w, screen_h = self.screen_size
+        cols = max(1, math.ceil(math.sqrt(self.seat_count * screen_w / screen_h)))
+        rows = math.ceil(self.seat_count / cols)
+
+        cell_w = screen_w // cols
+        cell_h = screen_h // rows
+        gap = max(2, min(cell_w, cell_h) // 30)
+
+        layout = []
+        for i in range(self.seat_count):
+            r, c = divmod(i, cols)
+            layout.append((c * cell_w + gap, r * cell_h + gap,
+                           cell_w - 2 * gap, cell_h - 2 * gap))
+        return layout
+
+    def _render_background(self, w: int, h: int) -> np.ndarray:
+        """좌석 배경 (벽 + 책상 + 의자 등받이)"""
+        base = self.rng.integers(60, 110, 3)
+        img = np.empty((h, w, 3), dtype=np.uint8)
+        img[:] = base
+        cv2.rectangle(img, (w // 4, h // 6), (3 * w // 4, 3 * h // 4), (base * 0.6).astype(int).tolist(), -1)
+        cv2.rectangle(img, (0, int(h * 0.8)), (w, h), (60, 110, 150), -1)
+        return img
+
+    def seats(self) -> Dict:
+        """seats.json 형식의 좌석 딕셔너리"""
+        return {
+            sid: {
+                'x': int(x), 'y': int(y), 'width': int(w), 'height': int(h),
+                'channel': f"CH{int(sid):02d}", 'enabled': True
+            }
+            for sid, (x, y, w, h) in zip(self.seat_ids, self.layout)
+        }
+
+    def save_seats(self, path: str) -> bool:
+        """
+        좌석 설정 저장 (ROI Manager와 같은 형식)
+
+        Args:
+            path: 저장 경로
+
+        Returns:
+            성공 여부
+        """
+        try:
+            directory = os.path.dirname(path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            with open(path, 'w', encoding='utf-8') as f:
+                json.dump({
+                    'comment': f'합성 그리드 {self.seat_count}석 ({self.screen_size[0]}x{self.screen_size[1]})',
+                    'seats': self.seats()
+                }, f, indent=2, ensure_ascii=False)
+            return True
+        except Exception as e:
+            print(f"❌ 좌석 설정 저장 실패: {e}")
+            return False
+
+    def _advance_states(self):
+        """좌석 상태 전이"""
+        changes = self.rng.random(self.seat_count) < self.transition_prob
+        for sid, change in zip(self.seat_ids, changes):
+            if change:
+                self.states[sid] = SEAT_STATES[self.rng.choice(len(SEAT_STATES), p=self.state_probs)]
+
+    def next_frame(self) -> Tuple[np.ndarray, Dict[str, str]]:
+        """
+        다음 합성 프레임 생성
+
+        Returns:
+            (BGR 화면 이미지, {seat_id: 상태 라벨})
+        """
+        if self.frame_index > 0:
+            self._advance_states()
+        self.frame_index += 1
+
+        screen_w, screen_h = self.screen_size
+        frame = np.full((screen_h, screen_w, 3), 30, dtype=np.uint8)
+
+        for sid, (x, y, w, h) in zip(self.seat_ids, self.layout):
+            frame[y:y+h, x:x+w] = self.library.render(
+                self.states[sid], (w, h), self.rng, self.backgrounds[sid]
+            )
+
+        return frame, dict(self.states)
+
+    def channel_frames(self, frame: np.ndarray,
+                       size: Tuple[int, int] = (1280, 720)) -> Dict[int, np.ndarray]:
+        """
+        합성 프레임을 순차 모드 채널 이미지로 변환 (좌석 = 채널, 전체 화면 크기로 확대)
+
+        Args:
+            frame: next_frame()의 화면 이미지
+            size: 채널 이미지 크기
+
+        Returns:
+            {채널 번호: 이미지}
+        """
+        return {
+            int(sid): cv2.resize(frame[y:y+h, x:x+w], size, interpolation=cv2.INTER_LINEAR)
+            for sid, (x, y, w, h) in zip(self.seat_ids, self.layout)
+        }
+
+
+class SyntheticCapture(ViewGuardCapture):
+    """합성 그리드를 화면 캡처 대신 공급하는 캡처 소스"""
+
+    # 합성 입력은 기다릴 필요 없음
+    realtime = False
+    # 좌석은 합성 그리드에서 생성
+    seats_from_file = False
+    # 합성 입력: 배경 모델은 메모리에서만, 알림은 콘솔로
+    offline = True
+
+    def __init__(self, grid: SyntheticFaceGrid, max_frames: Optional[int] = None,
+                 background_config: Optional[Dict] = None, keep_labels: bool = True):
+        """
+        초기화
+        Args:
+            grid: 합성 그리드 생성기
+            max_frames: 생성할 최대 프레임 수 (None이면 무한)
+            background_config: 배경 모델 설정
+            keep_labels: True면 프레임별 정답 라벨 누적 (max_frames가 없으면 무한히 쌓이므로 누적 안 함)
+        """
+        self.grid = grid
+        self.max_frames = max_frames
+        self.frames_generated = 0
+        self.last_labels: Dict[str, str] = {}
+        self.label_log: List[Dict[str, str]] = []
+        self.keep_labels = keep_labels and max_frames is not None
+
+        super().__init__(config_path=f'config/seats_synthetic_{grid.seat_count}.json',
+                         background_config=background_config)
+
+    def load_seats(self) -> Dict:
+        """좌석 설정을 파일 대신 합성 그리드에서 생성"""
+        return self.grid.seats()
+
+    @property
+    def exhausted(self) -> bool:
+        """최대 프레임 수에 도달하면 True"""
+        return self.max_frames is not None and self.frames_generated >= self.max_frames
+
+    def capture_screen(self, bbox: Optional[Tuple[int, int, int, int]] = None) -> Optional[np.ndarray]:
+        """
+        다음 합성 프레임 반환
+
+        Args:
+            bbox: 잘라낼 영역 (x1, y1, x2, y2). None이면 전체
+
+        Returns:
+            BGR 이미지 또는 None (최대 프레임 도달)
+        """
+        if self.exhausted:
+            return None
+
+        frame, labels = self.grid.next_frame()
+        self.frames_generated += 1
+        self.last_labels = labels
+        if self.keep_labels:
+            self.label_log.append(labels)
+
+        if bbox:
+            x1, y1, x2, y2 = bbox
+            frame = frame[y1:y2, x1:x2]
+        return frame
+
+
+def main():
+    """메인 함수"""
+    import argparse
+
+    parser = argparse.ArgumentParser(description='ViewGuard 합성 얼굴 그리드 생성기')
+    parser.add_argument('--seats', type=int, default=32, help='좌석 수')
+    parser.add_argument('--width', type=int, default=1920, help='화면 너비')
+    parser.add_argument('--height', type=int, default=1080, help='화면 높이')
+    parser.add_argument('--frames', type=int, default=30, help='생성할 프레임 수')
+    parser.add_argument('--seed', type=int, default=0, help='난수 시드')
+    parser.add_argument('--clips', type=str, help='얼굴 클립 폴더 (<state>/*.png)')
+    parser.add_argument('--export-seats', type=str, help='좌석 설정 저장 경로')
+    parser.add_argument('--export-labels', type=str, help='정답 라벨 저장 경로 (.jsonl)')
+    parser.add_argument('--record', type=str, help='녹화 파일로 저장 (.vgrec)')
+    parser.add_argument('--run', action='store_true',
+                       help='AccurateStudentMonitor로 헤드리스 스트레스 테스트 실행')
+    parser.add_argument('--config', type=str, default='config/settings.json',
+                       help='설정 파일 경로 (--run)')
+
+    args = parser.parse_args()
+
+    grid = SyntheticFaceGrid(args.seats, (args.width, args.height), args.seed, args.clips)
+    print(f"🧪 합성 그리드: {args.seats}석, {args.width}x{args.height}")
+
+    if args.export_seats:
+        if grid.save_seats(args.export_seats):
+            print(f"✅ 좌석 설정 저장: {args.export_seats}")
+
+    if args.run:
+        from main import AccurateStudentMonitor
+
+        settings = AccurateStudentMonitor.load_config(args.config)
+        capture = SyntheticCapture(
+            grid, args.frames,
+            settings.get('seat_detection', {}).get('background_model', {})
+        )
+        monitor = AccurateStudentMonitor(args.config, capture)
+        monitor.run()
+        labels = capture.label_log
+    else:
+        labels = []
+        writer = None
+        if args.record:
+            from replay import FrameRecorder
+            writer = FrameRecorder(args.record)
+
+        for i in range(args.frames):
+            frame, frame_labels = grid.next_frame()
+            labels.append(frame_labels)
+            if writer:
+                writer.write(frame, timestamp=i * 2.0)
+
+        if writer:
+            writer.close()
+            print(f"✅ 녹화 저장: {args.record} ({writer.frame_count}프레임)")
+
+    if args.export_labels:
+        with open(args.export_labels, 'w', encoding='utf-8') as f:
+            for i, frame_labels in enumerate(labels):
+                f.write(json.dumps({'frame': i, 'labels': frame_labels}, ensure_ascii=False) + '\n')
+        print(f"✅ 정답 라벨 저장: {args.export_labels} ({len(labels)}프레임)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,339 @@
+"""
+알림 아웃박스 테스트
+로컬 스텁 서버(텔레그램 Bot API / GitHub API 흉내)를 껐다 켜면서
+- 네트워크가 끊겨도 알림이 디스크에 남고 복구 후 순서대로 전송되는지
+- 채널별 지수 백오프 (한 채널 장애가 다른 채널을 막지 않음)
+- 다중 알림(MultiAlert) 웹훅도 장애 중 기록 후 복구되면 전송되는지
+- 응답을 못 받은 GitHub Issue를 재시도해도 중복 생성되지 않는지 (멱등 키)
+- 요청 한도로 연기된 일일 리포트가 뒤에 쌓인 졸음 알림 Issue를 막지 않는지
+- 재시작 후 남은 알림 전송
+확인
+
+사용법:
+    python test_alert_outbox.py
+"""
+import sys
+sys.path.append('src')
+
+import json
+import os
+import tempfile
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from alert_outbox import AlertOutbox
+from alert_outbox import open_outbox
+from alert_system import TelegramAlert
+from alert_system_github import GitHubAlert
+from alert_system_multi import MultiAlert
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    """텔레그램 sendMessage / GitHub issues API 최소 흉내"""
+
+    def _reply(self, status: int, data):
+        body = json.dumps(data).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _read_json(self) -> dict:
+        length = int(self.headers.get('Content-Length', 0))
+        raw = self.rfile.read(length) if length else b''
+        if 'json' in self.headers.get('Content-Type', ''):
+            return json.loads(raw or b'{}')
+        from urllib.parse import parse_qs
+        return {k: v[0] for k, v in parse_qs(raw.decode('utf-8')).items()}
+
+    def do_POST(self):
+        stub = self.server.stub
+        if self.path.endswith('/sendMessage'):
+            data = self._read_json()
+            stub.messages.append(data['text'])
+            self._reply(200, {'ok': True, 'result': {
+                'message_id': len(stub.messages), 'date': int(time.time()),
+                'chat': {'id': int(data['chat_id']), 'type': 'private'}, 'text': data['text']}})
+        elif self.path.endswith('/webhook'):
+            stub.webhooks.append(self._read_json())
+            self._reply(200, {'ok': True})
+        elif self.path.endswith('/issues'):
+            data = self._read_json()
+            number = len(stub.issues) + 1
+            stub.issues.append({'number': number, 'title': data['title'], 'body': data['body'],
+                                'html_url': f"http://stub/issues/{number}"})
+            if stub.lose_responses > 0:
+                # Issue는 만들었지만 응답이 유실된 상황
+                stub.lose_responses -= 1
+                self._reply(502, {'message': 'Bad Gateway'})
+                return
+            self._reply(201, stub.issues[-1])
+        else:
+            self._reply(404, {'message': 'Not Found'})
+
+    def do_GET(self):
+        if '/issues' in self.path:
+            self._reply(200, list(reversed(self.server.stub.issues)))
+        else:
+            self._reply(404, {'message': 'Not Found'})
+
+    def log_message(self, format, *args):
+        pass
+
+
+class StubServer:
+    """같은 포트로 껐다 켤 수 있는 스텁 서버 (받은 메시지 / Issue는 유지)"""
+
+    def __init__(self):
+        self.messages = []
+        self.issues = []
+        self.webhooks = []
+        self.lose_responses = 0
+        self.httpd = None
+        self.port = 0
+
+    def up(self):
+        self.httpd = ThreadingHTTPServer(('127.0.0.1', self.port), StubHandler)
+        self.httpd.daemon_threads = True
+        self.httpd.stub = self
+        self.port = self.httpd.server_address[1]
+        threading.Thread(target=self.httpd.serve_forever, daemon=True).start()
+
+    def down(self):
+        if self.httpd is not None:
+            self.httpd.shutdown()
+            self.httpd.server_close()
+            self.httpd = None
+
+
+def write_config(folder: str, port: int) -> str:
+    """스텁 서버를 가리키는 settings.json"""
+    path = os.path.join(folder, 'settings.json')
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump({
+            'telegram': {'bot_token': '123:TEST', 'chat_id': '42',
+                         'api_base_url': f'http://127.0.0.1:{port}/bot'},
+            'github': {'token': 'test', 'repo_owner': 'o', 'repo_name': 'r',
+                       'api_url': f'http://127.0.0.1:{port}'},
+            'webhook': {'enabled': True, 'url': f'http://127.0.0.1:{port}/webhook'},
+            'alert_outbox': {'enabled': True, 'path': os.path.join(folder, 'multi.db'),
+                             'base_delay': 0.2, 'max_delay': 0.5, 'poll_interval': 0.1},
+        }, f)
+    return path
+
+
+def wait_until(condition, timeout: float = 10.0) -> bool:
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if condition():
+            return True
+        time.sleep(0.05)
+    return condition()
+
+
+def test_backoff():
+    """채널별 지수 백오프, 멱등 키로 중복 기록 방지"""
+    print("\n" + "=" * 60)
+    print("⏳ 채널별 백오프 테스트")
+    print("=" * 60)
+
+    now = [1000.0]
+    outbox = AlertOutbox(':memory:', {'base_delay': 2, 'max_delay': 8, 'jitter': 0},
+                         clock=lambda: now[0])
+    attempts = {'down': 0, 'up': 0}
+
+    def down(payload, key, tries):
+        attempts['down'] += 1
+        return False
+
+    def up(payload, key, tries):
+        attempts['up'] += 1
+        return True
+
+    outbox.register('down', down)
+    outbox.register('up', up)
+    outbox.submit('down', {'n': 1})
+    outbox.submit('down', {'n': 2})
+    outbox.submit('up', {'n': 1})
+    assert outbox.submit('up', {'n': 1}) is not None and outbox.stats['duplicates'] == 1
+
+    # 실패한 채널은 첫 건에서 멈추고 2 → 4 → 8 → 8초 간격으로만 재시도, 다른 채널은 그대로 전송
+    delays = []
+    for _ in range(4):
+        outbox.process()
+        delays.append(outbox.backoff['down']['next_at'] - now[0])
+        outbox.process()  # 백오프 중이면 시도하지 않음
+        now[0] += delays[-1]
+    assert delays == [2, 4, 8, 8], delays
+    assert attempts == {'down': 4, 'up': 1}, attempts
+    assert outbox.pending_count('down') == 2 and outbox.pending_count('up') == 0
+    print(f"✅ 재시도 간격 {delays}초, 정상 채널 전송 {attempts['up']}건, 중복 기록 제외 1건")
+
+
+def run_telegram_outage(folder: str):
+    """텔레그램 서버가 내려간 동안 보낸 알림을 복구 후 순서대로 전송"""
+    print("\n" + "=" * 60)
+    print("📱 텔레그램 장애 / 복구 테스트")
+    print("=" * 60)
+
+    stub = StubServer()
+    stub.up()
+    stub.down()  # 포트만 받아 두고 내려간 상태로 시작
+    alert = TelegramAlert(write_config(folder, stub.port))
+    outbox = AlertOutbox(os.path.join(folder, 'telegram.db'),
+                         {'base_delay': 0.2, 'max_delay': 0.5, 'poll_interval': 0.1})
+    alert.attach_outbox(outbox)
+    outbox.start()
+
+    # 서버가 내려가 있어도 send는 기록만 하고 바로 반환 (감지 루프를 막지 않음)
+    start = time.perf_counter()
+    for seat in ('1', '2', '3'):
+        assert alert.send_drowsy_alert(seat, 0.9, {'ear': 0.1, 'head_tilt': 0.6})
+    elapsed = time.perf_counter() - start
+    assert elapsed < 0.5, elapsed
+
+    assert wait_until(lambda: outbox.stats['failed'] >= 2)
+    assert outbox.pending_count() == 3 and not stub.messages
+
+    stub.up()
+    assert wait_until(lambda: outbox.pending_count() == 0), "복구 후 전송 안 됨"
+    outbox.close()
+    stub.down()
+
+    seats = [line for message in stub.messages for line in message.splitlines() if '좌석' in line]
+    assert len(stub.messages) == 3 and seats == ['📍 좌석: 1', '📍 좌석: 2', '📍 좌석: 3'], seats
+    print(f"✅ 장애 중 send {elapsed * 1000:.0f}ms (3건 기록), 실패 {outbox.stats['failed']}회 후 "
+          f"복구되자 {len(stub.messages)}건 순서대로 전송")
+
+
+def run_multi_alert_outage(folder: str):
+    """MultiAlert 웹훅: 장애 중에도 기록되고 복구 후 전송 (open_outbox로 연결)"""
+    print("\n" + "=" * 60)
+    print("📡 다중 알림 아웃박스 테스트")
+    print("=" * 60)
+
+    stub = StubServer()
+    stub.up()
+    path = write_config(folder, stub.port)
+    stub.down()
+
+    alert = MultiAlert(path)
+    with open(path, encoding='utf-8') as f:
+        outbox = open_outbox(alert, json.load(f)['alert_outbox'])
+    assert outbox is not None
+    outbox.start()
+
+    assert alert.send_drowsy_alert('CH05', 0.9, {'ear': 0.12, 'head_tilt': 0.61})['webhook']
+    assert wait_until(lambda: outbox.stats['failed'] >= 1)
+    assert stub.webhooks == [] and outbox.pending_count('webhook') == 1
+
+    stub.up()
+    assert wait_until(lambda: outbox.pending_count() == 0)
+    outbox.close()
+    stub.down()
+    assert [hook['channel'] for hook in stub.webhooks] == ['CH05'], stub.webhooks
+    print(f"✅ 장애 중 웹훅 기록, 실패 {outbox.stats['failed']}회 후 복구되자 1건 전송")
+
+
+def run_github_no_duplicates(folder: str):
+    """응답이 유실된 Issue 생성을 재시도해도 Issue는 1개"""
+    print("\n" + "=" * 60)
+    print("📝 GitHub 멱등 재시도 테스트")
+    print("=" * 60)
+
+    stub = StubServer()
+    stub.up()
+    stub.lose_responses = 1
+    alert = GitHubAlert(write_config(folder, stub.port))
+    outbox = AlertOutbox(os.path.join(folder, 'github.db'),
+                         {'base_delay': 0.2, 'max_delay': 0.5, 'poll_interval': 0.1})
+    alert.attach_outbox(outbox)
+    outbox.start()
+
+    assert alert.send_drowsy_alert('CH03', 0.92, {'ear': 0.12, 'head_tilt': 0.61})
+    assert wait_until(lambda: outbox.pending_count() == 0)
+    assert len(stub.issues) == 1, f"Issue 중복 생성: {len(stub.issues)}개"
+
+    # 서버가 내려간 동안 만든 알림도 복구 후 1번만 생성
+    stub.down()
+    assert alert.send_drowsy_alert('CH07', 0.81, {'ear': 0.15, 'head_tilt': 0.6})
+    assert wait_until(lambda: outbox.stats['failed'] >= 2)
+    stub.up()
+    assert wait_until(lambda: outbox.pending_count() == 0)
+    outbox.close()
+    stub.down()
+
+    assert len(stub.issues) == 2, f"Issue {len(stub.issues)}개"
+    assert all('viewguard-key' in issue['body'] for issue in stub.issues)
+    print(f"✅ 응답 유실 1회 + 서버 장애 1회, Issue {len(stub.issues)}개 (중복 없음), "
+          f"재시도 {outbox.stats['failed']}회")
+
+
+def run_github_deferred_summary(folder: str):
+    """요청 한도로 연기된 일일 리포트는 실패가 아님: 뒤의 알림 Issue가 먼저 나가고 리포트는 나중에"""
+    print("\n" + "=" * 60)
+    print("⏸️  GitHub 요청 연기 순서 테스트")
+    print("=" * 60)
+
+    stub = StubServer()
+    stub.up()
+    alert = GitHubAlert(write_config(folder, stub.port))
+    outbox = AlertOutbox(os.path.join(folder, 'deferred.db'))
+    alert.attach_outbox(outbox)
+
+    # 남은 요청 한도 0 → 낮은 우선순위(리포트)만 연기, 알림은 그대로
+    alert.client.remaining = 0
+    assert alert.send_daily_summary({'total_checks': 10})
+    assert alert.send_drowsy_alert('CH01', 0.9, {'ear': 0.12, 'head_tilt': 0.61})
+    assert alert.send_drowsy_alert('CH02', 0.85, {'ear': 0.14, 'head_tilt': 0.6})
+
+    assert outbox.process() == 2
+    titles = [issue['title'] for issue in stub.issues]
+    assert len(titles) == 2 and all(title.startswith('🚨 졸음 감지') for title in titles), titles
+    assert outbox.pending_count('github') == 1
+    assert outbox.stats['failed'] == 0 and 'github' not in outbox.backoff, outbox.backoff
+
+    # 한도가 풀리면 남은 리포트 전송
+    alert.client.remaining = None
+    assert outbox.process() == 1
+    assert stub.issues[-1]['title'].startswith('📊 일일 리포트')
+    outbox.close()
+    stub.down()
+    print(f"✅ 리포트 연기 {outbox.stats['deferred']}회 (백오프 없음), 알림 Issue 2건 먼저 생성, "
+          f"한도가 풀린 뒤 리포트 생성")
+
+
+def run_restart(folder: str):
+    """전송 못 한 알림은 파일에 남아 다음 실행에서 전송"""
+    print("\n" + "=" * 60)
+    print("🔁 재시작 후 재전송 테스트")
+    print("=" * 60)
+
+    path = os.path.join(folder, 'restart.db')
+    outbox = AlertOutbox(path)
+    outbox.register('sink', lambda payload, key, tries: False)
+    outbox.submit('sink', {'text': '남은 알림'})
+    outbox.process()
+    outbox.close()
+
+    received = []
+    outbox = AlertOutbox(path)
+    outbox.register('sink', lambda payload, key, tries: received.append((payload['text'], tries)) or True)
+    outbox.process()
+    assert received == [('남은 알림', 1)], received
+    assert outbox.pending_count() == 0
+    outbox.close()
+    print("✅ 재시작 후 남은 알림 1건 전송 (이전 시도 1회 기록 유지)")
+
+
+if __name__ == "__main__":
+    with tempfile.TemporaryDirectory() as folder:
+        test_backoff()
+        run_telegram_outage(folder)
+        run_multi_alert_outage(folder)
+        run_github_no_duplicates(folder)
+        run_github_deferred_summary(folder)
+        run_restart(folder)
+    print("\n✅ 알림 아웃박스 테스트 통과")
@@ -0,0 +1,234 @@
+"""
+알림 라우팅 규칙 테스트
+notification_preferences 규칙 종류별로 컴파일된 결정 테이블이 맞게 동작하는지 확인
+- 채널별 on/off, 최소 신뢰도, 조용한 시간 (자정 넘김 / 일부 채널만), 좌석별 예외 (정확히 일치 / 패턴)
+- 텔레그램 대상 (alert_to), 설정 리로드 (재컴파일 / 잘못된 규칙은 기존 유지)
+- MultiAlert: 규칙으로 막힌 알림은 네트워크 요청 없이 건너뜀 (발송 성공으로 세지 않고 쿨다운 유지)
+
+사용법:
+    python test_alert_routing.py
+"""
+import sys
+sys.path.append('src')
+
+import json
+import os
+import tempfile
+from datetime import datetime
+
+from alert_coalescer import SUPPRESSED, AlertCoalescer, alert_result
+from alert_routing import AlertRouter, parse_hhmm
+from alert_system_multi import MultiAlert
+from config_reloader import validate_settings
+
+
+ALL = ('telegram', 'google_sheets', 'webhook')
+
+TELEGRAM = {
+    'bot_token': 'YOUR_BOT_TOKEN_HERE',
+    'chat_ids': {'comment': '각 사용자/그룹의 chat_id', 'admin': '1', 'staff1': '2',
+                 'staff2': '3', 'group': '-100'},
+    'alert_to': 'group',
+}
+
+
+def at(hhmm: str) -> datetime:
+    hour, minute = map(int, hhmm.split(':'))
+    return datetime(2026, 3, 2, hour, minute)
+
+
+def make_config(**prefs) -> dict:
+    return {'telegram': dict(TELEGRAM), 'notification_preferences': prefs}
+
+
+def test_sink_toggles():
+    """채널별 on/off"""
+    print("\n" + "=" * 60)
+    print("🔀 채널별 on/off")
+    print("=" * 60)
+
+    router = AlertRouter(make_config())
+    assert router.route('1', 0.9) == ALL
+
+    router = AlertRouter(make_config(send_telegram=True, log_to_sheets=False, send_webhook=False))
+    assert router.route('1', 0.9) == ('telegram',)
+    assert router.allows('1', 'telegram', 0.9) and not router.allows('1', 'webhook', 0.9)
+
+    router = AlertRouter(make_config(send_telegram=False, log_to_sheets=False, send_webhook=False))
+    assert router.route('1', 0.9) == ()
+    assert router.stats['muted'] == 1
+    print("✅ 켜진 채널만 선택, 모두 끄면 전송 안 함")
+
+
+def test_min_confidence():
+    """최소 신뢰도"""
+    print("\n" + "=" * 60)
+    print("📊 최소 신뢰도")
+    print("=" * 60)
+
+    router = AlertRouter(make_config(min_confidence_for_alert=0.75))
+    assert router.route('1', 0.74) == ()
+    assert router.route('1', 0.75) == ALL
+    assert router.stats == {'routed': 1, 'below_confidence': 1, 'muted': 0}, router.stats
+    print("✅ 0.74 → 전송 안 함, 0.75 → 전송")
+
+
+def test_quiet_hours():
+    """조용한 시간 (자정 넘김, 일부 채널만, start == end)"""
+    print("\n" + "=" * 60)
+    print("🌙 조용한 시간")
+    print("=" * 60)
+
+    router = AlertRouter(make_config(quiet_hours={'enabled': True, 'start': '22:00', 'end': '07:00'}))
+    assert router.route('1', 0.9, at('21:59')) == ALL
+    assert router.route('1', 0.9, at('22:00')) == ()
+    assert router.route('1', 0.9, at('00:00')) == ()
+    assert router.route('1', 0.9, at('06:59')) == ()
+    assert router.route('1', 0.9, at('07:00')) == ALL
+
+    # 낮 구간, 텔레그램만 조용히 (시트 기록은 계속)
+    router = AlertRouter(make_config(quiet_hours={'enabled': True, 'start': '12:00', 'end': '13:00',
+                                                  'sinks': ['telegram']}))
+    assert router.route('1', 0.9, at('12:30')) == ('google_sheets', 'webhook')
+    assert router.route('1', 0.9, at('13:00')) == ALL
+
+    router = AlertRouter(make_config(quiet_hours={'enabled': False, 'start': '00:00', 'end': '23:59'}))
+    assert router.route('1', 0.9, at('12:00')) == ALL
+    router = AlertRouter(make_config(quiet_hours={'enabled': True, 'start': '09:00', 'end': '09:00'}))
+    assert router.route('1', 0.9, at('09:00')) == ALL
+    print("✅ 22:00~07:00 자정 넘김, 12:00~13:00 텔레그램만, 꺼짐 / 길이 0 구간")
+
+
+def test_seat_overrides():
+    """좌석별 예외 (정확히 일치 > 패턴 순서 > 기본)"""
+    print("\n" + "=" * 60)
+    print("💺 좌석별 예외")
+    print("=" * 60)
+
+    router = AlertRouter(make_config(
+        min_confidence_for_alert=0.75,
+        seats={
+            'CH01': {'min_confidence_for_alert': 0.5, 'send_webhook': False},
+            'CH0*': {'send_telegram': False},
+            'CH*': {'log_to_sheets': False},
+            'node-2/*': {'quiet_hours': {'enabled': True, 'start': '00:00', 'end': '12:00'},
+                         'alert_to': 'staff2'},
+        }))
+    assert router.route('CH01', 0.6) == ('telegram', 'google_sheets')     # 정확히 일치
+    assert router.route('CH02', 0.6) == ()                                # 기본 신뢰도 0.75
+    assert router.route('CH02', 0.9) == ('google_sheets', 'webhook')      # 첫 번째 패턴
+    assert router.route('CH10', 0.9) == ('telegram', 'webhook')           # 두 번째 패턴
+    assert router.route('node-2/5', 0.9, at('08:00')) == ()
+    assert router.route('node-2/5', 0.9, at('12:00')) == ALL
+    assert router.route('node-1/5', 0.9, at('08:00')) == ALL
+    assert router.telegram_targets('node-2/5') == ('3',)
+    print("✅ CH01 정확히 일치, CH0* / CH* 패턴 순서, node-2/* 조용한 시간·대상 덮어쓰기")
+
+
+def test_telegram_targets():
+    """alert_to → chat_id (group / all / admin / 이름)"""
+    print("\n" + "=" * 60)
+    print("📱 텔레그램 대상")
+    print("=" * 60)
+
+    expected = {'group': ('-100',), 'all': ('1', '2', '3'), 'admin': ('1',),
+                'staff1': ('2',), 'nobody': ()}
+    for alert_to, targets in expected.items():
+        config = make_config()
+        config['telegram']['alert_to'] = alert_to
+        assert AlertRouter(config).telegram_targets() == targets, alert_to
+    print("✅ group / all (comment 제외) / admin / staff1 / 없는 이름")
+
+
+def test_reload():
+    """재컴파일 (좌석 캐시 초기화), 잘못된 규칙은 기존 테이블 유지 / 검증 실패"""
+    print("\n" + "=" * 60)
+    print("🔄 설정 리로드")
+    print("=" * 60)
+
+    router = AlertRouter(make_config())
+    assert router.route('CH01', 0.9) == ALL
+    router.compile(make_config(seats={'CH01': {'send_telegram': False}}))
+    assert router.route('CH01', 0.9) == ('google_sheets', 'webhook')
+
+    bad_configs = [
+        make_config(quiet_hours={'enabled': True, 'start': '25:00', 'end': '07:00'}),
+        make_config(quiet_hours={'enabled': True, 'start': '22:00', 'end': '7'}),
+        make_config(quiet_hours={'enabled': True, 'sinks': ['email']}),
+        make_config(min_confidence_for_alert=1.5),
+        make_config(seats={'CH01': 'off'}),
+    ]
+    for bad in bad_configs:
+        for check in (router.compile, validate_settings):
+            try:
+                check(bad)
+            except ValueError:
+                continue
+            raise AssertionError(f"잘못된 규칙 통과: {bad['notification_preferences']}")
+    assert router.route('CH01', 0.9) == ('google_sheets', 'webhook')
+    assert parse_hhmm('7:05') == 425
+    print(f"✅ 재컴파일 반영, 잘못된 규칙 {len(bad_configs)}종 거부 (기존 테이블 유지)")
+
+
+def run_multi_alert(folder: str):
+    """MultiAlert: 규칙으로 막힌 채널은 호출하지 않음"""
+    print("\n" + "=" * 60)
+    print("📡 MultiAlert 적용")
+    print("=" * 60)
+
+    path = os.path.join(folder, 'settings.json')
+    config = make_config(min_confidence_for_alert=0.75, send_webhook=False,
+                         seats={'CH02': {'alert_to': 'admin'}})
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(config, f)
+    alert = MultiAlert(path)
+
+    calls = []
+    alert.send_telegram = lambda message, targets=None, photos=None: calls.append(('telegram', tuple(targets))) or True
+    alert.log_to_google_sheets = lambda *args: calls.append(('google_sheets',)) or True
+    alert.log_rows_to_google_sheets = lambda alerts: calls.append(('google_sheets', len(alerts))) or True
+    alert.send_webhook = lambda data: calls.append(('webhook',)) or True
+
+    assert alert.send_drowsy_alert('CH01', 0.5, {}) == {'suppressed': True}
+    assert calls == []
+    assert alert.send_drowsy_alert('CH01', 0.9, {}) == {'telegram': True, 'google_sheets': True}
+    assert calls == [('telegram', ('-100',)), ('google_sheets',)], calls
+
+    calls.clear()
+    now = datetime.now()
+    alerts = [{'seat': seat, 'confidence': confidence, 'details': {}, 'time': now, 'repeats': 1}
+              for seat, confidence in (('CH01', 0.9), ('CH02', 0.9), ('CH03', 0.6))]
+    result = alert.send_drowsy_digest(alerts)
+    assert result == {'telegram': True, 'google_sheets': True, 'suppressed': ['CH03']}, result
+    assert sorted(calls) == [('google_sheets', 2), ('telegram', ('-100',)), ('telegram', ('1',))], calls
+    assert [alert_result(result, seat) for seat in ('CH01', 'CH02', 'CH03')] == [True, True, SUPPRESSED]
+    assert alert_result({'suppressed': True}) == SUPPRESSED
+    assert alert_result({'telegram': False, 'webhook': False}) is False
+
+    # 알림 묶음: 규칙으로 건너뛴 좌석도 쿨다운 (다시 넣지 않음)
+    clock = [0.0]
+    coalescer = AlertCoalescer(alert, {'window': 0}, cooldown=300, clock=lambda: clock[0])
+    coalescer.add('CH03', 0.6, {})
+    assert coalescer.flush() == [('CH03', SUPPRESSED)]
+    clock[0] = 10.0
+    assert not coalescer.add('CH03', 0.6, {})
+
+    # 리로드: 텔레그램 끄기
+    config['notification_preferences']['send_telegram'] = False
+    alert.apply_settings(config)
+    calls.clear()
+    assert alert.send_drowsy_alert('CH01', 0.9, {}) == {'google_sheets': True}
+    assert calls == [('google_sheets',)]
+    print("✅ 신뢰도 미달은 호출 0회 (suppressed, 쿨다운 유지), 좌석별 대상으로 요약 분리, 리로드 후 텔레그램 끔")
+
+
+if __name__ == "__main__":
+    test_sink_toggles()
+    test_min_confidence()
+    test_quiet_hours()
+    test_seat_overrides()
+    test_telegram_targets()
+    test_reload()
+    with tempfile.TemporaryDirectory() as folder:
+        run_multi_alert(folder)
+    print("\n✅ 알림 라우팅 테스트 통과")
@@ -0,0 +1,175 @@
+"""
+분산 모니터링 테스트
+전송 형식 / 집계 서버 좌석 상태 규칙 확인 + 노드 프로세스 여러 개로 집계 서버 처리량(이벤트/초) 측정
+
+사용법:
+    python test_distributed.py                         # 노드 4개 × 좌석 64개
+    python test_distributed.py --nodes 8 --seats 32 --batches 5000
+"""
+import sys
+sys.path.append('src')
+
+import argparse
+import asyncio
+import multiprocessing
+import time
+
+from alert_routing import AlertRouter
+from distributed import (AggregatorServer, EventAggregator, NodePublisher,
+                         FRAME_HEADER, decode_body, encode_batch, seat_event)
+
+
+def test_protocol():
+    """프레임 인코딩 / 디코딩"""
+    print("\n" + "=" * 60)
+    print("📦 전송 형식 테스트")
+    print("=" * 60)
+
+    events = [
+        seat_event('1', False),
+        seat_event('2', True, (True, 0.91, {'status': 'drowsy', 'ear': 0.1523,
+                                             'head_tilt': 0.6312, 'eyes_closed': True})),
+    ]
+    frame = encode_batch('node-a', events, ts=1700000000.0)
+    kind, length = FRAME_HEADER.unpack(frame[:FRAME_HEADER.size])
+    batch = decode_body(kind, frame[FRAME_HEADER.size:])
+
+    assert length == len(frame) - FRAME_HEADER.size
+    assert batch['node'] == 'node-a' and batch['events'] == events
+    print(f"✅ 이벤트 {len(events)}건 → {len(frame)}바이트, 왕복 일치")
+
+
+def test_aggregator_state():
+    """연속 감지 카운터 / 알림 쿨다운 (main.py와 같은 규칙)"""
+    print("\n" + "=" * 60)
+    print("🧮 집계 서버 좌석 상태 테스트")
+    print("=" * 60)
+
+    alerts = []
+    aggregator = EventAggregator(
+        {'detection': {'drowsy_count_threshold': 3, 'confidence_threshold': 0.7,
+                       'alert_cooldown': 300}},
+        alert_sink=lambda seat, confidence, details: alerts.append(seat)
+    )
+    drowsy = seat_event('5', True, (True, 0.9, {'status': 'drowsy'}))
+
+    for _ in range(3):
+        aggregator.apply_batch({'node': 'a', 'events': [drowsy]})
+    assert alerts == ['a/5'], alerts
+
+    # 쿨다운 중에는 다시 알리지 않음, 다른 노드의 같은 좌석 번호는 별도 좌석
+    for _ in range(3):
+        aggregator.apply_batch({'node': 'a', 'events': [drowsy]})
+        aggregator.apply_batch({'node': 'b', 'events': [drowsy]})
+    assert alerts == ['a/5', 'b/5'], alerts
+
+    # 빈 좌석이 되면 카운터 초기화
+    aggregator.apply_batch({'node': 'b', 'events': [drowsy, seat_event('5', False)]})
+    assert aggregator.seat_states['b/5']['drowsy_count'] == 0
+    print(f"✅ 알림 {len(alerts)}건 (a/5, b/5), 쿨다운 / 빈 좌석 초기화 확인")
+
+
+def test_wire_format_thresholds():
+    """JSON / 바이너리 형식이 임계값 경계에서 같은 알림 판단을 하는지"""
+    print("\n" + "=" * 60)
+    print("⚖️  전송 형식별 임계값 판단 테스트")
+    print("=" * 60)
+
+    confidences = [0.0, 0.6999, 0.7, 0.7001, 0.7499, 0.75, 0.7999, 0.8, 0.8001, 0.8999, 0.9, 1.0]
+    # 고개 숙임만 감지된 경우처럼 신뢰도가 임계값과 딱 같은 이벤트
+    events = [seat_event(str(i + 1), True, (True, confidence, {'status': 'drowsy', 'ear': 0.3,
+                                                                'head_down': True}))
+              for i, confidence in enumerate(confidences)]
+
+    decisions = {}
+    for wire_format in ('json', 'binary'):
+        frame = encode_batch('node-a', events, ts=1700000000.0, wire_format=wire_format)
+        kind, _ = FRAME_HEADER.unpack(frame[:FRAME_HEADER.size])
+        decoded = decode_body(kind, frame[FRAME_HEADER.size:])['events']
+        assert [e['confidence'] for e in decoded] == confidences, wire_format
+
+        for threshold in (0.7, 0.75, 0.8, 0.9):
+            alerts = []
+            aggregator = EventAggregator(
+                {'detection': {'drowsy_count_threshold': 1, 'confidence_threshold': threshold}},
+                alert_sink=lambda seat, confidence, details: alerts.append(seat))
+            aggregator.apply_batch({'node': 'node-a', 'events': decoded})
+            router = AlertRouter({'notification_preferences': {'min_confidence_for_alert': threshold}})
+            routed = [e['seat'] for e in decoded if router.route(e['seat'], e['confidence'])]
+            decisions[wire_format, threshold] = (alerts, routed)
+
+    for threshold in (0.7, 0.75, 0.8, 0.9):
+        assert decisions['json', threshold] == decisions['binary', threshold], threshold
+    assert len(decisions['binary', 0.8][0]) == 5, decisions['binary', 0.8]
+    print(f"✅ 신뢰도 {len(confidences)}개 × 임계값 4개: JSON / 바이너리 알림 판단 일치")
+
+
+def node_process(port: int, node_id: str, seats: int, batches: int):
+    """노드 1개: 좌석 seats개 이벤트 묶음을 batches번 최대 속도로 전송"""
+    publisher = NodePublisher('127.0.0.1', port, node_id)
+    detection = (False, 0.42, {'status': 'alert', 'ear': 0.28, 'head_tilt': 0.51,
+                               'eyes_closed': False, 'head_down': False})
+    events = [seat_event(str(i + 1), True, detection) for i in range(seats)]
+    for _ in range(batches):
+        publisher.publish(events)
+    publisher.close()
+
+
+async def measure_throughput(nodes: int, seats: int, batches: int) -> float:
+    """집계 서버 1개 + 노드 프로세스 nodes개, 모든 이벤트 처리까지 걸린 시간으로 이벤트/초 계산"""
+    aggregator = EventAggregator({})
+    server = AggregatorServer(aggregator, config={'listen_host': '127.0.0.1', 'listen_port': 0,
+                                                  'stats_interval': 3600})
+    await server.start()
+
+    expected = nodes * seats * batches
+    processes = [
+        multiprocessing.Process(target=node_process,
+                                args=(server.port, f"node-{n + 1}", seats, batches))
+        for n in range(nodes)
+    ]
+    for process in processes:
+        process.start()
+
+    # 첫 이벤트 도착부터 마지막 이벤트 처리까지 (노드 프로세스 시작 시간 제외)
+    first_at = None
+    deadline = time.perf_counter() + 120
+    while aggregator.stats['events'] < expected and time.perf_counter() < deadline:
+        if first_at is None and aggregator.stats['events']:
+            first_at = time.perf_counter()
+        await asyncio.sleep(0.005)
+    elapsed = time.perf_counter() - (first_at or time.perf_counter())
+
+    for process in processes:
+        process.join()
+    await server.stop()
+
+    received = aggregator.stats['events']
+    print(f"📨 수신 {received}/{expected}건, 노드 {len(aggregator.nodes)}개, "
+          f"좌석 {len(aggregator.seat_states)}석")
+    assert received == expected, "이벤트 유실"
+    return received / elapsed if elapsed > 0 else float('inf')
+
+
+def test_throughput(nodes: int = 4, seats: int = 64, batches: int = 2000):
+    """집계 서버 처리량"""
+    print("\n" + "=" * 60)
+    print(f"🚀 집계 서버 처리량 테스트 (노드 {nodes}개 × 좌석 {seats}개 × {batches}사이클)")
+    print("=" * 60)
+
+    rate = asyncio.run(measure_throughput(nodes, seats, batches))
+    print(f"✅ 집계 서버 처리량: {rate:,.0f} 이벤트/초 "
+          f"(16좌석 2초 주기 노드 기준 약 {rate / 8:,.0f}대 분량)")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='분산 모니터링 테스트')
+    parser.add_argument('--nodes', type=int, default=4, help='노드 프로세스 수')
+    parser.add_argument('--seats', type=int, default=64, help='노드당 좌석 수')
+    parser.add_argument('--batches', type=int, default=2000, help='노드당 전송 사이클 수')
+    args = parser.parse_args()
+
+    test_protocol()
+    test_aggregator_state()
+    test_wire_format_thresholds()
+    test_throughput(args.nodes, args.seats, args.batches)
@@ -0,0 +1,270 @@
+"""
+GitHub 요청 한도 클라이언트 시뮬레이션 테스트
+1차 한도(창마다 요청 수) / 2차 한도(1초당 요청 수)를 강제하는 로컬 스텁 GitHub API에
+대시보드 갱신 + 일일 리포트 + 알림 Issue 몰림을 동시에 보내서
+- 한도 초과(403) 없이 알림 Issue가 모두 생성되는지
+- 남은 한도가 적을 때 대시보드 / 리포트가 연기되고 알림이 우선하는지
+확인 (비교용으로 한도를 무시하는 설정도 실행)
+
+사용법:
+    python test_github_client.py
+    python test_github_client.py --seconds 10
+"""
+import sys
+sys.path.append('src')
+
+import argparse
+import builtins
+import json
+import math
+import os
+import tempfile
+import threading
+import time
+from collections import deque
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from alert_system_github import GitHubAlert
+from github_client import GitHubClient, PRIORITY_ALERT, PRIORITY_DASHBOARD, PRIORITY_SUMMARY
+
+
+class LimitedStub:
+    """요청 한도를 강제하는 스텁 GitHub API 상태"""
+
+    def __init__(self, limit: int, window: float, per_second: int):
+        self.limit = limit
+        self.window = window
+        self.per_second = per_second
+        self.lock = threading.Lock()
+        self.window_start = time.time()
+        self.used = 0
+        self.recent = deque()
+        self.issues = []
+        self.dashboard_updates = 0
+        self.primary_violations = 0
+        self.secondary_violations = 0
+
+    def check(self):
+        """요청 1건 한도 검사 → (상태 코드 또는 None, 헤더, 메시지)"""
+        with self.lock:
+            now = time.time()
+            if now >= self.window_start + self.window:
+                self.window_start, self.used = now, 0
+            reset = math.ceil(self.window_start + self.window)
+
+            while self.recent and now - self.recent[0] >= 1.0:
+                self.recent.popleft()
+            if len(self.recent) >= self.per_second:
+                self.secondary_violations += 1
+                return 403, {'Retry-After': '1'}, 'You have exceeded a secondary rate limit'
+            self.recent.append(now)
+
+            if self.used >= self.limit:
+                self.primary_violations += 1
+                return 403, {'X-RateLimit-Limit': str(self.limit), 'X-RateLimit-Remaining': '0',
+                             'X-RateLimit-Reset': str(reset)}, 'API rate limit exceeded'
+            self.used += 1
+            return None, {'X-RateLimit-Limit': str(self.limit),
+                          'X-RateLimit-Remaining': str(self.limit - self.used),
+                          'X-RateLimit-Reset': str(reset)}, ''
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    """issues 생성 / contents 조회·저장만 흉내"""
+
+    def _reply(self, status: int, data, headers: dict):
+        body = json.dumps(data).encode('utf-8')
+        self.send_response(status)
+        for name, value in headers.items():
+            self.send_header(name, value)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _handle(self):
+        stub = self.server.stub
+        length = int(self.headers.get('Content-Length', 0))
+        data = json.loads(self.rfile.read(length) or b'{}') if length else {}
+
+        status, headers, message = stub.check()
+        if status is not None:
+            self._reply(status, {'message': message}, headers)
+            return
+
+        if self.command == 'POST' and self.path.endswith('/issues'):
+            stub.issues.append(data['title'])
+            self._reply(201, {'html_url': f"http://stub/issues/{len(stub.issues)}"}, headers)
+        elif self.command == 'GET' and 'contents' in self.path:
+            self._reply(200, {'sha': 'abc'}, headers)
+        elif self.command == 'PUT' and 'contents' in self.path:
+            stub.dashboard_updates += 1
+            self._reply(200, {'content': {'sha': f"sha{stub.dashboard_updates}"}}, headers)
+        else:
+            self._reply(404, {'message': 'Not Found'}, headers)
+
+    do_GET = do_POST = do_PUT = _handle
+
+    def log_message(self, format, *args):
+        pass
+
+
+def run_scenario(folder: str, rate_limit: dict, seconds: float, alerts_per_burst: int = 10):
+    """
+    대시보드(0.05초마다) + 일일 리포트(0.5초마다) + 알림 몰림 2번을 동시에 실행
+
+    Returns:
+        (스텁 상태, GitHubAlert, 생성 성공한 알림 수)
+    """
+    stub = LimitedStub(limit=40, window=5.0, per_second=10)
+    httpd = ThreadingHTTPServer(('127.0.0.1', 0), StubHandler)
+    httpd.daemon_threads = True
+    httpd.stub = stub
+    threading.Thread(target=httpd.serve_forever, daemon=True).start()
+
+    config_path = os.path.join(folder, 'settings.json')
+    with open(config_path, 'w', encoding='utf-8') as f:
+        json.dump({'github': {'token': 'test', 'repo_owner': 'o', 'repo_name': 'r',
+                              'api_url': f"http://127.0.0.1:{httpd.server_address[1]}",
+                              'rate_limit': rate_limit}}, f)
+
+    quiet_print = builtins.print
+    github = GitHubAlert(config_path)
+    stop = threading.Event()
+    created = []
+
+    def dashboard():
+        while not stop.is_set():
+            github.update_dashboard_data({'total_checks': 1})
+            time.sleep(0.05)
+
+    def summaries():
+        while not stop.is_set():
+            github.send_daily_summary({'total_checks': 1})
+            time.sleep(0.5)
+
+    def alerts():
+        for burst_at in (0.5, seconds / 2):
+            time.sleep(max(0.0, burst_at - (time.monotonic() - started)))
+            for i in range(alerts_per_burst):
+                created.append(github.send_drowsy_alert(f"CH{i + 1:02d}", 0.9, {'ear': 0.1}))
+
+    # 요청마다 찍히는 성공 / 연기 메시지는 감춤
+    builtins.print = lambda *args, **kwargs: None
+    try:
+        started = time.monotonic()
+        workers = [threading.Thread(target=target) for target in (dashboard, summaries, alerts)]
+        for worker in workers:
+            worker.start()
+        workers[2].join()
+        remaining = seconds - (time.monotonic() - started)
+        if remaining > 0:
+            time.sleep(remaining)
+        stop.set()
+        for worker in workers[:2]:
+            worker.join()
+    finally:
+        builtins.print = quiet_print
+        httpd.shutdown()
+        httpd.server_close()
+
+    return stub, github, sum(1 for url in created if url)
+
+
+def report(name: str, stub: LimitedStub, github: GitHubAlert, created: int, expected: int):
+    print(f"{name}: 알림 Issue {created}/{expected}, 대시보드 갱신 {stub.dashboard_updates}회, "
+          f"1차 한도 초과 {stub.primary_violations}회, 2차 한도 초과 {stub.secondary_violations}회")
+    github.client.print_summary()
+
+
+class FakeResponse:
+    """update_limits에 넘길 최소 응답"""
+
+    def __init__(self, status_code: int, headers: dict, text: str = ''):
+        self.status_code = status_code
+        self.headers = headers
+        self.text = text
+
+
+def test_budget_priority():
+    """남은 한도에 따라 리포트 → 대시보드 순으로 연기, 알림은 끝까지 보냄"""
+    print("\n" + "=" * 60)
+    print("📊 남은 한도별 우선순위 테스트")
+    print("=" * 60)
+
+    now = [0.0]
+    client = GitHubClient('test', {'requests_per_second': 100, 'burst': 100,
+                                   'low_priority_reserve': 10, 'max_wait': 5},
+                          clock=lambda: now[0])
+    reset = str(int(time.time()) + 3600)
+
+    def remaining(count: int):
+        client.update_limits(FakeResponse(200, {'X-RateLimit-Limit': '100',
+                                                'X-RateLimit-Remaining': str(count),
+                                                'X-RateLimit-Reset': reset}))
+
+    allowed = {}
+    for count in (50, 15, 5, 1):
+        remaining(count)
+        allowed[count] = [client.defer_reason(priority) is None
+                          for priority in (PRIORITY_ALERT, PRIORITY_DASHBOARD, PRIORITY_SUMMARY)]
+    assert allowed == {50: [True, True, True], 15: [True, True, False],
+                       5: [True, False, False], 1: [True, False, False]}, allowed
+
+    # 2차 한도 (Retry-After) → 낮은 우선순위는 즉시 연기, 알림은 max_wait 안이면 기다림
+    client.update_limits(FakeResponse(403, {'Retry-After': '3'}, 'secondary rate limit'))
+    assert not client.acquire(PRIORITY_DASHBOARD)
+    assert client.blocked_until == 3.0 and client.stats['throttled'] == 1
+
+    # Retry-After가 max_wait보다 길면 알림도 연기 (outbox가 나중에 재시도)
+    client.update_limits(FakeResponse(429, {'Retry-After': '30'}))
+    assert not client.acquire(PRIORITY_ALERT)
+    now[0] = 31.0
+    assert client.acquire(PRIORITY_ALERT)
+    print("✅ 남은 한도 50: 모두 전송 / 15: 리포트 연기 / 5 이하: 알림만 전송, "
+          "Retry-After 동안 대기")
+
+
+def run_rate_limited(folder: str, seconds: float):
+    """한도 관리 클라이언트: 한도 초과 없이 알림 우선"""
+    print("\n" + "=" * 60)
+    print("🐙 요청 한도 관리 시뮬레이션 (스텁: 5초당 40건, 초당 10건)")
+    print("=" * 60)
+
+    stub, github, created = run_scenario(folder, {
+        'requests_per_second': 6, 'burst': 3, 'low_priority_reserve': 8, 'max_wait': 15,
+    }, seconds)
+    report("✅ 한도 관리", stub, github, created, 20)
+
+    client = github.client
+    assert created == 20, f"알림 Issue 누락: {created}/20"
+    assert stub.primary_violations == 0 and stub.secondary_violations == 0, "한도 초과 발생"
+    assert client.stats['deferred']['alert'] == 0, "알림 요청이 연기됨"
+    assert client.stats['deferred']['dashboard'] > 0, "한도가 부족해도 대시보드를 연기하지 않음"
+    assert stub.dashboard_updates > 0
+
+
+def run_unlimited(folder: str, seconds: float):
+    """비교: 한도를 무시하면 스텁이 403을 반환하고 알림 Issue를 잃음"""
+    print("\n" + "=" * 60)
+    print("💥 비교: 한도 무시 설정")
+    print("=" * 60)
+
+    stub, github, created = run_scenario(folder, {
+        'requests_per_second': 1000, 'burst': 1000, 'low_priority_reserve': 0,
+        'alert_token_reserve': 0, 'max_wait': 0,
+    }, seconds)
+    report("⚠️  한도 무시", stub, github, created, 20)
+    assert stub.primary_violations + stub.secondary_violations > 0, "스텁 한도가 동작하지 않음"
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='GitHub 요청 한도 클라이언트 시뮬레이션')
+    parser.add_argument('--seconds', type=float, default=6.0, help='시나리오 실행 시간 (초)')
+    args = parser.parse_args()
+
+    test_budget_priority()
+    with tempfile.TemporaryDirectory() as folder:
+        run_rate_limited(folder, args.seconds)
+        run_unlimited(folder, args.seconds)
+    print("\n✅ GitHub 클라이언트 테스트 통과")
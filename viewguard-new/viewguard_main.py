@@ -4,51 +4,72 @@ CCTV 화면 캡처 및 실시간 분석
 """
 
 import cv2
-import mediapipe as mp
-import numpy as np
 from datetime import datetime
+import queue
+import threading
 import time
 import json
-import requests
+import sys
 from pathlib import Path
 
+# 공용 모듈 (src/)
+sys.path.append(str(Path(__file__).resolve().parent.parent / 'src'))
+from alert_outbox import open_outbox
+from instrumentation import instrumentation, setup_metrics
+from stream_ingest import AnalysisCadence, StreamHub, StreamReader, record_frame_age
+from config_reloader import ConfigReloader
+from detection_engine import DetectionEngine, OVERLAY_POINTS, warmup_worker
+
 
 class DrowsinessDetector:
-    """졸음 감지 클래스"""
+    """졸음 감지 클래스 (공용 DetectionEngine + 스트림별 연속 감지 카운터)"""
     
-    def __init__(self):
-        # MediaPipe 초기화
-        self.mp_face_mesh = mp.solutions.face_mesh
-        self.face_mesh = self.mp_face_mesh.FaceMesh(
-            max_num_faces=1,
-            refine_landmarks=True,
-            min_detection_confidence=0.5,
-            min_tracking_confidence=0.5
-        )
-        
+    # CCTV 모니터 기본 구성: 코→턱 각도 + 둘 중 하나라도 넘으면 졸음 (settings.json의 cctv.engine으로 변경)
+    ENGINE_DEFAULTS = {'metrics': ['ear', 'head_tilt_angle'], 'decision': 'any'}
+    
+    def __init__(self, config_path='config/settings.json', stream_count=1):
+        """
+        stream_count: 한 프로세스에서 감시하는 스트림 수 (profile=auto일 때 프로필 선택 기준)
+        """
         # 설정 로드
+        self.config_path = config_path
         self.load_settings()
         
+        # 감지 엔진 (랜드마크 → 지표 → 판단)
+        self.engine = DetectionEngine(self.engine_config(), seat_count=stream_count)
+        
         # 상태 변수
         self.drowsy_count = 0
-        self.last_alert_time = 0
+        
+        # 마지막 분석 결과 (분석 사이 프레임의 오버레이에 재사용)
+        self.last_landmarks = None
+        self.last_result = (False, 0, 0)
         
     def load_settings(self):
         """설정 파일 로드"""
         try:
-            with open('config/settings.json', 'r', encoding='utf-8') as f:
+            with open(self.config_path, 'r', encoding='utf-8') as f:
                 settings = json.load(f)
                 
             self.ear_threshold = settings['detection']['ear_threshold']
             self.head_tilt_threshold = settings['detection']['head_tilt_threshold']
             self.drowsy_threshold = settings['detection']['drowsy_count_threshold']
-            self.alert_cooldown = settings['detection']['alert_cooldown']
+            # 감지 프로필 (fast / standard / precise / auto), 고개 숙임 판단 방식 (ratio / pnp)
+            self.detection_options = {
+                key: settings['detection'][key]
+                for key in ('profile', 'auto_fast_seat_count',
+                            'head_pose_method', 'head_pitch_threshold')
+                if key in settings['detection']
+            }
+            # 감지기 예열 설정 {"enabled": true, "rounds": 3}
+            self.warmup_config = settings['detection'].get('warmup', {})
             
-            # GitHub 설정
-            self.github_enabled = settings['github']['enabled']
-            self.github_token = settings['github']['token']
-            self.github_owner = settings['github']['repo_owner']
-            self.github_repo = settings['github']['repo_name']
+            # 측정 / 메트릭 엔드포인트 설정
+            self.metrics_config = settings.get('metrics', {})
+            # 다중 스트림 수집 설정
+            self.stream_config = settings.get('cctv', {})
+            # 설정 파일 핫 리로드
+            self.config_reload = settings.get('config_reload', {})
             
         except Exception as e:
             print(f"⚠️ 설정 파일 로드 실패: {e}")
@@ -56,84 +77,86 @@ class DrowsinessDetector:
             self.ear_threshold = 0.2
             self.head_tilt_threshold = 0.58
             self.drowsy_threshold = 5
-            self.alert_cooldown = 300
-            self.github_enabled = False
+            self.detection_options = {}
+            self.warmup_config = {}
+            self.metrics_config = {}
+            self.stream_config = {}
+            self.config_reload = {}
     
-    def calculate_ear(self, landmarks, indices):
-        """EAR (Eye Aspect Ratio) 계산"""
-        # 눈의 수직 거리
-        vertical1 = np.linalg.norm(landmarks[indices[1]] - landmarks[indices[5]])
-        vertical2 = np.linalg.norm(landmarks[indices[2]] - landmarks[indices[4]])
-        
-        # 눈의 수평 거리
-        horizontal = np.linalg.norm(landmarks[indices[0]] - landmarks[indices[3]])
-        
-        # EAR 계산
-        ear = (vertical1 + vertical2) / (2.0 * horizontal)
-        return ear
+    def engine_config(self):
+        """현재 설정으로 DetectionEngine 설정 딕셔너리 구성"""
+        return dict(
+            ear_threshold=self.ear_threshold,
+            head_tilt_threshold=self.head_tilt_threshold,
+            **self.detection_options,
+            engine=dict(self.ENGINE_DEFAULTS, **self.stream_config.get('engine', {}))
+        )
     
-    def calculate_head_tilt(self, landmarks):
-        """머리 기울기 계산"""
-        # 얼굴의 주요 포인트
-        nose_tip = landmarks[1]
-        chin = landmarks[152]
-        
-        # 수직선과의 각도 계산
-        dy = chin[1] - nose_tip[1]
-        dx = chin[0] - nose_tip[0]
-        
-        angle = abs(np.arctan2(dx, dy))
-        return angle
+    def reload_settings(self):
+        """
+        설정 파일 다시 읽어 임계값 적용 (모델 유지, 연속 감지 카운터 유지)
+        
+        Returns:
+            재시작해야 적용되는 변경 키 목록
+        """
+        self.load_settings()
+        return self.engine.reconfigure(self.engine_config())
     
     def detect_drowsiness(self, frame):
-        """졸음 감지"""
-        # RGB로 변환 (MediaPipe는 RGB 사용)
-        rgb_frame = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-        results = self.face_mesh.process(rgb_frame)
+        """
+        졸음 감지 (화면 표시는 draw_overlay, 알림은 GitHubIssueAlert에서 처리)
         
-        is_drowsy = False
-        ear_value = 0
-        head_tilt = 0
+        Returns:
+            (is_drowsy, ear, head_tilt) - is_drowsy는 연속 감지 카운터 기준
+        """
+        flagged, _, details = self.engine.detect_drowsiness(frame)
         
-        if results.multi_face_landmarks:
-            face_landmarks = results.multi_face_landmarks[0]
-            
-            # 랜드마크를 numpy 배열로 변환
-            h, w = frame.shape[:2]
-            landmarks = np.array([
-                [landmark.x * w, landmark.y * h]
-                for landmark in face_landmarks.landmark
-            ])
-            
-            # 왼쪽 눈 EAR (랜드마크 인덱스)
-            left_eye_indices = [362, 385, 387, 263, 373, 380]
-            # 오른쪽 눈 EAR
-            right_eye_indices = [33, 160, 158, 133, 153, 144]
-            
-            left_ear = self.calculate_ear(landmarks, left_eye_indices)
-            right_ear = self.calculate_ear(landmarks, right_eye_indices)
-            
-            # 평균 EAR
-            ear_value = (left_ear + right_ear) / 2.0
-            
-            # 머리 기울기
-            head_tilt = self.calculate_head_tilt(landmarks)
-            
+        if details['status'] == 'no_face_detected':
+            self.last_landmarks = None
+            self.last_result = (False, 0, 0)
+            return False, 0, 0
+        
+        ear_value = details['ear']
+        head_tilt = details['head_tilt']
+        
+        with instrumentation.span('state_update'):
             # 졸음 판단
-            if ear_value < self.ear_threshold or head_tilt > self.head_tilt_threshold:
+            if flagged:
                 self.drowsy_count += 1
             else:
                 self.drowsy_count = max(0, self.drowsy_count - 1)
             
             # 임계값 초과 시 졸음으로 판단
-            if self.drowsy_count >= self.drowsy_threshold:
-                is_drowsy = True
-            
-            # 화면에 정보 표시
-            self.draw_info(frame, ear_value, head_tilt, is_drowsy)
+            is_drowsy = self.drowsy_count >= self.drowsy_threshold
+        
+        # 오버레이용 주요 포인트 (눈, 코, 턱)
+        self.last_landmarks = self.engine.last_landmarks[OVERLAY_POINTS]
+        self.last_result = (is_drowsy, ear_value, head_tilt)
         
         return is_drowsy, ear_value, head_tilt
     
+    def warmup(self, sizes, rounds=3):
+        """합성 얼굴로 감지 모델 예열 (DetectionEngine.warmup)"""
+        return self.engine.warmup(sizes, rounds)
+    
+    def draw_overlay(self, frame, analysis_fps=None):
+        """
+        마지막 분석 결과를 현재 프레임에 표시 (분석하지 않은 프레임에도 사용)
+        analysis_fps: 실제 분석 FPS (None이면 표시 안 함)
+        """
+        if self.last_landmarks is not None:
+            # 마지막 분석 시점의 랜드마크 (분석 사이 프레임은 약간 어긋날 수 있음)
+            for x, y in self.last_landmarks.astype(int):
+                cv2.circle(frame, (int(x), int(y)), 2, (0, 255, 255), -1)
+            
+            is_drowsy, ear, head_tilt = self.last_result
+            self.draw_info(frame, ear, head_tilt, is_drowsy)
+        
+        if analysis_fps is not None:
+            h = frame.shape[0]
+            cv2.putText(frame, f"Analysis: {analysis_fps:.1f} fps", (20, h - 20),
+                       cv2.FONT_HERSHEY_SIMPLEX, 0.6, (255, 255, 255), 2)
+    
     def draw_info(self, frame, ear, head_tilt, is_drowsy):
         """화면에 정보 표시"""
         # 배경 박스
@@ -158,20 +181,101 @@ class DrowsinessDetector:
             cv2.rectangle(frame, (0, 0), (frame.shape[1], 80), (0, 0, 255), -1)
             cv2.putText(frame, "!!! DROWSY DETECTED !!!", (50, 50),
                        cv2.FONT_HERSHEY_SIMPLEX, 1.5, (255, 255, 255), 3)
+
+
+class GitHubIssueAlert:
+    """GitHub Issue 알림 (전송은 알림 스레드에서, 스트림별 쿨다운)"""
     
-    def send_github_alert(self, ear, head_tilt, seat_id="CH01"):
-        """GitHub Issue로 알림 전송"""
-        if not self.github_enabled:
-            print("⚠️ GitHub 알림이 비활성화되어 있습니다.")
+    QUEUE_SIZE = 100
+    
+    def __init__(self, config_path='config/settings.json'):
+        outbox_config = {}
+        try:
+            with open(config_path, 'r', encoding='utf-8') as f:
+                settings = json.load(f)
+            
+            self.ear_threshold = settings['detection']['ear_threshold']
+            self.head_tilt_threshold = settings['detection']['head_tilt_threshold']
+            self.alert_cooldown = settings['detection']['alert_cooldown']
+            enabled = settings['github']['enabled']
+            outbox_config = settings.get('alert_outbox', {})
+        except Exception as e:
+            print(f"⚠️ 알림 설정 로드 실패: {e}")
+            self.ear_threshold = 0.2
+            self.head_tilt_threshold = 0.58
+            self.alert_cooldown = 300
+            enabled = False
+        
+        # Issue 생성은 공용 GitHubAlert (GitHubClient 요청 한도 / 타임아웃, 아웃박스 재시도)
+        from alert_system_github import GitHubAlert
+        self.github = GitHubAlert(config_path)
+        self.enabled = enabled and self.github.enabled
+        self.outbox = open_outbox(self.github, outbox_config) if self.enabled else None
+        self.drain_timeout = outbox_config.get('drain_timeout', 5)
+        
+        # 스트림(좌석)별 마지막 알림 시각 (대기열에 넣을 때 잡고, 전송 실패 시 해제)
+        self.last_alert_time = {}
+        
+        # 감지 / 화면 스레드는 대기열에 넣기만 하고 전송은 알림 스레드가
+        self.queue = queue.Queue(maxsize=self.QUEUE_SIZE)
+        self.worker = None
+    
+    def start(self):
+        """알림 스레드 / 아웃박스 재시도 스레드 시작"""
+        if not self.enabled or self.worker is not None:
             return
+        if self.outbox is not None:
+            self.outbox.start()
+        self.worker = threading.Thread(target=self._run, name='github-alert', daemon=True)
+        self.worker.start()
+    
+    def send_drowsy_alert(self, ear, head_tilt, seat_id="CH01"):
+        """
+        GitHub Issue 알림 대기열에 넣기 (감지 스레드를 막지 않음)
+        
+        Returns:
+            대기열에 넣었으면 True
+        """
+        if not self.enabled:
+            print("⚠️ GitHub 알림이 비활성화되어 있습니다.")
+            return False
         
         # 쿨다운 체크
         current_time = time.time()
-        if current_time - self.last_alert_time < self.alert_cooldown:
+        if current_time - self.last_alert_time.get(seat_id, 0) < self.alert_cooldown:
             print("⏳ 알림 쿨다운 중...")
-            return
+            return False
+        
+        self.last_alert_time[seat_id] = current_time
+        try:
+            self.queue.put_nowait((seat_id, ear, head_tilt, datetime.now()))
+        except queue.Full:
+            self.last_alert_time.pop(seat_id, None)
+            instrumentation.inc('alerts_dropped_total', seat=seat_id)
+            print(f"⚠️ [{seat_id}] 알림 대기열이 가득 차 알림을 버립니다")
+            return False
+        return True
+    
+    def _run(self):
+        """알림 스레드: 대기열의 알림을 순서대로 전송 (None이면 종료)"""
+        while True:
+            item = self.queue.get()
+            try:
+                if item is None:
+                    return
+                self.deliver(*item)
+            except Exception as e:
+                print(f"❌ 알림 전송 오류: {e}")
+            finally:
+                self.queue.task_done()
+    
+    def deliver(self, seat_id, ear, head_tilt, now):
+        """
+        GitHub Issue 생성 (아웃박스 사용 시 기록만, 실패하면 쿨다운 해제)
         
-        now = datetime.now()
+        Returns:
+            성공 여부
+        """
         timestamp = now.strftime("%Y-%m-%d %H:%M:%S")
         
         # Issue 제목
@@ -197,104 +301,303 @@ class DrowsinessDetector:
 *자동 생성된 알림입니다.*
 """
         
-        # GitHub API 호출
-        url = f"https://api.github.com/repos/{self.github_owner}/{self.github_repo}/issues"
-        headers = {
-            "Authorization": f"token {self.github_token}",
-            "Accept": "application/vnd.github.v3+json"
-        }
-        data = {
-            "title": title,
-            "body": body,
-            "labels": ["drowsiness", "alert"]
-        }
-        
-        try:
-            response = requests.post(url, headers=headers, json=data)
-            if response.status_code == 201:
-                issue_url = response.json()['html_url']
-                print(f"✅ GitHub Issue 생성: {issue_url}")
-                self.last_alert_time = current_time
-            else:
-                print(f"❌ GitHub Issue 생성 실패: {response.status_code}")
-                print(response.text)
-        except Exception as e:
-            print(f"❌ 알림 전송 오류: {e}")
+        with instrumentation.span('alert_dispatch'):
+            success = self.github.create_issue(title, body, ["drowsiness", "alert"]) is not None
+        instrumentation.inc('alerts_total', seat=seat_id,
+                            result='success' if success else 'failure')
+        if not success:
+            # 다음 감지 때 다시 시도
+            self.last_alert_time.pop(seat_id, None)
+        return success
+    
+    def close(self):
+        """남은 알림 전송 후 알림 스레드 / 아웃박스 종료 (못 보낸 아웃박스 알림은 다음 실행에서 전송)"""
+        if self.worker is not None:
+            try:
+                self.queue.put(None, timeout=self.drain_timeout)
+            except queue.Full:
+                pass
+            self.worker.join(self.drain_timeout)
+            self.worker = None
+        if self.outbox is not None:
+            self.outbox.stop(self.drain_timeout)
+            self.outbox.close()
 
 
 class CCTVMonitor:
     """CCTV 모니터링 메인 클래스"""
     
-    def __init__(self, camera_index=0):
+    def __init__(self, camera_index=0, config_path='config/settings.json', show_window=True):
         """
         camera_index: 
         - 0: 웹캠
         - 1, 2, ...: 추가 카메라
         - 'rtsp://...' : RTSP 스트림 URL
+        - 동영상 파일 경로 (녹화/합성 입력 벤치마크용)
+        - 위 값들의 리스트: 한 프로세스에서 여러 스트림 동시 모니터링
+        show_window: False면 화면 표시 없이 실행 (헤드리스)
         """
         self.camera_index = camera_index
-        self.detector = DrowsinessDetector()
+        self.config_path = config_path
+        self.stream_count = len(camera_index) if isinstance(camera_index, (list, tuple)) else 1
+        self.detector = DrowsinessDetector(config_path, self.stream_count)
+        self.alert = GitHubIssueAlert(config_path)
+        # settings.json 핫 리로드 (분석 사이에 적용)
+        self.reloader = ConfigReloader(config_path, config=self.detector.config_reload)
+        self.detectors = [self.detector]
+        self.show_window = show_window
         self.running = False
+        self.frames_processed = 0
         
     def start(self):
         """모니터링 시작"""
+        if isinstance(self.camera_index, (list, tuple)):
+            if len(self.camera_index) > 1:
+                self.start_multi(list(self.camera_index))
+                return
+            self.camera_index = self.camera_index[0]
+        
         print("=" * 60)
         print("ViewGuard 졸음 모니터링 시스템 시작")
         print("=" * 60)
         print(f"카메라: {self.camera_index}")
         print(f"EAR 임계값: {self.detector.ear_threshold}")
         print(f"Head Tilt 임계값: {self.detector.head_tilt_threshold}")
-        print(f"GitHub 알림: {'활성화' if self.detector.github_enabled else '비활성화'}")
+        print(f"분석 주기: 초당 {self.detector.stream_config.get('analysis_fps', 5)}회 (0이면 매 프레임)")
+        print(f"GitHub 알림: {'활성화' if self.alert.enabled else '비활성화'}")
         print("-" * 60)
         print("종료하려면 'q' 키를 누르세요")
         print("=" * 60)
         
-        # 카메라 열기
-        cap = cv2.VideoCapture(self.camera_index)
+        # 구간별 측정 / 메트릭 엔드포인트
+        metrics_server = setup_metrics(self.detector.metrics_config)
+        self.alert.start()
         
-        if not cap.isOpened():
-            print("❌ 카메라를 열 수 없습니다!")
-            return
+        # 감지기 예열 (스트림 해상도 기준, 끝나야 /ready가 200)
+        stream_config = self.detector.stream_config
+        warmup_worker(self.detector,
+                      [(stream_config.get('width', 1280), stream_config.get('height', 720))],
+                      config=self.detector.warmup_config)
         
-        # 해상도 설정 (선택사항)
-        cap.set(cv2.CAP_PROP_FRAME_WIDTH, 1280)
-        cap.set(cv2.CAP_PROP_FRAME_HEIGHT, 720)
+        # 카메라 열기 (읽기 스레드가 장치를 계속 비우고 최신 프레임만 보관)
+        reader = StreamReader(
+            self.camera_index,
+            width=stream_config.get('width', 1280),
+            height=stream_config.get('height', 720),
+            reconnect_delay=stream_config.get('reconnect_delay', 2.0),
+            loop=False,
+            pace=stream_config.get('pace_files', True),
+            open_retries=stream_config.get('open_retries', 5)
+        ).start()
+        cadence = AnalysisCadence(stream_config.get('analysis_fps', 5))
         
         self.running = True
         
         try:
             while self.running:
-                ret, frame = cap.read()
+                # 헤드리스면 다음 분석 시각까지 쉬었다가 그 시점의 최신 프레임 사용
+                if not self.show_window:
+                    delay = cadence.next_due - time.perf_counter()
+                    if delay > 0:
+                        time.sleep(delay)
                 
-                if not ret:
-                    print("❌ 프레임을 읽을 수 없습니다!")
-                    break
+                with instrumentation.span('capture'):
+                    reader.wait(timeout=1.0)
+                    frame, _, captured_at = reader.read()
                 
-                # 졸음 감지
-                is_drowsy, ear, head_tilt = self.detector.detect_drowsiness(frame)
+                if frame is None:
+                    if reader.open_failed:
+                        print("❌ 카메라를 열 수 없습니다!")
+                        break
+                    if reader.exhausted:
+                        print("⏹️  스트림 종료")
+                        break
+                    continue
                 
-                # 졸음 감지 시 알림
-                if is_drowsy:
-                    print(f"🚨 졸음 감지! EAR: {ear:.3f}, Tilt: {head_tilt:.3f}")
-                    self.detector.send_github_alert(ear, head_tilt)
+                if not self.handle_frame(self.detector, cadence, reader.name, frame,
+                                         captured_at, 'ViewGuard - Drowsiness Monitor'):
+                    break
+                    
+        except KeyboardInterrupt:
+            print("\n⚠️ 사용자가 중단했습니다.")
+        finally:
+            reader.stop()
+            self.alert.close()
+            if metrics_server:
+                metrics_server.stop()
+            if self.show_window:
+                cv2.destroyAllWindows()
+            print("✅ 모니터링 종료")
+    
+    
+    def handle_frame(self, detector, cadence, name, frame, captured_at, window, seat_id="CH01"):
+        """
+        프레임 1장 처리
+        분석 차례면 졸음 감지, 아니면 마지막 분석 결과(랜드마크)만 재사용해 표시
+        
+        Returns:
+            'q' 키로 종료 요청 시 False
+        """
+        instrumentation.mark_first_capture()
+        
+        if cadence.due():
+            # 설정 파일 변경 적용 (분석 사이에만 교체)
+            self.apply_config_changes()
+            
+            # 캡처 → 감지 시작까지 지연
+            record_frame_age(name, captured_at)
+            
+            # 졸음 감지
+            is_drowsy, ear, head_tilt = detector.detect_drowsiness(frame)
+            cadence.mark()
+            self.frames_processed += 1
+            instrumentation.inc('frames_analyzed_total', stream=name)
+            instrumentation.set_gauge('analysis_fps', cadence.achieved_fps, stream=name)
+            
+            # 졸음 감지 시 알림
+            if is_drowsy:
+                print(f"🚨 [{name}] 졸음 감지! EAR: {ear:.3f}, Tilt: {head_tilt:.3f}")
+                self.alert.send_drowsy_alert(ear, head_tilt, seat_id=seat_id)
+        else:
+            instrumentation.inc('frames_skipped_total', stream=name)
+        
+        if not self.show_window:
+            return True
+        
+        # 화면 표시
+        with instrumentation.span('overlay'):
+            detector.draw_overlay(frame, cadence.achieved_fps)
+        cv2.imshow(window, frame)
+        
+        # 'q' 키로 종료
+        return cv2.waitKey(1) & 0xFF != ord('q')
+    
+    def apply_config_changes(self):
+        """settings.json 변경 시 모든 스트림 감지기에 임계값 적용"""
+        if 'settings' not in self.reloader.poll():
+            return
+        
+        try:
+            restart_keys = set()
+            for detector in self.detectors:
+                restart_keys.update(detector.reload_settings())
+        except Exception as e:
+            print(f"❌ 설정 적용 실패: {e}")
+            return
+        
+        print(f"🔄 설정 다시 불러옴: EAR {self.detector.ear_threshold}, "
+              f"Head Tilt {self.detector.head_tilt_threshold}, 연속 {self.detector.drowsy_threshold}회")
+        if restart_keys:
+            print(f"   ⚠️  재시작 후 적용: {', '.join(sorted(restart_keys))}")
+    
+    def start_multi(self, sources):
+        """
+        다중 스트림 모니터링
+        스트림마다 읽기 스레드가 최신 프레임만 보관하고,
+        감지 단계는 새 프레임이 있는 스트림을 라운드 로빈으로 처리
+        
+        sources: 카메라 번호 / 파일 경로 / RTSP URL 리스트
+        """
+        stream_config = self.detector.stream_config
+        
+        print("=" * 60)
+        print("ViewGuard 다중 스트림 모니터링 시작")
+        print("=" * 60)
+        for i, source in enumerate(sources):
+            print(f"CAM{i + 1:02d}: {source}")
+        print(f"GitHub 알림: {'활성화' if self.alert.enabled else '비활성화'}")
+        print("-" * 60)
+        print("종료하려면 'q' 키를 누르세요 (헤드리스: Ctrl+C)")
+        print("=" * 60)
+        
+        metrics_server = setup_metrics(self.detector.metrics_config)
+        self.alert.start()
+        
+        hub = StreamHub(
+            sources,
+            width=stream_config.get('width', 1280),
+            height=stream_config.get('height', 720),
+            reconnect_delay=stream_config.get('reconnect_delay', 2.0),
+            loop=stream_config.get('loop_files', True),
+            pace=stream_config.get('pace_files', True),
+            open_retries=stream_config.get('open_retries', 5)
+        )
+        
+        # 스트림별 감지기 (졸음 카운터/FaceMesh 추적 상태가 스트림마다 독립)
+        detectors = self.detectors = [self.detector] + [
+            DrowsinessDetector(self.config_path, len(sources)) for _ in sources[1:]
+        ]
+        cadences = [AnalysisCadence(stream_config.get('analysis_fps', 5)) for _ in sources]
+        
+        # 스트림별 감지기 예열 (전부 등록한 뒤 하나씩 예열 → 마지막까지 끝나야 /ready가 200)
+        size = (stream_config.get('width', 1280), stream_config.get('height', 720))
+        for reader in hub.readers:
+            instrumentation.set_ready(reader.name, False)
+        for detector, reader in zip(detectors, hub.readers):
+            warmup_worker(detector, [size], worker=reader.name, config=self.detector.warmup_config)
+        
+        hub.start()
+        self.running = True
+        
+        try:
+            while self.running:
+                item = hub.next_frame(timeout=1.0)
                 
-                # 화면 표시
-                cv2.imshow('ViewGuard - Drowsiness Monitor', frame)
+                if item is None:
+                    if hub.exhausted:
+                        print("⏹️  모든 스트림 종료")
+                        break
+                    continue
                 
-                # 'q' 키로 종료
-                if cv2.waitKey(1) & 0xFF == ord('q'):
+                index, frame, captured_at = item
+                name = hub.readers[index].name
+                
+                if not self.handle_frame(detectors[index], cadences[index], name, frame,
+                                         captured_at, f'ViewGuard - {name}', seat_id=name):
                     break
-                    
+        
         except KeyboardInterrupt:
             print("\n⚠️ 사용자가 중단했습니다.")
         finally:
-            cap.release()
-            cv2.destroyAllWindows()
+            hub.stop()
+            self.alert.close()
+            if metrics_server:
+                metrics_server.stop()
+            if self.show_window:
+                cv2.destroyAllWindows()
+            
+            for reader in hub.readers:
+                print(f"📊 {reader.name}: 수신 {reader.stats['frames_read']}프레임, "
+                      f"건너뜀 {reader.stats['frames_dropped']}프레임, "
+                      f"재연결 {reader.stats['reconnects']}회")
             print("✅ 모니터링 종료")
 
 
-def main():
-    """메인 함수"""
+def parse_camera_input(camera_input):
+    """
+    카메라 입력 문자열 → 소스 (쉼표로 여러 개 지정 가능)
+    예: "0", "0,1", "rtsp://a/stream, rtsp://b/stream, clip.mp4"
+    """
+    sources = []
+    for item in camera_input.split(','):
+        item = item.strip()
+        if not item:
+            continue
+        sources.append(int(item) if item.isdigit() else item)
+    
+    if not sources:
+        return 0
+    return sources[0] if len(sources) == 1 else sources
+
+
+def main(argv=None):
+    """
+    메인 함수
+    
+    Args:
+        argv: 스트림 소스 인자 (None이면 sys.argv[1:])
+    """
+    argv = sys.argv[1:] if argv is None else argv
     print("""
     ╔══════════════════════════════════════════════════╗
     ║                                                  ║
@@ -310,19 +613,18 @@ def main():
     print("  1: USB 카메라 1")
     print("  2: USB 카메라 2")
     print("  또는 RTSP URL 입력 (예: rtsp://192.168.0.100:554/stream)")
+    print("  여러 스트림은 쉼표로 구분 (예: 0,1,rtsp://192.168.0.100:554/stream)")
     
-    camera_input = input("\n카메라 선택 (기본값: 0): ").strip()
+    # 명령줄 인자로 소스 지정 가능: python viewguard_main.py 0 rtsp://... clip.mp4
+    if argv:
+        camera_input = ",".join(argv)
+    else:
+        camera_input = input("\n카메라 선택 (기본값: 0): ").strip()
     
-    if camera_input == "":
+    camera_index = parse_camera_input(camera_input)
+    if isinstance(camera_index, str) and "://" not in camera_index and not Path(camera_index).exists():
+        print("⚠️ 잘못된 입력입니다. 기본 웹캠(0)을 사용합니다.")
         camera_index = 0
-    elif camera_input.startswith("rtsp://"):
-        camera_index = camera_input
-    else:
-        try:
-            camera_index = int(camera_input)
-        except:
-            print("⚠️ 잘못된 입력입니다. 기본 웹캠(0)을 사용합니다.")
-            camera_index = 0
     
     # 모니터링 시작
     monitor = CCTVMonitor(camera_index)
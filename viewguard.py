@@ -0,0 +1,154 @@
+"""
+ViewGuard 통합 실행기
+
+사용법:
+    python viewguard.py monitor [--debug] [--replay lab.vgrec]   # 16분할 모니터
+    python viewguard.py monitor --node 10.0.0.5:9200             # 분산 노드 (감지 이벤트만 전송)
+    python viewguard.py aggregator [--listen 10.0.0.5:9200]      # 분산 집계 서버 (상태/알림/대시보드)
+    python viewguard.py sequential [--debug]                     # 순차 채널 모니터
+    python viewguard.py cctv 0 rtsp://... [--headless]           # CCTV / 다중 스트림
+    python viewguard.py roi                                      # 좌석 위치 설정
+    python viewguard.py roi --group right --region 1920,0,1920,1080  # 모니터/뷰어 창별 좌석 설정
+    python viewguard.py channels                                 # 채널 버튼 위치 설정
+    python viewguard.py test-alerts [--send]                     # 알림 연결 테스트
+    python viewguard.py --import-only roi                        # 모듈 로딩만 (시간 측정)
+
+무거운 모듈(mediapipe, cv2, telegram, pyautogui)은 명령마다 필요한 것만 불러오며,
+모니터 명령은 시작부터 첫 캡처까지 걸린 시간을 출력 (/metrics의 startup_seconds)
+"""
+import time
+
+BOOT_AT = time.perf_counter()
+
+import argparse  # noqa: E402
+import os  # noqa: E402
+import sys  # noqa: E402
+
+ROOT = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(ROOT, 'src'))
+sys.path.insert(0, os.path.join(ROOT, 'viewguard-new'))
+
+# 명령 → 불러올 모듈 (--import-only / 시작 시간 측정용)
+COMMAND_MODULES = {
+    'monitor': 'main',
+    'sequential': 'main_sequential',
+    'cctv': 'viewguard_main',
+    'roi': 'roi_manager',
+    'channels': 'channel_setup',
+    'test-alerts': 'alert_system',
+    'aggregator': 'distributed',
+}
+
+# ML 스택이 필요 없는 명령 (import 시간 회귀 검사 대상)
+LIGHT_COMMANDS = ('roi', 'channels', 'test-alerts', 'aggregator')
+
+
+def load_command(command: str):
+    """
+    명령 모듈 로딩 (소요 시간 출력)
+
+    Args:
+        command: COMMAND_MODULES의 키
+
+    Returns:
+        불러온 모듈
+    """
+    import importlib
+
+    start = time.perf_counter()
+    module = importlib.import_module(COMMAND_MODULES[command])
+    print(f"📦 {command}: 모듈 로딩 {time.perf_counter() - start:.2f}초 "
+          f"(시작 후 {time.perf_counter() - BOOT_AT:.2f}초)")
+    return module
+
+
+def run_cctv(module, argv):
+    """CCTV / 다중 스트림 모니터"""
+    parser = argparse.ArgumentParser(prog='viewguard cctv', description='CCTV 스트림 모니터')
+    parser.add_argument('sources', nargs='*', help='카메라 번호 / 동영상 파일 / RTSP URL')
+    parser.add_argument('--headless', action='store_true', help='화면 표시 없이 실행')
+    parser.add_argument('--config', type=str, default='config/settings.json',
+                        help='설정 파일 경로')
+    args = parser.parse_args(argv)
+
+    if not args.sources:
+        module.main([])
+        return
+
+    camera_index = module.parse_camera_input(','.join(args.sources))
+    monitor = module.CCTVMonitor(camera_index, args.config, show_window=not args.headless)
+    monitor.start()
+
+
+def run_test_alerts(module, argv):
+    """설정된 알림 채널 연결 테스트"""
+    parser = argparse.ArgumentParser(prog='viewguard test-alerts', description='알림 연결 테스트')
+    parser.add_argument('--config', type=str, default='config/settings.json',
+                        help='설정 파일 경로')
+    parser.add_argument('--send', action='store_true',
+                        help='연결 확인 후 테스트 졸음 알림까지 전송')
+    args = parser.parse_args(argv)
+
+    from alert_system_github import GitHubAlert
+
+    results = {}
+
+    telegram = module.TelegramAlert(args.config)
+    if telegram.enabled:
+        results['telegram'] = telegram.test_connection()
+
+    github = GitHubAlert(args.config)
+    if github.enabled:
+        results['github'] = github.test_connection()
+
+    if args.send:
+        test_details = {'ear': 0.182, 'head_tilt': 0.612, 'eyes_closed': True, 'head_down': True}
+        alert = telegram if telegram.enabled else module.ConsoleAlert()
+        results['test_alert'] = alert.send_drowsy_alert("TEST-01", 0.85, test_details)
+
+    if not results:
+        print("⚠️  활성화된 알림 채널이 없습니다 (config/settings.json의 telegram / github)")
+        return
+
+    print("\n📋 알림 테스트 결과")
+    for name, ok in results.items():
+        print(f"   {name}: {'✅ 성공' if ok else '❌ 실패'}")
+
+
+def main(argv=None):
+    """메인 함수"""
+    parser = argparse.ArgumentParser(
+        prog='viewguard',
+        description='ViewGuard Student Monitor 통합 실행기',
+        epilog='명령별 옵션: python viewguard.py <명령> --help'
+    )
+    parser.add_argument('--import-only', action='store_true',
+                        help='명령 모듈만 불러오고 종료 (시작 시간 측정용, 명령 앞에 지정)')
+    parser.add_argument('command', choices=list(COMMAND_MODULES), help='실행할 명령')
+    parser.add_argument('args', nargs=argparse.REMAINDER, help='명령 옵션')
+    args = parser.parse_args(argv)
+
+    os.chdir(ROOT)
+
+    # 첫 캡처까지 시간은 인터프리터 시작 직후부터 측정
+    from instrumentation import instrumentation
+    instrumentation.mark_boot(BOOT_AT)
+
+    module = load_command(args.command)
+    if args.import_only:
+        return
+
+    if args.command in ('monitor', 'sequential'):
+        module.main(args.args)
+    elif args.command == 'cctv':
+        run_cctv(module, args.args)
+    elif args.command in ('roi', 'aggregator'):
+        module.main(args.args)
+    elif args.command == 'channels':
+        module.main()
+    elif args.command == 'test-alerts':
+        run_test_alerts(module, args.args)
+
+
+if __name__ == "__main__":
+    main()